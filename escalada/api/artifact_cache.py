@@ -0,0 +1,136 @@
+"""
+Content-addressed on-disk cache for rendered export artifacts (official ZIPs).
+
+An export is fully determined by the inputs it is rendered from (scores, times, clubs, tie-break
+decisions, ...), so artifacts are stored under a hash of those inputs (`inputs_hash`):
+- a repeat export of an unchanged box is served straight from disk, without re-rendering
+- timer/climb fields are not part of the key, so a running timer does not invalidate it
+- eviction is LRU by file mtime (touched on every hit) once the cache exceeds its size budget
+
+Config:
+- `ARTIFACT_CACHE_DIR` (default: `cache/artifacts`)
+- `ARTIFACT_CACHE_MAX_MB` (default: 256)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", "cache/artifacts")
+ARTIFACT_CACHE_MAX_MB = int(os.getenv("ARTIFACT_CACHE_MAX_MB", "256"))
+
+
+def inputs_hash(*parts: Any) -> str:
+    """Stable SHA-256 of JSON-serializable parts (dict key order does not matter)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = json.dumps(
+            part, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+        digest.update(encoded.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Directory of `<key><suffix>` files with a total size budget (LRU eviction)."""
+
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str = "") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = "") -> Path | None:
+        """Return the cached artifact path (and mark it recently used), or None."""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, data: bytes, suffix: str = "") -> Path:
+        """Store `data` under `key` (atomic write) and evict old entries if over budget."""
+        path = self.path_for(key, suffix)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not (path.exists() and path.stat().st_size == len(data)):
+                tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            else:
+                os.utime(path)
+            self._evict(keep=path)
+        return path
+
+    def put_stream(self, key: str, chunks: Iterable[bytes], suffix: str = "") -> Iterator[bytes]:
+        """
+        Pass `chunks` through while writing them to the cache.
+
+        The artifact is stored only if the stream completes; an error or an abandoned stream
+        (client disconnected) discards the partial file.
+        """
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        complete = False
+        try:
+            with open(tmp, "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            if complete:
+                with self._lock:
+                    os.replace(tmp, path)
+                    self._evict(keep=path)
+            else:
+                tmp.unlink(missing_ok=True)
+
+    def size_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        return [p for p in self.root.glob("*/*") if p.is_file() and not p.name.startswith(".")]
+
+    def _evict(self, keep: Path | None = None) -> None:
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+                total -= size
+            except OSError as exc:
+                logger.warning("Could not evict cached artifact %s: %s", entry, exc)
+
+
+# Shared cache used by the export jobs.
+artifact_cache = ArtifactCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_MB * 1024 * 1024)
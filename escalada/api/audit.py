@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Literal
+
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from escalada.auth.deps import require_role
-from escalada.storage.json_store import read_latest_events
+from escalada.storage import iter_audit_lines, query_audit_events, read_latest_events
 
 router = APIRouter()
 
+# Streamed exports are sent in blocks of roughly this many bytes (not one write per event).
+AUDIT_EXPORT_CHUNK_BYTES = 64 * 1024
+
+AUDIT_CSV_COLUMNS = [
+    "id",
+    "createdAt",
+    "competitionId",
+    "boxId",
+    "action",
+    "actionId",
+    "boxVersion",
+    "sessionId",
+    "actorUsername",
+    "actorRole",
+    "actorIp",
+    "actorUserAgent",
+]
+
 
 class AuditEventOut(BaseModel):
     id: str
@@ -34,27 +60,145 @@ async def list_audit_events(
 ):
     """Admin-only audit log stream (most recent first)."""
 
-    events = read_latest_events(
+    # File/database read off the event loop (judge commands keep flowing during audit reviews).
+    events = await run_in_threadpool(
+        read_latest_events,
         limit=limit,
         include_payload=include_payload,
         box_id=box_id,
     )
 
-    return [
-        AuditEventOut(
-            id=str(ev.get("id", "")),
-            createdAt=str(ev.get("createdAt", "")),
-            competitionId=int(ev.get("competitionId", 0) or 0),
-            boxId=ev.get("boxId"),
-            action=str(ev.get("action", "")),
-            actionId=ev.get("actionId"),
-            boxVersion=int(ev.get("boxVersion", 0) or 0),
-            sessionId=ev.get("sessionId"),
-            actorUsername=ev.get("actorUsername"),
-            actorRole=ev.get("actorRole"),
-            actorIp=ev.get("actorIp"),
-            actorUserAgent=ev.get("actorUserAgent"),
-            payload=ev.get("payload") if include_payload else None,
-        )
-        for ev in events
-    ]
+    return [_event_out(ev, include_payload) for ev in events]
+
+
+@router.get("/audit/query", response_model=list[AuditEventOut])
+async def search_audit_events(
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    box_id: int | None = Query(default=None, alias="boxId"),
+    action: str | None = Query(default=None),
+    actor: str | None = Query(default=None),
+    limit: int = Query(default=500, ge=1, le=5000),
+    order: Literal["desc", "asc"] = Query(default="desc"),
+    include_payload: bool = Query(default=True, alias="includePayload"),
+    claims=Depends(require_role(["admin"])),
+):
+    """
+    Query the full audit history (all rotated segments), most recent first by default.
+
+    Same filters as `/audit/export`; answered from the per-segment audit indexes, reading only the
+    matching events.
+    """
+    events = await run_in_threadpool(
+        query_audit_events,
+        since=since,
+        until=until,
+        box_id=box_id,
+        action=action,
+        actor=actor,
+        limit=limit,
+        include_payload=include_payload,
+        newest_first=order == "desc",
+    )
+    return [_event_out(ev, include_payload) for ev in events]
+
+
+def _event_out(ev: dict, include_payload: bool) -> AuditEventOut:
+    return AuditEventOut(
+        id=str(ev.get("id", "")),
+        createdAt=str(ev.get("createdAt", "")),
+        competitionId=int(ev.get("competitionId", 0) or 0),
+        boxId=ev.get("boxId"),
+        action=str(ev.get("action", "")),
+        actionId=ev.get("actionId"),
+        boxVersion=int(ev.get("boxVersion", 0) or 0),
+        sessionId=ev.get("sessionId"),
+        actorUsername=ev.get("actorUsername"),
+        actorRole=ev.get("actorRole"),
+        actorIp=ev.get("actorIp"),
+        actorUserAgent=ev.get("actorUserAgent"),
+        payload=ev.get("payload") if include_payload else None,
+    )
+
+
+def _chunked(parts: Iterable[str]) -> Iterator[bytes]:
+    buffer: list[str] = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= AUDIT_EXPORT_CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _ndjson_parts(lines: Iterable[str], include_payload: bool) -> Iterator[str]:
+    for line in lines:
+        if include_payload:
+            # Raw pass-through: the stored line is already one JSON event.
+            yield line + "\n"
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        event["payload"] = None
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _csv_parts(lines: Iterable[str], include_payload: bool) -> Iterator[str]:
+    columns = AUDIT_CSV_COLUMNS + (["payload"] if include_payload else [])
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    yield out.getvalue()
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        row = ["" if event.get(col) is None else event.get(col) for col in AUDIT_CSV_COLUMNS]
+        if include_payload:
+            payload = event.get("payload")
+            row.append("" if payload is None else json.dumps(payload, ensure_ascii=False))
+        out.seek(0)
+        out.truncate()
+        writer.writerow(row)
+        yield out.getvalue()
+
+
+@router.get("/audit/export")
+async def export_audit_events(
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    box_id: int | None = Query(default=None, alias="boxId"),
+    action: str | None = Query(default=None),
+    actor: str | None = Query(default=None),
+    include_payload: bool = Query(default=True, alias="includePayload"),
+    claims=Depends(require_role(["admin"])),
+):
+    """
+    Stream the full audit history (all rotated segments, oldest first) as NDJSON or CSV.
+
+    Filters: `since` (inclusive) / `until` (exclusive) ISO timestamps, `boxId`, `action` and
+    `actor` (username). NDJSON passes the stored lines through unchanged; the file reads run in
+    the threadpool while the response streams, with constant memory.
+    """
+    lines = iter_audit_lines(since=since, until=until, box_id=box_id, action=action, actor=actor)
+    if fmt == "csv":
+        parts = _csv_parts(lines, include_payload)
+    else:
+        parts = _ndjson_parts(lines, include_payload)
+    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    media_type = "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _chunked(parts),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=audit_{ts}.{fmt}"},
+    )
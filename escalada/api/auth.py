@@ -6,10 +6,11 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from escalada.auth.deps import get_current_claims, require_role
 from escalada.auth.service import create_access_token, hash_password, verify_password
-from escalada.storage.json_store import get_users_with_default_admin, save_users
+from escalada.storage import get_users_with_default_admin, save_users
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +48,8 @@ class TokenResponse(BaseModel):
 
 @router.post("/auth/login", response_model=TokenResponse)
 async def login(payload: LoginRequest, response: Response) -> TokenResponse:
-    users = get_users_with_default_admin()
+    # Blocking storage I/O (file or SQLite): keep it off the event loop.
+    users = await run_in_threadpool(get_users_with_default_admin)
     requested = payload.username
     canonical = _canonical_username(requested)
 
@@ -151,7 +153,7 @@ async def set_judge_password(
     claims=Depends(require_role(["admin"])),
 ):
     """Setează/creează parola pentru userul judge al box-ului (implicit username=Box {id})."""
-    users = get_users_with_default_admin()
+    users = await run_in_threadpool(get_users_with_default_admin)
     raw_username = payload.username or f"Box {box_id}"
     username = _canonical_username(raw_username) or f"Box {box_id}"
     alias_username = _canonical_username(f"Box {box_id}") or f"Box {box_id}"
@@ -189,5 +191,5 @@ async def set_judge_password(
     for u in aliases:
         users[u] = {"username": u, **record}
 
-    save_users(users)
+    await run_in_threadpool(save_users, users)
     return {"status": "ok", "boxId": box_id, "username": username, "alias": alias_username, "id_alias": id_username}
@@ -1,4 +1,5 @@
 import asyncio
+import copy
 import csv
 import io
 import json
@@ -7,21 +8,77 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List
 
-import pandas as pd
-from fastapi import APIRouter, Depends, HTTPException, Response
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 from escalada.api import live
-from escalada.api.official_export import build_official_results_zip, safe_zip_component
-from escalada.api.save_ranking import _build_overall_df, _format_time
+from escalada.api.bundle_export import bundle_inputs_hash, iter_official_bundle, run_bundle_job
+from escalada.api.export_jobs import ExportJob, ExportQueueFull, export_jobs
+from escalada.api.official_export import (
+    build_official_results_zip,
+    official_export_inputs_hash,
+    safe_zip_component,
+)
+from escalada.api.overall_ranking import compute_overall_ranking
+from escalada.api.save_ranking import _format_time
+from escalada.api.score_matrix import SNAPSHOT_KEY, box_matrix, canonicalize_state
 from escalada.auth.deps import require_role
-from escalada.storage.json_store import save_box_state
+from escalada.storage import save_box_state
 
 router = APIRouter()
 
 
-def _snapshot_from_state(box_id: int, state: Dict[str, Any]) -> Dict[str, Any]:
+# Per-box cache of the overall ranking block: (version key, (scores, times, competitors), records).
+# Reused while the box version is unchanged and the score/roster containers are the same objects;
+# only trusted when command validation is on (otherwise boxVersion is not bumped).
+_ranking_cache: Dict[int, tuple] = {}
+
+
+def _ranking_block(box_id: int, state: Dict[str, Any], snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Overall ranking records for a snapshot (read-only; shared between snapshots of a version)."""
+    scores = snapshot.get("scores")
+    times = snapshot.get("times")
+    # Identity checks use the state's own containers (snapshot falls back to fresh dicts).
+    containers = (state.get("scores"), state.get("times"), state.get("competitors"))
+    route_count = snapshot.get("routesCount") or 0
+    use_time = bool(snapshot.get("timeCriterionEnabled"))
+    key = (state.get("sessionId"), state.get("boxVersion", 0), route_count, use_time)
+    cached = _ranking_cache.get(box_id)
+    if (
+        live.VALIDATION_ENABLED
+        and cached is not None
+        and cached[0] == key
+        and all(a is b for a, b in zip(cached[1], containers))
+    ):
+        return cached[2]
+
+    try:
+        if scores and route_count:
+            records = compute_overall_ranking(
+                scores,
+                route_count,
+                clubs=snapshot.get("clubs") or {},
+                times=times,
+                use_time=use_time,
+            ).records(_format_time)
+        else:
+            records = []
+    except Exception:
+        records = []
+    _ranking_cache[box_id] = (key, containers, records)
+    return records
+
+
+def _snapshot_from_state(
+    box_id: int, state: Dict[str, Any], include_ranking: bool = False
+) -> Dict[str, Any]:
+    """
+    Build a backup snapshot (raw box state) for one box.
+
+    The overall `ranking` block is only added when requested (`include_ranking`), from the
+    per-version cache above; periodic backups and restores only need the raw state.
+    """
     remaining = state.get("remaining")
     if live._server_side_timer_enabled():
         remaining = live._compute_remaining(state, live._now_ms())
@@ -83,49 +140,54 @@ def _snapshot_from_state(box_id: int, state: Dict[str, Any]) -> Dict[str, Any]:
                 }
             )
 
-    try:
-        route_count = snapshot.get("routesCount") or 0
-        if scores and route_count:
-            df_overall = _build_overall_df(
-                type(
-                    "Payload",
-                    (),
-                    {
-                        "scores": scores,
-                        "route_count": route_count,
-                        "clubs": clubs,
-                        "include_clubs": bool(clubs),
-                        "times": times,
-                        "use_time_tiebreak": bool(snapshot.get("timeCriterionEnabled")),
-                    },
-                ),
-                times,
-            )
-            snapshot["ranking"] = df_overall.to_dict(orient="records")
-        else:
-            snapshot["ranking"] = []
-    except Exception:
-        snapshot["ranking"] = []
+    if include_ranking:
+        snapshot["ranking"] = _ranking_block(box_id, state, snapshot)
 
     return snapshot
 
 
-async def _fetch_box_snapshot(box_id: int) -> Dict[str, Any] | None:
+async def _fetch_box_snapshot(
+    box_id: int, include_ranking: bool = False
+) -> Dict[str, Any] | None:
     state = live.state_map.get(box_id) or live._default_state()
-    return _snapshot_from_state(box_id, state)
+    return _snapshot_from_state(box_id, state, include_ranking=include_ranking)
+
+
+def _export_snapshot(box_id: int, state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Private export copy of a box snapshot (renders on the worker pool while the state changes).
+
+    Live boxes hand over a copy of their validated score matrix, so the render does not validate
+    the score/time tables again.
+    """
+    snap = copy.deepcopy(_snapshot_from_state(box_id, state))
+    if live.state_map.get(box_id) is state:
+        snap[SNAPSHOT_KEY] = box_matrix(box_id, state).copy()
+    return snap
+
+
+async def _fetch_export_snapshot(box_id: int) -> Dict[str, Any]:
+    return _export_snapshot(box_id, live.state_map.get(box_id) or live._default_state())
 
 
 @router.get("/backup/box/{box_id}")
-async def backup_box(box_id: int, claims=Depends(require_role(["admin"]))):
-    snap = await _fetch_box_snapshot(box_id)
+async def backup_box(
+    box_id: int,
+    include_ranking: bool = Query(default=False, alias="includeRanking"),
+    claims=Depends(require_role(["admin"])),
+):
+    snap = await _fetch_box_snapshot(box_id, include_ranking=include_ranking)
     if not snap:
         raise HTTPException(status_code=404, detail="box_not_found")
     return {"status": "ok", "snapshot": snap}
 
 
 @router.get("/backup/full")
-async def backup_full(claims=Depends(require_role(["admin"]))):
-    snapshots = await collect_snapshots()
+async def backup_full(
+    include_ranking: bool = Query(default=False, alias="includeRanking"),
+    claims=Depends(require_role(["admin"])),
+):
+    snapshots = await collect_snapshots(include_ranking=include_ranking)
     return {"status": "ok", "snapshots": snapshots}
 
 
@@ -151,7 +213,7 @@ async def backup_last(download: bool = False, claims=Depends(require_role(["admi
 async def export_box_csv(box_id: int, claims=Depends(require_role(["admin"]))):
     """Export current state to CSV (lightweight per-box export)."""
 
-    snap = await _fetch_box_snapshot(box_id)
+    snap = await _fetch_box_snapshot(box_id, include_ranking=True)
     if not snap:
         raise HTTPException(status_code=404, detail="box_not_found")
 
@@ -225,29 +287,164 @@ async def export_box_csv(box_id: int, claims=Depends(require_role(["admin"]))):
     )
 
 
+def _official_filename(box_id: int, snap: Dict[str, Any]) -> str:
+    folder = safe_zip_component(str(snap.get("categorie") or f"box_{box_id}"))
+    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    return f"official_{folder}_box{box_id}_{ts}.zip"
+
+
+def _submit_official_export(box_id: int, snap: Dict[str, Any]) -> tuple[ExportJob, bool]:
+    # Same render inputs => same output: concurrent requests share one render and repeat
+    # requests are served from the artifact cache.
+    digest = official_export_inputs_hash(snap)
+    try:
+        return export_jobs.submit(
+            kind="official_zip",
+            key=("official_zip", digest),
+            cache_key=digest,
+            render=build_official_results_zip,
+            render_input=snap,
+            filename=_official_filename(box_id, snap),
+            box_id=box_id,
+        )
+    except ExportQueueFull:
+        raise HTTPException(status_code=503, detail="export_queue_full")
+
+
+def _job_payload(job: ExportJob) -> Dict[str, Any]:
+    payload = job.to_dict()
+    payload["queuePosition"] = export_jobs.queue_position(job)
+    return payload
+
+
+def _job_download(job: ExportJob) -> Response:
+    if job.path is not None:
+        if not job.path.exists():
+            raise HTTPException(status_code=410, detail="artifact_evicted")
+        return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
+    return Response(
+        content=job.result,
+        media_type=job.media_type,
+        headers={"Content-Disposition": f"attachment; filename={job.filename}"},
+    )
+
+
 @router.get("/export/official/box/{box_id}")
 async def export_official_results_zip(box_id: int, claims=Depends(require_role(["admin"]))):
-    """Export "official" results bundle (ZIP with XLSX+PDF) for a box."""
+    """
+    Export "official" results bundle (ZIP with XLSX+PDF) for a box.
 
-    snap = await _fetch_box_snapshot(box_id)
+    Rendered as a regular export job on the worker pool (never in the API process) and served
+    from its artifact: repeat requests with unchanged inputs hit the artifact cache, concurrent
+    ones share the running job.
+    """
+
+    snap = await _fetch_export_snapshot(box_id)
     if not snap:
         raise HTTPException(status_code=404, detail="box_not_found")
 
-    try:
-        zip_bytes = build_official_results_zip(snap)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+    job, _ = _submit_official_export(box_id, snap)
+    await job.wait()
+    if job.status != "done":
+        raise HTTPException(status_code=400 if job.invalid_input else 500, detail=job.error)
+    return _job_download(job)
+
+
+async def _bundle_snapshots(box_ids: List[int] | None) -> List[Dict[str, Any]]:
+    ids = box_ids if box_ids else sorted(live.state_map.keys())
+    snapshots = []
+    for box_id in ids:
+        snap = await _fetch_export_snapshot(box_id)
+        if snap:
+            snapshots.append(snap)
+    if not snapshots:
+        raise HTTPException(status_code=404, detail="no_boxes")
+    return snapshots
 
-    folder = safe_zip_component(str(snap.get("categorie") or f"box_{box_id}"))
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    filename = f"official_{folder}_box{box_id}_{ts}.zip"
-    return Response(
-        content=zip_bytes,
+
+def _bundle_filename() -> str:
+    return f"official_bundle_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.zip"
+
+
+@router.get("/export/official/bundle")
+async def export_official_bundle_zip(
+    box_ids: List[int] | None = Query(default=None, alias="boxId"),
+    claims=Depends(require_role(["admin"])),
+):
+    """
+    Stream one ZIP with the official results of several boxes (`?boxId=1&boxId=2`, default all).
+
+    Boxes render in parallel on the worker pool and are streamed as each one finishes (one folder
+    per box); `index.json` at the end lists every box with its status.
+    """
+    snapshots = await _bundle_snapshots(box_ids)
+    return StreamingResponse(
+        iter_official_bundle(snapshots, export_jobs.cache),
         media_type="application/zip",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        headers={"Content-Disposition": f"attachment; filename={_bundle_filename()}"},
     )
 
 
+@router.post("/export/jobs/official/bundle", status_code=202)
+async def submit_official_bundle_job(
+    box_ids: List[int] | None = Query(default=None, alias="boxId"),
+    claims=Depends(require_role(["admin"])),
+):
+    """Queue an "export all" bundle; the job reports progress as each box finishes."""
+    snapshots = await _bundle_snapshots(box_ids)
+    digest = bundle_inputs_hash(snapshots)
+    cache = export_jobs.cache
+
+    async def runner(job: ExportJob) -> bytes:
+        return await run_bundle_job(job, snapshots, cache)
+
+    try:
+        job, deduplicated = export_jobs.submit(
+            kind="official_bundle",
+            key=("official_bundle", digest),
+            cache_key=digest,
+            runner=runner,
+            filename=_bundle_filename(),
+        )
+    except ExportQueueFull:
+        raise HTTPException(status_code=503, detail="export_queue_full")
+    return {"status": "ok", "deduplicated": deduplicated, "job": _job_payload(job)}
+
+
+@router.post("/export/jobs/official/box/{box_id}", status_code=202)
+async def submit_official_export_job(box_id: int, claims=Depends(require_role(["admin"]))):
+    """Queue an official ZIP export and return its job id immediately (poll, then download)."""
+
+    snap = await _fetch_export_snapshot(box_id)
+    if not snap:
+        raise HTTPException(status_code=404, detail="box_not_found")
+
+    job, deduplicated = _submit_official_export(box_id, snap)
+    return {"status": "ok", "deduplicated": deduplicated, "job": _job_payload(job)}
+
+
+@router.get("/export/jobs/{job_id}")
+async def export_job_status(job_id: str, claims=Depends(require_role(["admin"]))):
+    """Status/progress of an export job."""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return {"status": "ok", "job": _job_payload(job)}
+
+
+@router.get("/export/jobs/{job_id}/download")
+async def export_job_download(job_id: str, claims=Depends(require_role(["admin"]))):
+    """Download the result of a finished export job."""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"job_failed: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="job_not_ready")
+    return _job_download(job)
+
+
 class RestoreRequest(BaseModel):
     snapshots: List[Dict[str, Any]]
     box_ids: List[int] | None = None
@@ -286,7 +483,8 @@ def _state_from_backup_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
             "boxVersion": box_version,
         }
     )
-    return state
+    # Restore is a write path: validate scores/times once so readers never re-coerce them.
+    return canonicalize_state(state)
 
 
 async def restore_snapshots_json(
@@ -320,12 +518,14 @@ async def restore_backup(payload: RestoreRequest, claims=Depends(require_role(["
     return {"status": "ok", "restored": restored}
 
 
-async def collect_snapshots() -> List[Dict[str, Any]]:
+async def collect_snapshots(include_ranking: bool = False) -> List[Dict[str, Any]]:
     """Collect snapshots for all boxes from in-memory state_map (thread-safe)."""
     states = await live.get_all_states_snapshot()
     snapshots: List[Dict[str, Any]] = []
     for box_id, state in states.items():
-        snapshots.append(_snapshot_from_state(int(box_id), state))
+        snapshots.append(
+            _snapshot_from_state(int(box_id), state, include_ranking=include_ranking)
+        )
     return snapshots
 
 
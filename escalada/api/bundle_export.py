@@ -0,0 +1,181 @@
+"""
+"Export all boxes": one official results bundle for several boxes, rendered in parallel.
+
+Every selected box is rendered as its own official ZIP on the worker pool at the same time
+(`worker_pool.run_in_worker`), reusing the artifact cache per box (unchanged boxes are not
+re-rendered). As boxes finish, in completion order, their members are re-rooted under one folder
+per box/category (`<categorie>_box<id>/...`) and streamed into a single ZIP; `index.json` at the
+end lists every box with its status, files and inputs hash.
+
+Used by the streaming `GET /api/admin/export/official/bundle` and by the bundle export job
+(which reports per-box progress through `ExportJob.progress_done`/`parts`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from escalada.api.artifact_cache import ArtifactCache, inputs_hash
+from escalada.api.export_jobs import ExportJob
+from escalada.api.official_export import (
+    build_official_results_zip,
+    official_export_inputs_hash,
+    safe_zip_component,
+)
+from escalada.api.worker_pool import run_in_worker
+from escalada.api.zip_stream import ZipStreamWriter
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_folder(snapshot: dict[str, Any]) -> str:
+    """ZIP folder of one box inside a bundle (box id keeps equal categories apart)."""
+    categorie = snapshot.get("categorie") or "box"
+    return safe_zip_component(f"{categorie}_box{snapshot.get('boxId')}")
+
+
+def bundle_inputs_hash(snapshots: list[dict[str, Any]]) -> str:
+    """Content address of a bundle (the per-box official export hashes, in order)."""
+    return inputs_hash("official_bundle", [official_export_inputs_hash(s) for s in snapshots])
+
+
+@dataclass
+class BoxExport:
+    """Outcome of rendering one box of a bundle."""
+
+    box_id: Any
+    categorie: str
+    folder: str
+    inputs_hash: str
+    status: str = "ok"  # ok | skipped (nothing to export) | failed
+    error: str | None = None
+    cached: bool = False
+    elapsed_ms: float = 0.0
+    zip_bytes: bytes | None = field(default=None, repr=False)
+
+    def index_entry(self, files: list[str]) -> dict[str, Any]:
+        return {
+            "boxId": self.box_id,
+            "categorie": self.categorie,
+            "folder": self.folder,
+            "status": self.status,
+            "error": self.error,
+            "cached": self.cached,
+            "elapsedMs": round(self.elapsed_ms, 1),
+            "inputsHash": self.inputs_hash,
+            "files": files,
+        }
+
+
+async def _render_box(snapshot: dict[str, Any], cache: ArtifactCache | None) -> BoxExport:
+    digest = official_export_inputs_hash(snapshot)
+    box = BoxExport(
+        box_id=snapshot.get("boxId"),
+        categorie=str(snapshot.get("categorie") or ""),
+        folder=bundle_folder(snapshot),
+        inputs_hash=digest,
+    )
+    started = time.perf_counter()
+    try:
+        cached_path = cache.get(digest, ".zip") if cache is not None else None
+        if cached_path is not None:
+            box.zip_bytes = await asyncio.to_thread(cached_path.read_bytes)
+            box.cached = True
+        else:
+            box.zip_bytes = await run_in_worker(build_official_results_zip, snapshot)
+            if cache is not None:
+                await asyncio.to_thread(cache.put, digest, box.zip_bytes, ".zip")
+    except ValueError as exc:
+        box.status = "skipped"
+        box.error = str(exc)
+    except Exception as exc:
+        logger.error("Bundle export of box %s failed: %s", box.box_id, exc, exc_info=True)
+        box.status = "failed"
+        box.error = str(exc) or type(exc).__name__
+    box.elapsed_ms = (time.perf_counter() - started) * 1000
+    return box
+
+
+async def render_boxes(
+    snapshots: list[dict[str, Any]], cache: ArtifactCache | None = None
+) -> AsyncIterator[BoxExport]:
+    """Render all boxes concurrently on the worker pool; yield them as they finish."""
+    tasks = [asyncio.ensure_future(_render_box(snapshot, cache)) for snapshot in snapshots]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stream abandoned (client disconnected): do not keep rendering the remaining boxes.
+        for task in tasks:
+            task.cancel()
+
+
+def _box_members(writer: ZipStreamWriter, box: BoxExport, files: list[str]) -> Iterator[bytes]:
+    """Copy a box ZIP into the bundle under its folder, yielding chunks as members are written."""
+    with zipfile.ZipFile(io.BytesIO(box.zip_bytes)) as zf:
+        for info in zf.infolist():
+            name = f"{box.folder}/{info.filename.split('/', 1)[-1]}"
+            files.append(name)
+            yield from writer.add(name, zf.open(info))
+
+
+def _index_order(entry: dict[str, Any]) -> tuple:
+    """`index.json` order: numeric box id (box 2 before box 10), then folder."""
+    try:
+        return (0, int(entry["boxId"]), entry["folder"])
+    except (TypeError, ValueError):
+        return (1, 0, entry["folder"])
+
+
+async def iter_official_bundle(
+    snapshots: list[dict[str, Any]],
+    cache: ArtifactCache | None = None,
+    on_box: Callable[[dict[str, Any]], None] | None = None,
+) -> AsyncIterator[bytes]:
+    """Stream the bundle ZIP; `on_box(index_entry)` is called as each box finishes."""
+    writer = ZipStreamWriter()
+    index: list[dict[str, Any]] = []
+    async for box in render_boxes(snapshots, cache):
+        files: list[str] = []
+        if box.zip_bytes is not None:
+            # Re-deflated off the event loop, one chunk at a time (never a whole box in memory).
+            members = _box_members(writer, box, files)
+            while (chunk := await asyncio.to_thread(next, members, None)) is not None:
+                yield chunk
+            box.zip_bytes = None
+        entry = box.index_entry(files)
+        index.append(entry)
+        if on_box is not None:
+            on_box(entry)
+
+    index.sort(key=_index_order)
+    payload = {
+        "exportedAt": datetime.now(timezone.utc).isoformat(),
+        "boxCount": len(index),
+        "exported": sum(1 for entry in index if entry["status"] == "ok"),
+        "boxes": index,
+    }
+    for chunk in writer.add("index.json", json.dumps(payload, ensure_ascii=False, indent=2).encode()):
+        yield chunk
+    yield writer.close()
+
+
+async def run_bundle_job(
+    job: ExportJob, snapshots: list[dict[str, Any]], cache: ArtifactCache | None = None
+) -> bytes:
+    """Export job runner: render the bundle, reporting one progress step per box."""
+    job.progress_total = len(snapshots)
+
+    def on_box(entry: dict[str, Any]) -> None:
+        job.progress_done += 1
+        job.parts.append({k: v for k, v in entry.items() if k != "files"})
+
+    return b"".join([chunk async for chunk in iter_official_bundle(snapshots, cache, on_box)])
@@ -0,0 +1,295 @@
+"""
+Background export jobs (official ZIPs rendered off the event loop).
+
+Rendering an official export (several XLSX sheets via pandas/openpyxl and PDFs via reportlab)
+takes long enough to freeze every WebSocket and judge command when it runs on the event loop.
+`ExportJobManager` turns exports into jobs:
+- `submit()` snapshots the inputs on the loop and returns a job immediately
+- rendering runs on the shared worker process pool (`worker_pool.run_in_worker`)
+- at most `EXPORT_JOB_CONCURRENCY` jobs render at once; further jobs wait in the queue and at most
+  `EXPORT_JOB_MAX_PENDING` jobs may be queued/running (`ExportQueueFull` beyond that)
+- single-flight: a second request with the same key (kind, box, session, boxVersion) while a job
+  is queued/running gets that job instead of starting another render
+- finished jobs keep their result for `EXPORT_JOB_TTL_SEC` so clients can poll and download
+- with an `ArtifactCache`, results are stored on disk under their inputs hash (`cache_key`); a
+  submit whose artifact is already cached returns a finished job without rendering
+
+Progress is reported by stage (`queued` → `rendering` → `done`/`failed`). A single render runs in
+another process and does not report intermediate progress; multi-part jobs submitted with a
+`runner` coroutine (e.g. the multi-box bundle) update `progress_done`/`progress_total` and
+`parts` as each part finishes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from escalada.api.artifact_cache import ArtifactCache, artifact_cache
+from escalada.api.worker_pool import run_in_worker
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_CONCURRENCY = int(os.getenv("EXPORT_JOB_CONCURRENCY", "2"))
+EXPORT_JOB_MAX_PENDING = int(os.getenv("EXPORT_JOB_MAX_PENDING", "16"))
+EXPORT_JOB_TTL_SEC = int(os.getenv("EXPORT_JOB_TTL_SEC", "900"))
+
+_STAGE_PROGRESS = {"queued": 0.0, "rendering": 0.5, "done": 1.0, "failed": 1.0}
+
+
+class ExportQueueFull(Exception):
+    """Raised by `submit()` when too many export jobs are already queued or running."""
+
+
+@dataclass
+class ExportJob:
+    """
+    State of one export job.
+
+    The result is either a cached file (`path`) or, without an artifact cache, bytes kept in
+    memory until the job expires (`result`).
+    """
+
+    id: str
+    kind: str
+    box_id: int | None
+    key: tuple
+    filename: str
+    media_type: str
+    status: str = "queued"  # queued | running | done | failed
+    stage: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    # True when the render rejected its input (ValueError), e.g. a box without scores.
+    invalid_input: bool = False
+    result: bytes | None = field(default=None, repr=False)
+    path: Path | None = None
+    # True when the artifact was served from the cache without rendering.
+    cached: bool = False
+    # Multi-part jobs: finished/total parts and one status entry per finished part.
+    progress_done: int = 0
+    progress_total: int = 0
+    parts: list[dict[str, Any]] = field(default_factory=list)
+    done_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in {"queued", "running"}
+
+    def size(self) -> int | None:
+        if self.result is not None:
+            return len(self.result)
+        if self.path is not None:
+            try:
+                return self.path.stat().st_size
+            except OSError:
+                return None
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "boxId": self.box_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": (
+                round(self.progress_done / self.progress_total, 3)
+                if self.progress_total and self.stage == "rendering"
+                else _STAGE_PROGRESS.get(self.stage, 0.0)
+            ),
+            "partsDone": self.progress_done,
+            "partsTotal": self.progress_total,
+            "parts": list(self.parts),
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "filename": self.filename,
+            "size": self.size(),
+            "cached": self.cached,
+            "error": self.error,
+        }
+
+    async def wait(self) -> "ExportJob":
+        await self.done_event.wait()
+        return self
+
+
+class ExportJobManager:
+    """Bounded, single-flight export job queue backed by the worker pool."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = EXPORT_JOB_CONCURRENCY,
+        max_pending: int = EXPORT_JOB_MAX_PENDING,
+        ttl_sec: float = EXPORT_JOB_TTL_SEC,
+        cache: ArtifactCache | None = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max(1, max_pending)
+        self.ttl_sec = ttl_sec
+        self.cache = cache
+        self._jobs: dict[str, ExportJob] = {}
+        self._active_by_key: dict[tuple, ExportJob] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop (tests and reloads may run several loops).
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _prune(self, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if not job.active
+            and job.finished_at is not None
+            and now - job.finished_at > self.ttl_sec
+        ]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+
+    def get(self, job_id: str) -> ExportJob | None:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def active_job(self, key: tuple) -> ExportJob | None:
+        """Queued/running job for `key`, if any (single-flight lookup)."""
+        job = self._active_by_key.get(key)
+        return job if job is not None and job.active else None
+
+    def active_count(self) -> int:
+        """Number of queued/running jobs."""
+        return sum(1 for j in self._jobs.values() if j.active)
+
+    def queue_position(self, job: ExportJob) -> int | None:
+        """1-based position among queued jobs (None when not queued)."""
+        if job.status != "queued":
+            return None
+        queued = sorted(
+            (j for j in self._jobs.values() if j.status == "queued"), key=lambda j: j.created_at
+        )
+        return next((idx for idx, j in enumerate(queued, start=1) if j is job), None)
+
+    def submit(
+        self,
+        *,
+        kind: str,
+        key: tuple,
+        render: Callable[[Any], bytes] | None = None,
+        render_input: Any = None,
+        filename: str,
+        box_id: int | None = None,
+        media_type: str = "application/zip",
+        cache_key: str | None = None,
+        runner: Callable[[ExportJob], Awaitable[bytes]] | None = None,
+    ) -> tuple[ExportJob, bool]:
+        """
+        Queue a render: `render(render_input)` on the worker pool, or the `runner(job)` coroutine
+        for jobs that orchestrate several renders themselves (and report per-part progress).
+
+        Returns `(job, deduplicated)`; `deduplicated` is True when an active job with the same key
+        was returned instead of starting a new one. When `cache_key` (an `inputs_hash`) is given
+        and the artifact is cached, the returned job is already done. Must be called from the
+        event loop.
+        """
+        self._prune()
+        existing = self._active_by_key.get(key)
+        if existing is not None and existing.active:
+            return existing, True
+
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            box_id=box_id,
+            key=key,
+            filename=filename,
+            media_type=media_type,
+        )
+        suffix = Path(filename).suffix
+        cached_path = (
+            self.cache.get(cache_key, suffix) if self.cache is not None and cache_key else None
+        )
+        if cached_path is not None:
+            job.path = cached_path
+            job.cached = True
+            job.status = job.stage = "done"
+            job.finished_at = time.time()
+            job.done_event.set()
+            self._jobs[job.id] = job
+            return job, False
+
+        if self.active_count() >= self.max_pending:
+            raise ExportQueueFull()
+        self._jobs[job.id] = job
+        self._active_by_key[key] = job
+        if runner is None:
+            if render is None:
+                raise ValueError("render or runner is required")
+
+            async def runner(_job: ExportJob) -> bytes:
+                return await run_in_worker(render, render_input)
+
+        task = asyncio.create_task(self._run(job, runner, cache_key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job, False
+
+    async def _run(
+        self,
+        job: ExportJob,
+        runner: Callable[[ExportJob], Awaitable[bytes]],
+        cache_key: str | None,
+    ) -> None:
+        try:
+            async with self._get_semaphore():
+                job.status = "running"
+                job.stage = "rendering"
+                job.started_at = time.time()
+                try:
+                    data = await runner(job)
+                    if self.cache is not None and cache_key:
+                        job.path = await asyncio.to_thread(
+                            self.cache.put, cache_key, data, Path(job.filename).suffix
+                        )
+                    else:
+                        job.result = data
+                    job.status = job.stage = "done"
+                except ValueError as exc:
+                    job.status = job.stage = "failed"
+                    job.error = str(exc)
+                    job.invalid_input = True
+                except Exception as exc:
+                    logger.error(
+                        "Export job %s (%s) failed: %s", job.id, job.kind, exc, exc_info=True
+                    )
+                    job.status = job.stage = "failed"
+                    job.error = str(exc) or type(exc).__name__
+        except asyncio.CancelledError:
+            job.status = job.stage = "failed"
+            job.error = "cancelled"
+            raise
+        finally:
+            job.finished_at = time.time()
+            if self._active_by_key.get(job.key) is job:
+                del self._active_by_key[job.key]
+            job.done_event.set()
+
+
+# Shared manager used by the export endpoints.
+export_jobs = ExportJobManager(cache=artifact_cache)
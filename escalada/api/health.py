@@ -11,8 +11,8 @@
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from pathlib import Path
 
 # -------------------- Third-party imports --------------------
 from fastapi import APIRouter
@@ -20,39 +20,65 @@ from fastapi import APIRouter
 # -------------------- Local application imports --------------------
 # These are "in-memory" structures maintained by the live module (authoritative at runtime).
 from escalada.api.live import state_map, state_locks
-# JSON store path helpers (events file + storage root) used for size/usage reporting.
-from escalada.storage.json_store import _events_path, STORAGE_DIR
+# Storage backend helpers (audit log/archive sizes + storage root) used for size/usage reporting.
+from escalada.storage import STORAGE_DIR, audit_archive_bytes, audit_size_bytes
 
 logger = logging.getLogger(__name__)
+# The storage walk is cached this long (probes can run every few seconds).
+HEALTH_STORAGE_CACHE_SEC = float(os.getenv("HEALTH_STORAGE_CACHE_SEC", "30"))
+_storage_usage_cache: tuple[float, float] | None = None  # (monotonic time, MB)
 # Router is mounted under `/api` in `escalada/main.py`.
 router = APIRouter(tags=["health"])
 
 
 def _get_audit_file_size_mb() -> float:
-    """Return audit file size in MB, or 0 if not found."""
+    """Return audit log size in MB (NDJSON file or SQLite database), or 0 if not found."""
     # Best-effort: failures here should not break health probes.
     try:
-        path = _events_path()
-        if path.exists():
-            return path.stat().st_size / (1024 * 1024)
+        return audit_size_bytes() / (1024 * 1024)
     except Exception:
         pass
     return 0.0
 
 
+def _get_audit_archive_size_mb() -> float:
+    """Return the size of the rotated audit archives in MB (from the archive manifest)."""
+    try:
+        return audit_archive_bytes() / (1024 * 1024)
+    except Exception:
+        pass
+    return 0.0
+
+
+def _dir_size_bytes(path: str) -> int:
+    # os.scandir walk: one directory listing per folder (no per-file Path objects/is_file stats).
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                total += _dir_size_bytes(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
 def _get_storage_usage_mb() -> float:
-    """Return total storage directory size in MB."""
+    """Return total storage directory size in MB (cached for HEALTH_STORAGE_CACHE_SEC)."""
     # Best-effort recursion: counts file sizes under STORAGE_DIR.
     # Useful for monitoring disk growth during long events.
+    global _storage_usage_cache
+    now = time.monotonic()
+    cached = _storage_usage_cache
+    if cached is not None and now - cached[0] < HEALTH_STORAGE_CACHE_SEC:
+        return cached[1]
     try:
-        storage_path = Path(STORAGE_DIR)
-        if not storage_path.exists():
-            return 0.0
-        total = sum(f.stat().st_size for f in storage_path.rglob("*") if f.is_file())
-        return total / (1024 * 1024)
+        usage = _dir_size_bytes(STORAGE_DIR) / (1024 * 1024)
+    except FileNotFoundError:
+        usage = 0.0
     except Exception:
-        pass
-    return 0.0
+        return 0.0
+    _storage_usage_cache = (now, usage)
+    return usage
 
 
 @router.get("/health")
@@ -65,16 +91,19 @@ async def health_check():
         - boxes_loaded: number of box states in memory
         - ws_locks: number of active box locks
         - audit_file_mb: size of audit log file in MB
-        - storage_mb: total storage usage in MB
+        - audit_archive_mb: size of the rotated (compressed) audit archives in MB
+        - storage_mb: total storage usage in MB (cached walk, off the event loop)
         - timestamp: current server time (UTC)
     """
     # This endpoint is intentionally "safe": no secrets, only coarse counters and sizes.
+    storage_mb = await asyncio.to_thread(_get_storage_usage_mb)
     return {
         "status": "ok",
         "boxes_loaded": len(state_map),
         "ws_locks": len(state_locks),
         "audit_file_mb": round(_get_audit_file_size_mb(), 2),
-        "storage_mb": round(_get_storage_usage_mb(), 2),
+        "audit_archive_mb": round(_get_audit_archive_size_mb(), 2),
+        "storage_mb": round(storage_mb, 2),
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
 
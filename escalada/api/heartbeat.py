@@ -0,0 +1,146 @@
+"""
+Shared WebSocket heartbeat scheduler.
+
+One background loop serves every WebSocket endpoint (per-box, public per-box and the global
+public feed) instead of one sleeping task per connection:
+- all registered sockets live in a single last-pong table
+- every tick pings the live sockets concurrently with one pre-serialized PING frame; each send
+  is bounded by `HEARTBEAT_SEND_TIMEOUT_SEC`, so one stalled client cannot hold up the tick
+- sockets with no PONG within their timeout (or whose PING fails or times out) are closed in bulk
+
+Closing a socket makes the endpoint's pending `receive_text()` fail, so the endpoint's own
+`finally` block still performs registry cleanup (and calls `unregister`).
+"""
+
+# -------------------- Standard library imports --------------------
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+
+# -------------------- Third-party imports --------------------
+from starlette.websockets import WebSocket
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL_SEC = 30.0
+HEARTBEAT_TIMEOUT_SEC = 60.0
+HEARTBEAT_SEND_TIMEOUT_SEC = 5.0
+
+
+@dataclass
+class _Entry:
+    label: str
+    timeout: float
+    last_pong: float
+
+
+class HeartbeatScheduler:
+    """Ping all registered sockets from a single loop and close dead ones in bulk."""
+
+    def __init__(
+        self,
+        interval: float = HEARTBEAT_INTERVAL_SEC,
+        send_timeout: float = HEARTBEAT_SEND_TIMEOUT_SEC,
+    ) -> None:
+        self.interval = interval
+        self.send_timeout = send_timeout
+        self._entries: dict[WebSocket, _Entry] = {}
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def register(
+        self, ws: WebSocket, label: str = "", timeout: float = HEARTBEAT_TIMEOUT_SEC
+    ) -> None:
+        """Track `ws` (call after accept). Starts the loop on first registration."""
+        loop = asyncio.get_running_loop()
+        self._entries[ws] = _Entry(label=label, timeout=timeout, last_pong=loop.time())
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def unregister(self, ws: WebSocket) -> None:
+        """Stop tracking `ws`. The loop is cancelled once no socket is left."""
+        self._entries.pop(ws, None)
+        if not self._entries and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def touch(self, ws: WebSocket) -> None:
+        """Record a PONG from `ws`."""
+        entry = self._entries.get(ws)
+        if entry is not None:
+            entry.last_pong = asyncio.get_running_loop().time()
+
+    async def tick(self, now: float | None = None) -> list[WebSocket]:
+        """Run one heartbeat round; return the sockets that were closed."""
+        if now is None:
+            now = asyncio.get_running_loop().time()
+
+        entries = list(self._entries.items())
+        stale = [ws for ws, entry in entries if now - entry.last_pong > entry.timeout]
+        alive = [ws for ws, entry in entries if now - entry.last_pong <= entry.timeout]
+
+        ping = json.dumps({"type": "PING", "timestamp": now}, ensure_ascii=False)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(ping), self.send_timeout) for ws in alive),
+            return_exceptions=True,
+        )
+        failed = [ws for ws, result in zip(alive, results) if isinstance(result, BaseException)]
+        timed_out = [
+            ws for ws, result in zip(alive, results) if isinstance(result, asyncio.TimeoutError)
+        ]
+
+        dead = stale + failed
+        if not dead:
+            return []
+
+        if stale:
+            logger.warning(
+                "Heartbeat timeout, closing %d socket(s): %s",
+                len(stale),
+                ", ".join(sorted({self._entries[ws].label for ws in stale if ws in self._entries})),
+            )
+        if timed_out:
+            logger.warning(
+                "Heartbeat PING send timed out, closing %d socket(s): %s",
+                len(timed_out),
+                ", ".join(
+                    sorted({self._entries[ws].label for ws in timed_out if ws in self._entries})
+                ),
+            )
+        for ws in dead:
+            self._entries.pop(ws, None)
+        # A stalled client may not take the close frame either; don't wait on it past the bound.
+        await asyncio.gather(
+            *(asyncio.wait_for(ws.close(code=1000), self.send_timeout) for ws in dead),
+            return_exceptions=True,
+        )
+        return dead
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.tick()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.debug("Heartbeat tick failed: %s", exc)
+
+    async def stop(self) -> None:
+        """Cancel the loop (application shutdown)."""
+        task, self._task = self._task, None
+        self._entries.clear()
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+# Process-wide scheduler shared by all WebSocket endpoints.
+heartbeat = HeartbeatScheduler()
@@ -31,11 +31,14 @@ from typing import Dict
 # -------------------- Third-party imports --------------------
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from starlette.websockets import WebSocket
 
 # -------------------- Local application imports --------------------
 # Rate limiting is applied per box + per command type to keep the server responsive during events.
 from escalada.rate_limit import check_rate_limit
+# Single heartbeat loop shared by every WebSocket endpoint (no per-connection ping task).
+from escalada.api.heartbeat import heartbeat
 # Core command validation + state transition logic (shared with other services).
 from escalada_core import (
     ValidatedCmd,
@@ -51,16 +54,20 @@ from escalada.auth.deps import (
     require_view_box_access,
 )
 from escalada.auth.service import decode_token
-from escalada.storage.json_store import (
+from escalada.storage import (
     append_audit_event,
     build_audit_event,
     clear_box_state_files,
     ensure_storage_dirs,
     load_box_states,
     load_competition_officials,
-    save_competition_officials,
-    save_box_state,
+    persist_command,
+    save_competition_officials_async,
 )
+from escalada.api.overall_projection import get_overall_projection, mark_overall_dirty
+from escalada.api.prerender import prerenderer
+from escalada.api.ranking_index import get_route_index
+from escalada.api.score_matrix import box_matrix, canonicalize_athlete, drop_box_matrix
 from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
 
 logger = logging.getLogger(__name__)
@@ -79,6 +86,8 @@ router = APIRouter()
 # Active authenticated WS subscribers per box id.
 channels: dict[int, set[WebSocket]] = {}
 channels_lock = asyncio.Lock()  # Protects concurrent access to channels dict
+# Topic subscriptions for sockets in `channels` (absent = legacy full STATE_SNAPSHOT client).
+channel_topics: dict[WebSocket, frozenset[str]] = {}
 # Public spectators (unauthenticated, aggregated stream).
 public_channels: set[WebSocket] = set()
 public_channels_lock = asyncio.Lock()
@@ -87,6 +96,8 @@ public_channels_lock = asyncio.Lock()
 # - True in normal operation (ValidatedCmd + stale/session checks + rate limiting)
 # - Tests may disable it for backwards compatibility / focused unit scenarios
 VALIDATION_ENABLED = True
+# Commands that may rewrite the whole scores/times tables (the box matrix is rebuilt after them).
+_SCORE_TABLE_COMMANDS = frozenset({"INIT_ROUTE", "RESET_BOX", "RESET_PARTIAL"})
 # Global competition officials (not box-specific). Loaded at startup and included in snapshots.
 competition_officials: dict[str, str] = {"judgeChief": "", "competitionDirector": "", "chiefRoutesetter": ""}
 
@@ -96,7 +107,7 @@ def get_competition_officials() -> dict[str, str]:
     return dict(competition_officials)
 
 
-def set_competition_officials(
+async def set_competition_officials(
     *, judge_chief: str, competition_director: str, chief_routesetter: str
 ) -> dict[str, str]:
     """
@@ -112,7 +123,7 @@ def set_competition_officials(
         "chiefRoutesetter": (chief_routesetter or "").strip(),
     }
     try:
-        save_competition_officials(
+        await save_competition_officials_async(
             competition_officials["judgeChief"],
             competition_officials["competitionDirector"],
             competition_officials["chiefRoutesetter"],
@@ -261,7 +272,7 @@ async def preload_states_from_json() -> int:
     states = load_box_states()
     try:
         global competition_officials
-        competition_officials = load_competition_officials()
+        competition_officials = await run_in_threadpool(load_competition_officials)
     except Exception as exc:
         logger.warning("Failed to preload competition officials: %s", exc)
     loaded = 0
@@ -494,6 +505,20 @@ async def cmd(cmd: Cmd, request: Request = None, claims=Depends(require_box_acce
 
             outcome = apply_command(sm, cmd_dict)
             cmd_payload = outcome.cmd_payload
+            # Validate the written score/time once here (state + box matrix) so readers never
+            # re-coerce stored values; commands that replace the score tables rebuild the matrix.
+            if cmd.type in {"SUBMIT_SCORE", "REGISTER_TIME"}:
+                canonicalize_athlete(
+                    cmd.boxId,
+                    sm,
+                    (cmd_payload or {}).get("competitor")
+                    or cmd.competitor
+                    or sm.get("currentClimber"),
+                )
+            elif cmd.type in _SCORE_TABLE_COMMANDS:
+                drop_box_matrix(cmd.boxId)
+            if "ranking" in _command_topics(cmd.type):
+                mark_overall_dirty(cmd.boxId)
             if _server_side_timer_enabled():
                 _apply_server_side_timer(sm, cmd_payload, _now_ms())
 
@@ -511,9 +536,17 @@ async def cmd(cmd: Cmd, request: Request = None, claims=Depends(require_box_acce
             if outcome.snapshot_required:
                 await _send_state_snapshot(cmd.boxId)
 
+            # Topic subscribers get only the projections this command may have changed.
+            await _send_topic_updates(cmd.boxId, _command_topics(cmd.type))
+
             public_update = _public_update_type(cmd.type)
             if public_update:
-                await _broadcast_public_box_update(cmd.boxId, public_update)
+                await _broadcast_public_box_update(
+                    cmd.boxId, public_update, topics=_command_topics(cmd.type)
+                )
+
+            # Last climber marked on the last route: pre-render the official export when idle.
+            prerenderer.notify(cmd.boxId, sm)
 
         return {"status": "ok"}
     finally:
@@ -522,45 +555,26 @@ async def cmd(cmd: Cmd, request: Request = None, claims=Depends(require_box_acce
         except Exception:
             pass
 
-async def _heartbeat(ws: WebSocket, box_id: int, last_pong: dict[str, float]) -> None:
-    """Send PING every 30s; close if no PONG for 60s."""
-    heartbeat_interval = 30
-    heartbeat_timeout = 60
-
-    while True:
-        try:
-            await asyncio.sleep(heartbeat_interval)
-            now = asyncio.get_event_loop().time()
-
-            # Check timeout
-            if now - (last_pong.get("ts") or 0.0) > heartbeat_timeout:
-                logger.warning(f"Heartbeat timeout for box {box_id}, closing")
-                try:
-                    await ws.close(code=1000)
-                except Exception:
-                    pass
-                break
-
-            # Send PING
-            await ws.send_text(
-                json.dumps({"type": "PING", "timestamp": now}, ensure_ascii=False)
-            )
-        except Exception as e:
-            logger.debug(f"Heartbeat error for box {box_id}: {e}")
-            break
-
 async def _broadcast_to_box(box_id: int, payload: dict) -> None:
-    """Safely broadcast JSON payload to all subscribers on a box.
+    """Safely broadcast JSON payload to all full-snapshot subscribers on a box.
+    Topic subscribers (see `channel_topics`) only receive their projections.
     Removes dead connections automatically.
     Disconnects slow clients (timeout 5s) to prevent blocking.
     """
     # Get snapshot of current subscribers
-    async with channels_lock:
-        sockets = list(channels.get(box_id) or set())
+    legacy, _ = await _split_box_subscribers(box_id)
+    if not legacy:
+        return
+    message = json.dumps(payload, ensure_ascii=False)
+    await _send_to_sockets(box_id, [(ws, message) for ws in legacy])
 
+
+async def _send_to_sockets(box_id: int, sends: list[tuple[WebSocket, str]]) -> None:
+    """Send pre-serialized messages, dropping dead/slow sockets from the box channel."""
     dead = []
-    message = json.dumps(payload, ensure_ascii=False)
-    for ws in sockets:
+    for ws, message in sends:
+        if ws in dead:
+            continue
         try:
             # Add timeout to prevent slow clients from blocking broadcast
             await asyncio.wait_for(ws.send_text(message), timeout=5.0)
@@ -580,6 +594,7 @@ async def _broadcast_to_box(box_id: int, payload: dict) -> None:
         async with channels_lock:
             for ws in dead:
                 channels.get(box_id, set()).discard(ws)
+                channel_topics.pop(ws, None)
 
 def _public_preparing_climber(state: dict) -> str:
     """
@@ -675,31 +690,22 @@ def _merge_persistent_tiebreak_badges(
     return merged_rows
 
 
-def _build_public_box_state(box_id: int, state: dict) -> dict:
+def _resolve_lead_ranking(
+    box_id: int,
+    state: dict,
+    routes_count: int | None = None,
+) -> tuple[dict, list[dict]]:
     """
-    Build the read-only state shape sent to the public hub/WS.
+    Resolve the active-route lead ranking for a box (shared by snapshots and topic projections).
 
-    This is a reduced projection of the internal box state:
-    - does NOT expose the full competitor list (privacy + payload size)
-    - includes enough information for Live Rankings / Live Climbing tiles
-    - computes `remaining` from the authoritative server timer when enabled
+    Returns the raw tie-break context plus the ranking rows merged with persistent TB badges.
     """
-    routes_count = state.get("routesCount")
-    if routes_count is None:
-        routes_count = state.get("routeIndex") or 1
-    holds_counts = state.get("holdsCounts") or []
-    if not isinstance(holds_counts, list):
-        holds_counts = []
-    remaining = state.get("remaining")
-    if _server_side_timer_enabled():
-        remaining = _compute_remaining(state, _now_ms())
     route_index = int(state.get("routeIndex") or 1)
-    routes_count = int(routes_count or route_index or 1)
-    scores_by_name = state.get("scores") or {}
-    times_by_name = state.get("times") or {}
+    if routes_count is None:
+        routes_count = int(state.get("routesCount") or route_index or 1)
     tiebreak_state = resolve_rankings_with_time_tiebreak(
-        scores=scores_by_name,
-        times=times_by_name,
+        scores=None,
+        times=None,
         route_count=routes_count,
         active_route_index=route_index,
         box_id=box_id,
@@ -716,12 +722,40 @@ def _build_public_box_state(box_id: int, state: dict) -> dict:
         resolved_decisions=state.get("timeTiebreakDecisions"),
         resolved_fingerprint=state.get("timeTiebreakResolvedFingerprint"),
         resolved_decision=state.get("timeTiebreakResolvedDecision"),
+        ranking_index=get_route_index(box_id, state),
+        matrix=box_matrix(box_id, state),
     )
     merged_lead_rows = _merge_persistent_tiebreak_badges(
         state,
         route_index,
         tiebreak_state.get("lead_ranking_rows") or [],
     )
+    return tiebreak_state, merged_lead_rows
+
+
+def _build_public_box_state(box_id: int, state: dict) -> dict:
+    """
+    Build the read-only state shape sent to the public hub/WS.
+
+    This is a reduced projection of the internal box state:
+    - does NOT expose the full competitor list (privacy + payload size)
+    - includes enough information for Live Rankings / Live Climbing tiles
+    - computes `remaining` from the authoritative server timer when enabled
+    """
+    routes_count = state.get("routesCount")
+    if routes_count is None:
+        routes_count = state.get("routeIndex") or 1
+    holds_counts = state.get("holdsCounts") or []
+    if not isinstance(holds_counts, list):
+        holds_counts = []
+    remaining = state.get("remaining")
+    if _server_side_timer_enabled():
+        remaining = _compute_remaining(state, _now_ms())
+    route_index = int(state.get("routeIndex") or 1)
+    routes_count = int(routes_count or route_index or 1)
+    scores_by_name = state.get("scores") or {}
+    times_by_name = state.get("times") or {}
+    tiebreak_state, merged_lead_rows = _resolve_lead_ranking(box_id, state, routes_count)
     return {
         "boxId": box_id,
         "categorie": state.get("categorie", ""),
@@ -754,6 +788,7 @@ def _build_public_box_state(box_id: int, state: dict) -> dict:
         "leadTieEvents": tiebreak_state.get("lead_tie_events") or [],
         "leadRankingResolved": tiebreak_state.get("lead_ranking_resolved"),
         "leadRankingErrors": tiebreak_state.get("errors") or [],
+        "overallRanking": get_overall_projection(box_id, state),
         "scoresByName": scores_by_name,
         "timesByName": times_by_name,
     }
@@ -807,7 +842,9 @@ async def _send_public_snapshot(targets: set[WebSocket] | None = None) -> None:
     else:
         await _broadcast_public(payload)
 
-async def _broadcast_public_box_update(box_id: int, update_type: str) -> None:
+async def _broadcast_public_box_update(
+    box_id: int, update_type: str, topics: frozenset[str] | None = None
+) -> None:
     """
     Broadcast a single-box update to public spectators.
 
@@ -828,7 +865,7 @@ async def _broadcast_public_box_update(box_id: int, update_type: str) -> None:
     # Imported lazily to avoid circular imports during startup.
     try:
         from escalada.api.public import broadcast_to_public_box, _send_public_box_snapshot
-        await _send_public_box_snapshot(box_id)
+        await _send_public_box_snapshot(box_id, topics=topics)
     except ImportError:
         pass
 
@@ -850,6 +887,188 @@ def _public_update_type(cmd_type: str) -> str | None:
         "SET_PREV_ROUNDS_TIEBREAK_DECISION": "BOX_RANKING_UPDATE",
     }.get(cmd_type)
 
+
+# -------------------- Topic subscriptions --------------------
+# Clients may opt into topic projections (`?topics=flow,ranking` or a SUBSCRIBE message) instead of
+# the full STATE_SNAPSHOT. Only the projections that have subscribers are built and sent:
+# - flow: timer + current climber + hold count (tiny payload for timer displays)
+# - ranking: lead ranking rows + tie events (the expensive part of a snapshot)
+# - roster: competitors + route setup
+# - officials: global competition officials
+WS_TOPICS = ("flow", "ranking", "roster", "officials")
+_BOX_TOPICS = frozenset({"flow", "ranking", "roster"})
+
+
+def _parse_topics(raw: Any) -> frozenset[str] | None:
+    """
+    Parse a topic list from a query param ("flow,ranking") or a JSON list.
+
+    Returns None when no valid topic is requested (= legacy full snapshots).
+    """
+    if isinstance(raw, str):
+        items = raw.split(",")
+    elif isinstance(raw, (list, tuple, set, frozenset)):
+        items = [item for item in raw if isinstance(item, str)]
+    else:
+        return None
+    topics = frozenset(item.strip().lower() for item in items) & frozenset(WS_TOPICS)
+    return topics or None
+
+
+def _command_topics(cmd_type: str) -> frozenset[str]:
+    """Map a command type to the topics whose projection it may change."""
+    return {
+        "START_TIMER": frozenset({"flow"}),
+        "STOP_TIMER": frozenset({"flow"}),
+        "RESUME_TIMER": frozenset({"flow"}),
+        "SET_TIMER_PRESET": frozenset({"flow"}),
+        "TIMER_SYNC": frozenset({"flow"}),
+        "REGISTER_TIME": frozenset({"flow", "ranking"}),
+        "PROGRESS_UPDATE": frozenset({"flow"}),
+        "REQUEST_ACTIVE_COMPETITOR": frozenset({"flow"}),
+        "SET_TIME_CRITERION": frozenset({"ranking"}),
+        "SET_TIME_TIEBREAK_DECISION": frozenset({"ranking"}),
+        "SET_PREV_ROUNDS_TIEBREAK_DECISION": frozenset({"ranking"}),
+    }.get(cmd_type, _BOX_TOPICS)
+
+
+def _build_topic_payload(box_id: int, state: dict, topic: str) -> dict:
+    """Build the projection for a single topic (see `WS_TOPICS`)."""
+    if topic == "flow":
+        remaining = state.get("remaining")
+        if _server_side_timer_enabled():
+            remaining = _compute_remaining(state, _now_ms())
+        return {
+            "type": "TOPIC_UPDATE",
+            "topic": "flow",
+            "boxId": box_id,
+            "boxVersion": state.get("boxVersion", 0),
+            "timerState": state.get("timerState", "idle"),
+            "remaining": remaining,
+            "currentClimber": state.get("currentClimber", ""),
+            "holdCount": state.get("holdCount", 0.0),
+        }
+    if topic == "ranking":
+        tiebreak_state, merged_lead_rows = _resolve_lead_ranking(box_id, state)
+        return {
+            "type": "TOPIC_UPDATE",
+            "topic": "ranking",
+            "boxId": box_id,
+            "boxVersion": state.get("boxVersion", 0),
+            "routeIndex": state.get("routeIndex", 1),
+            "timeCriterionEnabled": state.get("timeCriterionEnabled", False),
+            "timeTiebreakCurrentFingerprint": tiebreak_state.get("fingerprint"),
+            "timeTiebreakHasEligibleTie": tiebreak_state.get("has_eligible_tie"),
+            "timeTiebreakIsResolved": tiebreak_state.get("is_resolved"),
+            "timeTiebreakEligibleGroups": tiebreak_state.get("eligible_groups") or [],
+            "leadRankingRows": merged_lead_rows,
+            "leadTieEvents": tiebreak_state.get("lead_tie_events") or [],
+            "leadRankingResolved": tiebreak_state.get("lead_ranking_resolved"),
+            "leadRankingErrors": tiebreak_state.get("errors") or [],
+            "overallRanking": get_overall_projection(box_id, state),
+        }
+    if topic == "roster":
+        return {
+            "type": "TOPIC_UPDATE",
+            "topic": "roster",
+            "boxId": box_id,
+            "boxVersion": state.get("boxVersion", 0),
+            "sessionId": state.get("sessionId"),
+            "initiated": state.get("initiated", False),
+            "categorie": state.get("categorie", ""),
+            "routeIndex": state.get("routeIndex", 1),
+            "routesCount": state.get("routesCount"),
+            "holdsCount": state.get("holdsCount", 0),
+            "holdsCounts": state.get("holdsCounts"),
+            "preparingClimber": state.get("preparingClimber", ""),
+            "competitors": state.get("competitors", []),
+        }
+    if topic == "officials":
+        officials = get_competition_officials()
+        return {
+            "type": "TOPIC_UPDATE",
+            "topic": "officials",
+            "judgeChief": officials.get("judgeChief", ""),
+            "competitionDirector": officials.get("competitionDirector", ""),
+            "chiefRoutesetter": officials.get("chiefRoutesetter", ""),
+        }
+    raise ValueError(f"unknown topic: {topic}")
+
+
+def _topic_messages(
+    box_id: int,
+    state: dict,
+    subscribers: list[tuple[WebSocket, frozenset[str]]],
+    changed: frozenset[str],
+) -> list[tuple[WebSocket, str]]:
+    """
+    Fan out topic projections: each projection is built and serialized once, and only if at
+    least one subscriber wants it.
+    """
+    wanted: set[str] = set()
+    for _, topics in subscribers:
+        wanted |= topics & changed
+    encoded = {
+        topic: json.dumps(_build_topic_payload(box_id, state, topic), ensure_ascii=False)
+        for topic in WS_TOPICS
+        if topic in wanted
+    }
+    return [
+        (ws, encoded[topic])
+        for ws, topics in subscribers
+        for topic in WS_TOPICS
+        if topic in topics and topic in encoded
+    ]
+
+
+async def _split_box_subscribers(
+    box_id: int,
+) -> tuple[list[WebSocket], list[tuple[WebSocket, frozenset[str]]]]:
+    """Return (legacy full-snapshot sockets, topic sockets) for a box channel."""
+    async with channels_lock:
+        sockets = list(channels.get(box_id) or set())
+        legacy = [ws for ws in sockets if ws not in channel_topics]
+        topical = [(ws, channel_topics[ws]) for ws in sockets if ws in channel_topics]
+    return legacy, topical
+
+
+async def _send_topic_updates(
+    box_id: int,
+    changed: frozenset[str],
+    targets: set[WebSocket] | None = None,
+) -> None:
+    """Send changed topic projections to topic subscribers of a box (or to `targets` only)."""
+    if targets is not None:
+        async with channels_lock:
+            subscribers = [(ws, channel_topics[ws]) for ws in targets if ws in channel_topics]
+    else:
+        _, subscribers = await _split_box_subscribers(box_id)
+    if not subscribers:
+        return
+    state = await _ensure_state(box_id)
+    await _send_to_sockets(box_id, _topic_messages(box_id, state, subscribers, changed))
+
+
+async def broadcast_officials_update() -> None:
+    """Push the officials projection to every socket subscribed to the `officials` topic."""
+    async with channels_lock:
+        by_box = [
+            (box_id, ws, channel_topics[ws])
+            for box_id, sockets in channels.items()
+            for ws in sockets
+            if "officials" in channel_topics.get(ws, frozenset())
+        ]
+    if by_box:
+        message = json.dumps(_build_topic_payload(-1, {}, "officials"), ensure_ascii=False)
+        for box_id, ws, _ in by_box:
+            await _send_to_sockets(box_id, [(ws, message)])
+
+    # Public per-box feeds keep their own registry (imported lazily to avoid circular imports).
+    from escalada.api.public import broadcast_public_officials_update
+
+    await broadcast_public_officials_update()
+
+
 def _authorize_ws(box_id: int, claims: dict) -> bool:
     """Return True if claims allow subscription to box_id."""
     role = claims.get("role")
@@ -872,8 +1091,8 @@ async def websocket_endpoint(ws: WebSocket, box_id: int):
     - Authenticate token (query param for legacy, then cookie)
     - Authorize access to the requested box_id
     - Add subscriber to the per-box channel
-    - Send an initial STATE_SNAPSHOT for hydration
-    - Maintain a heartbeat (PING/PONG) and handle REQUEST_STATE refresh messages
+    - Send an initial STATE_SNAPSHOT for hydration (or topic projections with `?topics=...`)
+    - Maintain a heartbeat (PING/PONG) and handle REQUEST_STATE/SUBSCRIBE messages
     """
     peer = ws.client.host if ws.client else None
 
@@ -908,27 +1127,26 @@ async def websocket_endpoint(ws: WebSocket, box_id: int):
 
     await ws.accept()
 
+    topics = _parse_topics(ws.query_params.get("topics"))
+
     # Atomically add to channel so broadcasts see a consistent subscriber set.
     async with channels_lock:
         channels.setdefault(box_id, set()).add(ws)
+        if topics:
+            channel_topics[ws] = topics
         subscriber_count = len(channels[box_id])
 
     logger.info(f"Client connected to box {box_id}, total: {subscriber_count}")
     # Immediately send a snapshot so the client can render without waiting for the next command.
     await _send_state_snapshot(box_id, targets={ws})
 
-    # Start heartbeat task
-    last_pong = {"ts": asyncio.get_event_loop().time()}
-    heartbeat_task = asyncio.create_task(_heartbeat(ws, box_id, last_pong))
+    # Shared scheduler pings the socket and closes it if PONGs stop (unblocks receive below).
+    heartbeat.register(ws, label=f"box {box_id}")
 
     try:
         while True:
             try:
-                # Receive with 180s timeout
-                data = await asyncio.wait_for(ws.receive_text(), timeout=180)
-            except asyncio.TimeoutError:
-                logger.warning(f"WebSocket receive timeout for box {box_id}")
-                break
+                data = await ws.receive_text()
             except Exception as e:
                 logger.warning(f"WebSocket receive error for box {box_id}: {e}")
                 break
@@ -941,7 +1159,7 @@ async def websocket_endpoint(ws: WebSocket, box_id: int):
 
                     # Acknowledge PONG
                     if msg_type == "PONG":
-                        last_pong["ts"] = asyncio.get_event_loop().time()
+                        heartbeat.touch(ws)
                         continue
 
                     # REQUEST_STATE lets a client recover after missed messages or tab backgrounding.
@@ -968,6 +1186,17 @@ async def websocket_endpoint(ws: WebSocket, box_id: int):
                         await _send_state_snapshot(requested_box_id, targets={ws})
                         continue
 
+                    # SUBSCRIBE switches the socket between topic projections and full snapshots.
+                    if msg_type == "SUBSCRIBE":
+                        topics = _parse_topics(msg.get("topics"))
+                        async with channels_lock:
+                            if topics:
+                                channel_topics[ws] = topics
+                            else:
+                                channel_topics.pop(ws, None)
+                        await _send_state_snapshot(box_id, targets={ws})
+                        continue
+
             except json.JSONDecodeError:
                 logger.debug(f"Invalid JSON from WS box {box_id}")
                 continue
@@ -975,16 +1204,12 @@ async def websocket_endpoint(ws: WebSocket, box_id: int):
     except Exception as e:
         logger.error(f"WebSocket error for box {box_id}: {e}")
     finally:
-        # Cancel heartbeat task
-        heartbeat_task.cancel()
-        try:
-            await heartbeat_task
-        except asyncio.CancelledError:
-            pass
+        heartbeat.unregister(ws)
 
         # Atomically remove from channel
         async with channels_lock:
             channels.get(box_id, set()).discard(ws)
+            channel_topics.pop(ws, None)
             remaining = len(channels.get(box_id, set()))
 
         logger.info(f"Client disconnected from box {box_id}, remaining: {remaining}")
@@ -1013,16 +1238,12 @@ async def public_websocket(ws: WebSocket):
 
     await _send_public_snapshot(targets={ws})
 
-    last_pong = {"ts": asyncio.get_event_loop().time()}
-    heartbeat_task = asyncio.create_task(_heartbeat(ws, -1, last_pong))
+    heartbeat.register(ws, label="public")
 
     try:
         while True:
             try:
-                data = await asyncio.wait_for(ws.receive_text(), timeout=180)
-            except asyncio.TimeoutError:
-                logger.warning("Public WebSocket receive timeout")
-                break
+                data = await ws.receive_text()
             except Exception as e:
                 logger.warning(f"Public WebSocket receive error: {e}")
                 break
@@ -1032,7 +1253,7 @@ async def public_websocket(ws: WebSocket):
                 if isinstance(msg, dict):
                     msg_type = msg.get("type")
                     if msg_type == "PONG":
-                        last_pong["ts"] = asyncio.get_event_loop().time()
+                        heartbeat.touch(ws)
                         continue
                     if msg_type == "PING":
                         # Some clients send PING; respond with PONG for compatibility.
@@ -1054,11 +1275,7 @@ async def public_websocket(ws: WebSocket):
     except Exception as e:
         logger.error(f"Public WebSocket error: {e}")
     finally:
-        heartbeat_task.cancel()
-        try:
-            await heartbeat_task
-        except asyncio.CancelledError:
-            pass
+        heartbeat.unregister(ws)
 
         async with public_channels_lock:
             public_channels.discard(ws)
@@ -1086,6 +1303,13 @@ async def get_state(box_id: int, claims=Depends(require_view_box_access())):
     state = await _ensure_state(box_id)
     return _build_snapshot(box_id, state)
 
+
+@router.get("/overall/{box_id}")
+async def get_overall_ranking(box_id: int, claims=Depends(require_view_box_access())):
+    """Return the live overall (multi-route) ranking of a box, cached per boxVersion."""
+    state = await _ensure_state(box_id)
+    return {"boxId": box_id, **get_overall_projection(box_id, state)}
+
 # helpers
 def _build_snapshot(box_id: int, state: dict) -> dict:
     """
@@ -1099,35 +1323,9 @@ def _build_snapshot(box_id: int, state: dict) -> dict:
     remaining = state.get("remaining")
     if _server_side_timer_enabled():
         remaining = _compute_remaining(state, _now_ms())
-    route_index = int(state.get("routeIndex") or 1)
-    routes_count = int(state.get("routesCount") or route_index or 1)
     scores_by_name = state.get("scores") or {}
     times_by_name = state.get("times") or {}
-    tiebreak_state = resolve_rankings_with_time_tiebreak(
-        scores=scores_by_name,
-        times=times_by_name,
-        route_count=routes_count,
-        active_route_index=route_index,
-        box_id=box_id,
-        time_criterion_enabled=bool(state.get("timeCriterionEnabled", False)),
-        active_holds_count=state.get("holdsCount")
-        if isinstance(state.get("holdsCount"), int)
-        else None,
-        prev_resolved_decisions=state.get("prevRoundsTiebreakDecisions"),
-        prev_orders_by_fingerprint=state.get("prevRoundsTiebreakOrders"),
-        prev_ranks_by_fingerprint=state.get("prevRoundsTiebreakRanks"),
-        prev_lineage_ranks_by_key=state.get("prevRoundsTiebreakLineageRanks"),
-        prev_resolved_fingerprint=state.get("prevRoundsTiebreakResolvedFingerprint"),
-        prev_resolved_decision=state.get("prevRoundsTiebreakResolvedDecision"),
-        resolved_decisions=state.get("timeTiebreakDecisions"),
-        resolved_fingerprint=state.get("timeTiebreakResolvedFingerprint"),
-        resolved_decision=state.get("timeTiebreakResolvedDecision"),
-    )
-    merged_lead_rows = _merge_persistent_tiebreak_badges(
-        state,
-        route_index,
-        tiebreak_state.get("lead_ranking_rows") or [],
-    )
+    tiebreak_state, merged_lead_rows = _resolve_lead_ranking(box_id, state)
     officials = get_competition_officials()
     return {
         "type": "STATE_SNAPSHOT",
@@ -1166,6 +1364,7 @@ def _build_snapshot(box_id: int, state: dict) -> dict:
         "leadTieEvents": tiebreak_state.get("lead_tie_events") or [],
         "leadRankingResolved": tiebreak_state.get("lead_ranking_resolved"),
         "leadRankingErrors": tiebreak_state.get("errors") or [],
+        "overallRanking": get_overall_projection(box_id, state),
         "scoresByName": scores_by_name,
         "timesByName": times_by_name,
         "timerPreset": state.get("timerPreset"),
@@ -1184,23 +1383,37 @@ async def _send_state_snapshot(box_id: int, targets: set[WebSocket] | None = Non
     Used on:
     - WS connect (targets={ws})
     - server-driven refreshes when a command requires a full snapshot
+
+    Topic subscribers receive all of their projections instead of the full snapshot.
     """
     # Ensure state exists and get a copy atomically
     state = await _ensure_state(box_id)
     if state is None:
         return
-    payload = _build_snapshot(box_id, state)
 
     # If targets specified (e.g., on new connection), send only to them
     if targets:
-        for ws in list(targets):
+        async with channels_lock:
+            topical = {ws: channel_topics[ws] for ws in targets if ws in channel_topics}
+        legacy = [ws for ws in targets if ws not in topical]
+        if topical:
+            await _send_to_sockets(
+                box_id,
+                _topic_messages(box_id, state, list(topical.items()), frozenset(WS_TOPICS)),
+            )
+        if not legacy:
+            return
+        message = json.dumps(_build_snapshot(box_id, state), ensure_ascii=False)
+        for ws in legacy:
             try:
-                await ws.send_text(json.dumps(payload, ensure_ascii=False))
+                await ws.send_text(message)
             except Exception as e:
                 logger.debug(f"Failed to send snapshot to target: {e}")
     else:
-        # Otherwise broadcast to all subscribers on this box
-        await _broadcast_to_box(box_id, payload)
+        # Otherwise broadcast to all full-snapshot subscribers on this box (built only if any).
+        legacy, _ = await _split_box_subscribers(box_id)
+        if legacy:
+            await _broadcast_to_box(box_id, _build_snapshot(box_id, state))
 
 async def _ensure_state(box_id: int) -> dict:
     """
@@ -1220,14 +1433,13 @@ async def _ensure_state(box_id: int) -> dict:
         return state
 
 async def _persist_state(box_id: int, state: dict, action: str, payload: dict) -> str:
-    """Persist snapshot + audit event (JSON-only)."""
+    """Persist snapshot + audit event (one transaction in SQLite mode)."""
     # Box version is used to prevent stale UI actions. Do not bump for TIMER_SYNC:
     # - TIMER_SYNC can be high-frequency
     # - clients may omit boxVersion for TIMER_SYNC
     # - bumping here causes unrelated commands (e.g. SUBMIT_SCORE) to be rejected as stale
     if action not in {"INIT_ROUTE", "TIMER_SYNC"}:
         state["boxVersion"] = int(state.get("boxVersion", 0) or 0) + 1
-    await save_box_state(box_id, state)
     event = build_audit_event(
         action=action,
         payload=payload,
@@ -1235,7 +1447,7 @@ async def _persist_state(box_id: int, state: dict, action: str, payload: dict) -
         state=state,
         actor=current_actor.get(),
     )
-    await append_audit_event(event)
+    await persist_command(box_id, state, event)
     return "ok"
 
 async def _persist_audit_only(action: str, payload: dict) -> None:
@@ -11,34 +11,38 @@ The export format:
 - `route_{n}.xlsx` + `route_{n}.pdf`: per-route ranking sheets
 - `metadata.json`: source fields (boxId/category/routesCount/export timestamp + clubs)
 
+Members are rendered one at a time into spooled buffers and streamed through `zip_stream.iter_zip`
+(no temp directory, no whole-archive buffer); multi-box bundles live in `bundle_export`.
+
 Notes:
-- Times are normalized via `_to_seconds` and formatted with `_format_time` for display only.
+- Scores/times come from the box's `ScoreMatrix` (validated when written; see `score_matrix`), or
+  are validated once here for snapshots from outside the live runtime. Ranking and sheet builders
+  read its rows directly, with times truncated to whole seconds as exports always did; they are
+  formatted with `_format_time` for display only.
 - The route-level ranking uses "dense" ranks for equal scores, and derives a points value
   as the average of the tied positions (used by the overall sheet builder).
 """
 
 # -------------------- Standard library imports --------------------
-import io
 import json
 import re
-import zipfile
 from datetime import datetime, timezone
-from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any
-
-# -------------------- Third-party imports --------------------
-import pandas as pd
+from typing import IO, TYPE_CHECKING, Any, Iterator
 
 # -------------------- Local application imports --------------------
+from escalada.api.artifact_cache import inputs_hash
 from escalada.api.save_ranking import (
+    EXPORT_FORMAT_VERSION,
     RankingIn,
-    _build_overall_df,
-    _df_to_pdf,
+    _build_overall_table,
     _format_time,
-    _to_seconds,
 )
 from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+from escalada.api.score_matrix import snapshot_matrix
+from escalada.api.zip_stream import iter_zip, spooled_buffer
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def safe_zip_component(val: str) -> str:
@@ -48,6 +52,39 @@ def safe_zip_component(val: str) -> str:
     return cleaned or "export"
 
 
+# Snapshot fields the official ZIP is rendered from (timer/climb fields are not among them).
+_EXPORT_INPUT_KEYS = (
+    "boxId",
+    "competitionId",
+    "categorie",
+    "routesCount",
+    "routes_count",
+    "routeIndex",
+    "holdsCount",
+    "holdsCounts",
+    "timeCriterionEnabled",
+    "scores",
+    "times",
+    "clubs",
+    "competitors",
+)
+
+
+def official_export_inputs_hash(snapshot: dict[str, Any]) -> str:
+    """
+    Content address of the official ZIP for `snapshot` (see `artifact_cache`).
+
+    Two snapshots with the same hash render the same sheets; the cached ZIP keeps the
+    `exportedAt` timestamp of its first render.
+    """
+    inputs = {
+        key: value
+        for key, value in snapshot.items()
+        if key in _EXPORT_INPUT_KEYS or key.startswith(("timeTiebreak", "prevRoundsTiebreak"))
+    }
+    return inputs_hash("official_zip", EXPORT_FORMAT_VERSION, inputs)
+
+
 def _route_count_from_snapshot(snapshot: dict[str, Any]) -> int:
     """
     Best-effort route count resolution from a snapshot.
@@ -67,20 +104,6 @@ def _route_count_from_snapshot(snapshot: dict[str, Any]) -> int:
         return 0
 
 
-def _normalize_times(raw_times: dict[str, list[Any]] | None) -> dict[str, list[int | None]]:
-    """
-    Convert the raw `times` payload (seconds/ms/strings) into seconds (ints) or None.
-
-    The downstream ranking builders operate on numeric seconds; formatting happens later
-    when we render to PDF/Excel.
-    """
-    times = raw_times or {}
-    normalized: dict[str, list[int | None]] = {}
-    for name, arr in times.items():
-        normalized[name] = [_to_seconds(t) for t in (arr or [])]
-    return normalized
-
-
 def _normalize_clubs(raw_clubs: dict[str, Any] | None) -> dict[str, str]:
     """Normalize club mapping: drop empty keys/values and coerce non-strings to strings."""
     clubs = raw_clubs or {}
@@ -99,7 +122,76 @@ def _normalize_clubs(raw_clubs: dict[str, Any] | None) -> dict[str, str]:
     return normalized
 
 
-def _build_route_df(
+def _clubs_from_snapshot(snapshot: dict[str, Any]) -> dict[str, str]:
+    """Clubs are optional; prefer explicit snapshot field but also support the competitors list."""
+    clubs = _normalize_clubs(snapshot.get("clubs") if isinstance(snapshot.get("clubs"), dict) else {})
+    if not clubs:
+        competitors = snapshot.get("competitors") or []
+        if isinstance(competitors, list):
+            for comp in competitors:
+                if not isinstance(comp, dict):
+                    continue
+                name = comp.get("nume") or comp.get("name")
+                club = comp.get("club")
+                if (
+                    isinstance(name, str)
+                    and name.strip()
+                    and isinstance(club, str)
+                    and club.strip()
+                ):
+                    clubs[name] = club.strip()
+    return clubs
+
+
+def ranking_payload_from_snapshot(
+    snapshot: dict[str, Any], clubs: dict[str, str] | None = None
+) -> RankingIn:
+    """
+    Map a box snapshot (or live box state) to the `RankingIn` payload used by the exporters.
+
+    Times are left out (snapshot times may be "mm:ss" strings); callers pass the validated times
+    of the box `ScoreMatrix` to the builders. Raises ValueError("missing_scores" /
+    "missing_routes_count") when the snapshot cannot be ranked.
+    """
+    categorie = snapshot.get("categorie") or f"box_{snapshot.get('boxId')}"
+    scores = snapshot.get("scores") or {}
+    if not isinstance(scores, dict) or not scores:
+        raise ValueError("missing_scores")
+    route_count = _route_count_from_snapshot(snapshot)
+    if route_count <= 0:
+        raise ValueError("missing_routes_count")
+    if clubs is None:
+        clubs = _clubs_from_snapshot(snapshot)
+    return RankingIn(
+        categorie=str(categorie),
+        route_count=int(route_count),
+        scores=scores,
+        use_time_tiebreak=bool(snapshot.get("timeCriterionEnabled")),
+        route_index=int(snapshot.get("routeIndex") or route_count),
+        holds_counts=snapshot.get("holdsCounts")
+        if isinstance(snapshot.get("holdsCounts"), list)
+        else None,
+        active_holds_count=snapshot.get("holdsCount")
+        if isinstance(snapshot.get("holdsCount"), int)
+        else None,
+        box_id=snapshot.get("boxId"),
+        time_tiebreak_resolved_decision=snapshot.get("timeTiebreakResolvedDecision"),
+        time_tiebreak_resolved_fingerprint=snapshot.get("timeTiebreakResolvedFingerprint"),
+        time_tiebreak_preference=snapshot.get("timeTiebreakPreference"),
+        time_tiebreak_decisions=snapshot.get("timeTiebreakDecisions"),
+        prev_rounds_tiebreak_resolved_decision=snapshot.get("prevRoundsTiebreakResolvedDecision"),
+        prev_rounds_tiebreak_resolved_fingerprint=snapshot.get("prevRoundsTiebreakResolvedFingerprint"),
+        prev_rounds_tiebreak_preference=snapshot.get("prevRoundsTiebreakPreference"),
+        prev_rounds_tiebreak_decisions=snapshot.get("prevRoundsTiebreakDecisions"),
+        prev_rounds_tiebreak_orders=snapshot.get("prevRoundsTiebreakOrders"),
+        prev_rounds_tiebreak_ranks_by_fingerprint=snapshot.get("prevRoundsTiebreakRanks"),
+        prev_rounds_tiebreak_lineage_ranks_by_key=snapshot.get("prevRoundsTiebreakLineageRanks"),
+        clubs=clubs,
+        include_clubs=bool(clubs),
+    )
+
+
+def _build_route_table(
     *,
     scores: dict[str, list[float]],
     times: dict[str, list[int | None]],
@@ -109,9 +201,9 @@ def _build_route_df(
     rank_override: dict[str, int] | None = None,
     tb_time_flags: dict[str, bool] | None = None,
     tb_prev_flags: dict[str, bool] | None = None,
-) -> pd.DataFrame:
+) -> tuple[list[str], list[list[Any]]]:
     """
-    Build a per-route ranking DataFrame.
+    Build a per-route ranking sheet as `(columns, rows)`.
 
     Ranking is score-descending, then name ascending for stable output. We compute:
     - `Rank`: 1..N with ties (same score => same rank number)
@@ -177,42 +269,63 @@ def _build_route_df(
         )
         ranks = [rank_override.get(name, idx + 1) for idx, (name, _, _) in enumerate(route_entries_sorted)]
 
-    rows = []
+    if not route_entries_sorted:
+        return [], []
+
+    # Include clubs when available; keep schema stable even when clubs are unknown.
+    # TB columns are only shown when at least one athlete carries the flag.
+    show_tb_time = bool(tb_time_flags) and any(
+        tb_time_flags.get(name) for name, _, _ in route_entries_sorted
+    )
+    show_tb_prev = bool(tb_prev_flags) and any(
+        tb_prev_flags.get(name) for name, _, _ in route_entries_sorted
+    )
+    columns = ["Rank", "Name", "Club", "Score", "Points"]
+    if use_time_tiebreak:
+        # Legacy flag: currently display-only (no time-based tie-breaking here).
+        columns.append("Time")
+    if show_tb_time:
+        columns.append("TB Time")
+    if show_tb_prev:
+        columns.append("TB Prev")
+
+    rows: list[list[Any]] = []
     for idx, (name, score, tm) in enumerate(route_entries_sorted):
-        # Include clubs when available; keep schema stable even when clubs are unknown.
-        row: dict[str, Any] = {
-            "Rank": ranks[idx],
-            "Name": name,
-            "Club": clubs.get(name, ""),
-            "Score": score,
-            "Points": points.get(name),
-        }
+        row: list[Any] = [ranks[idx], name, clubs.get(name, ""), score, points.get(name)]
         if use_time_tiebreak:
-            # Legacy flag: currently display-only (no time-based tie-breaking here).
-            row["Time"] = _format_time(tm)
-        if tb_time_flags:
-            row["TB Time"] = "TB Time" if tb_time_flags.get(name) else ""
-        if tb_prev_flags:
-            row["TB Prev"] = "TB Prev" if tb_prev_flags.get(name) else ""
+            row.append(_format_time(tm))
+        if show_tb_time:
+            row.append("TB Time" if tb_time_flags.get(name) else "")
+        if show_tb_prev:
+            row.append("TB Prev" if tb_prev_flags.get(name) else "")
         rows.append(row)
-    df = pd.DataFrame(rows)
-    if "TB Time" in df.columns and not any(bool(v) for v in df["TB Time"].tolist()):
-        df.drop(columns=["TB Time"], inplace=True)
-    if "TB Prev" in df.columns and not any(bool(v) for v in df["TB Prev"].tolist()):
-        df.drop(columns=["TB Prev"], inplace=True)
-    return df
+    return columns, rows
 
 
-def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
+def _build_route_df(**kwargs: Any) -> "pd.DataFrame":
+    """Per-route ranking sheet as a DataFrame (same arguments as `_build_route_table`)."""
+    import pandas as pd
+
+    columns, rows = _build_route_table(**kwargs)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def official_members(
+    snapshot: dict[str, Any], folder: str | None = None
+) -> Iterator[tuple[str, IO[bytes]]]:
     """
-    Build a ZIP bundle with "official" results for one box snapshot:
+    Validate `snapshot` and return an iterator of official ZIP members `(arcname, buffer)`:
       - overall.xlsx / overall.pdf
       - route_{n}.xlsx / route_{n}.pdf
       - metadata.json
+
+    Validation and tie-break resolution happen eagerly (`ValueError` is raised here, before any
+    member is rendered); each member is then rendered lazily into a spooled buffer when the
+    iterator reaches it. Members are placed under `folder/` (default: the category name).
     """
     # Use category name for folder naming; fall back to box id for robustness.
     categorie = snapshot.get("categorie") or f"box_{snapshot.get('boxId')}"
-    folder = safe_zip_component(str(categorie))
+    folder = folder or safe_zip_component(str(categorie))
     exported_at = datetime.now(timezone.utc).isoformat()
 
     # We expect a `scores` mapping: {athleteName: [route1Score, route2Score, ...]}.
@@ -220,68 +333,22 @@ def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
     if not isinstance(scores, dict) or not scores:
         raise ValueError("missing_scores")
 
-    # Times are optional; normalize to seconds so renderers can format them consistently.
-    raw_times = snapshot.get("times") or {}
-    times = _normalize_times(raw_times if isinstance(raw_times, dict) else {})
-
-    # Clubs are optional; prefer explicit snapshot field but also support the competitors list.
-    clubs = _normalize_clubs(snapshot.get("clubs") if isinstance(snapshot.get("clubs"), dict) else {})
-    if not clubs:
-        competitors = snapshot.get("competitors") or []
-        if isinstance(competitors, list):
-            for comp in competitors:
-                if not isinstance(comp, dict):
-                    continue
-                name = comp.get("nume") or comp.get("name")
-                club = comp.get("club")
-                if (
-                    isinstance(name, str)
-                    and name.strip()
-                    and isinstance(club, str)
-                    and club.strip()
-                ):
-                    clubs[name] = club.strip()
+    # Every builder below reads the same validated matrix (times as whole seconds).
+    matrix = snapshot_matrix(snapshot).whole_seconds()
+    times = matrix.times
 
+    clubs = _clubs_from_snapshot(snapshot)
     route_count = _route_count_from_snapshot(snapshot)
-    if route_count <= 0:
-        raise ValueError("missing_routes_count")
 
     # Legacy flag: controls time column display only (no tie-breaking).
     use_time = bool(snapshot.get("timeCriterionEnabled"))
 
     # `RankingIn` is shared with other exports; we reuse the same overall builder for consistency.
-    payload = RankingIn(
-        categorie=str(categorie),
-        route_count=int(route_count),
-        scores=scores,
-        times=times,
-        use_time_tiebreak=use_time,
-        route_index=int(snapshot.get("routeIndex") or route_count),
-        holds_counts=snapshot.get("holdsCounts")
-        if isinstance(snapshot.get("holdsCounts"), list)
-        else None,
-        active_holds_count=snapshot.get("holdsCount")
-        if isinstance(snapshot.get("holdsCount"), int)
-        else None,
-        box_id=snapshot.get("boxId"),
-        time_tiebreak_resolved_decision=snapshot.get("timeTiebreakResolvedDecision"),
-        time_tiebreak_resolved_fingerprint=snapshot.get("timeTiebreakResolvedFingerprint"),
-        time_tiebreak_preference=snapshot.get("timeTiebreakPreference"),
-        time_tiebreak_decisions=snapshot.get("timeTiebreakDecisions"),
-        prev_rounds_tiebreak_resolved_decision=snapshot.get("prevRoundsTiebreakResolvedDecision"),
-        prev_rounds_tiebreak_resolved_fingerprint=snapshot.get("prevRoundsTiebreakResolvedFingerprint"),
-        prev_rounds_tiebreak_preference=snapshot.get("prevRoundsTiebreakPreference"),
-        prev_rounds_tiebreak_decisions=snapshot.get("prevRoundsTiebreakDecisions"),
-        prev_rounds_tiebreak_orders=snapshot.get("prevRoundsTiebreakOrders"),
-        prev_rounds_tiebreak_ranks_by_fingerprint=snapshot.get("prevRoundsTiebreakRanks"),
-        prev_rounds_tiebreak_lineage_ranks_by_key=snapshot.get("prevRoundsTiebreakLineageRanks"),
-        clubs=clubs,
-        include_clubs=bool(clubs),
-    )
+    payload = ranking_payload_from_snapshot(snapshot, clubs=clubs)
 
     tiebreak_context = resolve_rankings_with_time_tiebreak(
-        scores=scores,
-        times=times,
+        scores=None,
+        times=None,
         route_count=route_count,
         active_route_index=int(snapshot.get("routeIndex") or route_count),
         box_id=snapshot.get("boxId"),
@@ -298,6 +365,7 @@ def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
         resolved_decisions=snapshot.get("timeTiebreakDecisions"),
         resolved_fingerprint=snapshot.get("timeTiebreakResolvedFingerprint"),
         resolved_decision=snapshot.get("timeTiebreakResolvedDecision"),
+        matrix=matrix,
     )
     overall_rank_override = {
         row["name"]: int(row["rank"]) for row in tiebreak_context["overall_rows"]
@@ -318,28 +386,34 @@ def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
         row["name"]: bool(row.get("tb_prev")) for row in tiebreak_context["route_rows"]
     }
 
-    with TemporaryDirectory() as tmp:
-        tmp_dir = Path(tmp)
+    def render_sheets(table: tuple[list[str], list[list[Any]]], stem: str, title: str):
+        # Imported on first render (openpyxl/reportlab are not needed to import this module).
+        from escalada.api.pdf_writer import write_pdf
+        from escalada.api.xlsx_writer import write_xlsx
 
+        columns, rows = table
+        xlsx = spooled_buffer()
+        write_xlsx(xlsx, columns, rows)
+        yield f"{folder}/{stem}.xlsx", xlsx
+        pdf = spooled_buffer()
+        write_pdf(pdf, columns, rows, title=title)
+        yield f"{folder}/{stem}.pdf", pdf
+
+    def render():
         # Overall files (XLSX + PDF)
-        overall_df = _build_overall_df(
+        overall_table = _build_overall_table(
             payload,
             times,
             rank_override=overall_rank_override,
             tb_time_flags=overall_tb_flags,
             tb_prev_flags=overall_tb_prev_flags,
         )
-        overall_xlsx = tmp_dir / "overall.xlsx"
-        overall_pdf = tmp_dir / "overall.pdf"
-        overall_df.to_excel(overall_xlsx, index=False)
-        _df_to_pdf(overall_df, overall_pdf, title=f"{categorie} – Overall")
-
-        file_paths: list[Path] = [overall_xlsx, overall_pdf]
+        yield from render_sheets(overall_table, "overall", f"{categorie} – Overall")
 
         # Per-route files (XLSX + PDF)
         for r in range(route_count):
             is_active_route = (r + 1) == int(snapshot.get("routeIndex") or route_count)
-            df_route = _build_route_df(
+            route_table = _build_route_table(
                 scores=scores,
                 times=times,
                 clubs=clubs,
@@ -349,11 +423,7 @@ def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
                 tb_time_flags=active_route_tb_flags if is_active_route else None,
                 tb_prev_flags=active_route_tb_prev_flags if is_active_route else None,
             )
-            xlsx_route = tmp_dir / f"route_{r+1}.xlsx"
-            pdf_route = tmp_dir / f"route_{r+1}.pdf"
-            df_route.to_excel(xlsx_route, index=False)
-            _df_to_pdf(df_route, pdf_route, title=f"{categorie} – Route {r+1}")
-            file_paths.extend([xlsx_route, pdf_route])
+            yield from render_sheets(route_table, f"route_{r+1}", f"{categorie} – Route {r+1}")
 
         # Include metadata for traceability/debugging (no personal data beyond names/clubs).
         metadata = {
@@ -381,15 +451,19 @@ def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
             "clubs": clubs,
             "exportedAt": exported_at,
         }
-        metadata_path = tmp_dir / "metadata.json"
-        metadata_path.write_text(
-            json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-        file_paths.append(metadata_path)
-
-        # Package everything into a ZIP buffer for streaming as a single response.
-        buf = io.BytesIO()
-        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for p in file_paths:
-                zf.write(p, arcname=f"{folder}/{p.name}")
-        return buf.getvalue()
+        meta = spooled_buffer()
+        meta.write(json.dumps(metadata, ensure_ascii=False, indent=2).encode("utf-8"))
+        yield f"{folder}/metadata.json", meta
+
+    return render()
+
+
+def iter_official_results_zip(snapshot: dict[str, Any]) -> Iterator[bytes]:
+    """Stream the official ZIP of one box (raises `ValueError` before the first chunk)."""
+    return iter_zip(official_members(snapshot))
+
+
+def build_official_results_zip(snapshot: dict[str, Any]) -> bytes:
+    """Official ZIP of one box as bytes (used by export jobs and the artifact cache)."""
+    return b"".join(iter_official_results_zip(snapshot))
+
@@ -0,0 +1,152 @@
+"""
+Live overall ranking projection (one per box).
+
+The overall ranking across routes (rank points + geometric mean, see `overall_ranking.py`) used to
+exist only in the export path, so control panels and public TVs recomputed it client-side on every
+update. The live runtime now keeps a projection per box and ships it in `STATE_SNAPSHOT`, the
+public box state, the `ranking` topic and `GET /api/overall/{boxId}`.
+
+Caching:
+- the projection is reused while the state object, `boxVersion` and the dirty flag are unchanged,
+  so fanning a snapshot out to many clients computes it once per version
+- the command path marks a box dirty after any ranking-relevant command (`mark_overall_dirty`),
+  which also covers commands that do not bump `boxVersion` (INIT_ROUTE, validation disabled)
+- on rebuild, each route's score column is compared with the cached one and only changed routes
+  are re-sorted (a SUBMIT_SCORE touches one route); totals and order are then recombined
+- scores are read from the box's validated `ScoreMatrix` (`box_matrix`), never re-coerced
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from escalada.api.overall_ranking import compute_overall_ranking, route_rank_points
+from escalada.api.score_matrix import ScoreMatrix, box_matrix
+
+
+def _clubs_from_state(state: dict) -> dict[str, str]:
+    clubs: dict[str, str] = {}
+    competitors = state.get("competitors") or []
+    if isinstance(competitors, list):
+        for comp in competitors:
+            if not isinstance(comp, dict):
+                continue
+            name = comp.get("nume") or comp.get("name")
+            club = comp.get("club")
+            if isinstance(name, str) and name.strip() and isinstance(club, str) and club.strip():
+                clubs[name] = club.strip()
+    return clubs
+
+
+def _routes_count(state: dict) -> int:
+    routes_count = state.get("routesCount")
+    if routes_count is None:
+        routes_count = state.get("routeIndex") or 1
+    try:
+        return max(1, int(routes_count or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+class OverallProjection:
+    """Cached overall ranking of one box with per-route incremental recomputation."""
+
+    def __init__(self) -> None:
+        self.state: dict | None = None
+        self.version: Any = None
+        self.dirty = True
+        self.payload: dict[str, Any] | None = None
+        self._columns: list[dict[str, float]] = []
+        self._points: list[dict[str, float]] = []
+        # Number of route re-sorts performed (observability/tests).
+        self.route_recomputes = 0
+
+    def get(self, state: dict, matrix: ScoreMatrix | None = None) -> dict[str, Any]:
+        """
+        Return the projection payload for `state` (rebuilt only when something changed).
+
+        `matrix` holds the state's validated scores (the box matrix); without it the state's
+        score table is validated on each rebuild.
+        """
+        version = state.get("boxVersion", 0)
+        if (
+            self.payload is not None
+            and not self.dirty
+            and self.state is state
+            and self.version == version
+        ):
+            return self.payload
+        if matrix is None:
+            matrix = ScoreMatrix.from_mappings(state.get("scores"), {})
+        self.payload = self._rebuild(state, matrix.scores)
+        self.state = state
+        self.version = version
+        self.dirty = False
+        return self.payload
+
+    def _rebuild(self, state: dict, scores: dict[str, list[float | None]]) -> dict[str, Any]:
+        routes_count = _routes_count(state)
+        columns: list[dict[str, float]] = []
+        points: list[dict[str, float]] = []
+        for r in range(routes_count):
+            column = {
+                name: arr[r] for name, arr in scores.items() if r < len(arr) and arr[r] is not None
+            }
+            if r < len(self._columns) and self._columns[r] == column:
+                route_points = self._points[r]
+            else:
+                route_points = route_rank_points(scores, r)
+                self.route_recomputes += 1
+            columns.append(column)
+            points.append(route_points)
+        self._columns = columns
+        self._points = points
+
+        ranking = compute_overall_ranking(
+            scores,
+            routes_count,
+            clubs=_clubs_from_state(state),
+            route_points=points,
+        )
+        return {
+            "boxVersion": state.get("boxVersion", 0),
+            "routesCount": routes_count,
+            "rows": [
+                {
+                    "rank": row.rank,
+                    "name": row.name,
+                    "club": row.club,
+                    "total": row.total,
+                    "rankPoints": row.rank_points,
+                    "scores": row.scores,
+                }
+                for row in ranking.rows
+            ],
+        }
+
+
+# -------------------- Per-box registry --------------------
+_projections: dict[int, OverallProjection] = {}
+
+
+def get_overall_projection(box_id: int, state: dict) -> dict[str, Any]:
+    """Return the (cached) overall ranking projection of a box."""
+    projection = _projections.get(box_id)
+    if projection is None:
+        projection = _projections[box_id] = OverallProjection()
+    return projection.get(state, box_matrix(box_id, state))
+
+
+def mark_overall_dirty(box_id: int) -> None:
+    """Force the next read to re-check the box scores (called after ranking-relevant commands)."""
+    projection = _projections.get(box_id)
+    if projection is not None:
+        projection.dirty = True
+
+
+def drop_overall_projection(box_id: int | None = None) -> None:
+    """Forget the projection of one box (or all boxes)."""
+    if box_id is None:
+        _projections.clear()
+    else:
+        _projections.pop(box_id, None)
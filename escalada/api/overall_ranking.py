@@ -0,0 +1,183 @@
+"""
+Overall (multi-route) ranking engine.
+
+The overall ranking combines per-route "rank points" with a geometric mean (matches the frontend):
+- For each route: sort athletes with a score once (score desc, then name) and give every athlete
+  the average of the positions of its tie group (tie for 2nd/3rd => 2.5 points)
+- Athletes without a score on a route get `athletes + 1` points (worse than last place)
+- Total = geometric mean of the route points, rounded to 3 decimals (lower is better)
+- Order: by total, then name; "Rank" is shared on equal totals. When the tie-break resolver
+  provides a rank override, rows follow it instead (total/name only break remaining ties).
+
+Cost is one sort per route (O(R·N log N)) instead of re-ranking every route for every athlete.
+The result is a plain row model (`OverallRanking`) with no pandas dependency; the XLSX/PDF
+exports (`save_ranking._build_overall_df`), official ZIPs and backup snapshots all render from it.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Sequence
+
+
+@dataclass
+class OverallRow:
+    """One athlete's overall result (scores/times are the raw per-route values)."""
+
+    rank: int
+    name: str
+    club: str
+    scores: list[Any]
+    times: list[Any]
+    rank_points: list[float]
+    total: float
+    tb_time: bool = False
+    tb_prev: bool = False
+
+
+@dataclass
+class OverallRanking:
+    """Ordered overall rows plus the layout flags needed to render them as a table."""
+
+    route_count: int
+    use_time: bool
+    rows: list[OverallRow] = field(default_factory=list)
+    show_tb_time: bool = False
+    show_tb_prev: bool = False
+
+    def columns(self) -> list[str]:
+        """Sheet columns: Rank, Nume, Club, Score R1[, Time R1], ..., Total[, TB Time][, TB Prev]."""
+        cols = ["Rank", "Nume", "Club"]
+        for i in range(self.route_count):
+            cols.append(f"Score R{i+1}")
+            if self.use_time:
+                cols.append(f"Time R{i+1}")
+        cols.append("Total")
+        if self.show_tb_time:
+            cols.append("TB Time")
+        if self.show_tb_prev:
+            cols.append("TB Prev")
+        return cols
+
+    def table(self, format_time: Callable[[Any], Any]) -> list[list[Any]]:
+        """Rows as lists aligned with `columns()` (times rendered with `format_time`)."""
+        out: list[list[Any]] = []
+        for row in self.rows:
+            values: list[Any] = [row.rank, row.name, row.club]
+            for idx in range(self.route_count):
+                values.append(row.scores[idx])
+                if self.use_time:
+                    values.append(format_time(row.times[idx]))
+            values.append(row.total)
+            if self.show_tb_time:
+                values.append("TB Time" if row.tb_time else "")
+            if self.show_tb_prev:
+                values.append("TB Prev" if row.tb_prev else "")
+            out.append(values)
+        return out
+
+    def records(self, format_time: Callable[[Any], Any]) -> list[dict[str, Any]]:
+        """Rows as JSON-ready dicts keyed by `columns()` (missing values are None)."""
+        cols = self.columns()
+        return [dict(zip(cols, values)) for values in self.table(format_time)]
+
+
+def route_rank_points(scores: Mapping[str, Sequence[Any]], route_offset: int) -> dict[str, float]:
+    """Rank points for one route (only athletes with a score on it), in one sorted pass."""
+    scored = [
+        (name, arr[route_offset])
+        for name, arr in scores.items()
+        if route_offset < len(arr) and arr[route_offset] is not None
+    ]
+    scored.sort(key=lambda x: (-x[1], x[0].lower()))
+    points: dict[str, float] = {}
+    i = 0
+    pos = 1
+    while i < len(scored):
+        j = i + 1
+        while j < len(scored) and scored[i][1] == scored[j][1]:
+            j += 1
+        avg = (pos + pos + (j - i) - 1) / 2
+        for k in range(i, j):
+            points[scored[k][0]] = avg
+        pos += j - i
+        i = j
+    return points
+
+
+def compute_overall_ranking(
+    scores: Mapping[str, Sequence[Any]],
+    route_count: int,
+    *,
+    clubs: Mapping[str, str] | None = None,
+    times: Mapping[str, Sequence[Any]] | None = None,
+    use_time: bool = False,
+    rank_override: Mapping[str, int] | None = None,
+    tb_time_flags: Mapping[str, bool] | None = None,
+    tb_prev_flags: Mapping[str, bool] | None = None,
+    route_points: Sequence[Mapping[str, float]] | None = None,
+) -> OverallRanking:
+    """
+    Compute the ordered overall ranking (see module docstring for the algorithm).
+
+    `route_points` may carry precomputed `route_rank_points()` per route (the live projection
+    reuses the routes whose scores did not change).
+    """
+    clubs = clubs or {}
+    times = times or {}
+    n = route_count
+    n_comp = len(scores)
+    if route_points is not None and len(route_points) == n:
+        per_route = list(route_points)
+    else:
+        per_route = [route_rank_points(scores, r) for r in range(n)]
+
+    rows: list[OverallRow] = []
+    for name, arr in scores.items():
+        filled = [points.get(name, n_comp + 1) for points in per_route]
+        # Geometric mean keeps totals comparable across different route counts.
+        total = round(math.prod(filled) ** (1 / n), 3)
+        time_row = times.get(name, [])
+        rows.append(
+            OverallRow(
+                rank=0,
+                name=name,
+                club=clubs.get(name, ""),
+                scores=[arr[idx] if idx < len(arr) else None for idx in range(n)],
+                times=[time_row[idx] if idx < len(time_row) else None for idx in range(n)],
+                rank_points=filled,
+                total=total,
+            )
+        )
+
+    if rank_override:
+        rows.sort(key=lambda row: (rank_override.get(row.name, 10**9), row.total, row.name.lower()))
+        for idx, row in enumerate(rows):
+            row.rank = rank_override.get(row.name, idx + 1)
+    else:
+        rows.sort(key=lambda row: (math.isnan(row.total), row.total, row.name))
+        prev_total = None
+        prev_rank = 0
+        for idx, row in enumerate(rows, start=1):
+            row.rank = prev_rank if row.total == prev_total else idx
+            prev_total = row.total
+            prev_rank = row.rank
+
+    show_tb_time = show_tb_prev = False
+    if tb_time_flags:
+        for row in rows:
+            row.tb_time = bool(tb_time_flags.get(row.name))
+        show_tb_time = any(row.tb_time for row in rows)
+    if tb_prev_flags:
+        for row in rows:
+            row.tb_prev = bool(tb_prev_flags.get(row.name))
+        show_tb_prev = any(row.tb_prev for row in rows)
+
+    return OverallRanking(
+        route_count=n,
+        use_time=bool(use_time),
+        rows=rows,
+        show_tb_time=show_tb_time,
+        show_tb_prev=show_tb_prev,
+    )
@@ -0,0 +1,159 @@
+"""
+PDF renderer for ranking sheets (landscape A4 table with a title).
+
+Rendering cost used to grow faster than the row count: styles were rebuilt on every call, the
+whole DataFrame was converted with `astype(str)`, every row got its own BACKGROUND command and
+reportlab had to split one giant table across pages. `write_pdf` instead:
+- reuses module-level paragraph/table styles (alternating rows via one ROWBACKGROUNDS command)
+- takes `(columns, rows)` straight from the ranking row model and formats each cell once
+- measures column widths once, then renders page-sized table chunks (same widths on every page,
+  header repeated on each chunk) separated by page breaks
+
+Fonts: DejaVuSans is registered on first use when available so Romanian diacritics render
+correctly; otherwise Helvetica is used (limited diacritics support). Callers import this module
+lazily (reportlab is only loaded when a PDF is rendered).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Sequence
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# -------------------- Font setup --------------------
+# We prefer a Unicode-capable TTF (DejaVuSans) so Romanian diacritics render correctly.
+# If the font cannot be found/registered, we fall back to Helvetica (may not render all diacritics).
+# Registration parses the TTF, so it happens on the first render, not at import time.
+FONT_PATHS = [
+    "DejaVuSans.ttf",  # Current directory
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
+    "/System/Library/Fonts/Supplemental/DejaVuSans.ttf",  # macOS
+    "C:\\Windows\\Fonts\\DejaVuSans.ttf",  # Windows
+    "/Library/Fonts/DejaVuSans.ttf",  # macOS user fonts
+]
+
+
+@lru_cache(maxsize=1)
+def default_font() -> str:
+    """Register DejaVuSans once (first call) and return the font name to render with."""
+    try:
+        for path in FONT_PATHS:
+            if os.path.exists(path):
+                pdfmetrics.registerFont(TTFont("DejaVuSans", path))
+                return "DejaVuSans"
+    except Exception as e:
+        logging.warning(
+            f"Could not register DejaVuSans font: {e}. Using Helvetica (limited diacritic support)."
+        )
+    return "Helvetica"
+
+
+# -------------------- Layout --------------------
+PAGE_SIZE = landscape(A4)
+MARGIN = 36
+HEADER_FONT_SIZE = 12
+BODY_FONT_SIZE = 10
+CELL_PADDING = 6  # reportlab's default LEFTPADDING/RIGHTPADDING
+# Rows per table chunk: a landscape A4 page fits ~27 body rows (18pt each) under the header;
+# the first page also carries the title. Even sizes keep the row colors alternating across pages.
+FIRST_PAGE_ROWS = 24
+PAGE_ROWS = 26
+
+HEADER_BG = colors.HexColor("#4F81BD")
+ROW_BACKGROUNDS = [colors.lightgrey, colors.whitesmoke]
+
+
+@lru_cache(maxsize=1)
+def _title_style() -> ParagraphStyle:
+    styles = getSampleStyleSheet()
+    return ParagraphStyle(
+        "TitleStyle",
+        parent=styles["Heading1"],
+        alignment=1,  # center
+        fontSize=18,
+        fontName=default_font(),
+        spaceAfter=12,
+    )
+
+
+@lru_cache(maxsize=1)
+def _table_style() -> TableStyle:
+    return TableStyle(
+        [
+            ("FONTNAME", (0, 0), (-1, -1), default_font()),
+            ("FONTSIZE", (0, 0), (-1, 0), HEADER_FONT_SIZE),
+            ("FONTSIZE", (0, 1), (-1, -1), BODY_FONT_SIZE),
+            ("BACKGROUND", (0, 0), (-1, 0), HEADER_BG),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), ROW_BACKGROUNDS),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ]
+    )
+
+
+def _cell_text(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _column_widths(header: list[str], body: list[list[str]]) -> list[float]:
+    font = default_font()
+    widths = [pdfmetrics.stringWidth(text, font, HEADER_FONT_SIZE) for text in header]
+    for row in body:
+        for idx, text in enumerate(row):
+            width = pdfmetrics.stringWidth(text, font, BODY_FONT_SIZE)
+            if width > widths[idx]:
+                widths[idx] = width
+    return [w + 2 * CELL_PADDING for w in widths]
+
+
+def _chunks(body: list[list[str]]):
+    yield body[:FIRST_PAGE_ROWS]
+    for start in range(FIRST_PAGE_ROWS, len(body), PAGE_ROWS):
+        yield body[start : start + PAGE_ROWS]
+
+
+def write_pdf(
+    target: str | Path | IO[bytes],
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    title: str = "Ranking",
+) -> None:
+    """Render `columns` + `rows` as a paginated landscape-A4 PDF table (path or binary buffer)."""
+    doc = SimpleDocTemplate(
+        str(target) if isinstance(target, (str, Path)) else target,
+        pagesize=PAGE_SIZE,
+        leftMargin=MARGIN,
+        rightMargin=MARGIN,
+        topMargin=MARGIN,
+        bottomMargin=MARGIN,
+    )
+    elements: list[Any] = [Paragraph(title, _title_style()), Spacer(1, 12)]
+
+    header = [str(c) for c in columns]
+    if header:
+        body = [[_cell_text(v) for v in row] for row in rows]
+        col_widths = _column_widths(header, body)
+        for idx, chunk in enumerate(_chunks(body)):
+            if idx:
+                elements.append(PageBreak())
+            # repeatRows keeps the header if a chunk still overflows (e.g. a long title).
+            table = Table(
+                [header] + chunk, colWidths=col_widths, repeatRows=1, hAlign="CENTER"
+            )
+            table.setStyle(_table_style())
+            elements.append(table)
+
+    doc.build(elements)
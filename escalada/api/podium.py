@@ -1,45 +1,133 @@
+"""
+Podium (top 3) of a category for ceremony screens.
+
+Sources, in order:
+- the live overall ranking projection (`overall_projection`, cached per box version) of the box
+  running this category, so the podium follows the scores without re-running `save_ranking`;
+  ties are ordered by the box's tie-break decisions (same rank overrides as `overall.xlsx`)
+- `escalada/clasamente/<categorie>/overall.xlsx` written by `save_ranking`, when no live box
+  with scores matches (e.g. after a restart); parsed once and cached by file mtime/size
+"""
+
 import os
 from pathlib import Path
 from typing import Dict, List
 
-import pandas as pd
 from fastapi import APIRouter, HTTPException
 
+from escalada.api import live
+from escalada.api.overall_projection import get_overall_projection
+
 router = APIRouter()
 
+PODIUM_COLORS = ["#ffd700", "#c0c0c0", "#cd7f32"]  # aur, argint, bronz
 
-@router.get("/podium/{category}", response_model=List[Dict[str, str]])
-async def get_podium(category: str):
-    """
-    Returnează primii 3 clasați pentru categoria specificată,
-    citind fișierul Excel generat anterior.
-    """
-    # Sanitize category to prevent path traversal
-    safe_category = os.path.basename(category)
-    if not safe_category or safe_category != category:
-        raise HTTPException(status_code=400, detail="Invalid category name")
+# category -> ((st_mtime_ns, st_size), podium) for the overall.xlsx fallback.
+_file_podium_cache: Dict[str, tuple] = {}
+# box_id -> (state, boxVersion, projection payload, overall rank overrides) of the live podium.
+_rank_override_cache: Dict[int, tuple] = {}
 
-    excel_path = Path("escalada/clasamente") / safe_category / "overall.xlsx"
-    if not excel_path.exists():
-        raise HTTPException(
-            status_code=404, detail="Clasament inexistent pentru categoria specificată."
-        )
+
+def _podium(names: List[str]) -> List[Dict[str, str]]:
+    return [{"name": name, "color": PODIUM_COLORS[idx]} for idx, name in enumerate(names[:3])]
+
+
+def _rank_overrides(box_id: int, state: dict, projection: dict) -> Dict[str, int]:
+    """Overall ranks after tie-break decisions (cached per state, version and projection)."""
+    version = state.get("boxVersion", 0)
+    cached = _rank_override_cache.get(box_id)
+    if (
+        cached is not None
+        and cached[0] is state
+        and cached[1] == version
+        and cached[2] is projection
+    ):
+        return cached[3]
+    tiebreak_state, _ = live._resolve_lead_ranking(box_id, state)
+    overrides = {row["name"]: int(row["rank"]) for row in tiebreak_state.get("overall_rows") or []}
+    _rank_override_cache[box_id] = (state, version, projection, overrides)
+    return overrides
+
+
+def _live_podium(category: str) -> List[Dict[str, str]] | None:
+    """Top 3 from the live projection of the box running `category` (latest box wins)."""
+    for box_id in sorted(live.state_map.keys(), reverse=True):
+        state = live.state_map.get(box_id)
+        if not isinstance(state, dict) or (state.get("categorie") or "").strip() != category:
+            continue
+        projection = get_overall_projection(box_id, state)
+        rows = [
+            row
+            for row in projection.get("rows") or []
+            if any(s is not None for s in row.get("scores") or [])
+        ]
+        if not rows:
+            continue
+        overrides = _rank_overrides(box_id, state, projection)
+        if overrides:
+            # Same order as the exported overall sheet (`compute_overall_ranking` rank_override).
+            rows.sort(
+                key=lambda row: (overrides.get(row["name"], 10**9), row["total"], row["name"].lower())
+            )
+        return _podium([row["name"] for row in rows])
+    return None
+
+
+def _read_file_podium(excel_path: Path) -> List[Dict[str, str]]:
     try:
+        import pandas as pd  # imported on first use (heavy, not needed by the live path)
+
         df = pd.read_excel(excel_path)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Eroare la citirea fișierului Excel: {e}"
         )
     # Presupunem că DataFrame-ul are coloana "Nume" și este deja sortat după tipărirea cu Rank
-    top3 = df.head(3)
-    colors = ["#ffd700", "#c0c0c0", "#cd7f32"]  # aur, argint, bronz
-    result = []
-    for idx, row in enumerate(top3.itertuples()):
+    names = []
+    for row in df.head(3).itertuples():
         name = getattr(row, "Nume", None) or getattr(row, "Name", None)
         if name is None:
             raise HTTPException(
                 status_code=500,
                 detail="Excel file is missing required 'Nume' or 'Name' column",
             )
-        result.append({"name": name, "color": colors[idx]})
-    return result
+        names.append(name)
+    return _podium(names)
+
+
+def _file_podium(category: str) -> List[Dict[str, str]]:
+    excel_path = Path("escalada/clasamente") / category / "overall.xlsx"
+    if not excel_path.exists():
+        raise HTTPException(
+            status_code=404, detail="Clasament inexistent pentru categoria specificată."
+        )
+    try:
+        stat = excel_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None  # vanished/unreadable metadata: read without caching
+
+    cached = _file_podium_cache.get(category)
+    if signature is not None and cached is not None and cached[0] == signature:
+        return cached[1]
+    podium = _read_file_podium(excel_path)
+    if signature is not None:
+        _file_podium_cache[category] = (signature, podium)
+    return podium
+
+
+@router.get("/podium/{category}", response_model=List[Dict[str, str]])
+async def get_podium(category: str):
+    """
+    Returnează primii 3 clasați pentru categoria specificată,
+    din clasamentul live al cutiei sau din fișierul Excel generat anterior.
+    """
+    # Sanitize category to prevent path traversal
+    safe_category = os.path.basename(category)
+    if not safe_category or safe_category != category:
+        raise HTTPException(status_code=400, detail="Invalid category name")
+
+    podium = _live_podium(safe_category)
+    if podium is not None:
+        return podium
+    return _file_podium(safe_category)
@@ -0,0 +1,136 @@
+"""
+Background pre-rendering of official exports when a category completes.
+
+Officials download the official ZIP right after the last climber of the last route is marked,
+which is also when judge traffic peaks. The command path calls `prerender.notify()` after every
+command; when a box becomes complete (last route running and every competitor marked), a
+pre-render of its official ZIP is scheduled into the artifact cache so the download is a cache
+hit (or joins the running render through the export job single-flight key).
+
+The pre-render is low priority and yields to judge traffic:
+- it starts only after `EXPORT_PRERENDER_QUIET_SEC` without commands on any box (each new command
+  pushes it back; a further command on the box reschedules it with the latest state)
+- it waits while any export job is queued/running, so requested exports go first
+- it is submitted as a regular export job (same key/inputs hash as `/export/official/box/{id}`)
+  and skipped when the artifact is already cached
+
+`EXPORT_PRERENDER=0` disables it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from escalada.api.export_jobs import ExportJobManager, ExportQueueFull, export_jobs
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PRERENDER = os.getenv("EXPORT_PRERENDER", "1") != "0"
+EXPORT_PRERENDER_QUIET_SEC = float(os.getenv("EXPORT_PRERENDER_QUIET_SEC", "5"))
+
+
+def is_box_complete(state: dict[str, Any]) -> bool:
+    """True when the last route is running and every listed competitor is marked."""
+    try:
+        route_index = int(state.get("routeIndex") or 1)
+        routes_count = int(state.get("routesCount") or route_index)
+    except (TypeError, ValueError):
+        return False
+    if route_index < routes_count:
+        return False
+    competitors = state.get("competitors")
+    if not isinstance(competitors, list):
+        return False
+    named = [
+        comp
+        for comp in competitors
+        if isinstance(comp, dict) and isinstance(comp.get("nume"), str) and comp["nume"].strip()
+    ]
+    return bool(named) and all(comp.get("marked") for comp in named)
+
+
+class Prerenderer:
+    """Debounced, low-priority pre-render scheduler (one pending task per box)."""
+
+    def __init__(
+        self,
+        manager: ExportJobManager = export_jobs,
+        *,
+        quiet_sec: float = EXPORT_PRERENDER_QUIET_SEC,
+        enabled: bool = EXPORT_PRERENDER,
+    ) -> None:
+        self.manager = manager
+        self.quiet_sec = quiet_sec
+        self.enabled = enabled
+        self.last_activity = time.monotonic()
+        self._pending: dict[int, asyncio.Task] = {}
+        # Boxes pre-rendered (submitted) so far (observability/tests).
+        self.submitted = 0
+
+    def notify(self, box_id: int, state: dict[str, Any]) -> None:
+        """Record command activity; schedule a pre-render when `state` completes its category."""
+        self.last_activity = time.monotonic()
+        if not self.enabled:
+            return
+        pending = self._pending.get(box_id)
+        if not is_box_complete(state):
+            if pending is not None:
+                pending.cancel()
+            return
+        if pending is not None and not pending.done():
+            return  # the pending task re-reads the box state when it runs
+        task = asyncio.create_task(self._run(box_id))
+        self._pending[box_id] = task
+        task.add_done_callback(lambda t, box_id=box_id: self._forget(box_id, t))
+
+    def _forget(self, box_id: int, task: asyncio.Task) -> None:
+        if self._pending.get(box_id) is task:
+            del self._pending[box_id]
+
+    async def _wait_for_idle(self) -> None:
+        while True:
+            idle_for = time.monotonic() - self.last_activity
+            if idle_for >= self.quiet_sec and self.manager.active_count() == 0:
+                return
+            await asyncio.sleep(max(self.quiet_sec - idle_for, self.quiet_sec / 4, 0.01))
+
+    async def _run(self, box_id: int) -> None:
+        # Imported here: `live` imports this module, and `backup` imports `live`.
+        from escalada.api import live
+        from escalada.api.backup import _export_snapshot, _official_filename
+        from escalada.api.official_export import (
+            build_official_results_zip,
+            official_export_inputs_hash,
+        )
+
+        await self._wait_for_idle()
+        state = live.state_map.get(box_id)
+        if not isinstance(state, dict) or not is_box_complete(state):
+            return
+        snap = _export_snapshot(box_id, state)
+        digest = official_export_inputs_hash(snap)
+        cache = self.manager.cache
+        if cache is not None and cache.get(digest, ".zip") is not None:
+            return
+        try:
+            job, _ = self.manager.submit(
+                kind="official_zip",
+                key=("official_zip", digest),
+                cache_key=digest,
+                render=build_official_results_zip,
+                render_input=snap,
+                filename=_official_filename(box_id, snap),
+                box_id=box_id,
+            )
+        except ExportQueueFull:
+            return
+        self.submitted += 1
+        logger.info("Pre-rendering official export of box %s (job %s)", box_id, job.id)
+
+
+# Shared scheduler used by the command path.
+prerenderer = Prerenderer()
@@ -23,10 +23,11 @@ Endpoints:
    - Returns: {judgeChief, competitionDirector, chiefRoutesetter}
    - Used by: CompetitionOfficials component
 
-4. WS /api/public/ws/{box_id}?token=...
+4. WS /api/public/ws/{box_id}?token=...[&topics=flow,ranking,roster,officials]
    - WebSocket for live state updates per box
    - Sends: STATE_SNAPSHOT (initial + on changes), PING (every 30s)
-   - Accepts: PONG (heartbeat response), REQUEST_STATE (manual refresh)
+   - With `topics`: TOPIC_UPDATE projections instead of STATE_SNAPSHOT (only changed topics)
+   - Accepts: PONG (heartbeat response), REQUEST_STATE (manual refresh), SUBSCRIBE (change topics)
    - Blocks: All command types (INIT_ROUTE, START_TIMER, etc.)
    - Used by: PublicLiveClimbing, PublicRankings components
 
@@ -65,6 +66,7 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from starlette.websockets import WebSocket
 
+from escalada.api.heartbeat import heartbeat
 from escalada.auth.service import create_access_token, decode_token
 
 logger = logging.getLogger(__name__)
@@ -328,6 +330,11 @@ public_box_channels: Dict[int, set[WebSocket]] = {}
 # Lock for thread-safe access to public_box_channels (async context)
 public_box_channels_lock = asyncio.Lock()
 
+# Topic subscriptions for sockets in public_box_channels: {WebSocket: frozenset({"flow", ...})}
+# Sockets absent from this dict are legacy clients and receive the full STATE_SNAPSHOT.
+# Guarded by public_box_channels_lock (same lifecycle as the channel registry).
+public_box_topics: Dict[WebSocket, frozenset[str]] = {}
+
 
 async def broadcast_to_public_box(box_id: int, payload: dict) -> None:
     """Broadcast state update to all public spectators watching a specific box.
@@ -361,15 +368,25 @@ async def broadcast_to_public_box(box_id: int, payload: dict) -> None:
         payload: State snapshot dict (will be JSON-serialized)
     """
     # Snapshot WebSocket set inside lock (prevents concurrent modification)
+    # Topic subscribers are skipped: they only receive TOPIC_UPDATE projections.
     async with public_box_channels_lock:
-        sockets = list(public_box_channels.get(box_id, set()))  # Convert set to list for iteration
+        sockets = [
+            ws for ws in public_box_channels.get(box_id, set()) if ws not in public_box_topics
+        ]
+
+    # Serialize once for all recipients (ensure_ascii=False preserves Romanian chars)
+    message = json.dumps(payload, ensure_ascii=False)
+    await _send_public_messages(box_id, [(ws, message) for ws in sockets])
 
-    # Broadcast to all sockets (outside lock to reduce contention)
+
+async def _send_public_messages(box_id: int, sends: List[tuple[WebSocket, str]]) -> None:
+    """Send pre-serialized messages and drop dead sockets from the public registry."""
     dead = []  # Track failed sends for cleanup
-    for ws in sockets:
+    for ws, message in sends:
+        if ws in dead:
+            continue
         try:
-            # Send JSON payload to WebSocket (ensure_ascii=False preserves Romanian chars)
-            await ws.send_text(json.dumps(payload, ensure_ascii=False))
+            await ws.send_text(message)
         except Exception as e:
             # Connection closed or network error (log at debug level, not error)
             logger.debug(f"Public box broadcast error: {e}")
@@ -381,66 +398,34 @@ async def broadcast_to_public_box(box_id: int, payload: dict) -> None:
             channel = public_box_channels.get(box_id, set())
             for ws in dead:
                 channel.discard(ws)  # Safe even if already removed
+                public_box_topics.pop(ws, None)
 
 
-async def _heartbeat(ws: WebSocket, box_id: int, last_pong: dict) -> None:
-    """WebSocket heartbeat loop: Send PING every 30s, close if no PONG within 90s.
-    
-    Purpose:
-    - Detect dead connections early (client closed tab, network failure, etc.)
-    - Free resources by closing stale WebSockets (prevents memory leaks)
-    - Standard WebSocket keepalive pattern (PING/PONG handshake)
-    
-    Flow:
-    1. Sleep 30s (interval between PINGs)
-    2. Send {type: "PING"} to client
-    3. Check last_pong timestamp (updated by main loop when client sends PONG)
-    4. If >90s since last PONG, consider connection dead → break loop
-    5. Main loop catches break → closes WebSocket and removes from registry
-    
-    Timeout Logic:
-    - 30s PING interval: Balance between responsiveness and network overhead
-    - 90s PONG timeout: Allows up to 3 missed PINGs (network hiccups, slow clients)
-    - If client doesn't respond within 90s, assume connection dead
-    
-    Client Handling:
-    - Client must reply with {type: "PONG"} when receiving PING
-    - See PublicLiveClimbing.tsx, PublicRankings.tsx for PONG logic
-    - If client doesn't implement PONG, connection closed after 90s
-    
-    Cancellation:
-    - Task cancelled by main loop on disconnect (finally block)
-    - CancelledError caught and suppressed (normal shutdown, not an error)
-    
-    Args:
-        ws: WebSocket connection to monitor
-        box_id: Box identifier (for logging only)
-        last_pong: Mutable dict with "ts" key (shared with main loop)
-    
-    Raises:
-        asyncio.CancelledError: When task cancelled by main loop (caught and suppressed)
+async def broadcast_public_officials_update() -> None:
+    """Push the officials projection to public sockets subscribed to the `officials` topic.
+
+    Called From:
+    - escalada.api.live.broadcast_officials_update() after officials are changed by an admin
     """
-    try:
-        while True:
-            # Wait 30 seconds between PINGs
-            await asyncio.sleep(30)
-            
-            try:
-                # Send PING to client (expects PONG response)
-                await ws.send_text(json.dumps({"type": "PING"}))
-            except Exception:
-                # Send failed (connection closed) → exit loop
-                break
-            
-            # Check if client responded to recent PINGs
-            now = asyncio.get_event_loop().time()  # Current timestamp (monotonic)
-            if now - last_pong["ts"] > 90:  # No PONG in 90s (3 missed PINGs)
-                logger.warning(f"Public WS box {box_id}: no PONG in 90s, closing")
-                break  # Exit loop → main loop closes WebSocket
-                
-    except asyncio.CancelledError:
-        # Task cancelled by main loop (normal shutdown on disconnect)
-        pass  # Suppress error, let finally block in main loop handle cleanup
+    from escalada.api.live import _build_topic_payload
+
+    async with public_box_channels_lock:
+        targets = [
+            (box_id, ws)
+            for box_id, sockets in public_box_channels.items()
+            for ws in sockets
+            if "officials" in public_box_topics.get(ws, frozenset())
+        ]
+    if not targets:
+        return
+    message = json.dumps(_build_topic_payload(-1, {}, "officials"), ensure_ascii=False)
+    for box_id, ws in targets:
+        await _send_public_messages(box_id, [(ws, message)])
+
+
+# Spectators get a longer PONG window than judges/control panel (mobile tabs, flaky venue Wi-Fi).
+# PINGs are sent by the shared scheduler (escalada.api.heartbeat) every 30s for all sockets.
+PUBLIC_HEARTBEAT_TIMEOUT_SEC = 90.0
 
 
 @router.websocket("/ws/{box_id}")
@@ -462,11 +447,12 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
        - Shape: {type: "STATE_SNAPSHOT", boxId, sessionId, state: {...}}
        - Same format as private WS (escalada.api.live.box_channels)
     2. PING: Heartbeat every 30s (client must reply with PONG)
-       - Shape: {type: "PING"}
+       - Shape: {type: "PING", timestamp}
+       - Sent by the shared heartbeat scheduler (one loop for all sockets, not one task per WS)
        - Used to detect dead connections (90s timeout if no PONG)
     
     Message Types Accepted (Client → Server):
-    1. PONG: Heartbeat response (updates last_pong timestamp)
+    1. PONG: Heartbeat response (updates the scheduler's last-pong table)
        - Shape: {type: "PONG"}
        - Required to keep connection alive (must respond within 90s)
     2. REQUEST_STATE: Manual refresh (sends STATE_SNAPSHOT immediately)
@@ -483,10 +469,10 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     2. Server validates token (close with 4401 if invalid)
     3. Server accepts connection → adds to public_box_channels[box_id]
     4. Server sends initial STATE_SNAPSHOT
-    5. Server starts heartbeat task (PING every 30s)
+    5. Server registers the socket with the shared heartbeat scheduler (PING every 30s)
     6. Client receives state updates whenever box state changes
     7. Client sends PONG to keep connection alive
-    8. On disconnect/timeout: Remove from registry, cancel heartbeat task, close WS
+    8. On disconnect/timeout: Remove from registry, unregister from heartbeat, close WS
     
     Broadcasting:
     - State changes trigger broadcast_to_public_box() (called from escalada.api.live)
@@ -495,13 +481,12 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     
     Error Handling:
     - Token validation errors: Close with 4401 + reason (token_required, invalid_token)
-    - Receive timeout (180s): Close connection (client stopped sending PONG)
-    - Heartbeat timeout (90s no PONG): Close connection (dead client detection)
+    - Heartbeat timeout (90s no PONG): Scheduler closes the socket → receive fails → cleanup
     - JSON decode errors: Log + ignore message (continue receiving)
     
     Performance:
     - One WebSocket per spectator per box (can be 100+ connections for popular boxes)
-    - Heartbeat overhead: 1 PING per connection per 30s (~3.3% bandwidth for PING/PONG)
+    - Heartbeat overhead: 1 PING per connection per 30s, no per-connection task or timer
     - Broadcast: O(n) where n = spectators watching box (no fan-out optimization)
     
     Args:
@@ -513,7 +498,7 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     
     Closes With:
         4401: Token missing, invalid, expired, or role mismatch
-        Normal: Client disconnected, heartbeat timeout, or receive timeout
+        Normal: Client disconnected or heartbeat timeout
     """
     # Extract peer IP for logging (None if unavailable)
     peer = ws.client.host if ws.client else None
@@ -544,10 +529,17 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     # Token valid → accept WebSocket connection
     await ws.accept()
 
+    # Optional topic subscription (e.g. ?topics=flow for a timer-only display)
+    from escalada.api.live import _parse_topics
+
+    topics = _parse_topics(ws.query_params.get("topics"))
+
     # Add WebSocket to channel registry (for broadcast_to_public_box)
     async with public_box_channels_lock:
         # setdefault: create set if box_id not in dict, then add WebSocket
         public_box_channels.setdefault(box_id, set()).add(ws)
+        if topics:
+            public_box_topics[ws] = topics  # Projections only (no full snapshot)
         subscriber_count = len(public_box_channels[box_id])  # Count spectators watching this box
 
     logger.info(f"Public spectator connected to box {box_id}, total: {subscriber_count}")
@@ -556,23 +548,17 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     # targets={ws}: Send only to this WebSocket (not broadcast to all spectators)
     await _send_public_box_snapshot(box_id, targets={ws})
 
-    # Start heartbeat task (PING every 30s, close if no PONG within 90s)
-    # last_pong: Mutable dict shared between heartbeat task and main loop
-    # Initialize with current timestamp (connection just established)
-    last_pong = {"ts": asyncio.get_event_loop().time()}
-    heartbeat_task = asyncio.create_task(_heartbeat(ws, box_id, last_pong))
+    # Register with the shared heartbeat scheduler (PING every 30s, close if no PONG within 90s)
+    # The scheduler closes dead sockets itself, which unblocks receive_text() below.
+    heartbeat.register(ws, label=f"public box {box_id}", timeout=PUBLIC_HEARTBEAT_TIMEOUT_SEC)
 
     # Main receive loop: Process messages from client
     try:
         while True:
             try:
-                # Wait for message from client (180s timeout = 3x heartbeat interval)
-                # Timeout prevents hung connections from accumulating
-                data = await asyncio.wait_for(ws.receive_text(), timeout=180)
-            except asyncio.TimeoutError:
-                # No message in 180s → assume connection dead
-                logger.warning(f"Public WS timeout for box {box_id}")
-                break  # Exit loop → cleanup in finally block
+                # Wait for message from client (no per-receive timer: dead sockets are
+                # closed by the heartbeat scheduler, which makes this call raise)
+                data = await ws.receive_text()
             except Exception as e:
                 # Receive error (connection closed, network error)
                 logger.warning(f"Public WS receive error for box {box_id}: {e}")
@@ -584,9 +570,9 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
                 if isinstance(msg, dict):
                     msg_type = msg.get("type")
 
-                    # Handle PONG: Update last_pong timestamp (keeps connection alive)
+                    # Handle PONG: Update last-pong timestamp (keeps connection alive)
                     if msg_type == "PONG":
-                        last_pong["ts"] = asyncio.get_event_loop().time()  # Reset heartbeat timer
+                        heartbeat.touch(ws)  # Reset heartbeat timer
                         continue  # No response needed
 
                     # Handle REQUEST_STATE: Send fresh state snapshot
@@ -595,6 +581,17 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
                         await _send_public_box_snapshot(box_id, targets={ws})  # Send only to this client
                         continue
 
+                    # Handle SUBSCRIBE: Switch topics (empty/invalid list → full snapshots again)
+                    if msg_type == "SUBSCRIBE":
+                        topics = _parse_topics(msg.get("topics"))
+                        async with public_box_channels_lock:
+                            if topics:
+                                public_box_topics[ws] = topics
+                            else:
+                                public_box_topics.pop(ws, None)
+                        await _send_public_box_snapshot(box_id, targets={ws})  # Re-hydrate client
+                        continue
+
                     # Block all other message types (commands, unknown types)
                     # Commands like INIT_ROUTE, START_TIMER, etc. are silently ignored
                     # Logged at debug level (not error, expected behavior for read-only access)
@@ -614,16 +611,13 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
     finally:
         # Cleanup: Always executed (normal disconnect, timeout, error)
         
-        # 1. Cancel heartbeat task (stop sending PINGs)
-        heartbeat_task.cancel()
-        try:
-            await heartbeat_task  # Wait for task to acknowledge cancellation
-        except asyncio.CancelledError:
-            pass  # Expected when cancelling, suppress error
+        # 1. Unregister from heartbeat scheduler (stop sending PINGs)
+        heartbeat.unregister(ws)
 
         # 2. Remove WebSocket from channel registry (no more broadcasts to this client)
         async with public_box_channels_lock:
             public_box_channels.get(box_id, set()).discard(ws)  # Safe even if already removed
+            public_box_topics.pop(ws, None)  # Forget topic subscription
             remaining = len(public_box_channels.get(box_id, set()))  # Count remaining spectators
 
         logger.info(f"Public spectator disconnected from box {box_id}, remaining: {remaining}")
@@ -636,7 +630,9 @@ async def public_box_websocket(ws: WebSocket, box_id: int):
 
 
 async def _send_public_box_snapshot(
-    box_id: int, targets: set[WebSocket] | None = None
+    box_id: int,
+    targets: set[WebSocket] | None = None,
+    topics: frozenset[str] | None = None,
 ) -> None:
     """Send state snapshot for a specific box to public spectators.
     
@@ -649,6 +645,13 @@ async def _send_public_box_snapshot(
     - Same as private WS: {type: "STATE_SNAPSHOT", boxId, sessionId, state: {...}}
     - Built by escalada.api.live._build_snapshot() (shared function)
     - Contains full box state: competitors, routes, timer, scores, etc.
+    - Built only when at least one legacy (non-topic) recipient exists
+    
+    Topic Subscribers:
+    - Receive TOPIC_UPDATE projections (escalada.api.live._build_topic_payload) instead
+    - `topics`: topics changed by the triggering command (None = all, e.g. connect/refresh)
+    - Each projection is built once and only if some recipient subscribed to it
+      (a timer-only display never triggers ranking resolution)
     
     Target Modes:
     - targets={ws}: Send only to specific WebSocket (single recipient)
@@ -669,9 +672,10 @@ async def _send_public_box_snapshot(
     Args:
         box_id: Box identifier to send snapshot for
         targets: Set of specific WebSockets (or None to broadcast to all)
+        topics: Changed topics for topic subscribers (None = all topics)
     """
     # Import here to avoid circular import (live.py imports public.py for broadcasting)
-    from escalada.api.live import _build_snapshot, init_lock, state_map
+    from escalada.api.live import WS_TOPICS, _build_snapshot, _topic_messages, init_lock, state_map
 
     # Snapshot state inside lock (prevents race with command processing in live.py)
     async with init_lock:
@@ -681,6 +685,19 @@ async def _send_public_box_snapshot(
     if not state:
         return
 
+    # Split recipients: legacy sockets get STATE_SNAPSHOT, topic sockets get projections
+    async with public_box_channels_lock:
+        recipients = list(targets) if targets else list(public_box_channels.get(box_id, set()))
+        topical = [(ws, public_box_topics[ws]) for ws in recipients if ws in public_box_topics]
+    legacy = [ws for ws in recipients if ws not in public_box_topics]
+
+    if topical:
+        changed = topics if topics is not None else frozenset(WS_TOPICS)
+        await _send_public_messages(box_id, _topic_messages(box_id, state, topical, changed))
+
+    if not legacy:
+        return  # Nobody needs the fat snapshot → skip building it
+
     # Build snapshot payload (same format as private WS for consistency)
     # _build_snapshot() from live.py: {type: "STATE_SNAPSHOT", boxId, sessionId, state: {...}}
     payload = _build_snapshot(box_id, state)
@@ -688,9 +705,10 @@ async def _send_public_box_snapshot(
     # Send to specific targets or broadcast to all spectators
     if targets:
         # Single recipient mode: Send only to specified WebSockets
-        for ws in list(targets):  # Convert to list for safe iteration
+        message = json.dumps(payload, ensure_ascii=False)  # ensure_ascii=False for Romanian chars
+        for ws in legacy:
             try:
-                await ws.send_text(json.dumps(payload, ensure_ascii=False))  # ensure_ascii=False for Romanian chars
+                await ws.send_text(message)
             except Exception as e:
                 # Send failed (connection closing, network error)
                 logger.debug(f"Failed to send public snapshot: {e}")  # Debug level (not error, may be normal disconnect)
@@ -0,0 +1,249 @@
+"""
+Incremental Lead ranking index (one per box, for the active route).
+
+`resolve_rankings_with_time_tiebreak()` used to rebuild everything on each call (sanitize every
+score/time list, rebuild every `LeadResult`, sort, regroup ties). Snapshots are built after almost
+every command, so large categories paid that cost continuously.
+
+`RouteRankingIndex` keeps the same data incrementally:
+- the box's validated score/time rows (`score_matrix.ScoreMatrix`) and a `LeadResult` per athlete
+- a sorted list of baseline sort keys (best result first, then name)
+- tie-group sizes per result key, plus cached member lists per tie group
+
+`sync()` reconciles the index with the box matrix: nothing is done while the matrix version is
+unchanged, athletes whose revision did not change are skipped, a changed athlete (e.g. after
+SUBMIT_SCORE) is repositioned with a binary search, and only the tie groups it left/joined are
+recomputed. A full rebuild is the fallback whenever the route, hold count or matrix changes, and
+`verify()` compares the index with a rebuild (enabled per resolve with RANKING_INDEX_VERIFY=1).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from bisect import bisect_left, insort
+from typing import Any
+
+from escalada_core import LeadResult
+
+from escalada.api.ranking_time_tiebreak import (
+    _baseline_sort_key,
+    _build_tie_groups,
+    _result_key,
+    _score_to_lead_result,
+    _tie_member,
+)
+from escalada.api.score_matrix import ScoreMatrix, box_matrix
+
+logger = logging.getLogger(__name__)
+
+RANKING_INDEX_VERIFY = os.getenv("RANKING_INDEX_VERIFY", "0").lower() in {"1", "true", "yes", "on"}
+
+_GroupKey = tuple[int, int, int]  # negated result key (sorts best group first)
+
+
+class RouteRankingIndex:
+    """Sorted, incrementally updated baseline ranking of one route."""
+
+    def __init__(self, *, route_index: int, active_holds_count: int | None) -> None:
+        self.route_index = max(1, int(route_index or 1))
+        self.active_holds_count = active_holds_count
+        self.scores: dict[str, list[float | None]] = {}
+        self.times: dict[str, list[float | None]] = {}
+        self.results: dict[str, LeadResult] = {}
+        self.result_keys: dict[str, tuple[int, int, int]] = {}
+        self.matrix: ScoreMatrix | None = None
+        self._matrix_version = -1
+        self._revisions: dict[str, int] = {}
+        self._sort_keys: dict[str, tuple[int, int, int, str, str]] = {}
+        self._order: list[tuple[int, int, int, str, str]] = []
+        self._group_sizes: dict[_GroupKey, int] = {}
+        self._group_order: list[_GroupKey] = []
+        self._group_members: dict[_GroupKey, list[dict[str, Any]]] = {}
+
+    def matches(self, *, route_index: int, active_holds_count: int | None) -> bool:
+        return (
+            self.route_index == max(1, int(route_index or 1))
+            and self.active_holds_count == active_holds_count
+        )
+
+    # -------------------- updates --------------------
+
+    def sync(self, matrix: ScoreMatrix) -> int:
+        """Apply the athletes written to `matrix` since the last sync; return how many changed."""
+        if matrix is not self.matrix:
+            self._reset()
+            self.matrix = matrix
+        elif matrix.version == self._matrix_version:
+            return 0
+        changed = 0
+        for name, revision in matrix.revisions.items():
+            if self._revisions.get(name) == revision:
+                continue
+            self._revisions[name] = revision
+            scores = matrix.scores.get(name)
+            times = matrix.times.get(name)
+            if scores is None and times is None:
+                if name in self.results:
+                    self.remove(name)
+                    changed += 1
+                continue
+            self.upsert(name, scores, times)
+            changed += 1
+        self._matrix_version = matrix.version
+        return changed
+
+    def _reset(self) -> None:
+        fresh = RouteRankingIndex(
+            route_index=self.route_index, active_holds_count=self.active_holds_count
+        )
+        self.__dict__.update(fresh.__dict__)
+
+    def upsert(
+        self, name: str, scores: list[float | None] | None, times: list[float | None] | None
+    ) -> None:
+        """Insert or reposition one athlete (validated rows): O(log n) search + local refresh."""
+        offset = self.route_index - 1
+        if scores is not None:
+            self.scores[name] = scores
+        else:
+            scores = []
+            self.scores.pop(name, None)
+        if times is not None:
+            self.times[name] = times
+        else:
+            times = []
+            self.times.pop(name, None)
+
+        result = _score_to_lead_result(
+            score=scores[offset] if offset < len(scores) else None,
+            time_seconds=times[offset] if offset < len(times) else None,
+            active_holds_count=self.active_holds_count,
+        )
+        new_key = _baseline_sort_key(name, result)
+        old_key = self._sort_keys.get(name)
+        self.results[name] = result
+        self.result_keys[name] = _result_key(result)
+
+        if old_key != new_key:
+            if old_key is not None:
+                self._discard_key(old_key)
+            self._sort_keys[name] = new_key
+            insort(self._order, new_key)
+            group = new_key[:3]
+            if group not in self._group_sizes:
+                self._group_sizes[group] = 0
+                insort(self._group_order, group)
+            self._group_sizes[group] += 1
+        # Member payload includes the time, so the athlete's group is stale even if it didn't move.
+        self._group_members.pop(new_key[:3], None)
+
+    def remove(self, name: str) -> None:
+        old_key = self._sort_keys.pop(name, None)
+        if old_key is not None:
+            self._discard_key(old_key)
+        for table in (self.scores, self.times, self.results, self.result_keys):
+            table.pop(name, None)
+
+    def _discard_key(self, key: tuple[int, int, int, str, str]) -> None:
+        pos = bisect_left(self._order, key)
+        if pos < len(self._order) and self._order[pos] == key:
+            del self._order[pos]
+        group = key[:3]
+        self._group_members.pop(group, None)
+        size = self._group_sizes.get(group, 0) - 1
+        if size > 0:
+            self._group_sizes[group] = size
+        else:
+            self._group_sizes.pop(group, None)
+            gpos = bisect_left(self._group_order, group)
+            if gpos < len(self._group_order) and self._group_order[gpos] == group:
+                del self._group_order[gpos]
+
+    # -------------------- queries --------------------
+
+    def ordered_ids(self) -> list[str]:
+        """Athlete names in baseline order (same as the full rebuild sort)."""
+        return [key[4] for key in self._order]
+
+    def tie_groups(self) -> list[dict[str, Any]]:
+        """Baseline tie groups (same shape as `_build_tie_groups`), reusing cached members."""
+        groups: list[dict[str, Any]] = []
+        pos = 1
+        for group in self._group_order:
+            size = self._group_sizes[group]
+            if size > 1:
+                members = self._group_members.get(group)
+                if members is None:
+                    start = bisect_left(self._order, group)
+                    members = [
+                        _tie_member(key[4], self.results[key[4]])
+                        for key in self._order[start : start + size]
+                    ]
+                    self._group_members[group] = members
+                groups.append(
+                    {
+                        "rank_start": pos,
+                        "rank_end": pos + size - 1,
+                        "affects_podium": pos <= 3,
+                        "members": list(members),
+                    }
+                )
+            pos += size
+        return groups
+
+    def verify(self) -> bool:
+        """Consistency check against a full rebuild from the same matrix."""
+        fresh = RouteRankingIndex(
+            route_index=self.route_index, active_holds_count=self.active_holds_count
+        )
+        if self.matrix is not None:
+            fresh.sync(self.matrix)
+        ordered = fresh.ordered_ids()
+        return (
+            ordered == self.ordered_ids()
+            and _build_tie_groups(ordered, fresh.results, fresh.result_keys) == self.tie_groups()
+            and fresh.scores == self.scores
+            and fresh.times == self.times
+        )
+
+
+# -------------------- Per-box registry --------------------
+# box_id -> (state dict the index was built from, index). The state object is held by reference and
+# compared by identity, so a replaced state (restore, re-init) always triggers a rebuild; so does
+# a replaced box matrix (`sync` starts over when handed another matrix).
+_indexes: dict[int, tuple[dict, RouteRankingIndex]] = {}
+
+
+def get_route_index(box_id: int, state: dict) -> RouteRankingIndex:
+    """Return the (synced) ranking index for the active route of a box."""
+    route_index = max(1, int(state.get("routeIndex") or 1))
+    holds_count = state.get("holdsCount") if isinstance(state.get("holdsCount"), int) else None
+
+    entry = _indexes.get(box_id)
+    if (
+        entry is None
+        or entry[0] is not state
+        or not entry[1].matches(route_index=route_index, active_holds_count=holds_count)
+    ):
+        index = RouteRankingIndex(route_index=route_index, active_holds_count=holds_count)
+        _indexes[box_id] = (state, index)
+    else:
+        index = entry[1]
+
+    matrix = box_matrix(box_id, state)
+    index.sync(matrix)
+    if RANKING_INDEX_VERIFY and not index.verify():
+        logger.warning("Ranking index mismatch for box %s, rebuilding", box_id)
+        index = RouteRankingIndex(route_index=route_index, active_holds_count=holds_count)
+        index.sync(matrix)
+        _indexes[box_id] = (state, index)
+    return index
+
+
+def drop_route_index(box_id: int | None = None) -> None:
+    """Forget the index of one box (or all boxes)."""
+    if box_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(box_id, None)
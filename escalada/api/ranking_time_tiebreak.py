@@ -10,10 +10,18 @@ from __future__ import annotations
 import hashlib
 import json
 import math
-from typing import Any
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Mapping
 
 from escalada_core import Athlete, LeadResult, TieBreakDecision, TieContext, compute_lead_ranking
 
+from escalada.api.ranking_vectorized import VECTORIZED_MIN_ATHLETES, vectorized_baseline
+
+if TYPE_CHECKING:
+    from escalada.api.ranking_index import RouteRankingIndex
+    from escalada.api.score_matrix import ScoreMatrix
+
 
 def _coerce_time_seconds(val: Any) -> float | None:
     if val is None or isinstance(val, bool):
@@ -52,19 +60,23 @@ def _sanitize_scores(
             continue
         if not isinstance(arr, list):
             continue
-        clean: list[float | None] = []
-        for value in arr:
-            if isinstance(value, bool):
-                clean.append(None)
-                continue
-            if isinstance(value, (int, float)) and math.isfinite(value):
-                clean.append(float(value))
-            else:
-                clean.append(None)
-        out[name] = clean
+        out[name] = _sanitize_score_values(arr)
     return out
 
 
+def _sanitize_score_values(arr: list[Any]) -> list[float | None]:
+    clean: list[float | None] = []
+    for value in arr:
+        if isinstance(value, bool):
+            clean.append(None)
+            continue
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            clean.append(float(value))
+        else:
+            clean.append(None)
+    return clean
+
+
 def _sanitize_times(
     times: dict[str, list[int | float | str | None]] | None,
 ) -> dict[str, list[float | None]]:
@@ -207,6 +219,119 @@ def _score_to_lead_result(
     return LeadResult(topped=False, hold=hold, plus=plus, time_seconds=time_seconds)
 
 
+def _baseline_sort_key(name: str, result: LeadResult) -> tuple[int, int, int, str, str]:
+    """Sort key of the baseline (pre tie-break) order: best result first, then name."""
+    topped, hold, plus = _result_key(result)
+    return (-topped, -hold, -plus, name.lower(), name)
+
+
+def _build_tie_groups(
+    ordered_ids: list[str],
+    results: dict[str, LeadResult],
+    result_keys: dict[str, tuple[int, int, int]],
+) -> list[dict[str, Any]]:
+    tie_groups: list[dict[str, Any]] = []
+    pos = 1
+    i = 0
+    while i < len(ordered_ids):
+        k = result_keys[ordered_ids[i]]
+        j = i + 1
+        while j < len(ordered_ids) and result_keys[ordered_ids[j]] == k:
+            j += 1
+        size = j - i
+        if size > 1:
+            tie_groups.append(
+                {
+                    "rank_start": pos,
+                    "rank_end": pos + size - 1,
+                    "affects_podium": pos <= 3,
+                    "members": [_tie_member(name, results[name]) for name in ordered_ids[i:j]],
+                }
+            )
+        pos += size
+        i = j
+    return tie_groups
+
+
+def _tie_member(name: str, result: LeadResult) -> dict[str, Any]:
+    return {
+        "name": name,
+        "topped": bool(result.topped),
+        "hold": int(result.hold),
+        "plus": bool(result.plus),
+        "time": result.time_seconds,
+    }
+
+
+def _build_results(
+    athlete_ids: list[str],
+    normalized_scores: Mapping[str, Any],
+    normalized_times: Mapping[str, Any],
+    route_offset: int,
+    active_holds_count: int | None,
+) -> dict[str, LeadResult]:
+    results: dict[str, LeadResult] = {}
+    for athlete_id in athlete_ids:
+        score_arr = normalized_scores.get(athlete_id, [])
+        time_arr = normalized_times.get(athlete_id, [])
+        score = score_arr[route_offset] if route_offset < len(score_arr) else None
+        time_value = time_arr[route_offset] if route_offset < len(time_arr) else None
+        results[athlete_id] = _score_to_lead_result(
+            score=score,
+            time_seconds=time_value,
+            active_holds_count=active_holds_count,
+        )
+    return results
+
+
+def _baseline_columns(
+    ordered_ids: list[str],
+    results: dict[str, LeadResult],
+    result_keys: dict[str, tuple[int, int, int]],
+) -> tuple[list[int], list[float], list[float | None]]:
+    """Competition ranks, score hints and times in baseline order."""
+    ranks: list[int] = []
+    hints: list[float] = []
+    times: list[float | None] = []
+    rank = 0
+    prev_key: tuple[int, int, int] | None = None
+    for idx, athlete_id in enumerate(ordered_ids, start=1):
+        key = result_keys[athlete_id]
+        if key != prev_key:
+            rank = idx
+            prev_key = key
+        result = results[athlete_id]
+        ranks.append(rank)
+        hints.append(
+            float(result.hold) + (0.0 if result.topped else (0.1 if result.plus else 0.0))
+        )
+        times.append(result.time_seconds)
+    return ranks, hints, times
+
+
+def _baseline_rows(
+    ordered_ids: list[str],
+    columns: tuple[list[int], list[float], list[float | None]],
+    normalized_scores: Mapping[str, Any],
+    normalized_times: Mapping[str, Any],
+) -> list[dict[str, Any]]:
+    ranks, hints, times = columns
+    return [
+        {
+            "name": athlete_id,
+            "rank": ranks[idx],
+            "total": hints[idx],
+            "score": hints[idx],
+            "time": times[idx],
+            "tb_time": False,
+            "tb_prev": False,
+            "raw_scores": normalized_scores.get(athlete_id, []),
+            "raw_times": normalized_times.get(athlete_id, []),
+        }
+        for idx, athlete_id in enumerate(ordered_ids)
+    ]
+
+
 def _event_global_fingerprint(
     *,
     box_id: int | None,
@@ -215,13 +340,70 @@ def _event_global_fingerprint(
 ) -> str | None:
     if not tie_groups:
         return None
+    cache_key = _fingerprint_cache_key(box_id, route_index, tie_groups)
+    if cache_key is not None:
+        with _fingerprint_cache_lock:
+            cached = _fingerprint_cache.get(cache_key)
+            if cached is not None:
+                _fingerprint_cache.move_to_end(cache_key)
+                return cached
     payload = {
         "boxId": box_id,
         "routeIndex": route_index,
         "ties": tie_groups,
     }
     raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-    return f"tb3:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+    fingerprint = f"tb3:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+    if cache_key is not None:
+        with _fingerprint_cache_lock:
+            _fingerprint_cache[cache_key] = fingerprint
+            while len(_fingerprint_cache) > _FINGERPRINT_CACHE_SIZE:
+                _fingerprint_cache.popitem(last=False)
+    return fingerprint
+
+
+# Fingerprints are persisted (e.g. keys of `timeTiebreakDecisions`), so the cache must never change
+# their bytes: the key captures every serialized value, including the type of values whose JSON
+# form depends on it (`time` may be int or float, `boxId` may be None).
+_FINGERPRINT_CACHE_SIZE = 1024
+_fingerprint_cache: OrderedDict[tuple, str] = OrderedDict()
+_fingerprint_cache_lock = threading.Lock()
+
+
+def _fingerprint_cache_key(
+    box_id: Any, route_index: int, tie_groups: list[dict[str, Any]]
+) -> tuple | None:
+    """Cheap structural key of the tie groups (None = shape not cacheable)."""
+    try:
+        groups = []
+        for group in tie_groups:
+            if len(group) != 4:
+                return None
+            members = group["members"]
+            for member in members:
+                if len(member) != 5:
+                    return None
+            groups.append(
+                (
+                    group["rank_start"],
+                    group["rank_end"],
+                    group["affects_podium"],
+                    tuple(
+                        (
+                            member["name"],
+                            member["topped"],
+                            member["hold"],
+                            member["plus"],
+                            member["time"].__class__,
+                            member["time"],
+                        )
+                        for member in members
+                    ),
+                )
+            )
+        return (box_id.__class__, box_id, route_index.__class__, route_index, tuple(groups))
+    except (KeyError, TypeError):
+        return None
 
 
 class _StateBackedResolver:
@@ -383,72 +565,69 @@ def resolve_rankings_with_time_tiebreak(
     resolved_decisions: dict[str, str] | None = None,
     resolved_fingerprint: str | None = None,
     resolved_decision: str | None = None,
+    ranking_index: RouteRankingIndex | None = None,
+    matrix: ScoreMatrix | None = None,
 ) -> dict[str, Any]:
-    normalized_scores = _sanitize_scores(scores)
-    normalized_times = _sanitize_times(times)
     active_route_norm = max(1, int(active_route_index or 1))
     route_offset = active_route_norm - 1
+    results: dict[str, LeadResult] | None = None
+    baseline_columns: tuple[list[int], list[float], list[float | None]] | None = None
 
-    athlete_ids = sorted(
-        set(normalized_scores.keys()) | set(normalized_times.keys()),
-        key=lambda name: name.lower(),
-    )
-    athletes = [Athlete(id=name, name=name) for name in athlete_ids]
-
-    results: dict[str, LeadResult] = {}
-    for athlete_id in athlete_ids:
-        score_arr = normalized_scores.get(athlete_id, [])
-        time_arr = normalized_times.get(athlete_id, [])
-        score = score_arr[route_offset] if route_offset < len(score_arr) else None
-        time_value = time_arr[route_offset] if route_offset < len(time_arr) else None
-        results[athlete_id] = _score_to_lead_result(
-            score=score,
-            time_seconds=time_value,
-            active_holds_count=active_holds_count,
+    if ranking_index is not None and ranking_index.matches(
+        route_index=active_route_norm, active_holds_count=active_holds_count
+    ):
+        # Incrementally maintained view (see escalada.api.ranking_index): no re-sanitizing,
+        # no per-call sort, tie groups reused for unchanged result keys.
+        normalized_scores = ranking_index.scores
+        normalized_times = ranking_index.times
+        results = ranking_index.results
+        baseline_ids = ranking_index.ordered_ids()
+        result_keys = ranking_index.result_keys
+        tie_groups = ranking_index.tie_groups()
+        athlete_ids = sorted(results.keys(), key=lambda name: name.lower())
+    else:
+        if matrix is not None:
+            # Validated when written (see escalada.api.score_matrix): read the rows as-is.
+            normalized_scores = matrix.scores
+            normalized_times = matrix.times
+        else:
+            normalized_scores = _sanitize_scores(scores)
+            normalized_times = _sanitize_times(times)
+
+        athlete_ids = sorted(
+            set(normalized_scores.keys()) | set(normalized_times.keys()),
+            key=lambda name: name.lower(),
         )
 
-    # Build baseline tie groups for has_eligible_tie and event-level fingerprint compatibility.
-    baseline_sorted = sorted(
-        athletes,
-        key=lambda athlete: (
-            -_result_key(results[athlete.id])[0],
-            -_result_key(results[athlete.id])[1],
-            -_result_key(results[athlete.id])[2],
-            athlete.name.lower(),
-            athlete.id,
-        ),
-    )
-    tie_groups: list[dict[str, Any]] = []
-    pos = 1
-    i = 0
-    while i < len(baseline_sorted):
-        athlete = baseline_sorted[i]
-        k = _result_key(results[athlete.id])
-        j = i + 1
-        while j < len(baseline_sorted) and _result_key(results[baseline_sorted[j].id]) == k:
-            j += 1
-        size = j - i
-        if size > 1:
-            members = baseline_sorted[i:j]
-            tie_groups.append(
-                {
-                    "rank_start": pos,
-                    "rank_end": pos + size - 1,
-                    "affects_podium": pos <= 3,
-                    "members": [
-                        {
-                            "name": m.name,
-                            "topped": bool(results[m.id].topped),
-                            "hold": int(results[m.id].hold),
-                            "plus": bool(results[m.id].plus),
-                            "time": results[m.id].time_seconds,
-                        }
-                        for m in members
-                    ],
-                }
+        vector = (
+            vectorized_baseline(
+                athlete_ids,
+                normalized_scores,
+                normalized_times,
+                route_offset,
+                active_holds_count,
             )
-        pos += size
-        i = j
+            if len(athlete_ids) >= VECTORIZED_MIN_ATHLETES
+            else None
+        )
+        if vector is not None:
+            # Large category: baseline order/ties/ranks computed with NumPy (identical values).
+            baseline_ids = vector.order
+            tie_groups = vector.tie_groups
+            baseline_columns = (vector.ranks, vector.score_hints, vector.times)
+        else:
+            results = _build_results(
+                athlete_ids, normalized_scores, normalized_times, route_offset, active_holds_count
+            )
+            # Build baseline tie groups for has_eligible_tie and event-level fingerprint compatibility.
+            # Keys are computed once per athlete (not inside the sort comparator).
+            result_keys = {athlete_id: _result_key(result) for athlete_id, result in results.items()}
+            baseline_ids = sorted(
+                athlete_ids,
+                key=lambda athlete_id: _baseline_sort_key(athlete_id, results[athlete_id]),
+            )
+            tie_groups = _build_tie_groups(baseline_ids, results, result_keys)
+
     has_eligible_tie = bool(tie_groups)
     event_fp = _event_global_fingerprint(
         box_id=box_id,
@@ -456,26 +635,12 @@ def resolve_rankings_with_time_tiebreak(
         tie_groups=tie_groups,
     )
 
+    if baseline_columns is None and (not has_eligible_tie or not bool(time_criterion_enabled)):
+        baseline_columns = _baseline_columns(baseline_ids, results, result_keys)
+
     if not has_eligible_tie:
-        rows = []
-        for idx, athlete in enumerate(baseline_sorted):
-            result = results[athlete.id]
-            score_hint = float(result.hold) + (
-                0.0 if result.topped else (0.1 if result.plus else 0.0)
-            )
-            rows.append(
-                {
-                    "name": athlete.name,
-                    "rank": idx + 1,
-                    "total": score_hint,
-                    "score": score_hint,
-                    "time": result.time_seconds,
-                    "tb_time": False,
-                    "tb_prev": False,
-                    "raw_scores": normalized_scores.get(athlete.id, []),
-                    "raw_times": normalized_times.get(athlete.id, []),
-                }
-            )
+        # Without ties competition ranks are simply 1..N.
+        rows = _baseline_rows(baseline_ids, baseline_columns, normalized_scores, normalized_times)
         return {
             "overall_rows": rows,
             "route_rows": rows,
@@ -529,36 +694,7 @@ def resolve_rankings_with_time_tiebreak(
     )
 
     if not bool(time_criterion_enabled):
-        rows: list[dict[str, Any]] = []
-        rank = 1
-        i = 0
-        while i < len(baseline_sorted):
-            athlete = baseline_sorted[i]
-            current_key = _result_key(results[athlete.id])
-            j = i + 1
-            while j < len(baseline_sorted) and _result_key(results[baseline_sorted[j].id]) == current_key:
-                j += 1
-            for k in range(i, j):
-                athlete_k = baseline_sorted[k]
-                result_k = results[athlete_k.id]
-                score_hint = float(result_k.hold) + (
-                    0.0 if result_k.topped else (0.1 if result_k.plus else 0.0)
-                )
-                rows.append(
-                    {
-                        "name": athlete_k.name,
-                        "rank": rank,
-                        "total": score_hint,
-                        "score": score_hint,
-                        "time": result_k.time_seconds,
-                        "tb_time": False,
-                        "tb_prev": False,
-                        "raw_scores": normalized_scores.get(athlete_k.id, []),
-                        "raw_times": normalized_times.get(athlete_k.id, []),
-                    }
-                )
-            rank += j - i
-            i = j
+        rows = _baseline_rows(baseline_ids, baseline_columns, normalized_scores, normalized_times)
         route_rows = [
             {
                 "name": row["name"],
@@ -611,9 +747,14 @@ def resolve_rankings_with_time_tiebreak(
         event_time_decision=resolved_decision if resolved_decision in {"yes", "no"} else None,
     )
 
+    if results is None:
+        results = _build_results(
+            athlete_ids, normalized_scores, normalized_times, route_offset, active_holds_count
+        )
+    athletes = [Athlete(id=name, name=name) for name in athlete_ids]
     core_result = compute_lead_ranking(
         athletes=athletes,
-        results=results,
+        results=dict(results),
         tie_break_resolver=resolver if bool(time_criterion_enabled) else None,
         podium_places=3,
         round_name=f"Final|route:{active_route_norm}",
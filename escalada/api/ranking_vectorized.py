@@ -0,0 +1,128 @@
+"""
+NumPy baseline for large Lead categories.
+
+`resolve_rankings_with_time_tiebreak()` spends most of its time in per-athlete Python work when a
+category has hundreds or thousands of athletes (mass-participation qualifiers): building
+`LeadResult` objects, sorting with tuple keys and scanning for tie groups. Above
+`VECTORIZED_MIN_ATHLETES`, the baseline (result keys, order, tie-group boundaries, competition
+ranks, score hints) is computed here with NumPy arrays instead.
+
+The output is value-for-value identical to the Python path (same float operations, same sort
+keys), so callers can switch transparently. Tie-break resolution itself (time criterion on with
+ties) still goes through `escalada_core`; only the baseline is vectorized.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+VECTORIZED_MIN_ATHLETES = int(os.getenv("RANKING_VECTORIZED_MIN_ATHLETES", "200"))
+
+
+@dataclass
+class VectorBaseline:
+    """Baseline ranking columns, all in baseline order."""
+
+    order: list[str]
+    ranks: list[int]  # competition ranks (ties share the first position)
+    score_hints: list[float]
+    times: list[float | None]
+    tie_groups: list[dict[str, Any]]
+
+
+def vectorized_baseline(
+    athlete_ids: Sequence[str],
+    normalized_scores: Mapping[str, Sequence[float | None]],
+    normalized_times: Mapping[str, Sequence[float | None]],
+    route_offset: int,
+    active_holds_count: int | None,
+) -> VectorBaseline | None:
+    """Compute the baseline with NumPy (None when NumPy is unavailable)."""
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover - numpy ships with pandas
+        return None
+
+    n = len(athlete_ids)
+    raw = np.empty(n, dtype=np.float64)
+    times: list[float | None] = []
+    for i, athlete_id in enumerate(athlete_ids):
+        score_arr = normalized_scores.get(athlete_id, [])
+        score = score_arr[route_offset] if route_offset < len(score_arr) else None
+        raw[i] = np.nan if score is None else score
+        time_arr = normalized_times.get(athlete_id, [])
+        times.append(time_arr[route_offset] if route_offset < len(time_arr) else None)
+
+    # Same semantics as _score_to_lead_result / _result_key.
+    missing = np.isnan(raw)
+    safe = np.where(missing, 0.0, raw)
+    hold_cap = (
+        int(active_holds_count)
+        if isinstance(active_holds_count, int) and active_holds_count > 0
+        else None
+    )
+    if hold_cap is not None:
+        topped = ~missing & (safe >= float(hold_cap))
+    else:
+        topped = np.zeros(n, dtype=bool)
+    floored = np.floor(np.maximum(safe, 0.0))
+    plus = ~missing & ~topped & ((safe - floored) > 1e-9)
+    hold = np.where(missing, -1, np.where(topped, hold_cap or 0, floored)).astype(np.int64)
+    hints = hold.astype(np.float64) + np.where(topped, 0.0, np.where(plus, 0.1, 0.0))
+
+    # Name tiebreak (lower-case, then exact) as an integer rank, then one lexsort for the key
+    # (-topped, -hold, -plus, name.lower(), name).
+    name_rank = np.empty(n, dtype=np.int64)
+    name_rank[sorted(range(n), key=lambda i: (athlete_ids[i].lower(), athlete_ids[i]))] = np.arange(n)
+    order = np.lexsort((name_rank, -plus.astype(np.int8), -hold, -topped.astype(np.int8)))
+
+    t_sorted = topped[order]
+    h_sorted = hold[order]
+    p_sorted = plus[order]
+    new_group = np.ones(n, dtype=bool)
+    if n > 1:
+        new_group[1:] = (
+            (t_sorted[1:] != t_sorted[:-1])
+            | (h_sorted[1:] != h_sorted[:-1])
+            | (p_sorted[1:] != p_sorted[:-1])
+        )
+    starts = np.flatnonzero(new_group)
+    sizes = np.diff(np.append(starts, n))
+    ranks = starts[np.cumsum(new_group) - 1] + 1
+
+    order_list = order.tolist()
+    ordered_ids = [athlete_ids[i] for i in order_list]
+    tie_groups: list[dict[str, Any]] = []
+    for start, size in zip(starts.tolist(), sizes.tolist()):
+        if size < 2:
+            continue
+        members = []
+        for pos in range(start, start + size):
+            i = order_list[pos]
+            members.append(
+                {
+                    "name": athlete_ids[i],
+                    "topped": bool(topped[i]),
+                    "hold": int(hold[i]),
+                    "plus": bool(plus[i]),
+                    "time": times[i],
+                }
+            )
+        tie_groups.append(
+            {
+                "rank_start": start + 1,
+                "rank_end": start + size,
+                "affects_podium": start + 1 <= 3,
+                "members": members,
+            }
+        )
+
+    return VectorBaseline(
+        order=ordered_ids,
+        ranks=ranks.tolist(),
+        score_hints=hints[order].tolist(),
+        times=[times[i] for i in order_list],
+        tie_groups=tie_groups,
+    )
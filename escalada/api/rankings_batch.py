@@ -0,0 +1,193 @@
+"""
+Admin-only batch ranking endpoint (all categories in one call).
+
+Announcers, printing and cross-checks usually need every category's ranking at once. Instead of
+N sequential `/save_ranking`-style computations in the request thread, this endpoint accepts a
+set of live box ids and/or raw `RankingIn` payloads and ranks each category on the shared worker
+process pool (`escalada/api/worker_pool.py`), one job per category.
+
+Each category result carries the overall rows (same columns as `overall.xlsx`), the active
+route's tie-break rows and the tie-break status, plus per-category timing:
+- `elapsedMs`: compute time inside the worker
+- `wallMs`: time from submission to result (includes queueing behind other categories)
+
+Categories that cannot be ranked (unknown box, no scores, worker error) are reported in `errors`
+without failing the whole batch.
+"""
+
+# -------------------- Standard library imports --------------------
+import asyncio
+import math
+import os
+import time
+from typing import Any
+
+# -------------------- Third-party imports --------------------
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, ValidationError
+
+# -------------------- Local application imports --------------------
+from escalada.api import live
+from escalada.api.official_export import ranking_payload_from_snapshot
+from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+from escalada.api.save_ranking import RankingIn, _build_overall_df, _derive_active_holds_count
+from escalada.api.score_matrix import ScoreMatrix
+from escalada.api.worker_pool import configured_workers, run_in_worker
+from escalada.auth.deps import require_role
+
+router = APIRouter()
+
+# Upper bound on categories per request (protects the pool from accidental huge batches).
+BATCH_RANKING_MAX_CATEGORIES = int(os.getenv("BATCH_RANKING_MAX_CATEGORIES", "64"))
+
+
+class BatchRankingRequest(BaseModel):
+    """Categories to rank: live boxes by id and/or explicit payloads."""
+    box_ids: list[int] | None = None
+    payloads: list[RankingIn] | None = None
+
+
+def _json_records(df) -> list[dict[str, Any]]:
+    """DataFrame rows as JSON-safe dicts (NaN → None)."""
+    return [
+        {
+            key: None if isinstance(value, float) and math.isnan(value) else value
+            for key, value in record.items()
+        }
+        for record in df.to_dict(orient="records")
+    ]
+
+
+def compute_category_ranking(
+    payload: RankingIn, matrix: ScoreMatrix | None = None
+) -> dict[str, Any]:
+    """
+    Rank one category (runs in a worker process; must stay a picklable top-level function).
+
+    Mirrors `save_ranking()`: tie-break resolution first, then the overall sheet with the resolved
+    ranks and TB flags applied. `matrix` is the box snapshot's validated matrix; raw payloads
+    are validated here.
+    """
+    started = time.perf_counter()
+    if matrix is None:
+        matrix = ScoreMatrix.from_mappings(payload.scores, payload.times or {})
+    matrix = matrix.whole_seconds()
+    times = matrix.times
+    active_route_index = payload.route_index or payload.route_count
+    tiebreak_context = resolve_rankings_with_time_tiebreak(
+        scores=None,
+        times=None,
+        route_count=payload.route_count,
+        active_route_index=active_route_index,
+        box_id=payload.box_id,
+        time_criterion_enabled=bool(payload.use_time_tiebreak),
+        active_holds_count=_derive_active_holds_count(payload, active_route_index),
+        prev_resolved_decisions=payload.prev_rounds_tiebreak_decisions,
+        prev_orders_by_fingerprint=payload.prev_rounds_tiebreak_orders,
+        prev_ranks_by_fingerprint=payload.prev_rounds_tiebreak_ranks_by_fingerprint,
+        prev_lineage_ranks_by_key=payload.prev_rounds_tiebreak_lineage_ranks_by_key,
+        prev_resolved_fingerprint=payload.prev_rounds_tiebreak_resolved_fingerprint,
+        prev_resolved_decision=payload.prev_rounds_tiebreak_resolved_decision,
+        prev_resolved_ranks_by_name=payload.prev_rounds_tiebreak_resolved_ranks_by_name,
+        resolved_decisions=payload.time_tiebreak_decisions,
+        resolved_fingerprint=payload.time_tiebreak_resolved_fingerprint,
+        resolved_decision=payload.time_tiebreak_resolved_decision,
+        matrix=matrix,
+    )
+    overall_rows = tiebreak_context["overall_rows"]
+    overall_df = _build_overall_df(
+        payload,
+        times,
+        rank_override={row["name"]: int(row["rank"]) for row in overall_rows},
+        tb_time_flags={row["name"]: bool(row.get("tb_time")) for row in overall_rows},
+        tb_prev_flags={row["name"]: bool(row.get("tb_prev")) for row in overall_rows},
+    )
+    return {
+        "categorie": payload.categorie,
+        "boxId": payload.box_id,
+        "routeCount": payload.route_count,
+        "routeIndex": active_route_index,
+        "athletes": len(payload.scores),
+        "overall": _json_records(overall_df),
+        "routeRows": tiebreak_context["route_rows"],
+        "timeTiebreakFingerprint": tiebreak_context.get("fingerprint"),
+        "timeTiebreakHasEligibleTie": tiebreak_context.get("has_eligible_tie"),
+        "timeTiebreakIsResolved": tiebreak_context.get("is_resolved"),
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+_Job = tuple[dict[str, Any], RankingIn, ScoreMatrix | None]
+
+
+async def _collect_jobs(request: BatchRankingRequest) -> tuple[list[_Job], list[dict[str, Any]]]:
+    """Resolve the request into `(source, payload, matrix)` jobs plus early errors."""
+    jobs: list[_Job] = []
+    errors: list[dict[str, Any]] = []
+
+    if request.box_ids:
+        states = await live.get_all_states_snapshot()
+        for box_id in dict.fromkeys(request.box_ids):
+            source = {"boxId": box_id}
+            state = states.get(box_id)
+            if state is None:
+                errors.append({**source, "error": "box_not_found"})
+                continue
+            try:
+                payload = ranking_payload_from_snapshot({**state, "boxId": box_id})
+            except ValidationError:
+                errors.append({**source, "error": "invalid_scores"})
+                continue
+            except ValueError as exc:
+                errors.append({**source, "error": str(exc)})
+                continue
+            # Built from the same snapshot as the payload so both describe one state.
+            matrix = ScoreMatrix.from_mappings(state.get("scores"), state.get("times") or {})
+            jobs.append((source, payload, matrix))
+
+    for idx, payload in enumerate(request.payloads or []):
+        jobs.append(({"payloadIndex": idx, "boxId": payload.box_id}, payload, None))
+
+    return jobs, errors
+
+
+@router.post("/rankings/batch")
+async def batch_rankings(
+    request: BatchRankingRequest, claims=Depends(require_role(["admin"]))
+):
+    """Compute rankings for many categories in parallel on the worker pool."""
+    requested = len(set(request.box_ids or [])) + len(request.payloads or [])
+    if requested == 0:
+        raise HTTPException(status_code=400, detail="empty_batch")
+    if requested > BATCH_RANKING_MAX_CATEGORIES:
+        raise HTTPException(status_code=400, detail="too_many_categories")
+
+    started = time.perf_counter()
+    jobs, errors = await _collect_jobs(request)
+
+    async def _run(
+        source: dict[str, Any], payload: RankingIn, matrix: ScoreMatrix | None
+    ) -> dict[str, Any]:
+        submitted = time.perf_counter()
+        try:
+            result = await run_in_worker(compute_category_ranking, payload, matrix)
+        except Exception as exc:
+            return {**source, "categorie": payload.categorie, "error": str(exc) or type(exc).__name__}
+        result.update(source)
+        result["wallMs"] = round((time.perf_counter() - submitted) * 1000, 3)
+        return result
+
+    outcomes = await asyncio.gather(*(_run(*job) for job in jobs))
+    results = [item for item in outcomes if "error" not in item]
+    errors.extend(item for item in outcomes if "error" in item)
+
+    return {
+        "status": "ok",
+        "results": results,
+        "errors": errors,
+        "timing": {
+            "totalMs": round((time.perf_counter() - started) * 1000, 3),
+            "computeMs": round(sum(item["elapsedMs"] for item in results), 3),
+            "workers": configured_workers(),
+        },
+    }
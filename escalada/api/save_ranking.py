@@ -6,8 +6,11 @@ This module renders a category's results to disk under `escalada/clasamente/<cat
 - `overall.xlsx` / `overall.pdf`
 - `route_{n}.xlsx` / `route_{n}.pdf` (one per route)
 
-It also exposes helper functions (`_build_overall_df`, `_df_to_pdf`, `_to_seconds`, etc.) that
-are reused by other export features (e.g. official ZIP exports).
+It also exposes helper functions (`_build_overall_table`, `_format_time`, `_to_seconds`, etc.) that
+are reused by other export features (e.g. official ZIP exports). Sheets are built as
+`(columns, rows)` from the ranking row model and written with `xlsx_writer.write_xlsx`
+(write-only openpyxl, constant memory) and `pdf_writer.write_pdf` (paginated tables);
+`_build_overall_df` / `_df_to_pdf` remain as DataFrame adapters.
 
 Important:
 - The `use_time_tiebreak` flag is currently **display-only** (adds a Time column). Ranking is
@@ -15,57 +18,35 @@ Important:
 """
 
 # -------------------- Standard library imports --------------------
+import json
 import math
-import os
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 
 # -------------------- Third-party imports --------------------
-import pandas as pd
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import (Paragraph, SimpleDocTemplate, Spacer, Table,
-                                TableStyle)
+from escalada.api.artifact_cache import inputs_hash
+from escalada.api.overall_ranking import compute_overall_ranking
 from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
-
-# -------------------- Font setup (PDF rendering) --------------------
-# We prefer a Unicode-capable TTF (DejaVuSans) so Romanian diacritics render correctly.
-# If the font cannot be found/registered, we fall back to Helvetica (may not render all diacritics).
-DEFAULT_FONT = "Helvetica"
-try:
-    # Try to find and register DejaVuSans
-    font_paths = [
-        "DejaVuSans.ttf",  # Current directory
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
-        "/System/Library/Fonts/Supplemental/DejaVuSans.ttf",  # macOS
-        "C:\\Windows\\Fonts\\DejaVuSans.ttf",  # Windows
-        "/Library/Fonts/DejaVuSans.ttf",  # macOS user fonts
-    ]
-    for path in font_paths:
-        if os.path.exists(path):
-            pdfmetrics.registerFont(TTFont("DejaVuSans", path))
-            DEFAULT_FONT = "DejaVuSans"
-            break
-
-    # If DejaVuSans not found, use Helvetica (limited diacritics)
-    # Note: Helvetica may not render all Romanian diacritics correctly
-except Exception as e:
-    import logging
-
-    logging.warning(
-        f"Could not register DejaVuSans font: {e}. Using Helvetica (limited diacritic support)."
-    )
-    DEFAULT_FONT = "Helvetica"
+from escalada.api.score_matrix import ScoreMatrix
+from escalada.api.worker_pool import run_in_worker
 
 from escalada.auth.deps import require_role
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas, openpyxl (`xlsx_writer`) and reportlab (`pdf_writer`) are imported on first use:
+# the live contest path imports this module (RankingIn, helpers) but never renders a sheet.
+
 router = APIRouter()
 
+# Bump when the XLSX/PDF layout changes: invalidates cached artifacts and skip-unchanged manifests.
+EXPORT_FORMAT_VERSION = 2
+# Per-category manifest of the last render (inputs hash + response), see `render_category_files`.
+RENDER_MANIFEST = ".render.json"
+
 def _safe_category_dir(category: str) -> Path:
     """
     Build a safe category directory under `escalada/clasamente`.
@@ -118,7 +99,7 @@ class RankingIn(BaseModel):
 
 
 @router.post("/save_ranking")
-def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
+async def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
     """
     Persist category rankings to disk (XLSX + PDF).
 
@@ -128,25 +109,45 @@ def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
     Files:
     - overall.xlsx / overall.pdf: overall ranking across routes (geometric mean of rank-points)
     - route_{n}.xlsx / route_{n}.pdf: per-route ranking with tie-handling and points column
+
+    Rendering runs on the worker pool so the event loop keeps serving WebSockets meanwhile.
     """
+    # Validate the category on the loop so bad input still maps to a 400.
+    _safe_category_dir(payload.categorie)
+    return await run_in_worker(render_category_files, payload)
+
+
+def render_category_files(payload: RankingIn) -> dict:
+    """
+    Render the XLSX/PDF files of `save_ranking` (top-level so worker processes can run it).
+
+    The inputs hash of the last render is kept in `RENDER_MANIFEST`; when the payload is unchanged
+    and every file is still on disk, nothing is rewritten and the previous response is returned.
+    """
+    from escalada.api.pdf_writer import write_pdf
+    from escalada.api.xlsx_writer import write_xlsx
+
     cat_dir = _safe_category_dir(payload.categorie)
     cat_dir.mkdir(parents=True, exist_ok=True)
-    raw_times = payload.times or {}
-    # Normalize all times to seconds (int) or None so rendering is consistent.
-    times = {name: [_to_seconds(t) for t in arr] for name, arr in raw_times.items()}
+    digest = inputs_hash(EXPORT_FORMAT_VERSION, payload.model_dump(mode="json"))
+    manifest_path = cat_dir / RENDER_MANIFEST
+    previous = _read_render_manifest(manifest_path)
+    if previous and previous.get("inputsHash") == digest:
+        response = previous.get("response") or {}
+        if response.get("saved") and all(Path(p).exists() for p in response["saved"]):
+            return {**response, "unchanged": True}
+
+    # Validate the request's scores/times once; ranking and sheets read the matrix rows. Exports
+    # rank and print times as whole seconds (`_to_seconds` truncation).
+    matrix = ScoreMatrix.from_mappings(payload.scores, payload.times or {}).whole_seconds()
+    times = matrix.times
     # Legacy flag: controls time column display only (no tie-breaking).
     use_time = payload.use_time_tiebreak
     active_route_index = payload.route_index or payload.route_count
-    derived_holds_count = payload.active_holds_count
-    if derived_holds_count is None and isinstance(payload.holds_counts, list):
-        idx = max(0, int(active_route_index) - 1)
-        if idx < len(payload.holds_counts):
-            candidate = payload.holds_counts[idx]
-            if isinstance(candidate, int):
-                derived_holds_count = candidate
+    derived_holds_count = _derive_active_holds_count(payload, active_route_index)
     tiebreak_context = resolve_rankings_with_time_tiebreak(
-        scores=payload.scores,
-        times=times,
+        scores=None,
+        times=None,
         route_count=payload.route_count,
         active_route_index=active_route_index,
         box_id=payload.box_id,
@@ -162,6 +163,7 @@ def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
         resolved_decisions=payload.time_tiebreak_decisions,
         resolved_fingerprint=payload.time_tiebreak_resolved_fingerprint,
         resolved_decision=payload.time_tiebreak_resolved_decision,
+        matrix=matrix,
     )
     overall_rank_override = {
         row["name"]: int(row["rank"]) for row in tiebreak_context["overall_rows"]
@@ -187,7 +189,7 @@ def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
         return _to_seconds(arr[idx]) if idx < len(arr) else None
 
     # ---------- excel + pdf TOTAL ----------
-    overall_df = _build_overall_df(
+    overall_cols, overall_rows = _build_overall_table(
         payload,
         times,
         rank_override=overall_rank_override,
@@ -196,8 +198,8 @@ def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
     )
     xlsx_tot = cat_dir / "overall.xlsx"
     pdf_tot = cat_dir / "overall.pdf"
-    overall_df.to_excel(xlsx_tot, index=False)
-    _df_to_pdf(overall_df, pdf_tot, title=f"{payload.categorie} – Overall")
+    write_xlsx(xlsx_tot, overall_cols, overall_rows)
+    write_pdf(pdf_tot, overall_cols, overall_rows, title=f"{payload.categorie} – Overall")
     saved_paths = [xlsx_tot, pdf_tot]
 
     # ---------- excel + pdf BY‑ROUTE ----------
@@ -263,60 +265,74 @@ def save_ranking(payload: RankingIn, claims=Depends(require_role(["admin"]))):
                 for idx, (name, _, _) in enumerate(route_list_sorted)
             ]
 
-        df_route = pd.DataFrame(
-            [
-                {
-                    "Rank": ranks[i],
-                    "Name": name,
-                    "Club": payload.clubs.get(name, ""),
-                    "Score": score,
-                    **({"Time": _format_time(tm)} if use_time else {}),
-                    **(
-                        {
-                            "TB Time": "TB Time"
-                            if is_active_route and active_route_tb_time.get(name)
-                            else ""
-                        }
-                    ),
-                    **(
-                        {
-                            "TB Prev": "TB Prev"
-                            if is_active_route and active_route_tb_prev.get(name)
-                            else ""
-                        }
-                    ),
-                    "Points": points.get(name),
-                }
-                for i, (name, score, tm) in enumerate(route_list_sorted)
-            ]
-        )
+        route_cols = ["Rank", "Name", "Club", "Score"]
+        if use_time:
+            route_cols.append("Time")
+        route_cols += ["TB Time", "TB Prev", "Points"]
+        route_rows = []
+        for i, (name, score, tm) in enumerate(route_list_sorted):
+            row = [ranks[i], name, payload.clubs.get(name, ""), score]
+            if use_time:
+                row.append(_format_time(tm))
+            row.append("TB Time" if is_active_route and active_route_tb_time.get(name) else "")
+            row.append("TB Prev" if is_active_route and active_route_tb_prev.get(name) else "")
+            row.append(points.get(name))
+            route_rows.append(row)
+        if not route_rows:
+            route_cols = []
 
         # 5) save Excel and PDF for this route
         xlsx_route = cat_dir / f"route_{r+1}.xlsx"
         pdf_route = cat_dir / f"route_{r+1}.pdf"
-        df_route.to_excel(xlsx_route, index=False)
-        _df_to_pdf(df_route, pdf_route, title=f"{payload.categorie} – Route {r+1}")
+        write_xlsx(xlsx_route, route_cols, route_rows)
+        write_pdf(pdf_route, route_cols, route_rows, title=f"{payload.categorie} – Route {r+1}")
         saved_paths.extend([xlsx_route, pdf_route])
 
-    return {
+    response = {
         "status": "ok",
         "saved": [str(p) for p in saved_paths],
         "time_tiebreak_fingerprint": tiebreak_context.get("fingerprint"),
         "time_tiebreak_has_eligible_tie": tiebreak_context.get("has_eligible_tie"),
         "time_tiebreak_is_resolved": tiebreak_context.get("is_resolved"),
     }
+    manifest_path.write_text(
+        json.dumps({"inputsHash": digest, "response": response}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    return {**response, "unchanged": False}
+
+
+def _read_render_manifest(path: Path) -> dict | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
 
 
 # ------- helpers -------
-def _build_overall_df(
+def _derive_active_holds_count(p: RankingIn, active_route_index: int) -> int | None:
+    """Explicit `active_holds_count`, else the active route's entry in `holds_counts`."""
+    if p.active_holds_count is not None:
+        return p.active_holds_count
+    if isinstance(p.holds_counts, list):
+        idx = max(0, int(active_route_index) - 1)
+        if idx < len(p.holds_counts):
+            candidate = p.holds_counts[idx]
+            if isinstance(candidate, int):
+                return candidate
+    return None
+
+
+def _build_overall_table(
     p: RankingIn,
     normalized_times: dict[str, list[int | None]] | None = None,
     rank_override: dict[str, int] | None = None,
     tb_time_flags: dict[str, bool] | None = None,
     tb_prev_flags: dict[str, bool] | None = None,
-) -> pd.DataFrame:
+) -> tuple[list[str], list[list]]:
     """
-    Build the overall ranking DataFrame.
+    Build the overall ranking sheet as `(columns, rows)` (from `compute_overall_ranking`).
 
     Algorithm (matches frontend):
     - For each route: compute "rank points" per athlete (average-of-positions for ties)
@@ -324,122 +340,44 @@ def _build_overall_df(
     - Sort ascending by total (lower is better), then by name for stability
     - Compute a "Rank" column with ties on equal totals
     """
-    from math import prod
+    ranking = compute_overall_ranking(
+        p.scores,
+        p.route_count,
+        clubs=p.clubs,
+        times=normalized_times if normalized_times is not None else (p.times or {}),
+        # Legacy flag: controls time column display only (no tie-breaking).
+        use_time=p.use_time_tiebreak,
+        rank_override=rank_override,
+        tb_time_flags=tb_time_flags,
+        tb_prev_flags=tb_prev_flags,
+    )
+    return ranking.columns(), ranking.table(_format_time)
 
-    scores = p.scores
-    times = normalized_times if normalized_times is not None else (p.times or {})
-    # Legacy flag: controls time column display only (no tie-breaking).
-    use_time = p.use_time_tiebreak
-    rows_data = []
-    n = p.route_count
-    n_comp = len(scores)
-
-    for name, arr in scores.items():
-        # Compute per-route "rank points" exactly like the frontend does.
-        rp: list[float | None] = [None] * n
-        for r in range(n):
-            scored = []
-            for nume, sc in scores.items():
-                if r < len(sc) and sc[r] is not None:
-                    t_val = None
-                    t_arr = times.get(nume, [])
-                    if r < len(t_arr):
-                        t_val = t_arr[r]
-                    scored.append((nume, sc[r], t_val))
-            scored.sort(key=lambda x: (-x[1], x[0].lower()))
-
-            i = 0
-            pos = 1
-            while i < len(scored):
-                current = scored[i]
-                same = [current]
-                while (
-                    i + len(same) < len(scored)
-                    and scored[i][1] == scored[i + len(same)][1]
-                ):
-                    same.append(scored[i + len(same)])
-                avg = (pos + pos + len(same) - 1) / 2
-                for nume, _, _ in same:
-                    if nume == name:
-                        rp[r] = avg
-                pos += len(same)
-                i += len(same)
-
-        # Fill missing routes (no score) with a penalty worse than last place.
-        filled = [v if v is not None else n_comp + 1 for v in rp]
-        while len(filled) < n:
-            filled.append(n_comp + 1)
-
-        # Geometric mean keeps totals comparable across different route counts.
-        total = round(prod(filled) ** (1 / n), 3)
-        club = p.clubs.get(name, "")
-        row: list[str | float | None] = [name, club]
-        time_row = times.get(name, [])
-        for idx in range(n):
-            row.append(arr[idx] if idx < len(arr) else None)
-            if use_time:
-                row.append(_format_time(time_row[idx] if idx < len(time_row) else None))
-        row.append(total)
-        rows_data.append((name, row))
 
-    cols = ["Nume", "Club"]
-    for i in range(n):
-        cols.append(f"Score R{i+1}")
-        if use_time:
-            cols.append(f"Time R{i+1}")
-    cols.append("Total")
-    if rank_override:
-        rows_data.sort(
-            key=lambda item: (
-                rank_override.get(item[0], 10**9),
-                item[1][-1],
-                item[0].lower(),
-            )
-        )
-        data = [row for _, row in rows_data]
-        df = pd.DataFrame(data, columns=cols)
-        ranks = [rank_override.get(name, idx + 1) for idx, (name, _) in enumerate(rows_data)]
-    else:
-        data = [row for _, row in rows_data]
-        df = pd.DataFrame(data, columns=cols)
-        df.sort_values(["Total", "Nume"], inplace=True)
-        # Insert a human-readable rank column with ties for identical totals.
-        ranks = []
-        prev_total = None
-        prev_rank = 0
-        for idx, total in enumerate(df["Total"], start=1):
-            rank = prev_rank if total == prev_total else idx
-            ranks.append(rank)
-            prev_total = total
-            prev_rank = rank
-    if tb_time_flags:
-        tb_values = []
-        if rank_override:
-            for name, _ in rows_data:
-                tb_values.append("TB Time" if tb_time_flags.get(name) else "")
-        else:
-            for _, row in df.iterrows():
-                name = str(row["Nume"])
-                tb_values.append("TB Time" if tb_time_flags.get(name) else "")
-        if any(tb_values):
-            df["TB Time"] = tb_values
-    if tb_prev_flags:
-        prev_values = []
-        if rank_override:
-            for name, _ in rows_data:
-                prev_values.append("TB Prev" if tb_prev_flags.get(name) else "")
-        else:
-            for _, row in df.iterrows():
-                name = str(row["Nume"])
-                prev_values.append("TB Prev" if tb_prev_flags.get(name) else "")
-        if any(prev_values):
-            df["TB Prev"] = prev_values
-    df.insert(0, "Rank", ranks)
-    return df
-
-
-def _build_by_route_df(p: RankingIn) -> pd.DataFrame:
+def _build_overall_df(
+    p: RankingIn,
+    normalized_times: dict[str, list[int | None]] | None = None,
+    rank_override: dict[str, int] | None = None,
+    tb_time_flags: dict[str, bool] | None = None,
+    tb_prev_flags: dict[str, bool] | None = None,
+) -> "pd.DataFrame":
+    """Overall ranking sheet as a DataFrame (see `_build_overall_table`)."""
+    import pandas as pd
+
+    columns, rows = _build_overall_table(
+        p,
+        normalized_times,
+        rank_override=rank_override,
+        tb_time_flags=tb_time_flags,
+        tb_prev_flags=tb_prev_flags,
+    )
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _build_by_route_df(p: RankingIn) -> "pd.DataFrame":
     """Build a long-form table (Route/Name/Score/Time) from a RankingIn payload."""
+    import pandas as pd
+
     rows = []
     n = p.route_count
     times = p.times or {}
@@ -496,58 +434,8 @@ def _to_seconds(val) -> int | None:
         return None
 
 
-def _df_to_pdf(df: pd.DataFrame, pdf_path: Path, title="Ranking"):
-    """Render a DataFrame as a simple landscape-A4 PDF table."""
-    # Create document with margins and landscape A4
-    doc = SimpleDocTemplate(
-        str(pdf_path),
-        pagesize=landscape(A4),
-        leftMargin=36,
-        rightMargin=36,
-        topMargin=36,
-        bottomMargin=36,
-    )
-
-    # Styles for title
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "TitleStyle",
-        parent=styles["Heading1"],
-        alignment=1,  # center
-        fontSize=18,
-        fontName=DEFAULT_FONT,
-        spaceAfter=12,
-    )
-
-    # Build table data
-    data = [df.columns.tolist()] + df.astype(str).values.tolist()
-
-    # Create table
-    table = Table(data, hAlign="CENTER")
-    # Table styling
-    tbl_style = TableStyle(
-        [
-            ("FONTNAME", (0, 0), (-1, 0), DEFAULT_FONT),
-            ("FONTNAME", (0, 1), (-1, -1), DEFAULT_FONT),
-            ("FONTSIZE", (0, 0), (-1, 0), 12),
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4F81BD")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-        ]
-    )
-    # Alternate row background colors
-    for i in range(1, len(data)):
-        bg_color = colors.whitesmoke if i % 2 == 0 else colors.lightgrey
-        tbl_style.add("BACKGROUND", (0, i), (-1, i), bg_color)
-
-    table.setStyle(tbl_style)
-
-    # Build document elements
-    elements = []
-    elements.append(Paragraph(title, title_style))
-    elements.append(Spacer(1, 12))
-    elements.append(table)
+def _df_to_pdf(df: "pd.DataFrame", pdf_path: Path | BinaryIO, title="Ranking"):
+    """Render a DataFrame as a landscape-A4 PDF table (see `pdf_writer.write_pdf`)."""
+    from escalada.api.pdf_writer import write_pdf
 
-    # Generate PDF
-    doc.build(elements)
+    write_pdf(pdf_path, df.columns.tolist(), df.values.tolist(), title=title)
@@ -0,0 +1,265 @@
+"""
+Typed, column-oriented score/time store (athletes × routes), one per live box.
+
+Box state keeps `scores` / `times` as free-form JSON dicts of lists, so every reader used to
+re-coerce every value (bool rejection, `isfinite`, "mm:ss" parsing). `ScoreMatrix` validates once
+when values are written and then keeps them ready to read:
+- `scores` / `times`: validated `{name: [v1, v2, ...]}` rows in the persisted JSON shape; readers
+  (ranking index, overall projection, exports) use these lists as-is, without copying
+- one float64 `array('d')` per route for scores and one for times (NaN = missing), for column reads
+- a per-athlete revision counter, so incremental readers only revisit athletes that changed
+
+Each live box owns one matrix (`box_matrix`), built once from its state and then updated by the
+write path: `canonicalize_athlete` after SUBMIT_SCORE / REGISTER_TIME, `drop_box_matrix` after
+commands that replace the score tables (INIT_ROUTE, RESET_*). Backup restore validates the whole
+state with `canonicalize_state`. Export snapshots carry a private copy of the box matrix under
+`SNAPSHOT_KEY`; only snapshots from outside the live runtime are validated again.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+from array import array
+from collections.abc import Mapping
+from typing import Any
+
+from escalada.api.ranking_time_tiebreak import _coerce_time_seconds, _sanitize_score_values
+
+_NAN = float("nan")
+_UNSET: Any = object()
+
+# Export snapshot key holding the box matrix (never persisted or sent to clients).
+SNAPSHOT_KEY = "_scoreMatrix"
+
+
+def canonical_scores(arr: Any) -> list[float | None] | None:
+    """Validate one athlete's score list (None when the value is not a list)."""
+    if not isinstance(arr, list):
+        return None
+    return _sanitize_score_values(arr)
+
+
+def canonical_times(arr: Any) -> list[float | None] | None:
+    """Validate one athlete's time list to seconds (None when the value is not a list)."""
+    if not isinstance(arr, list):
+        return None
+    return [_coerce_time_seconds(v) for v in arr]
+
+
+def _valid_name(name: Any) -> bool:
+    return isinstance(name, str) and bool(name.strip())
+
+
+class ScoreMatrix:
+    """Athletes × routes validated scores and times (rows as lists, columns as float64)."""
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self._rows: dict[str, int] = {}
+        # Validated rows in the persisted shape; an athlete may be present in only one of them.
+        self.scores: dict[str, list[float | None]] = {}
+        self.times: dict[str, list[float | None]] = {}
+        self._score_columns: list[array] = []
+        self._time_columns: list[array] = []
+        # Bumped on every write (per athlete and overall).
+        self.revisions: dict[str, int] = {}
+        self.version = 0
+        self._whole_seconds: tuple[int, ScoreMatrix] | None = None
+
+    @classmethod
+    def from_mappings(cls, scores: Any, times: Any) -> "ScoreMatrix":
+        """Build (and validate) a matrix from the legacy `{name: [...]}` dicts."""
+        matrix = cls()
+        scores = scores if isinstance(scores, Mapping) else {}
+        times = times if isinstance(times, Mapping) else {}
+        for name, arr in scores.items():
+            if _valid_name(name) and isinstance(arr, list):
+                matrix.set_athlete(name, scores=arr)
+        for name, arr in times.items():
+            if _valid_name(name) and isinstance(arr, list):
+                matrix.set_athlete(name, times=arr)
+        return matrix
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.scores or name in self.times
+
+    @property
+    def route_count(self) -> int:
+        return max(len(self._score_columns), len(self._time_columns))
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Copies and pickles (export snapshots, worker jobs) leave the derived cache behind.
+        state = self.__dict__.copy()
+        state["_whole_seconds"] = None
+        return state
+
+    def copy(self) -> "ScoreMatrix":
+        """Independent copy (export jobs render it while the live matrix keeps changing)."""
+        return copy.deepcopy(self)
+
+    # -------------------- writes (validated) --------------------
+
+    def _ensure_row(self, name: str) -> int:
+        row = self._rows.get(name)
+        if row is not None:
+            return row
+        row = len(self.names)
+        self.names.append(name)
+        self._rows[name] = row
+        for column in self._score_columns:
+            column.append(_NAN)
+        for column in self._time_columns:
+            column.append(_NAN)
+        return row
+
+    def _write_columns(
+        self, columns: list[array], row: int, values: list[float | None] | None
+    ) -> None:
+        values = values or []
+        while len(columns) < len(values):
+            columns.append(array("d", [_NAN]) * len(self.names))
+        for idx, column in enumerate(columns):
+            value = values[idx] if idx < len(values) else None
+            column[row] = _NAN if value is None else value
+
+    def store(self, name: str, *, scores: Any = _UNSET, times: Any = _UNSET) -> None:
+        """Store already-validated lists (None = athlete absent from that table)."""
+        row = self._ensure_row(name)
+        for values, table, columns in (
+            (scores, self.scores, self._score_columns),
+            (times, self.times, self._time_columns),
+        ):
+            if values is _UNSET:
+                continue
+            if values is None:
+                table.pop(name, None)
+            else:
+                table[name] = values
+            self._write_columns(columns, row, values)
+        self.revisions[name] = self.revisions.get(name, 0) + 1
+        self.version += 1
+
+    def set_athlete(self, name: str, *, scores: Any = _UNSET, times: Any = _UNSET) -> None:
+        """Validate and store one athlete's score and/or time list."""
+        if scores is not _UNSET:
+            scores = canonical_scores(scores)
+        if times is not _UNSET:
+            times = canonical_times(times)
+        self.store(name, scores=scores, times=times)
+
+    # -------------------- reads (no re-coercion) --------------------
+
+    def score(self, name: str, route_offset: int) -> float | None:
+        arr = self.scores.get(name)
+        return arr[route_offset] if arr is not None and 0 <= route_offset < len(arr) else None
+
+    def time(self, name: str, route_offset: int) -> float | None:
+        arr = self.times.get(name)
+        return arr[route_offset] if arr is not None and 0 <= route_offset < len(arr) else None
+
+    def score_column(self, route_offset: int) -> memoryview:
+        """Zero-copy float64 view of one route's scores (row order = `names`)."""
+        if route_offset < len(self._score_columns):
+            return memoryview(self._score_columns[route_offset])
+        return memoryview(array("d", [_NAN]) * len(self.names))
+
+    def time_column(self, route_offset: int) -> memoryview:
+        if route_offset < len(self._time_columns):
+            return memoryview(self._time_columns[route_offset])
+        return memoryview(array("d", [_NAN]) * len(self.names))
+
+    def whole_seconds(self) -> "ScoreMatrix":
+        """
+        Same matrix with times truncated to whole seconds (cached until the next write).
+
+        Official exports have always ranked and fingerprinted times as integer seconds
+        (`save_ranking._to_seconds`); live rankings keep the fractional seconds.
+        """
+        cached = self._whole_seconds
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        derived = ScoreMatrix()
+        derived.names = self.names
+        derived._rows = self._rows
+        derived.scores = self.scores
+        derived._score_columns = self._score_columns
+        derived.revisions = self.revisions
+        derived.version = self.version
+        derived.times = {
+            name: [None if value is None else float(math.trunc(value)) for value in arr]
+            for name, arr in self.times.items()
+        }
+        for name, arr in derived.times.items():
+            derived._write_columns(derived._time_columns, self._rows[name], arr)
+        self._whole_seconds = (self.version, derived)
+        return derived
+
+    def to_json(self) -> tuple[dict[str, list[float | None]], dict[str, list[float | None]]]:
+        """Serialize to the persisted `(scores, times)` dict shape (fresh lists)."""
+        return (
+            {name: list(arr) for name, arr in self.scores.items()},
+            {name: list(arr) for name, arr in self.times.items()},
+        )
+
+
+# -------------------- Per-box matrix --------------------
+# box_id -> (state dict the matrix mirrors, matrix). The state object is compared by identity
+# (same rule as the ranking index), so a replaced state (preload, restore, re-init) gets a new one.
+_matrices: dict[int, tuple[dict, ScoreMatrix]] = {}
+
+
+def box_matrix(box_id: int, state: dict) -> ScoreMatrix:
+    """Return the validated matrix of a live box (built from its state on first use)."""
+    entry = _matrices.get(box_id)
+    if entry is not None and entry[0] is state:
+        return entry[1]
+    matrix = ScoreMatrix.from_mappings(state.get("scores"), state.get("times"))
+    _matrices[box_id] = (state, matrix)
+    return matrix
+
+
+def drop_box_matrix(box_id: int | None = None) -> None:
+    """Forget the matrix of one box (or all boxes); the next read rebuilds it from the state."""
+    if box_id is None:
+        _matrices.clear()
+    else:
+        _matrices.pop(box_id, None)
+
+
+def canonicalize_athlete(box_id: int, state: dict, name: Any) -> None:
+    """Validate one athlete's stored score/time lists in place and update the box matrix."""
+    if not _valid_name(name):
+        return
+    clean: dict[str, Any] = {}
+    for key, canonical in (("scores", canonical_scores), ("times", canonical_times)):
+        table = state.get(key)
+        values = canonical(table.get(name)) if isinstance(table, dict) else None
+        if values is not None:
+            table[name] = values
+        # The matrix keeps its own lists: the command layer may mutate the state's in place.
+        clean[key] = None if values is None else list(values)
+    entry = _matrices.get(box_id)
+    if entry is not None and entry[0] is state:
+        entry[1].store(name, scores=clean["scores"], times=clean["times"])
+
+
+def canonicalize_state(state: dict) -> dict:
+    """Validate all stored scores/times of a box state in place (used on restore)."""
+    matrix = ScoreMatrix.from_mappings(state.get("scores") or {}, state.get("times") or {})
+    state["scores"], state["times"] = matrix.to_json()
+    return state
+
+
+def snapshot_matrix(snapshot: dict[str, Any]) -> ScoreMatrix:
+    """Matrix of an export snapshot: the live box's copy, else validated from the snapshot."""
+    matrix = snapshot.get(SNAPSHOT_KEY)
+    if isinstance(matrix, ScoreMatrix):
+        return matrix
+    raw_times = snapshot.get("times")
+    return ScoreMatrix.from_mappings(
+        snapshot.get("scores") or {}, raw_times if isinstance(raw_times, dict) else {}
+    )
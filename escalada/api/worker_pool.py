@@ -0,0 +1,88 @@
+"""
+Shared process pool for CPU-bound ranking/export work.
+
+Ranking a category (`resolve_rankings_with_time_tiebreak` + the overall sheet builder) is pure
+CPU work and holds the GIL, so running several categories from one request thread is strictly
+sequential. This module owns a single lazily-created `ProcessPoolExecutor` reused by every caller
+(created on first use, shut down from the app lifespan).
+
+Configuration:
+- `RANKING_WORKERS`: pool size (default: min(4, CPU count)); `0` disables the pool and runs jobs
+  on the default thread executor instead (useful for constrained hosts and tests).
+
+If the pool cannot be created or breaks (e.g. a worker was killed), jobs fall back to the thread
+executor so callers always get a result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def configured_workers() -> int:
+    raw = os.getenv("RANKING_WORKERS")
+    if raw is None or not raw.strip():
+        return min(4, os.cpu_count() or 1)
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return min(4, os.cpu_count() or 1)
+
+
+def get_worker_pool() -> ProcessPoolExecutor | None:
+    """Return the shared pool (created on first use), or None when disabled/unavailable."""
+    global _pool
+    workers = configured_workers()
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError) as exc:
+                logger.warning("Worker pool unavailable, using threads: %s", exc)
+                return None
+        return _pool
+
+
+def shutdown_worker_pool(wait: bool = True) -> None:
+    """Shut the shared pool down (next use creates a fresh one)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def _discard_broken_pool(pool: Executor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_in_worker(fn: Callable[..., T], *args: Any) -> T:
+    """Run a picklable top-level function on the shared pool (thread fallback)."""
+    loop = asyncio.get_running_loop()
+    pool = get_worker_pool()
+    if pool is not None:
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Worker pool broke; retrying %s on a thread", getattr(fn, "__name__", fn))
+            _discard_broken_pool(pool)
+    return await loop.run_in_executor(None, fn, *args)
@@ -0,0 +1,55 @@
+"""
+Constant-memory XLSX writer for ranking sheets.
+
+Exports used to build a pandas DataFrame and call `DataFrame.to_excel`, which materializes a
+full openpyxl workbook (one cell object per value) before saving. `write_xlsx` streams rows from
+the ranking row model into an openpyxl *write-only* workbook instead: rows are serialized as they
+are appended, so memory stays flat and time is linear in the number of rows.
+
+The layout matches what `to_excel(index=False)` produced: one sheet named `Sheet1`, a bold,
+centered, thin-bordered header row, then plain values (None/NaN → empty cell).
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import IO, Any, Iterable, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+_THIN = Side(style="thin")
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+
+def _cell_value(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+
+def write_xlsx(
+    target: str | Path | IO[bytes],
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Sheet1",
+) -> None:
+    """Write `columns` + `rows` as a single-sheet workbook to a path or binary buffer."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    if columns:
+        header = []
+        for name in columns:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = _HEADER_FONT
+            cell.border = _HEADER_BORDER
+            cell.alignment = _HEADER_ALIGNMENT
+            header.append(cell)
+        ws.append(header)
+    for row in rows:
+        ws.append([_cell_value(value) for value in row])
+    wb.save(str(target) if isinstance(target, Path) else target)
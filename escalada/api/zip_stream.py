@@ -0,0 +1,97 @@
+"""
+Streaming ZIP writer.
+
+`iter_zip(members)` turns an iterator of `(arcname, source)` pairs into ZIP bytes chunks as soon
+as each member is available, so a `StreamingResponse` can start sending before the last member is
+rendered and the archive is never held in memory (or on disk) as a whole.
+
+`source` is `bytes` or a binary file object (e.g. a `SpooledTemporaryFile` a member was rendered
+into); file sources are copied in `CHUNK_SIZE` blocks. The output stream is not seekable, so the
+`zipfile` module writes sizes/CRCs in data descriptors after each member (standard ZIP, readable
+by every unzip tool).
+"""
+
+from __future__ import annotations
+
+import zipfile
+from tempfile import SpooledTemporaryFile
+from typing import IO, Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+# Members rendered into a spooled buffer stay in memory up to this size, then spill to disk.
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+
+def spooled_buffer() -> SpooledTemporaryFile:
+    """Binary buffer for rendering one ZIP member (pass it to `iter_zip` as the source)."""
+    return SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+
+class _Sink:
+    """Write-only stream collecting what `zipfile` writes until it is drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+class ZipStreamWriter:
+    """
+    Incremental streaming ZIP: `add()` yields the bytes of one member, `close()` the directory.
+
+    Lets callers interleave members as they become available (e.g. boxes finishing on a worker
+    pool, in completion order) instead of providing one iterator up front.
+    """
+
+    def __init__(self) -> None:
+        self._sink = _Sink()
+        self._zf = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, arcname: str, source: bytes | IO[bytes]) -> Iterator[bytes]:
+        """Write one member (bytes or a binary file object, closed afterwards); yield chunks."""
+        if isinstance(source, (bytes, bytearray)):
+            self._zf.writestr(arcname, source)
+        else:
+            try:
+                source.seek(0)
+                with self._zf.open(arcname, "w") as dest:
+                    while True:
+                        block = source.read(CHUNK_SIZE)
+                        if not block:
+                            break
+                        dest.write(block)
+                        chunk = self._sink.drain()
+                        if chunk:
+                            yield chunk
+            finally:
+                source.close()
+        chunk = self._sink.drain()
+        if chunk:
+            yield chunk
+
+    def close(self) -> bytes:
+        """Finish the archive and return the remaining bytes (central directory)."""
+        self._zf.close()
+        return self._sink.drain()
+
+
+def iter_zip(members: Iterable[tuple[str, bytes | IO[bytes]]]) -> Iterator[bytes]:
+    """Yield a deflated ZIP archive of `members` chunk by chunk."""
+    writer = ZipStreamWriter()
+    for arcname, source in members:
+        yield from writer.add(arcname, source)
+    tail = writer.close()
+    if tail:
+        yield tail
@@ -27,13 +27,17 @@ from escalada.api.audit import router as audit_router
 from escalada.api.auth import router as auth_router
 from escalada.api.backup import collect_snapshots, router as backup_router, write_backup_file
 from escalada.api.health import router as health_router
+from escalada.api.heartbeat import heartbeat
 from escalada.api.live import router as live_router
 from escalada.api.public import router as public_router
 from escalada.api.ops import router as ops_router
 from escalada.api.podium import router as podium_router
+from escalada.api.rankings_batch import router as rankings_batch_router
 from escalada.api.save_ranking import router as save_ranking_router
+from escalada.api.worker_pool import shutdown_worker_pool
 from escalada.routers.upload import router as upload_router
 from escalada.rate_limit import cleanup_rate_limit_data
+from escalada.storage import schedule_audit_maintenance
 
 # -------------------- Logging --------------------
 # Log to stdout (for containers/terminal) and also to a local file (useful on event day).
@@ -112,6 +116,12 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.warning("State preload skipped: %s", exc)
 
+    # Compress/prune audit segments rotated before this start (runs on a background thread).
+    try:
+        schedule_audit_maintenance()
+    except Exception as exc:
+        logger.warning("Audit archive maintenance skipped: %s", exc)
+
     async def _backup_loop():
         # Periodically snapshot all box states to JSON files for disaster recovery.
         output_dir = Path(BACKUP_DIR)
@@ -176,6 +186,12 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    # Stop the shared WebSocket heartbeat loop.
+    await heartbeat.stop()
+
+    # Stop ranking/export worker processes.
+    shutdown_worker_pool(wait=False)
+
 
 # -------------------- FastAPI app --------------------
 app = FastAPI(
@@ -270,3 +286,4 @@ app.include_router(health_router, prefix="/api")
 app.include_router(backup_router, prefix="/api/admin")
 app.include_router(audit_router, prefix="/api/admin")
 app.include_router(ops_router, prefix="/api/admin")
+app.include_router(rankings_batch_router, prefix="/api/admin")
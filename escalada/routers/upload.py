@@ -17,7 +17,6 @@ from io import BytesIO
 from zipfile import BadZipFile
 
 # -------------------- Third-party imports --------------------
-import openpyxl
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
 
@@ -112,6 +111,9 @@ async def upload_listbox(
     holds_counts_list = _parse_holds_counts(holdsCounts)
     include_clubs_enabled = _parse_include_clubs(include_clubs)
 
+    # Imported on first upload: openpyxl is heavy and the live contest path never needs it.
+    import openpyxl
+
     try:
         wb = openpyxl.load_workbook(filename=BytesIO(data), read_only=True)
     except BadZipFile:
@@ -182,9 +184,10 @@ async def set_competition_officials(
     payload: CompetitionOfficialsPayload, claims=Depends(require_role(["admin"]))
 ):
     """Persist global officials (admin-only)."""
-    officials = live_module.set_competition_officials(
+    officials = await live_module.set_competition_officials(
         judge_chief=payload.judgeChief,
         competition_director=payload.competitionDirector,
         chief_routesetter=payload.chiefRoutesetter,
     )
+    await live_module.broadcast_officials_update()
     return {"status": "ok", **officials}
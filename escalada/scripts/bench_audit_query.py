@@ -0,0 +1,198 @@
+"""
+Audit query benchmark: per-segment indexes vs a full scan of the NDJSON segments.
+
+Writes `--events` synthetic audit events (`--boxes` boxes, a few actions/judges, one event per
+`--interval-ms`) into rotated segments of `--segment-mb` in a temporary storage directory, then
+measures:
+- building the indexes of all segments from scratch (first query after an upgrade) and loading
+  them from the sidecar files (first query after a restart)
+- a few typical investigations through `query_audit_events` (indexed) vs a full raw-line scan,
+  then again once the rotated segments are gzip-compressed (`audit_archive`)
+- the cost of one `append_audit_event` including its index record
+
+    python -m escalada.scripts.bench_audit_query --events 500000 --segment-mb 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from escalada.storage import audit_index, json_store
+from escalada.storage.audit_archive import AuditArchiver
+from escalada.storage.audit_index import AuditFilter
+from escalada.storage.segment_file import SegmentFile
+
+ACTIONS = (
+    ["SUBMIT_SCORE"] * 6 + ["PROGRESS_UPDATE"] * 10 + ["START_TIMER", "SET_TIME_TIEBREAK_DECISION"]
+)
+START = datetime(2026, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _write_log(root: Path, events: int, boxes: int, interval_ms: int, segment_mb: int, seed: int):
+    rng = random.Random(seed)
+    limit = segment_mb * 1024 * 1024
+    segment = 0
+    handle = (root / f"events.{segment:014d}.ndjson").open("w", encoding="utf-8")
+    for i in range(events):
+        box_id = rng.randrange(boxes)
+        event = json_store.build_audit_event(
+            action=rng.choice(ACTIONS),
+            payload={"boxId": box_id, "competitor": f"Athlete {rng.randrange(400)}", "delta": 1},
+            box_id=box_id,
+            state={"boxVersion": i, "sessionId": "bench"},
+            actor={"username": f"judge{box_id}-{rng.randrange(2)}", "role": "judge"},
+        )
+        event["createdAt"] = (START + timedelta(milliseconds=i * interval_ms)).isoformat()
+        handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+        if handle.tell() >= limit:
+            handle.close()
+            segment += 1
+            handle = (root / f"events.{segment:014d}.ndjson").open("w", encoding="utf-8")
+    handle.close()
+    # The last segment is the live one.
+    (root / f"events.{segment:014d}.ndjson").rename(root / "events.ndjson")
+
+
+def _timed_ms(fn) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def _scan(flt: AuditFilter, limit: int) -> int:
+    # Pre-index approach: read every line of every segment, match the raw line.
+    matches = 0
+    for segment in json_store.audit_segments():
+        with SegmentFile(segment) as raw:
+            matches += sum(1 for _ in json_store._scan_segment(raw, flt))
+    return min(matches, limit)
+
+
+def run(
+    events: int = 200_000,
+    boxes: int = 8,
+    interval_ms: int = 150,
+    segment_mb: int = 16,
+    seed: int = 0,
+) -> dict[str, Any]:
+    end = START + timedelta(milliseconds=events * interval_ms)
+    mid = START + (end - START) / 2
+    queries = {
+        "box+30min": AuditFilter(box_id=3, since=mid, until=mid + timedelta(minutes=30)),
+        "action(day)": AuditFilter(action="SET_TIME_TIEBREAK_DECISION"),
+        "actor+box": AuditFilter(box_id=5, actor="judge5-1"),
+        "latest(box)": AuditFilter(box_id=1),
+    }
+    previous = json_store.STORAGE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        json_store.STORAGE_DIR = str(root)
+        try:
+            _write_log(root, events, boxes, interval_ms, segment_mb, seed)
+            segments = json_store.audit_segments()
+            log_mb = sum(p.stat().st_size for p in segments) / (1024 * 1024)
+
+            def load_all():
+                for segment in json_store.audit_segments():
+                    persist = segment != json_store._events_path()
+                    with SegmentFile(segment) as raw:
+                        audit_index.load_segment_index(raw, persist=persist)
+
+            audit_index.forget()
+            build_ms, _ = _timed_ms(load_all)
+            # Let the writer own the live segment's sidecars, as after the first append.
+            live = json_store._events_path()
+            json_store._audit_indexer.reset()
+            json_store._audit_indexer._attach(live, live.stat().st_size)
+            audit_index.forget()
+            load_ms, _ = _timed_ms(load_all)
+
+            def run_queries() -> dict[str, dict[str, Any]]:
+                results = {}
+                for name, flt in queries.items():
+                    params = {
+                        "since": flt.since,
+                        "until": flt.until,
+                        "box_id": flt.box_id,
+                        "action": flt.action,
+                        "actor": flt.actor,
+                    }
+                    indexed_ms, found = _timed_ms(
+                        lambda: json_store.query_audit_events(**params, limit=500)
+                    )
+                    scan_ms, scanned = _timed_ms(lambda: _scan(flt, 500))
+                    results[name] = {
+                        "indexedMs": round(indexed_ms, 2),
+                        "scanMs": round(scan_ms, 1),
+                        "matches": len(found),
+                        "scanMatches": scanned,
+                    }
+                return results
+
+            results = run_queries()
+            compress_ms, manifest = _timed_ms(lambda: AuditArchiver(compress=True).run(root))
+            audit_index.forget()
+            compressed_load_ms, _ = _timed_ms(load_all)
+            compressed_results = run_queries()
+            archive = {
+                "compressMs": round(compress_ms, 1),
+                "rawMb": round(manifest["totalRawBytes"] / (1024 * 1024), 1),
+                "storedMb": round(manifest["totalStoredBytes"] / (1024 * 1024), 1),
+                "indexLoadMs": round(compressed_load_ms, 1),
+                "queries": compressed_results,
+            }
+
+            async def appends(count: int) -> float:
+                started = time.perf_counter()
+                for i in range(count):
+                    await json_store.append_audit_event(
+                        json_store.build_audit_event(
+                            action="SUBMIT_SCORE",
+                            payload={"boxId": i % boxes},
+                            box_id=i % boxes,
+                            state=None,
+                            actor={"username": "bench"},
+                        )
+                    )
+                return (time.perf_counter() - started) * 1e6 / count
+
+            append_us = asyncio.run(appends(2000))
+        finally:
+            json_store.STORAGE_DIR = previous
+            json_store._audit_indexer.reset()
+            audit_index.forget()
+    return {
+        "events": events,
+        "segments": len(segments),
+        "logMb": round(log_mb, 1),
+        "indexBuildMs": round(build_ms, 1),
+        "indexLoadMs": round(load_ms, 1),
+        "appendUs": round(append_us, 1),
+        "queries": results,
+        "compressed": archive,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Indexed vs scanned audit queries")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--boxes", type=int, default=8)
+    parser.add_argument("--interval-ms", type=int, default=150)
+    parser.add_argument("--segment-mb", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(args.events, args.boxes, args.interval_ms, args.segment_mb, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+"""
+Box state store benchmark: legacy pretty-printed files vs the compact schema-versioned format.
+
+Writes `--boxes` synthetic boxes (`bench_ranking.generate_competition`, `--athletes` x `--routes`)
+into a temporary storage directory in both formats and reports, per format:
+- file size and write time (serialize + atomic replace)
+- load time of all boxes: `legacy_load_box_states` (the previous loader: parse + per-field default
+  patching on every load) vs `json_store.load_box_states` on current-format files
+- the one-time migration cost (first load of legacy files, which rewrites them)
+
+    python -m escalada.scripts.bench_box_store --boxes 50 --athletes 400 --routes 4
+    python -m escalada.scripts.bench_box_store --encoding msgpack   # needs `msgpack`
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+from escalada.scripts.bench_ranking import generate_competition
+from escalada.storage import box_codec, json_store
+
+
+def legacy_load_box_states(boxes_dir: Path) -> dict[int, dict]:
+    """Loader as it was before `box_codec` (pretty JSON, defaults patched on every load)."""
+    states: dict[int, dict] = {}
+    for path in boxes_dir.glob("*.json"):
+        try:
+            box_id = int(path.stem)
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (ValueError, OSError):
+            continue
+        if not isinstance(data, dict):
+            continue
+        if "initiated" in data and not isinstance(data["initiated"], bool):
+            continue
+        if "competitors" in data and not isinstance(data["competitors"], list):
+            continue
+        if "boxVersion" not in data:
+            data["boxVersion"] = 0
+        if "sessionId" not in data:
+            data["sessionId"] = str(uuid.uuid4())
+        if "routesCount" not in data:
+            data["routesCount"] = data.get("routeIndex") or 1
+        if "holdsCounts" not in data:
+            data["holdsCounts"] = []
+        states[box_id] = data
+    return states
+
+
+def _legacy_write(path: Path, state: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _dir_bytes(boxes_dir: Path) -> int:
+    return sum(p.stat().st_size for p in boxes_dir.iterdir() if p.is_file())
+
+
+def run(
+    boxes: int = 50,
+    athletes: int = 400,
+    routes: int = 4,
+    repeat: int = 3,
+    encoding: str = "json",
+    seed: int = 0,
+) -> dict[str, Any]:
+    encoding = box_codec.resolve_encoding(encoding)
+    states = {
+        box_id: generate_competition(athletes, routes, seed=seed + box_id) for box_id in range(boxes)
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp) / "legacy"
+        compact_dir = Path(tmp) / "compact"
+        migrate_dir = Path(tmp) / "migrate"
+        for path in (legacy_dir, compact_dir, migrate_dir):
+            path.mkdir()
+
+        def write_legacy():
+            for box_id, state in states.items():
+                _legacy_write(legacy_dir / f"{box_id}.json", state)
+
+        def write_compact():
+            for box_id, state in states.items():
+                json_store._write_box_file(compact_dir, box_id, state, encoding)
+
+        legacy_write_ms = _median_ms(write_legacy, repeat)
+        compact_write_ms = _median_ms(write_compact, repeat)
+        legacy_load_ms = _median_ms(lambda: legacy_load_box_states(legacy_dir), repeat)
+        compact_load_ms = _median_ms(lambda: json_store.load_box_states(compact_dir, encoding), repeat)
+
+        # First load of legacy files: migrate + rewrite once.
+        for path in legacy_dir.glob("*.json"):
+            (migrate_dir / path.name).write_bytes(path.read_bytes())
+        started = time.perf_counter()
+        loaded = json_store.load_box_states(migrate_dir, encoding)
+        migrate_ms = (time.perf_counter() - started) * 1000
+        assert len(loaded) == boxes
+
+        legacy_bytes = _dir_bytes(legacy_dir)
+        compact_bytes = _dir_bytes(compact_dir)
+
+    return {
+        "boxes": boxes,
+        "athletes": athletes,
+        "routes": routes,
+        "encoding": encoding,
+        "repeat": repeat,
+        "legacy": {
+            "bytes": legacy_bytes,
+            "writeMs": round(legacy_write_ms, 2),
+            "loadMs": round(legacy_load_ms, 2),
+        },
+        "compact": {
+            "bytes": compact_bytes,
+            "writeMs": round(compact_write_ms, 2),
+            "loadMs": round(compact_load_ms, 2),
+        },
+        "firstLoadMigrationMs": round(migrate_ms, 2),
+        "sizeRatio": round(compact_bytes / legacy_bytes, 3) if legacy_bytes else None,
+        "loadSpeedup": round(legacy_load_ms / compact_load_ms, 2) if compact_load_ms else None,
+        "writeSpeedup": round(legacy_write_ms / compact_write_ms, 2) if compact_write_ms else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Legacy vs compact box state files")
+    parser.add_argument("--boxes", type=int, default=50)
+    parser.add_argument("--athletes", type=int, default=400)
+    parser.add_argument("--routes", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--encoding", default="json", choices=sorted(box_codec.SUFFIXES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(args.boxes, args.athletes, args.routes, args.repeat, args.encoding, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
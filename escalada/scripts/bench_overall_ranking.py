@@ -0,0 +1,203 @@
+"""
+Overall ranking benchmark: shared engine vs the previous per-athlete builder.
+
+`legacy_overall_df` is the overall builder as it was before `escalada/api/overall_ranking.py`
+(every athlete re-sorted every route: O(R·N²)). It is kept here as the reference both for the
+speed comparison and for the equivalence tests (`tests/test_overall_ranking.py`).
+
+    python -m escalada.scripts.bench_overall_ranking --athletes 500 --routes 2 --repeat 5
+
+Prints a JSON report with both timings and the speedup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any
+
+import pandas as pd
+
+from escalada.api.save_ranking import RankingIn, _build_overall_df, _format_time
+from escalada.scripts.bench_ranking import generate_competition
+
+
+def legacy_overall_df(
+    p: Any,
+    normalized_times: dict[str, list[int | None]] | None = None,
+    rank_override: dict[str, int] | None = None,
+    tb_time_flags: dict[str, bool] | None = None,
+    tb_prev_flags: dict[str, bool] | None = None,
+) -> pd.DataFrame:
+    """
+    Pre-engine overall builder (re-ranks every route for every athlete), kept as the reference.
+
+    Algorithm (matches frontend):
+    - For each route: compute "rank points" per athlete (average-of-positions for ties)
+    - For each athlete: compute geometric mean of rank points across routes
+    - Sort ascending by total (lower is better), then by name for stability
+    - Compute a "Rank" column with ties on equal totals
+    """
+    from math import prod
+
+    scores = p.scores
+    times = normalized_times if normalized_times is not None else (p.times or {})
+    # Legacy flag: controls time column display only (no tie-breaking).
+    use_time = p.use_time_tiebreak
+    rows_data = []
+    n = p.route_count
+    n_comp = len(scores)
+
+    for name, arr in scores.items():
+        # Compute per-route "rank points" exactly like the frontend does.
+        rp: list[float | None] = [None] * n
+        for r in range(n):
+            scored = []
+            for nume, sc in scores.items():
+                if r < len(sc) and sc[r] is not None:
+                    t_val = None
+                    t_arr = times.get(nume, [])
+                    if r < len(t_arr):
+                        t_val = t_arr[r]
+                    scored.append((nume, sc[r], t_val))
+            scored.sort(key=lambda x: (-x[1], x[0].lower()))
+
+            i = 0
+            pos = 1
+            while i < len(scored):
+                current = scored[i]
+                same = [current]
+                while (
+                    i + len(same) < len(scored)
+                    and scored[i][1] == scored[i + len(same)][1]
+                ):
+                    same.append(scored[i + len(same)])
+                avg = (pos + pos + len(same) - 1) / 2
+                for nume, _, _ in same:
+                    if nume == name:
+                        rp[r] = avg
+                pos += len(same)
+                i += len(same)
+
+        # Fill missing routes (no score) with a penalty worse than last place.
+        filled = [v if v is not None else n_comp + 1 for v in rp]
+        while len(filled) < n:
+            filled.append(n_comp + 1)
+
+        # Geometric mean keeps totals comparable across different route counts.
+        total = round(prod(filled) ** (1 / n), 3)
+        club = p.clubs.get(name, "")
+        row: list[str | float | None] = [name, club]
+        time_row = times.get(name, [])
+        for idx in range(n):
+            row.append(arr[idx] if idx < len(arr) else None)
+            if use_time:
+                row.append(_format_time(time_row[idx] if idx < len(time_row) else None))
+        row.append(total)
+        rows_data.append((name, row))
+
+    cols = ["Nume", "Club"]
+    for i in range(n):
+        cols.append(f"Score R{i+1}")
+        if use_time:
+            cols.append(f"Time R{i+1}")
+    cols.append("Total")
+    if rank_override:
+        rows_data.sort(
+            key=lambda item: (
+                rank_override.get(item[0], 10**9),
+                item[1][-1],
+                item[0].lower(),
+            )
+        )
+        data = [row for _, row in rows_data]
+        df = pd.DataFrame(data, columns=cols)
+        ranks = [rank_override.get(name, idx + 1) for idx, (name, _) in enumerate(rows_data)]
+    else:
+        data = [row for _, row in rows_data]
+        df = pd.DataFrame(data, columns=cols)
+        df.sort_values(["Total", "Nume"], inplace=True)
+        # Insert a human-readable rank column with ties for identical totals.
+        ranks = []
+        prev_total = None
+        prev_rank = 0
+        for idx, total in enumerate(df["Total"], start=1):
+            rank = prev_rank if total == prev_total else idx
+            ranks.append(rank)
+            prev_total = total
+            prev_rank = rank
+    if tb_time_flags:
+        tb_values = []
+        if rank_override:
+            for name, _ in rows_data:
+                tb_values.append("TB Time" if tb_time_flags.get(name) else "")
+        else:
+            for _, row in df.iterrows():
+                name = str(row["Nume"])
+                tb_values.append("TB Time" if tb_time_flags.get(name) else "")
+        if any(tb_values):
+            df["TB Time"] = tb_values
+    if tb_prev_flags:
+        prev_values = []
+        if rank_override:
+            for name, _ in rows_data:
+                prev_values.append("TB Prev" if tb_prev_flags.get(name) else "")
+        else:
+            for _, row in df.iterrows():
+                name = str(row["Nume"])
+                prev_values.append("TB Prev" if tb_prev_flags.get(name) else "")
+        if any(prev_values):
+            df["TB Prev"] = prev_values
+    df.insert(0, "Rank", ranks)
+    return df
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(athletes: int = 500, routes: int = 2, repeat: int = 3, seed: int = 0) -> dict[str, Any]:
+    """Time both builders on one synthetic category and check they produce the same sheet."""
+    state = generate_competition(athletes, routes, tie_density=0.3, seed=seed)
+    payload = RankingIn(
+        categorie=state["categorie"],
+        route_count=routes,
+        scores=state["scores"],
+        times=state["times"],
+        use_time_tiebreak=True,
+    )
+    legacy_ms = _median_ms(lambda: legacy_overall_df(payload), repeat)
+    engine_ms = _median_ms(lambda: _build_overall_df(payload), repeat)
+    identical = legacy_overall_df(payload).reset_index(drop=True).equals(_build_overall_df(payload))
+    return {
+        "athletes": athletes,
+        "routes": routes,
+        "repeat": repeat,
+        "legacyMs": round(legacy_ms, 3),
+        "engineMs": round(engine_ms, 3),
+        "speedup": round(legacy_ms / engine_ms, 1) if engine_ms else None,
+        "identical": identical,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Overall ranking engine vs legacy builder")
+    parser.add_argument("--athletes", type=int, default=500)
+    parser.add_argument("--routes", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(args.athletes, args.routes, args.repeat, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
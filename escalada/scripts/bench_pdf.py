@@ -0,0 +1,143 @@
+"""
+PDF rendering benchmark: paginated `pdf_writer.write_pdf` vs the previous `_df_to_pdf`.
+
+`legacy_df_to_pdf` is the renderer as it was before `escalada/api/pdf_writer.py` (styles rebuilt
+per call, `astype(str)` on the whole frame, one BACKGROUND command per row and a single table
+split by reportlab). Both render the same overall sheet of a synthetic category at each size.
+
+    python -m escalada.scripts.bench_pdf --sizes 50,500,5000 --repeat 3
+
+Prints a JSON report with per-size timings, ms per row and the scaling ratio of the new renderer
+(ms/row at the largest size divided by ms/row at the smallest; ~1 means linear).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import statistics
+import time
+from typing import Any
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from escalada.api.pdf_writer import default_font, write_pdf
+from escalada.api.save_ranking import RankingIn, _build_overall_table
+from escalada.scripts.bench_ranking import generate_competition
+
+
+def legacy_df_to_pdf(df: pd.DataFrame, pdf_path: Any, title="Ranking"):
+    """Pre-paginated renderer (one table, per-row background commands), kept as the reference."""
+    doc = SimpleDocTemplate(
+        pdf_path,
+        pagesize=landscape(A4),
+        leftMargin=36,
+        rightMargin=36,
+        topMargin=36,
+        bottomMargin=36,
+    )
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "TitleStyle",
+        parent=styles["Heading1"],
+        alignment=1,
+        fontSize=18,
+        fontName=default_font(),
+        spaceAfter=12,
+    )
+    data = [df.columns.tolist()] + df.astype(str).values.tolist()
+    table = Table(data, hAlign="CENTER")
+    tbl_style = TableStyle(
+        [
+            ("FONTNAME", (0, 0), (-1, 0), default_font()),
+            ("FONTNAME", (0, 1), (-1, -1), default_font()),
+            ("FONTSIZE", (0, 0), (-1, 0), 12),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4F81BD")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ]
+    )
+    for i in range(1, len(data)):
+        bg_color = colors.whitesmoke if i % 2 == 0 else colors.lightgrey
+        tbl_style.add("BACKGROUND", (0, i), (-1, i), bg_color)
+    table.setStyle(tbl_style)
+    doc.build([Paragraph(title, title_style), Spacer(1, 12), table])
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _overall_sheet(athletes: int, routes: int, seed: int) -> tuple[list[str], list[list[Any]]]:
+    state = generate_competition(athletes, routes, tie_density=0.3, seed=seed)
+    payload = RankingIn(
+        categorie=state["categorie"],
+        route_count=routes,
+        scores=state["scores"],
+        times=state["times"],
+        use_time_tiebreak=True,
+    )
+    return _build_overall_table(payload)
+
+
+def run(
+    sizes: tuple[int, ...] = (50, 500, 5000),
+    routes: int = 2,
+    repeat: int = 3,
+    seed: int = 0,
+    legacy: bool = True,
+) -> dict[str, Any]:
+    """Time both renderers at each size (set `legacy=False` to time only the new one)."""
+    cases = []
+    for size in sizes:
+        columns, rows = _overall_sheet(size, routes, seed)
+        new_ms = _median_ms(lambda: write_pdf(io.BytesIO(), columns, rows, "Overall"), repeat)
+        case: dict[str, Any] = {
+            "rows": size,
+            "newMs": round(new_ms, 3),
+            "newMsPerRow": round(new_ms / size, 4),
+        }
+        if legacy:
+            df = pd.DataFrame(rows, columns=columns)
+            legacy_ms = _median_ms(lambda: legacy_df_to_pdf(df, io.BytesIO(), "Overall"), repeat)
+            case["legacyMs"] = round(legacy_ms, 3)
+            case["speedup"] = round(legacy_ms / new_ms, 2) if new_ms else None
+        cases.append(case)
+    first, last = cases[0], cases[-1]
+    return {
+        "routes": routes,
+        "repeat": repeat,
+        "cases": cases,
+        "scaling": round(last["newMsPerRow"] / first["newMsPerRow"], 2)
+        if first["newMsPerRow"]
+        else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Paginated PDF renderer vs legacy renderer")
+    parser.add_argument("--sizes", default="50,500,5000")
+    parser.add_argument("--routes", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-legacy", action="store_true", help="time only the new renderer")
+    args = parser.parse_args(argv)
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+    report = run(sizes, args.routes, args.repeat, args.seed, legacy=not args.no_legacy)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
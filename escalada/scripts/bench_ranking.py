@@ -0,0 +1,311 @@
+"""
+Ranking engine benchmark suite (synthetic competitions).
+
+Generates deterministic synthetic Lead categories (athletes × routes, with configurable tie
+density and share of recorded times) and times the ranking hot paths:
+- `resolve_rankings_with_time_tiebreak` (live/export ranking + tie-break context)
+- `_build_overall_df` (overall sheet, geometric mean of rank points)
+- `_build_route_df` (per-route sheets, all routes)
+- `live._build_snapshot` (full STATE_SNAPSHOT built for every connected client)
+
+Results are written as JSON so runs can be archived and compared:
+
+    python -m escalada.scripts.bench_ranking --output bench.json
+    python -m escalada.scripts.bench_ranking --compare bench.json --threshold 0.25
+
+`--compare` re-runs the same cases and exits with status 1 when any case's median is slower than
+the baseline by more than the threshold (relative) and by at least `--min-delta-ms`. Each timing
+entry keeps `firstMs` (cold run: empty caches, new ranking index) separately from the median/min
+of the remaining runs.
+
+`_build_overall_df` cases above `--max-overall-athletes` (when set) are reported with
+`"skipped": true`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_ROUTES = (1, 2, 4)
+DEFAULT_TIE_DENSITIES = (0.1, 0.5)
+TARGETS = ("resolve", "overall_df", "route_df", "snapshot")
+
+_FIRST_NAMES = ("Ana", "Bogdan", "Cristina", "Dan", "Elena", "Florin", "Ioana", "Mihai", "Ștefan")
+_CLUBS = ("CSM Cluj", "Dinamo", "Vertical Brașov", "Alpin Club", "")
+
+
+def generate_competition(
+    athletes: int,
+    routes: int,
+    *,
+    tie_density: float = 0.2,
+    time_fraction: float = 0.7,
+    holds_count: int = 40,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Build a synthetic box state (same shape as `live.state_map[boxId]`).
+
+    `tie_density` is the share of athletes whose score on a route is drawn from a small pool of
+    shared values (so they tie with others); the rest get near-unique scores. `time_fraction` is
+    the share of results that carry a recorded time (seconds).
+    """
+    rng = random.Random(seed)
+    shared = [float(h) for h in range(holds_count // 3, holds_count + 1, max(1, holds_count // 8))]
+    scores: dict[str, list[float | None]] = {}
+    times: dict[str, list[float | None]] = {}
+    competitors: list[dict[str, Any]] = []
+    for i in range(athletes):
+        name = f"{rng.choice(_FIRST_NAMES)} {i:05d}"
+        row: list[float | None] = []
+        time_row: list[float | None] = []
+        for _ in range(routes):
+            if rng.random() < tie_density:
+                score = rng.choice(shared)
+            else:
+                hold = rng.randint(0, holds_count - 1)
+                score = hold + (0.1 if rng.random() < 0.4 else 0.0)
+            row.append(score)
+            time_row.append(float(rng.randint(30, 360)) if rng.random() < time_fraction else None)
+        scores[name] = row
+        times[name] = time_row
+        competitors.append({"nume": name, "club": rng.choice(_CLUBS), "marked": True})
+    return {
+        "initiated": True,
+        "categorie": f"Bench {athletes}x{routes}",
+        "routesCount": routes,
+        "routeIndex": routes,
+        "holdsCount": holds_count,
+        "holdsCounts": [holds_count] * routes,
+        "competitors": competitors,
+        "scores": scores,
+        "times": times,
+        "timeCriterionEnabled": False,
+        "boxVersion": 1,
+    }
+
+
+def _time_runs(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    samples: list[float] = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    warm = samples[1:] or samples
+    return {
+        "runs": len(samples),
+        "firstMs": round(samples[0], 3),
+        "minMs": round(min(warm), 3),
+        "medianMs": round(statistics.median(warm), 3),
+        "meanMs": round(statistics.fmean(warm), 3),
+    }
+
+
+def _case_callables(state: dict[str, Any], box_id: int) -> dict[str, Callable[[], Any]]:
+    from escalada.api import live
+    from escalada.api.official_export import _build_route_df, ranking_payload_from_snapshot
+    from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+    from escalada.api.save_ranking import _build_overall_df
+
+    routes = int(state["routesCount"])
+    payload = ranking_payload_from_snapshot({**state, "boxId": box_id})
+    clubs = payload.clubs
+
+    def resolve() -> Any:
+        return resolve_rankings_with_time_tiebreak(
+            scores=state["scores"],
+            times=state["times"],
+            route_count=routes,
+            active_route_index=int(state["routeIndex"]),
+            box_id=box_id,
+            time_criterion_enabled=bool(state.get("timeCriterionEnabled")),
+            active_holds_count=state.get("holdsCount"),
+        )
+
+    def overall_df() -> Any:
+        return _build_overall_df(payload, state["times"])
+
+    def route_df() -> Any:
+        return [
+            _build_route_df(
+                scores=state["scores"],
+                times=state["times"],
+                clubs=clubs,
+                route_index=r,
+                use_time_tiebreak=False,
+            )
+            for r in range(routes)
+        ]
+
+    def snapshot() -> Any:
+        return live._build_snapshot(box_id, state)
+
+    return {"resolve": resolve, "overall_df": overall_df, "route_df": route_df, "snapshot": snapshot}
+
+
+def case_key(athletes: int, routes: int, tie_density: float) -> str:
+    return f"n={athletes},routes={routes},ties={tie_density:g}"
+
+
+def run_suite(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    routes: tuple[int, ...] = DEFAULT_ROUTES,
+    tie_densities: tuple[float, ...] = DEFAULT_TIE_DENSITIES,
+    *,
+    targets: tuple[str, ...] = TARGETS,
+    repeat: int = 5,
+    seed: int = 0,
+    max_overall_athletes: int | None = None,
+    log: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """Run every (size, routes, tie density) case and return the JSON report."""
+    results: list[dict[str, Any]] = []
+    box_id = 10_000  # distinct box id per case: per-box caches start cold
+    for athletes in sizes:
+        for route_count in routes:
+            for tie_density in tie_densities:
+                box_id += 1
+                state = generate_competition(
+                    athletes, route_count, tie_density=tie_density, seed=seed
+                )
+                callables = _case_callables(state, box_id)
+                key = case_key(athletes, route_count, tie_density)
+                for target in targets:
+                    entry: dict[str, Any] = {
+                        "case": key,
+                        "target": target,
+                        "athletes": athletes,
+                        "routes": route_count,
+                        "tieDensity": tie_density,
+                    }
+                    if (
+                        target == "overall_df"
+                        and max_overall_athletes is not None
+                        and athletes > max_overall_athletes
+                    ):
+                        entry["skipped"] = True
+                    else:
+                        entry.update(_time_runs(callables[target], repeat))
+                    results.append(entry)
+                    if log:
+                        timing = "skipped" if entry.get("skipped") else f"{entry['medianMs']:.2f} ms"
+                        log(f"{key:<28} {target:<11} {timing}")
+    return {
+        "meta": {
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare_reports(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = 0.25,
+    min_delta_ms: float = 1.0,
+) -> list[dict[str, Any]]:
+    """
+    Return the cases whose median got slower than baseline by more than `threshold`.
+
+    Slowdowns smaller than `min_delta_ms` in absolute terms are ignored (timer noise on
+    sub-millisecond cases).
+    """
+    base = {
+        (item["case"], item["target"]): item
+        for item in baseline.get("results", [])
+        if not item.get("skipped")
+    }
+    regressions: list[dict[str, Any]] = []
+    for item in current.get("results", []):
+        if item.get("skipped"):
+            continue
+        ref = base.get((item["case"], item["target"]))
+        if not ref or not ref.get("medianMs"):
+            continue
+        ratio = item["medianMs"] / ref["medianMs"]
+        if ratio > 1 + threshold and item["medianMs"] - ref["medianMs"] >= min_delta_ms:
+            regressions.append(
+                {
+                    "case": item["case"],
+                    "target": item["target"],
+                    "baselineMs": ref["medianMs"],
+                    "currentMs": item["medianMs"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+    return regressions
+
+
+def _parse_list(raw: str, cast: Callable[[str], Any]) -> tuple:
+    return tuple(cast(part) for part in raw.split(",") if part.strip())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--routes", default=",".join(map(str, DEFAULT_ROUTES)))
+    parser.add_argument("--tie-densities", default=",".join(map(str, DEFAULT_TIE_DENSITIES)))
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-overall-athletes", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=1.0, help="ignore smaller absolute slowdowns"
+    )
+    args = parser.parse_args(argv)
+
+    targets = _parse_list(args.targets, str)
+    unknown = sorted(set(targets) - set(TARGETS))
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+
+    report = run_suite(
+        _parse_list(args.sizes, int),
+        _parse_list(args.routes, int),
+        _parse_list(args.tie_densities, float),
+        targets=targets,
+        repeat=args.repeat,
+        seed=args.seed,
+        max_overall_athletes=args.max_overall_athletes,
+        log=lambda line: print(line, file=sys.stderr),
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_reports(report, baseline, args.threshold, args.min_delta_ms)
+        for reg in regressions:
+            print(
+                f"REGRESSION {reg['case']} {reg['target']}: "
+                f"{reg['baselineMs']:.2f} ms -> {reg['currentMs']:.2f} ms (x{reg['ratio']})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
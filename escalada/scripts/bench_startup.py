@@ -0,0 +1,131 @@
+"""
+Startup benchmark: import time and RSS of `escalada.main`.
+
+Each run starts a fresh interpreter with `-X importtime`, imports the target module and reports:
+- wall time of the import and the process RSS right after it
+- whether heavy export dependencies (pandas, numpy, reportlab, openpyxl) were loaded
+- the slowest direct imports, parsed from the `-X importtime` trace (cumulative time)
+
+    python -m escalada.scripts.bench_startup --repeat 5 --top 15
+    python -m escalada.scripts.bench_startup --module escalada.api.official_export
+
+`--fail-on-heavy` exits with status 1 when a heavy module is loaded at import time (CI guard for
+the lazy imports in `save_ranking`, `official_export`, `podium` and `routers/upload`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+HEAVY_MODULES = ("pandas", "numpy", "reportlab", "openpyxl")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - started) * 1000
+rss_kb = None
+try:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss_kb //= 1024
+print(json.dumps({{
+    "importMs": elapsed_ms,
+    "rssKb": rss_kb,
+    "heavyLoaded": [m for m in {heavy!r} if m in sys.modules],
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    """Parse `-X importtime` lines into `{module, selfUs, cumulativeUs, depth}` entries."""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append(
+            {
+                "module": module,
+                "selfUs": int(self_us),
+                "cumulativeUs": int(cumulative_us),
+                # importtime indents nested imports by two spaces per level.
+                "depth": max(0, (len(indent) - 1) // 2),
+            }
+        )
+    return entries
+
+
+def measure(module: str = "escalada.main", python: str = sys.executable) -> dict[str, Any]:
+    """Import `module` in a fresh interpreter and return the probe report plus the parsed trace."""
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import of {module} failed:\n{proc.stderr[-2000:]}")
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["imports"] = parse_importtime(proc.stderr)
+    return report
+
+
+def run(module: str = "escalada.main", repeat: int = 3, top: int = 10) -> dict[str, Any]:
+    """Measure `repeat` cold imports; report medians and the slowest direct imports."""
+    runs = [measure(module) for _ in range(max(1, repeat))]
+    last = runs[-1]
+    # Direct imports of the target (and other top-level imports such as `site`).
+    top_level = sorted(
+        (e for e in last["imports"] if e["depth"] <= 1 and e["module"] != module),
+        key=lambda entry: entry["cumulativeUs"],
+        reverse=True,
+    )
+    return {
+        "module": module,
+        "repeat": len(runs),
+        "importMsMedian": round(statistics.median(r["importMs"] for r in runs), 1),
+        "rssMbMedian": round(statistics.median(r["rssKb"] or 0 for r in runs) / 1024, 1),
+        "modulesLoaded": last["modules"],
+        "heavyLoaded": last["heavyLoaded"],
+        "slowestImports": [
+            {"module": e["module"], "cumulativeMs": round(e["cumulativeUs"] / 1000, 1)}
+            for e in top_level[:top]
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import time / RSS of the API process")
+    parser.add_argument("--module", default="escalada.main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--fail-on-heavy",
+        action="store_true",
+        help="exit 1 when pandas/numpy/reportlab/openpyxl are loaded at import time",
+    )
+    args = parser.parse_args(argv)
+    report = run(args.module, args.repeat, args.top)
+    print(json.dumps(report, indent=2))
+    return 1 if args.fail_on_heavy and report["heavyLoaded"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""
+Storage backend benchmark: JSON files + NDJSON audit vs SQLite (WAL).
+
+Replays `--commands` state-changing commands round-robin over `--boxes` synthetic boxes
+(`bench_ranking.generate_competition`, `--athletes` x `--routes`) through each backend's
+`persist_command` (box state + audit event), in a temporary storage directory, then measures:
+- per-command persist latency (p50/p95/max) and throughput
+- startup load of all boxes (`load_box_states`)
+- latest 200 audit events of one box (`read_latest_events`) and a full filtered audit scan
+  (`iter_audit_lines(box_id=...)`)
+
+    python -m escalada.scripts.bench_storage --commands 2000 --boxes 6 --athletes 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from escalada.scripts.bench_ranking import generate_competition
+from escalada.storage import json_store
+from escalada.storage.sqlite_store import SqliteStore
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _timed_ms(fn: Callable[[], Any]) -> tuple[float, Any]:
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+async def _replay(persist, states: dict[int, dict], commands: int) -> list[float]:
+    latencies = []
+    box_ids = sorted(states)
+    for i in range(commands):
+        box_id = box_ids[i % len(box_ids)]
+        state = states[box_id]
+        state["boxVersion"] += 1
+        event = json_store.build_audit_event(
+            action="SUBMIT_SCORE",
+            payload={"boxId": box_id, "type": "SUBMIT_SCORE", "score": float(i % 40)},
+            box_id=box_id,
+            state=state,
+            actor={"username": f"judge{box_id}", "role": "judge"},
+        )
+        started = time.perf_counter()
+        await persist(box_id, state, event)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(latencies: list[float], load_ms: float, latest_ms: float, scan_ms: float, scanned: int):
+    total_s = sum(latencies) / 1000
+    return {
+        "persistP50Ms": round(statistics.median(latencies), 3),
+        "persistP95Ms": round(_percentile(latencies, 95), 3),
+        "persistMaxMs": round(max(latencies), 3),
+        "commandsPerSec": round(len(latencies) / total_s, 1) if total_s else None,
+        "loadBoxesMs": round(load_ms, 2),
+        "latestEventsMs": round(latest_ms, 2),
+        "auditScanMs": round(scan_ms, 2),
+        "auditScanRows": scanned,
+    }
+
+
+def _bench_json(root: Path, states: dict[int, dict], commands: int) -> dict[str, Any]:
+    previous = json_store.STORAGE_DIR
+    json_store.STORAGE_DIR = str(root)
+    try:
+        json_store.ensure_storage_dirs()
+        latencies = asyncio.run(_replay(json_store.persist_command, states, commands))
+        load_ms, _ = _timed_ms(json_store.load_box_states)
+        latest_ms, _ = _timed_ms(lambda: json_store.read_latest_events(limit=200, box_id=0))
+        scan_ms, scanned = _timed_ms(lambda: sum(1 for _ in json_store.iter_audit_lines(box_id=0)))
+    finally:
+        json_store.STORAGE_DIR = previous
+    return _report(latencies, load_ms, latest_ms, scan_ms, scanned)
+
+
+def _bench_sqlite(root: Path, states: dict[int, dict], commands: int) -> dict[str, Any]:
+    store = SqliteStore(root / "escalada.sqlite3")
+    try:
+        store.ensure()
+        latencies = asyncio.run(_replay(store.persist_command, states, commands))
+        load_ms, _ = _timed_ms(store.load_box_states)
+        latest_ms, _ = _timed_ms(lambda: store.read_latest_events(limit=200, box_id=0))
+        scan_ms, scanned = _timed_ms(lambda: sum(1 for _ in store.iter_audit_lines(box_id=0)))
+    finally:
+        store.close()
+    return _report(latencies, load_ms, latest_ms, scan_ms, scanned)
+
+
+def run(
+    commands: int = 2000, boxes: int = 6, athletes: int = 200, routes: int = 2, seed: int = 0
+) -> dict[str, Any]:
+    def fresh_states() -> dict[int, dict]:
+        return {b: generate_competition(athletes, routes, seed=seed + b) for b in range(boxes)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_report = _bench_json(Path(tmp) / "json", fresh_states(), commands)
+        sqlite_report = _bench_sqlite(Path(tmp) / "sqlite", fresh_states(), commands)
+    return {
+        "commands": commands,
+        "boxes": boxes,
+        "athletes": athletes,
+        "routes": routes,
+        "json": json_report,
+        "sqlite": sqlite_report,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON vs SQLite storage backend")
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--boxes", type=int, default=6)
+    parser.add_argument("--athletes", type=int, default=200)
+    parser.add_argument("--routes", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = run(args.commands, args.boxes, args.athletes, args.routes, args.seed)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
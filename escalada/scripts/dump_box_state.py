@@ -0,0 +1,66 @@
+"""
+Print persisted box states as readable JSON (ops tool for the compact/binary box files).
+
+    python -m escalada.scripts.dump_box_state                 # every box under STORAGE_DIR
+    python -m escalada.scripts.dump_box_state --box 3
+    python -m escalada.scripts.dump_box_state data/boxes/3.msgpack --state-only
+
+Each file is printed as `{"file", "encoding", "schemaVersion", "state"}` (`--state-only`: just the
+state). Files are only read, never migrated or rewritten.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from escalada.storage import json_store
+from escalada.storage.box_codec import SUFFIXES, BoxStateFormatError, decode_box_file
+
+
+def _box_paths(storage_dir: str, box: int | None) -> list[Path]:
+    boxes_dir = Path(storage_dir) / "boxes"
+    if box is not None:
+        return [p for suffix in SUFFIXES.values() if (p := boxes_dir / f"{box}{suffix}").exists()]
+    return sorted(
+        (p for suffix in SUFFIXES.values() for p in boxes_dir.glob(f"*{suffix}")),
+        key=lambda p: (int(p.stem) if p.stem.isdigit() else 0, p.suffix),
+    )
+
+
+def dump(path: Path) -> dict[str, Any]:
+    """Decoded view of one box file."""
+    version, encoding, state = decode_box_file(path.read_bytes())
+    return {"file": str(path), "encoding": encoding, "schemaVersion": version, "state": state}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Print box state files as readable JSON")
+    parser.add_argument("paths", nargs="*", help="box files (default: all boxes in STORAGE_DIR)")
+    parser.add_argument("--box", type=int, help="only this box id")
+    parser.add_argument("--storage-dir", default=json_store.STORAGE_DIR)
+    parser.add_argument("--state-only", action="store_true", help="print only the state object")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.paths] or _box_paths(args.storage_dir, args.box)
+    if not paths:
+        print("no box state files found", file=sys.stderr)
+        return 1
+    status = 0
+    for path in paths:
+        try:
+            view = dump(path)
+        except (OSError, BoxStateFormatError) as exc:
+            print(f"{path}: {exc}", file=sys.stderr)
+            status = 1
+            continue
+        out = view["state"] if args.state_only else view
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
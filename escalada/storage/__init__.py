@@ -1,25 +1,88 @@
-from .json_store import (
-    STORAGE_DIR,
-    STORAGE_MODE,
-    append_audit_event,
-    ensure_storage_dirs,
-    get_users_with_default_admin,
-    is_json_mode,
-    load_box_states,
-    read_latest_events,
-    save_box_state,
-    save_users,
-)
+"""
+Storage backend selection.
+
+`STORAGE_MODE` picks the backend behind this interface:
+- `json` (default): box files + NDJSON audit log + users.json (`json_store`)
+- `sqlite`: one SQLite database in WAL mode (`sqlite_store`)
+
+Application code imports storage functions from `escalada.storage`, never from a backend module.
+"""
+
+import os
+
+STORAGE_MODE = os.getenv("STORAGE_MODE", "json").strip().lower() or "json"
+
+if STORAGE_MODE == "sqlite":
+    from .sqlite_store import (
+        STORAGE_DIR,
+        append_audit_event,
+        audit_archive_bytes,
+        audit_segments,
+        audit_size_bytes,
+        build_audit_event,
+        clear_box_state_files,
+        ensure_storage_dirs,
+        get_users_with_default_admin,
+        is_json_mode,
+        iter_audit_lines,
+        load_box_states,
+        load_competition_officials,
+        persist_command,
+        query_audit_events,
+        read_latest_events,
+        schedule_audit_maintenance,
+        save_box_state,
+        save_competition_officials,
+        save_competition_officials_async,
+        save_users,
+    )
+else:
+    STORAGE_MODE = "json"
+    from .json_store import (
+        STORAGE_DIR,
+        append_audit_event,
+        audit_archive_bytes,
+        audit_segments,
+        audit_size_bytes,
+        build_audit_event,
+        clear_box_state_files,
+        ensure_storage_dirs,
+        get_users_with_default_admin,
+        is_json_mode,
+        iter_audit_lines,
+        load_box_states,
+        load_competition_officials,
+        persist_command,
+        query_audit_events,
+        read_latest_events,
+        schedule_audit_maintenance,
+        save_box_state,
+        save_competition_officials,
+        save_competition_officials_async,
+        save_users,
+    )
 
 __all__ = [
     "STORAGE_DIR",
     "STORAGE_MODE",
     "append_audit_event",
+    "audit_archive_bytes",
+    "audit_segments",
+    "audit_size_bytes",
+    "build_audit_event",
+    "clear_box_state_files",
     "ensure_storage_dirs",
     "get_users_with_default_admin",
     "is_json_mode",
+    "iter_audit_lines",
     "load_box_states",
+    "load_competition_officials",
+    "persist_command",
+    "query_audit_events",
     "read_latest_events",
+    "schedule_audit_maintenance",
     "save_box_state",
+    "save_competition_officials",
+    "save_competition_officials_async",
     "save_users",
 ]
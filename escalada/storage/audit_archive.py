@@ -0,0 +1,255 @@
+"""
+Compression, retention and manifest of rotated audit log segments (JSON storage mode).
+
+The audit writer rotates `events.ndjson` to `events.<timestamp>.ndjson` at
+`MAX_AUDIT_FILE_SIZE_MB`. Rotated segments used to stay uncompressed forever and filled the venue
+laptop's disk on multi-day events. After each rotation (and once at startup) the archiver runs a
+maintenance pass on its own background thread, so the audit writer never waits for it:
+- rotated segments are gzip-compressed to `events.<timestamp>.ndjson.gz` (`segment_file` block
+  format: readers decompress in memory, one member at a time, never to disk) and keep their audit
+  index sidecars (`audit_index`, indexed before compressing)
+- retention: at most `AUDIT_RETENTION_SEGMENTS` archived segments are kept, none older than
+  `AUDIT_RETENTION_DAYS` (by rotation time; 0 = unlimited)
+- `audit_manifest.json` is rewritten: one entry per archived segment (rotation time, first/last
+  event, event count, raw/stored bytes) plus totals, so size probes need not walk the archives
+
+`AUDIT_COMPRESS=0` keeps archives uncompressed (retention and the manifest still apply).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from escalada.storage import audit_index
+from escalada.storage.segment_file import (
+    BLOCKS_SUFFIX,
+    GZ_SUFFIX,
+    SegmentFile,
+    is_compressed,
+    write_block_gzip,
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COMPRESS = os.getenv("AUDIT_COMPRESS", "1") != "0"
+AUDIT_GZIP_LEVEL = int(os.getenv("AUDIT_GZIP_LEVEL", "6"))
+AUDIT_RETENTION_SEGMENTS = int(os.getenv("AUDIT_RETENTION_SEGMENTS", "0"))
+AUDIT_RETENTION_DAYS = float(os.getenv("AUDIT_RETENTION_DAYS", "0"))
+
+MANIFEST_NAME = "audit_manifest.json"
+_ARCHIVE_NAME = re.compile(r"^events\.(\d+)\.ndjson(\.gz)?$")
+_SIDECARS = (audit_index.INDEX_SUFFIX, audit_index.SYMBOLS_SUFFIX, BLOCKS_SUFFIX)
+
+
+def archived_segments(storage_dir: Path) -> list[Path]:
+    """Rotated segments, oldest first (one being compressed is listed once, uncompressed)."""
+    by_name: dict[str, Path] = {}
+    for path in storage_dir.glob("events.*.ndjson*"):
+        match = _ARCHIVE_NAME.match(path.name)
+        if match is None:
+            continue
+        name = path.name[: -len(GZ_SUFFIX)] if match.group(2) else path.name
+        if name not in by_name or not match.group(2):
+            by_name[name] = path
+    # Rotation timestamps are fixed-width (%Y%m%d%H%M%S), so name order is chronological.
+    return [by_name[name] for name in sorted(by_name)]
+
+
+def rotated_at(segment: Path) -> datetime | None:
+    match = _ARCHIVE_NAME.match(segment.name)
+    try:
+        stamp = datetime.strptime(match.group(1)[:14], "%Y%m%d%H%M%S")
+    except (AttributeError, ValueError):
+        return None
+    return stamp.replace(tzinfo=timezone.utc)
+
+
+def read_manifest(storage_dir: Path) -> dict[str, Any]:
+    try:
+        with (storage_dir / MANIFEST_NAME).open("r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def archive_stored_bytes(storage_dir: Path) -> int:
+    """On-disk size of the archived segments, from the manifest (no directory walk)."""
+    total = read_manifest(storage_dir).get("totalStoredBytes")
+    return total if isinstance(total, int) else 0
+
+
+def _iso_us(value: int) -> str:
+    return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=value)).isoformat()
+
+
+def remove_segment(segment: Path) -> None:
+    for path in [segment, *(audit_index.sidecar(segment, suffix) for suffix in _SIDECARS)]:
+        path.unlink(missing_ok=True)
+    audit_index.forget([segment])
+
+
+class AuditArchiver:
+    """Runs archive maintenance passes on one background thread (in submission order)."""
+
+    def __init__(
+        self,
+        *,
+        compress: bool = AUDIT_COMPRESS,
+        level: int = AUDIT_GZIP_LEVEL,
+        keep_segments: int = AUDIT_RETENTION_SEGMENTS,
+        keep_days: float = AUDIT_RETENTION_DAYS,
+    ) -> None:
+        self.compress = compress
+        self.level = level
+        self.keep_segments = keep_segments
+        self.keep_days = keep_days
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def schedule(self, storage_dir: Path | str) -> Future:
+        """Queue a maintenance pass of `storage_dir`."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="audit-archive"
+                )
+            return self._executor.submit(self._run_logged, Path(storage_dir))
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait until the passes queued so far are done."""
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.submit(lambda: None).result(timeout)
+
+    def _run_logged(self, storage_dir: Path) -> dict[str, Any] | None:
+        try:
+            return self.run(storage_dir)
+        except Exception:
+            logger.exception("Audit archive maintenance failed")
+            return None
+
+    def run(self, storage_dir: Path) -> dict[str, Any]:
+        """One maintenance pass: compress, apply retention, rewrite the manifest."""
+        self._remove_leftovers(storage_dir)
+        segments = archived_segments(storage_dir)
+        if self.compress:
+            segments = [s if is_compressed(s) else self._compress(s) for s in segments]
+        segments = self._apply_retention(segments)
+
+        previous = read_manifest(storage_dir)
+        if not segments and not previous:
+            return {}
+        known = {
+            entry.get("name"): entry
+            for entry in previous.get("segments", [])
+            if isinstance(entry, dict)
+        }
+        entries = [self._entry(segment, known.get(segment.name)) for segment in segments]
+        manifest = {
+            "version": 1,
+            "updatedAt": datetime.now(timezone.utc).isoformat(),
+            "compress": self.compress,
+            "retention": {"segments": self.keep_segments, "days": self.keep_days},
+            "segments": entries,
+            "totalRawBytes": sum(entry["rawBytes"] for entry in entries),
+            "totalStoredBytes": sum(entry["storedBytes"] for entry in entries),
+        }
+        tmp = storage_dir / f"{MANIFEST_NAME}.tmp"
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, storage_dir / MANIFEST_NAME)
+        return manifest
+
+    def _remove_leftovers(self, storage_dir: Path) -> None:
+        # Temporary files of an interrupted compression, sidecars of segments that are gone.
+        for path in storage_dir.glob("events.*.ndjson*"):
+            name = path.name
+            if name.endswith((f"{GZ_SUFFIX}.tmp", f"{BLOCKS_SUFFIX}.tmp")):
+                path.unlink(missing_ok=True)
+                continue
+            for suffix in _SIDECARS:
+                if name.endswith(suffix) and not path.with_name(name[: -len(suffix)]).exists():
+                    path.unlink(missing_ok=True)
+
+    def _compress(self, segment: Path) -> Path:
+        target = segment.with_name(segment.name + GZ_SUFFIX)
+        try:
+            raw_size = segment.stat().st_size
+            with SegmentFile(segment) as raw:
+                # Index first: rebuilding it later would mean decompressing the whole segment.
+                audit_index.load_segment_index(raw, persist=True)
+            done = False
+            if target.exists():  # compressed before an interrupted cleanup
+                with SegmentFile(target) as existing:
+                    done = existing.size == raw_size
+            if not done:
+                _, stored = write_block_gzip(segment, target, level=self.level)
+                logger.info(
+                    "Compressed audit segment %s (%.1f MB -> %.1f MB)",
+                    segment.name,
+                    raw_size / (1024 * 1024),
+                    stored / (1024 * 1024),
+                )
+            for suffix in (audit_index.INDEX_SUFFIX, audit_index.SYMBOLS_SUFFIX):
+                source = audit_index.sidecar(segment, suffix)
+                if source.exists():
+                    os.replace(source, audit_index.sidecar(target, suffix))
+            segment.unlink()
+        except OSError as exc:
+            # Readers keep using the uncompressed segment; the next pass retries.
+            logger.warning("Failed to compress audit segment %s: %s", segment.name, exc)
+            return segment
+        audit_index.forget([segment])
+        return target
+
+    def _apply_retention(self, segments: list[Path]) -> list[Path]:
+        keep = list(segments)
+        if self.keep_days > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.keep_days)
+            keep = [s for s in keep if (rotated_at(s) or cutoff) >= cutoff]
+        if self.keep_segments > 0:
+            keep = keep[-self.keep_segments :]
+        for segment in segments:
+            if segment not in keep:
+                try:
+                    remove_segment(segment)
+                except OSError as exc:
+                    logger.warning("Failed to remove audit segment %s: %s", segment.name, exc)
+                    keep.append(segment)
+                else:
+                    logger.info("Removed audit segment %s (retention)", segment.name)
+        return sorted(keep, key=lambda s: segments.index(s))
+
+    def _entry(self, segment: Path, previous: dict[str, Any] | None) -> dict[str, Any]:
+        stored = segment.stat().st_size
+        if previous is not None and previous.get("storedBytes") == stored:
+            return previous
+        with SegmentFile(segment) as raw:
+            index = audit_index.load_segment_index(raw, persist=True)
+            raw_size = raw.size
+        times = index.records["ts"]
+        times = times[times != audit_index.NO_TIME]
+        rotated = rotated_at(segment)
+        return {
+            "name": segment.name,
+            "rotatedAt": rotated.isoformat() if rotated else None,
+            "compressed": is_compressed(segment),
+            "events": int(len(index.records)),
+            "firstEventAt": _iso_us(int(times.min())) if len(times) else None,
+            "lastEventAt": _iso_us(int(times.max())) if len(times) else None,
+            "rawBytes": raw_size,
+            "storedBytes": stored,
+        }
+
+
+# Shared archiver used by the audit writer.
+audit_archiver = AuditArchiver()
@@ -0,0 +1,506 @@
+"""
+Per-segment indexes of the NDJSON audit log (JSON storage mode).
+
+Every audit segment (`events.ndjson` and the rotated `events.<timestamp>.ndjson[.gz]` files) has
+two sidecar files, maintained by the audit writer as it appends:
+- `<segment>.idx`: one fixed-size little-endian record per line (`RECORD`, 32 bytes): raw
+  (uncompressed) byte offset, byte length, `createdAt` (epoch microseconds), `boxId`, action
+  symbol, actor symbol
+- `<segment>.sym`: the segment's symbol table (actions and actor usernames), one JSON string per
+  line; symbol id = line number, 0 = null
+
+Queries load a segment's records as a NumPy structured array (cached per segment, extended
+incrementally for the live one), filter them with vectorized comparisons and then seek straight
+to the matching lines (`segment_file`: compressed segments decompress only the gzip members
+holding them), so a query over a full day of rotated logs reads only the matching bytes.
+
+The index is derived data. A missing, partial or stale index (crash between a line and its
+record, logs copied without their sidecars) is rebuilt from the segment: on the next read for
+rotated segments, on the next append for the live one (readers index an unindexed live tail in
+memory meanwhile).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import struct
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from escalada.storage.segment_file import SegmentFile
+
+logger = logging.getLogger(__name__)
+
+# offset, length, createdAt (epoch microseconds), boxId, action symbol, actor symbol
+RECORD = struct.Struct("<QIqiII")
+NO_TIME = -(2**63)
+NO_BOX = -(2**31)
+INDEX_SUFFIX = ".idx"
+SYMBOLS_SUFFIX = ".sym"
+# Contiguous matching lines are read in blocks of up to this many bytes.
+READ_BLOCK_BYTES = 1024 * 1024
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Envelope fields are written before `payload` (see `build_audit_event`), so the leftmost match of
+# `"<field>": ` in a raw line is the envelope value, never a nested payload key.
+_AUDIT_STRING_FIELD = {
+    name: re.compile(r'"%s": (null|"((?:[^"\\]|\\.)*)")' % name)
+    for name in ("createdAt", "action", "actorUsername")
+}
+_AUDIT_BOX_ID = re.compile(r'"boxId": (null|-?\d+)')
+
+
+def raw_string_field(line: str, name: str) -> str | None:
+    match = _AUDIT_STRING_FIELD[name].search(line)
+    if match is None or match.group(2) is None:
+        return None
+    value = match.group(2)
+    return json.loads(f'"{value}"') if "\\" in value else value
+
+
+def raw_box_id(line: str) -> int | None:
+    match = _AUDIT_BOX_ID.search(line)
+    if match is None or match.group(1) == "null":
+        return None
+    return int(match.group(1))
+
+
+def parse_created_at(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        created = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return created if created.tzinfo else created.replace(tzinfo=timezone.utc)
+
+
+def _epoch_us(created: datetime | None) -> int:
+    if created is None:
+        return NO_TIME
+    delta = created - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _box_key(box_id: Any) -> int:
+    if isinstance(box_id, int) and not isinstance(box_id, bool) and NO_BOX < box_id < 2**31:
+        return box_id
+    return NO_BOX
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+@dataclass
+class AuditFilter:
+    """Audit query filters: `since` inclusive, `until` exclusive (naive = UTC), exact matches."""
+
+    since: datetime | None = None
+    until: datetime | None = None
+    box_id: int | None = None
+    action: str | None = None
+    actor: str | None = None
+
+    def __post_init__(self) -> None:
+        self.since = _utc(self.since)
+        self.until = _utc(self.until)
+
+    @property
+    def empty(self) -> bool:
+        return all(
+            value is None
+            for value in (self.since, self.until, self.box_id, self.action, self.actor)
+        )
+
+    def matches_line(self, line: str) -> bool:
+        """Match a raw line without decoding the event (scan path)."""
+        if self.box_id is not None and raw_box_id(line) != self.box_id:
+            return False
+        if self.action is not None and raw_string_field(line, "action") != self.action:
+            return False
+        if self.actor is not None and raw_string_field(line, "actorUsername") != self.actor:
+            return False
+        if self.since is not None or self.until is not None:
+            created = parse_created_at(raw_string_field(line, "createdAt"))
+            if created is None:
+                return False
+            if self.since is not None and created < self.since:
+                return False
+            if self.until is not None and created >= self.until:
+                return False
+        return True
+
+    def mask(self, index: "SegmentIndex"):
+        """Boolean mask of the index records matching the filters."""
+        import numpy as np
+
+        records = index.records
+        mask = np.ones(len(records), dtype=bool)
+        if self.box_id is not None:
+            box = _box_key(self.box_id)
+            if box == NO_BOX:
+                return np.zeros(len(records), dtype=bool)
+            mask &= records["box"] == box
+        for column, value in (("action", self.action), ("actor", self.actor)):
+            if value is None:
+                continue
+            symbol = index.symbol_id(value)
+            if symbol is None:
+                return np.zeros(len(records), dtype=bool)
+            mask &= records[column] == symbol
+        if self.since is not None:
+            mask &= records["ts"] >= _epoch_us(self.since)
+        if self.until is not None:
+            mask &= (records["ts"] < _epoch_us(self.until)) & (records["ts"] != NO_TIME)
+        return mask
+
+
+def _record_dtype():
+    import numpy as np
+
+    return np.dtype(
+        [
+            ("offset", "<u8"),
+            ("length", "<u4"),
+            ("ts", "<i8"),
+            ("box", "<i4"),
+            ("action", "<u4"),
+            ("actor", "<u4"),
+        ]
+    )
+
+
+@dataclass
+class SegmentIndex:
+    """Loaded index of one segment."""
+
+    records: Any  # numpy structured array (`_record_dtype`)
+    symbols: list[str | None]  # symbol id -> value (0: null)
+    covered: int  # segment bytes covered by `records`
+    identity: tuple[int, int] = (0, 0)  # (st_dev, st_ino) of the segment
+    index_bytes: int = 0  # sidecar bytes loaded so far
+    symbol_bytes: int = 0
+
+    def symbol_id(self, value: str) -> int | None:
+        try:
+            return self.symbols.index(value, 1)
+        except ValueError:
+            return None
+
+
+class _Symbols:
+    def __init__(self, values: list[str | None]) -> None:
+        self.values = values
+        self.ids = {value: i for i, value in enumerate(values) if i}
+
+    def id_for(self, value: str | None, new: list[str]) -> int:
+        if value is None:
+            return 0
+        symbol = self.ids.get(value)
+        if symbol is None:
+            symbol = len(self.values)
+            self.values.append(value)
+            self.ids[value] = symbol
+            new.append(value)
+        return symbol
+
+
+def sidecar(segment: Path, suffix: str) -> Path:
+    return segment.with_name(segment.name + suffix)
+
+
+def _read_symbols(path: Path, start: int = 0) -> tuple[list[str], int]:
+    """Symbols stored from byte `start` (complete lines only) and the end of what was read."""
+    with path.open("rb") as handle:
+        handle.seek(start)
+        data = handle.read()
+    end = data.rfind(b"\n") + 1
+    return [json.loads(line) for line in data[:end].splitlines()], start + end
+
+
+def _ends_line(raw: SegmentFile, end: int) -> bool:
+    return end == 0 or raw.read(end - 1, end) == b"\n"
+
+
+def _scan_records(
+    raw: SegmentFile, start: int, stop: int | None, symbols: _Symbols
+) -> tuple[list[bytes], list[str], int]:
+    """Index complete lines of the segment in [start, stop): packed records, new symbols, end."""
+    records: list[bytes] = []
+    new_symbols: list[str] = []
+    end = start
+    for offset, data in raw.iter_lines(start):
+        if not data.endswith(b"\n") or (stop is not None and offset + len(data) > stop):
+            break
+        line = data.decode("utf-8", "replace")
+        if line.strip():
+            created = parse_created_at(raw_string_field(line, "createdAt"))
+            records.append(
+                RECORD.pack(
+                    offset,
+                    len(data),
+                    _epoch_us(created),
+                    _box_key(raw_box_id(line)),
+                    symbols.id_for(raw_string_field(line, "action"), new_symbols),
+                    symbols.id_for(raw_string_field(line, "actorUsername"), new_symbols),
+                )
+            )
+        end = offset + len(data)
+    return records, new_symbols, end
+
+
+def _append_sidecars(segment: Path, new_symbols: Iterable[str], records: bytes) -> None:
+    # Symbols first: a record is only ever written after the symbols it references.
+    lines = "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in new_symbols)
+    if lines:
+        with sidecar(segment, SYMBOLS_SUFFIX).open("ab") as handle:
+            handle.write(lines.encode("utf-8"))
+    if records:
+        with sidecar(segment, INDEX_SUFFIX).open("ab") as handle:
+            handle.write(records)
+
+
+def _replace_sidecars(segment: Path, symbols: list[str | None], records: bytes) -> None:
+    suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    payloads = {
+        SYMBOLS_SUFFIX: "".join(
+            json.dumps(value, ensure_ascii=False) + "\n" for value in symbols[1:]
+        ).encode("utf-8"),
+        INDEX_SUFFIX: records,
+    }
+    for kind, data in payloads.items():
+        target = sidecar(segment, kind)
+        tmp = target.with_name(target.name + suffix)
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+
+
+def remove_sidecars(segment: Path) -> None:
+    for suffix in (INDEX_SUFFIX, SYMBOLS_SUFFIX):
+        sidecar(segment, suffix).unlink(missing_ok=True)
+
+
+# -------------------- Writer (live segment) --------------------
+class AuditIndexWriter:
+    """Appends index records for the live segment; called by the audit writer under its lock."""
+
+    def __init__(self) -> None:
+        self._segment: Path | None = None
+        self._symbols = _Symbols([None])
+        self._covered = 0
+
+    def reset(self) -> None:
+        self._segment = None
+        self._symbols = _Symbols([None])
+        self._covered = 0
+
+    def _attach(self, segment: Path, end: int) -> None:
+        # Resume from the sidecars (if they match the segment), then index lines up to `end`.
+        index_path = sidecar(segment, INDEX_SUFFIX)
+        symbols_path = sidecar(segment, SYMBOLS_SUFFIX)
+        with SegmentFile(segment) as raw:
+            covered = 0
+            values: list[str | None] = [None]
+            try:
+                size = index_path.stat().st_size
+                whole = size - size % RECORD.size
+                if whole:
+                    with index_path.open("rb") as handle:
+                        handle.seek(whole - RECORD.size)
+                        offset, length, *_ = RECORD.unpack(handle.read(RECORD.size))
+                    covered = offset + length
+                stored, stored_end = _read_symbols(symbols_path)
+                if covered > end or not _ends_line(raw, covered):
+                    raise ValueError("index does not match the segment")
+                # Drop a partially written trailing record/symbol before appending after it.
+                if whole != size:
+                    os.truncate(index_path, whole)
+                if stored_end != symbols_path.stat().st_size:
+                    os.truncate(symbols_path, stored_end)
+                values.extend(stored)
+            except FileNotFoundError:
+                remove_sidecars(segment)
+                covered, values = 0, [None]
+            except (OSError, ValueError) as exc:
+                logger.warning("Rebuilding audit index of %s: %s", segment.name, exc)
+                remove_sidecars(segment)
+                covered, values = 0, [None]
+            symbols = _Symbols(values)
+            records, new_symbols, covered = _scan_records(raw, covered, end, symbols)
+        _append_sidecars(segment, new_symbols, b"".join(records))
+        self._segment, self._symbols, self._covered = segment, symbols, covered
+
+    def append(self, segment: Path, offset: int, data: bytes, event: dict) -> None:
+        """Index the line `data` just written at `offset` of `segment`."""
+        try:
+            if self._segment != segment or self._covered != offset:
+                self._attach(segment, offset)
+            new_symbols: list[str] = []
+            action = event.get("action")
+            actor = event.get("actorUsername")
+            record = RECORD.pack(
+                offset,
+                len(data),
+                _epoch_us(parse_created_at(event.get("createdAt"))),
+                _box_key(event.get("boxId")),
+                self._symbols.id_for(action if isinstance(action, str) else None, new_symbols),
+                self._symbols.id_for(actor if isinstance(actor, str) else None, new_symbols),
+            )
+            _append_sidecars(segment, new_symbols, record)
+            self._covered = offset + len(data)
+        except Exception as exc:
+            logger.warning("Failed to index audit event: %s", exc)
+            self.reset()
+
+    def rotated(self, segment: Path, archive: Path) -> None:
+        """Move the live segment's sidecars along with its rotation to `archive`."""
+        self.reset()
+        for suffix in (INDEX_SUFFIX, SYMBOLS_SUFFIX):
+            source = sidecar(segment, suffix)
+            try:
+                if source.exists():
+                    source.rename(sidecar(archive, suffix))
+            except OSError as exc:
+                logger.warning("Failed to move audit index %s: %s", source.name, exc)
+                source.unlink(missing_ok=True)
+
+
+# -------------------- Readers --------------------
+_cache: dict[str, SegmentIndex] = {}
+_cache_lock = threading.Lock()
+
+
+def _empty_index(identity: tuple[int, int]) -> SegmentIndex:
+    import numpy as np
+
+    return SegmentIndex(np.empty(0, dtype=_record_dtype()), [None], 0, identity)
+
+
+def _extend_from_sidecars(raw: SegmentFile, base: SegmentIndex) -> SegmentIndex | None:
+    """`base` plus the sidecar records written since it was loaded (None: no match)."""
+    import numpy as np
+
+    segment = raw.path
+    index_path = sidecar(segment, INDEX_SUFFIX)
+    try:
+        index_size = index_path.stat().st_size
+        if index_size < base.index_bytes:
+            return None
+        # Symbols are read after sizing the index: every record in range has its symbols stored.
+        symbols, symbol_bytes = _read_symbols(sidecar(segment, SYMBOLS_SUFFIX), base.symbol_bytes)
+        whole = index_size - (index_size - base.index_bytes) % RECORD.size
+        with index_path.open("rb") as handle:
+            handle.seek(base.index_bytes)
+            data = handle.read(whole - base.index_bytes)
+    except FileNotFoundError:
+        return base if base.index_bytes == 0 else None
+    if len(data) != whole - base.index_bytes:
+        return None
+    added = np.frombuffer(data, dtype=_record_dtype())
+    all_symbols = base.symbols + symbols
+    if len(added):
+        covered = int(added["offset"][-1]) + int(added["length"][-1])
+        if (
+            int(added["offset"][0]) < base.covered
+            or covered > raw.size
+            or int(max(added["action"].max(), added["actor"].max())) >= len(all_symbols)
+            or not _ends_line(raw, covered)
+        ):
+            return None
+        records = np.concatenate([base.records, added]) if len(base.records) else added
+    else:
+        covered, records = base.covered, base.records
+    return SegmentIndex(records, all_symbols, covered, base.identity, whole, symbol_bytes)
+
+
+def load_segment_index(raw: SegmentFile, *, persist: bool) -> SegmentIndex:
+    """
+    Index of the segment opened as `raw`, covering every complete line.
+
+    Unindexed lines are scanned; with `persist` (immutable rotated segments) the rebuilt index is
+    written back to the sidecars, otherwise (live segment, owned by the writer) it stays in memory.
+    """
+    import numpy as np
+
+    segment = raw.path
+    key = str(segment)
+    with _cache_lock:
+        cached = _cache.get(key)
+    index = None
+    if cached is not None and cached.identity == raw.identity and cached.covered <= raw.size:
+        index = _extend_from_sidecars(raw, cached)
+    if index is None:
+        index = _extend_from_sidecars(raw, _empty_index(raw.identity))
+    if index is None:
+        logger.warning("Audit index of %s does not match the segment; rebuilding", segment.name)
+        index = _empty_index(raw.identity)
+        if persist:
+            remove_sidecars(segment)
+    if index.covered < raw.size:
+        symbols = _Symbols(list(index.symbols))
+        packed, _, covered = _scan_records(raw, index.covered, None, symbols)
+        if packed:
+            added = np.frombuffer(b"".join(packed), dtype=_record_dtype())
+            index = SegmentIndex(
+                np.concatenate([index.records, added]),
+                symbols.values,
+                covered,
+                raw.identity,
+            )
+            if persist:
+                _replace_sidecars(segment, index.symbols, index.records.tobytes())
+                index.index_bytes = len(index.records) * RECORD.size
+                index.symbol_bytes = sidecar(segment, SYMBOLS_SUFFIX).stat().st_size
+            else:
+                return index  # transient: the writer indexes the live tail on its next append
+    with _cache_lock:
+        _cache[key] = index
+    return index
+
+
+def forget(segments: Iterable[Path] | None = None) -> None:
+    """Drop cached indexes (of `segments`, or all of them)."""
+    with _cache_lock:
+        if segments is None:
+            _cache.clear()
+        else:
+            for segment in segments:
+                _cache.pop(str(segment), None)
+
+
+def matching_spans(
+    raw: SegmentFile, flt: AuditFilter, *, persist: bool
+) -> tuple[list[int], list[int]]:
+    """Raw byte offsets and lengths of the lines matching `flt`, in file order."""
+    index = load_segment_index(raw, persist=persist)
+    matched = index.records[flt.mask(index)]
+    return matched["offset"].tolist(), matched["length"].tolist()
+
+
+def read_lines(raw: SegmentFile, offsets: list[int], lengths: list[int]) -> Iterator[str]:
+    """Read the given lines (without newline); ascending contiguous lines are read in blocks."""
+    i, count = 0, len(offsets)
+    while i < count:
+        start = offsets[i]
+        end = start + lengths[i]
+        j = i + 1
+        while j < count and offsets[j] == end and end - start < READ_BLOCK_BYTES:
+            end += lengths[j]
+            j += 1
+        block = raw.read(start, end)
+        pos = 0
+        for k in range(i, j):
+            piece = block[pos : pos + lengths[k]]
+            pos += lengths[k]
+            yield piece.decode("utf-8", "replace").rstrip("\r\n")
+        i = j
@@ -0,0 +1,124 @@
+"""
+On-disk encoding of box states (schema-versioned, compact).
+
+Box state files used to be pretty-printed bare state dicts (`indent=2`): about twice the size and
+serialization time of minified JSON, and every load re-applied the missing-field defaults. Files
+are now a versioned envelope `{"schemaVersion": N, "state": {...}}` in one of two encodings:
+- `json` (default): minified UTF-8 JSON in `boxes/{boxId}.json` (still valid JSON for `jq`)
+- `msgpack`: `MSGPACK_MAGIC` + the msgpack-encoded envelope in `boxes/{boxId}.msgpack`; needs the
+  optional `msgpack` package (falls back to `json` with a warning when it is not installed)
+
+`BOX_STATE_ENCODING` selects the encoding used for writes; both are always readable.
+
+Files without an envelope are schema 1 (the legacy format). `migrate_box_state` upgrades a state
+step by step to `BOX_SCHEMA_VERSION`; the loader rewrites upgraded (or re-encoded) files once, so
+later loads take the fast path. `python -m escalada.scripts.dump_box_state` prints any box file
+as readable JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import uuid
+from functools import lru_cache
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+BOX_SCHEMA_VERSION = 2
+BOX_STATE_ENCODING = os.getenv("BOX_STATE_ENCODING", "json").strip().lower()
+
+MSGPACK_MAGIC = b"ESCB\x01"
+SUFFIXES = {"json": ".json", "msgpack": ".msgpack"}
+
+
+class BoxStateFormatError(ValueError):
+    """Raised when a box file cannot be decoded or has an unsupported schema version."""
+
+
+@lru_cache(maxsize=1)
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+@lru_cache(maxsize=4)
+def resolve_encoding(requested: str | None = None) -> str:
+    """Encoding used for writes (`msgpack` only when requested and installed)."""
+    encoding = (requested or BOX_STATE_ENCODING or "json").strip().lower()
+    if encoding == "msgpack":
+        if _msgpack() is not None:
+            return "msgpack"
+        logger.warning("BOX_STATE_ENCODING=msgpack but msgpack is not installed; using json")
+    elif encoding != "json":
+        logger.warning("Unknown BOX_STATE_ENCODING=%r; using json", encoding)
+    return "json"
+
+
+def encode_box_state(state: dict[str, Any], encoding: str = "json") -> bytes:
+    """Serialize a state in the current schema envelope."""
+    envelope = {"schemaVersion": BOX_SCHEMA_VERSION, "state": state}
+    if encoding == "msgpack":
+        return MSGPACK_MAGIC + _msgpack().packb(envelope, use_bin_type=True)
+    return json.dumps(envelope, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_box_file(data: bytes) -> tuple[int, str, dict[str, Any]]:
+    """Decode a box file into `(schemaVersion, encoding, state)` (state not yet migrated)."""
+    if data.startswith(MSGPACK_MAGIC):
+        packer = _msgpack()
+        if packer is None:
+            raise BoxStateFormatError("msgpack box file but msgpack is not installed")
+        try:
+            decoded = packer.unpackb(data[len(MSGPACK_MAGIC) :], raw=False, strict_map_key=False)
+        except Exception as exc:
+            raise BoxStateFormatError(f"invalid msgpack box file: {exc}") from exc
+        encoding = "msgpack"
+    else:
+        try:
+            decoded = json.loads(data)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise BoxStateFormatError(f"invalid JSON box file: {exc}") from exc
+        encoding = "json"
+
+    if not isinstance(decoded, dict):
+        raise BoxStateFormatError("box file is not an object")
+    if "schemaVersion" in decoded and isinstance(decoded.get("state"), dict):
+        version = decoded["schemaVersion"]
+        if not isinstance(version, int) or version < 1:
+            raise BoxStateFormatError(f"invalid schemaVersion {version!r}")
+        return version, encoding, decoded["state"]
+    # Legacy (pre-envelope) file: the bare state dict.
+    return 1, encoding, decoded
+
+
+# -------------------- Migrations --------------------
+def _v1_to_v2(state: dict[str, Any]) -> dict[str, Any]:
+    # Defaults the loader used to patch on every load (backward compatibility with old states).
+    state.setdefault("boxVersion", 0)
+    state.setdefault("sessionId", str(uuid.uuid4()))
+    if "routesCount" not in state:
+        state["routesCount"] = state.get("routeIndex") or 1
+    state.setdefault("holdsCounts", [])
+    return state
+
+
+# from-version -> step producing the next version
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {1: _v1_to_v2}
+
+
+def migrate_box_state(state: dict[str, Any], version: int) -> dict[str, Any]:
+    """Upgrade `state` from schema `version` to `BOX_SCHEMA_VERSION`."""
+    if version > BOX_SCHEMA_VERSION:
+        raise BoxStateFormatError(
+            f"box schema {version} is newer than supported {BOX_SCHEMA_VERSION}"
+        )
+    while version < BOX_SCHEMA_VERSION:
+        state = _MIGRATIONS[version](state)
+        version += 1
+    return state
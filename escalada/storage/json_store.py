@@ -2,8 +2,11 @@
 JSON storage backend (file-based persistence).
 
 This module provides:
-- Per-box state persistence under `STORAGE_DIR/boxes/{boxId}.json` (atomic writes)
-- Append-only audit log in NDJSON format (`STORAGE_DIR/events.ndjson`) with size-based rotation
+- Per-box state persistence under `STORAGE_DIR/boxes/{boxId}.json` (atomic writes, compact
+  schema-versioned format, see `box_codec`)
+- Append-only audit log in NDJSON format (`STORAGE_DIR/events.ndjson`) with size-based rotation,
+  indexed per segment as it is written (`audit_index`); rotated segments are compressed and
+  pruned in the background (`audit_archive`)
 - User database stored in `STORAGE_DIR/users.json` (includes default admin bootstrap + reset escape hatch)
 - Global competition officials stored in `STORAGE_DIR/competition_officials.json`
 
@@ -19,12 +22,28 @@ import logging
 import os
 import uuid
 from collections import deque
+from itertools import islice
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Iterator
+
+# -------------------- Local application imports --------------------
+from escalada.storage import audit_index
+from escalada.storage.audit_archive import archive_stored_bytes, archived_segments, audit_archiver
+from escalada.storage.audit_index import AuditFilter, AuditIndexWriter
+from escalada.storage.box_codec import (
+    BOX_SCHEMA_VERSION,
+    SUFFIXES,
+    BoxStateFormatError,
+    decode_box_file,
+    encode_box_state,
+    migrate_box_state,
+    resolve_encoding,
+)
+from escalada.storage.segment_file import GZ_SUFFIX, SegmentFile
 
 # -------------------- Storage configuration --------------------
-# JSON-only build: Postgres/Alembic removed (all persistence is file-based).
+# File-based backend (Postgres/Alembic removed); `escalada.storage` selects it for STORAGE_MODE=json.
 STORAGE_MODE = "json"
 STORAGE_DIR = os.getenv("STORAGE_DIR", "data")
 
@@ -34,6 +53,8 @@ _box_locks: Dict[int, asyncio.Lock] = {}
 _box_locks_lock = asyncio.Lock()
 # Single lock for audit writes/rotation (NDJSON is append-only but rotation/rename must be serialized).
 _audit_lock = asyncio.Lock()
+# Maintains the live segment's index sidecars (`audit_index`), under `_audit_lock`.
+_audit_indexer = AuditIndexWriter()
 
 # -------------------- Audit file rotation settings --------------------
 MAX_AUDIT_FILE_SIZE_MB = int(os.getenv("MAX_AUDIT_FILE_SIZE_MB", "50"))
@@ -105,12 +126,12 @@ def ensure_storage_dirs() -> None:
 
 def clear_box_state_files() -> int:
     """
-    Delete all persisted box state JSON files (data/boxes/*.json).
+    Delete all persisted box state files (data/boxes/*.json, *.msgpack).
     Returns the number of deleted files.
     """
     ensure_storage_dirs()
     removed = 0
-    for path in _boxes_dir().glob("*.json"):
+    for path in _box_files(_boxes_dir()):
         try:
             path.unlink()
             removed += 1
@@ -132,13 +153,39 @@ def _atomic_write_json(path: Path, payload: Any) -> None:
     os.replace(tmp_path, path)
 
 
-def load_box_states() -> Dict[int, dict]:
-    """Load box states from JSON files with validation.
-    Skips invalid/corrupt files to prevent startup crashes.
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    # Same tmp + replace pattern as `_atomic_write_json`, for pre-encoded payloads.
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _box_files(boxes_dir: Path) -> list[Path]:
+    return [path for suffix in SUFFIXES.values() for path in boxes_dir.glob(f"*{suffix}")]
+
+
+def _write_box_file(boxes_dir: Path, box_id: int, state: dict, encoding: str) -> Path:
+    path = boxes_dir / f"{box_id}{SUFFIXES[encoding]}"
+    _atomic_write_bytes(path, encode_box_state(state, encoding))
+    return path
+
+
+def load_box_states(
+    boxes_dir: Path | None = None, encoding: str | None = None
+) -> Dict[int, dict]:
+    """Load box states (any supported encoding/schema) with validation.
+    Skips invalid/corrupt files to prevent startup crashes. Files in an older schema or another
+    encoding are migrated and rewritten once in the current format (see `box_codec`).
+    When a box has several files (e.g. `3.json` and `3.msgpack` left by an interrupted
+    re-encode), the state with the highest `boxVersion` wins and the other files are removed.
     """
-    ensure_storage_dirs()
-    states: Dict[int, dict] = {}
-    for path in _boxes_dir().glob("*.json"):
+    if boxes_dir is None:
+        ensure_storage_dirs()
+        boxes_dir = _boxes_dir()
+    encoding = resolve_encoding(encoding)
+    # box_id -> decoded candidates: (path, schema version, encoding, migrated state).
+    candidates: Dict[int, list[tuple[Path, int, str, dict]]] = {}
+    for path in _box_files(boxes_dir):
         # Box id is derived from the filename (e.g. `0.json` -> box_id=0).
         try:
             box_id = int(path.stem)
@@ -146,43 +193,67 @@ def load_box_states() -> Dict[int, dict]:
             logger.warning(f"Skipping invalid box state filename: {path.name}")
             continue
 
-        # Parse JSON (corrupt files are skipped instead of crashing the process).
+        # Decode (corrupt files are skipped instead of crashing the process).
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            logger.error(f"Corrupt JSON in box state file {path.name}: {exc}")
+            version, file_encoding, data = decode_box_file(path.read_bytes())
+        except BoxStateFormatError as exc:
+            logger.error(f"Corrupt box state file {path.name}: {exc}")
             continue
         except Exception as exc:
             logger.error(f"Failed to read box state file {path.name}: {exc}")
             continue
-        
-        # Validate basic structure (must be a dict-like state object).
-        if not isinstance(data, dict):
-            logger.warning(f"Invalid box state format in {path.name} (not a dict), skipping")
-            continue
-        
+
         # Validate critical fields if present (defensive against manual edits / older versions).
         if "initiated" in data and not isinstance(data["initiated"], bool):
             logger.warning(f"Invalid 'initiated' field in {path.name}, skipping")
             continue
-        
+
         if "competitors" in data and not isinstance(data["competitors"], list):
             logger.warning(f"Invalid 'competitors' field in {path.name}, skipping")
             continue
-        
-        # Apply defaults for missing fields (backward compatibility).
-        if "boxVersion" not in data:
-            data["boxVersion"] = 0
-        if "sessionId" not in data:
-            data["sessionId"] = str(uuid.uuid4())
-        if "routesCount" not in data:
-            data["routesCount"] = data.get("routeIndex") or 1
-        if "holdsCounts" not in data:
-            data["holdsCounts"] = []
-        
+
+        if version != BOX_SCHEMA_VERSION:
+            try:
+                data = migrate_box_state(data, version)
+            except BoxStateFormatError as exc:
+                logger.error(f"Unsupported box state file {path.name}: {exc}")
+                continue
+        candidates.setdefault(box_id, []).append((path, version, file_encoding, data))
+
+    states: Dict[int, dict] = {}
+    for box_id, found in candidates.items():
+        # Newest state first; on equal versions prefer a file already in the current format.
+        path, version, file_encoding, data = max(
+            found,
+            key=lambda item: (
+                item[3].get("boxVersion", 0),
+                item[1] == BOX_SCHEMA_VERSION and item[2] == encoding,
+            ),
+        )
+        keep = path
+        if version != BOX_SCHEMA_VERSION or file_encoding != encoding:
+            # One-time upgrade: later loads read the current format without patching fields.
+            try:
+                keep = _write_box_file(boxes_dir, box_id, data, encoding)
+                logger.info(
+                    "Migrated box state %s (schema %s/%s -> %s/%s)",
+                    path.name,
+                    version,
+                    file_encoding,
+                    BOX_SCHEMA_VERSION,
+                    encoding,
+                )
+            except OSError as exc:
+                logger.warning("Failed to rewrite migrated box state %s: %s", path.name, exc)
+        for other, *_ in found:
+            if other != keep:
+                try:
+                    other.unlink(missing_ok=True)
+                except OSError as exc:
+                    logger.warning("Failed to remove stale box state %s: %s", other.name, exc)
         states[box_id] = data
         logger.debug(f"Loaded box state: {box_id} (version={data.get('boxVersion')})")
-    
+
     if states:
         logger.info(f"Successfully loaded {len(states)} valid box states")
     return states
@@ -199,6 +270,10 @@ def load_competition_officials() -> dict[str, str]:
     except Exception as exc:
         logger.error("Failed to load competition officials: %s", exc)
         return {"judgeChief": "", "competitionDirector": "", "chiefRoutesetter": ""}
+    return _normalize_officials(data)
+
+
+def _normalize_officials(data: Any) -> dict[str, str]:
     if not isinstance(data, dict):
         return {"judgeChief": "", "competitionDirector": "", "chiefRoutesetter": ""}
     judge = data.get("judgeChief")
@@ -211,25 +286,35 @@ def load_competition_officials() -> dict[str, str]:
     }
 
 
-def save_competition_officials(judge_chief: str, competition_director: str, chief_routesetter: str) -> None:
-    """Persist global competition officials (JSON-only)."""
-    ensure_storage_dirs()
-    payload = {
+def _officials_payload(judge_chief: str, competition_director: str, chief_routesetter: str) -> dict[str, str]:
+    return {
         "judgeChief": (judge_chief or "").strip(),
         "competitionDirector": (competition_director or "").strip(),
         "chiefRoutesetter": (chief_routesetter or "").strip(),
     }
+
+
+def save_competition_officials(judge_chief: str, competition_director: str, chief_routesetter: str) -> None:
+    """Persist global competition officials (JSON-only)."""
+    ensure_storage_dirs()
+    payload = _officials_payload(judge_chief, competition_director, chief_routesetter)
     _atomic_write_json(_competition_officials_path(), payload)
 
 
+async def save_competition_officials_async(
+    judge_chief: str, competition_director: str, chief_routesetter: str
+) -> None:
+    """Async `save_competition_officials` (the atomic file write runs in a worker thread)."""
+    await asyncio.to_thread(save_competition_officials, judge_chief, competition_director, chief_routesetter)
+
+
 async def save_box_state(box_id: int, state: dict) -> None:
     # Persist a single box state file (serialized under the per-box lock).
     ensure_storage_dirs()
     payload = dict(state)
-    path = _boxes_dir() / f"{box_id}.json"
     lock = await _get_box_lock(box_id)
     async with lock:
-        _atomic_write_json(path, payload)
+        _write_box_file(_boxes_dir(), box_id, payload, resolve_encoding())
 
 
 def _rotate_audit_file_if_needed() -> None:
@@ -242,9 +327,19 @@ def _rotate_audit_file_if_needed() -> None:
         if size_mb >= MAX_AUDIT_FILE_SIZE_MB:
             timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
             archive_name = f"events.{timestamp}.ndjson"
+            # Same-second rotations get a counter (still sorts chronologically by name).
+            counter = 0
+            while (path.parent / archive_name).exists() or (
+                path.parent / f"{archive_name}{GZ_SUFFIX}"
+            ).exists():
+                counter += 1
+                archive_name = f"events.{timestamp}{counter:02d}.ndjson"
             archive_path = path.parent / archive_name
             path.rename(archive_path)
+            _audit_indexer.rotated(path, archive_path)
             logger.info("Rotated audit file to %s (was %.2f MB)", archive_name, size_mb)
+            # Compression/retention of the archives runs off the event loop.
+            audit_archiver.schedule(path.parent)
     except Exception as exc:
         logger.warning("Failed to rotate audit file: %s", exc)
 
@@ -253,15 +348,44 @@ async def append_audit_event(event: dict) -> None:
     # Append a single event as NDJSON.
     # Rotation happens under the same lock so rename + append cannot interleave.
     ensure_storage_dirs()
-    line = json.dumps(event, ensure_ascii=False)
+    data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
     async with _audit_lock:
         try:
             # Check rotation before appending
             _rotate_audit_file_if_needed()
-            with _events_path().open("a", encoding="utf-8") as handle:
-                handle.write(line + "\n")
+            path = _events_path()
+            with path.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(data)
         except Exception as exc:
             logger.warning("Failed to append audit event: %s", exc)
+            return
+        _audit_indexer.append(path, offset, data, event)
+
+
+async def persist_command(box_id: int, state: dict, event: dict) -> None:
+    # Box file then audit line: two separate writes (SQLite does both in one transaction).
+    await save_box_state(box_id, state)
+    await append_audit_event(event)
+
+
+def audit_size_bytes() -> int:
+    """Size of the live audit file (rotated segments not included)."""
+    try:
+        return _events_path().stat().st_size
+    except OSError:
+        return 0
+
+
+def audit_archive_bytes() -> int:
+    """On-disk size of the rotated (archived) segments, from the archive manifest."""
+    return archive_stored_bytes(_storage_dir())
+
+
+def schedule_audit_maintenance() -> None:
+    """Queue an archive pass (compress rotated segments left uncompressed, apply retention)."""
+    if _storage_dir().exists():
+        audit_archiver.schedule(_storage_dir())
 
 
 def read_latest_events(
@@ -270,28 +394,127 @@ def read_latest_events(
     include_payload: bool = False,
     box_id: int | None = None,
 ) -> list[dict]:
-    # Tail the NDJSON audit log in a memory-bounded way using a deque.
-    path = _events_path()
-    if not path.exists():
+    # Tail of the audit log (newest first), continuing into rotated/compressed segments.
+    return query_audit_events(box_id=box_id, limit=limit, include_payload=include_payload)
+
+
+def audit_segments() -> list[Path]:
+    """
+    Audit log segments, oldest first: the rotated `events.<timestamp>.ndjson[.gz]` archives, then
+    the live `events.ndjson`.
+    """
+    base = _storage_dir()
+    if not base.exists():
         return []
-    tail: deque[dict] = deque(maxlen=limit)
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            line = line.strip()
-            if not line:
-                continue
+    segments = archived_segments(base)
+    if _events_path().exists():
+        segments.append(_events_path())
+    return segments
+
+
+def _scan_segment(raw: SegmentFile, flt: AuditFilter) -> Iterator[str]:
+    for _, data in raw.iter_lines():
+        line = data.decode("utf-8", "replace").rstrip("\r\n")
+        if line.strip() and flt.matches_line(line):
+            yield line
+
+
+def _open_segment(segment: Path) -> SegmentFile:
+    # A plain segment listed before the archiver compressed and unlinked it is read through its
+    # `.gz` sibling (written before the plain file is removed), so its events are not skipped.
+    try:
+        return SegmentFile(segment)
+    except FileNotFoundError:
+        if segment.name.endswith(GZ_SUFFIX):
+            raise
+        return SegmentFile(segment.with_name(segment.name + GZ_SUFFIX))
+
+
+def _segment_lines(
+    segment: Path, flt: AuditFilter, *, newest_first: bool = False, limit: int | None = None
+) -> Iterator[str]:
+    # Filtered/newest-first reads seek through the segment index; plain exports read sequentially.
+    # Compressed archives are decompressed in memory as they are read.
+    try:
+        with _open_segment(segment) as raw:
+            spans = None
+            if not flt.empty or newest_first:
+                try:
+                    spans = audit_index.matching_spans(
+                        raw, flt, persist=segment != _events_path()
+                    )
+                except (ValueError, ImportError) as exc:
+                    logger.warning(
+                        "Audit index of %s unavailable (%s); scanning", segment.name, exc
+                    )
+            if spans is not None:
+                offsets, lengths = spans
+                if newest_first:
+                    # Read forwards (cheap on compressed segments), then reverse the few lines.
+                    if limit is not None:
+                        offsets, lengths = offsets[-limit:], lengths[-limit:]
+                    yield from reversed(list(audit_index.read_lines(raw, offsets, lengths)))
+                else:
+                    yield from islice(audit_index.read_lines(raw, offsets, lengths), limit)
+                return
+            lines = _scan_segment(raw, flt)
+            if newest_first:
+                lines = reversed(deque(lines, maxlen=limit))
+            yield from islice(lines, limit)
+    except OSError as exc:
+        logger.warning("Failed to read audit segment %s: %s", segment.name, exc)
+
+
+def iter_audit_lines(
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    box_id: int | None = None,
+    action: str | None = None,
+    actor: str | None = None,
+) -> Iterator[str]:
+    """
+    Yield raw NDJSON audit lines (without the newline) across all segments, oldest first.
+
+    Filters: `since` inclusive, `until` exclusive (naive datetimes are UTC), `box_id`, `action`
+    and `actor` (username) exact matches. Filtered reads go through the per-segment indexes
+    (`audit_index`) and read only the matching lines; unfiltered ones stream each segment.
+    """
+    flt = AuditFilter(since=since, until=until, box_id=box_id, action=action, actor=actor)
+    for segment in audit_segments():
+        yield from _segment_lines(segment, flt)
+
+
+def query_audit_events(
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    box_id: int | None = None,
+    action: str | None = None,
+    actor: str | None = None,
+    limit: int = 500,
+    include_payload: bool = True,
+    newest_first: bool = True,
+) -> list[dict]:
+    """At most `limit` events matching the filters (same semantics as `iter_audit_lines`)."""
+    flt = AuditFilter(since=since, until=until, box_id=box_id, action=action, actor=actor)
+    segments = audit_segments()
+    if newest_first:
+        segments.reverse()
+    events: list[dict] = []
+    for segment in segments:
+        remaining = limit - len(events)
+        if remaining <= 0:
+            break
+        for line in _segment_lines(segment, flt, newest_first=newest_first, limit=remaining):
             try:
                 event = json.loads(line)
-            except Exception:
-                continue
-            if box_id is not None and event.get("boxId") != box_id:
+            except ValueError:
                 continue
             if not include_payload:
-                # Strip payload for lighter UI responses unless explicitly requested.
-                event = dict(event)
                 event["payload"] = None
-            tail.append(event)
-    return list(reversed(list(tail)))
+            events.append(event)
+    return events
 
 
 def load_users() -> Dict[str, dict]:
@@ -320,11 +543,9 @@ def save_users(users: Dict[str, dict]) -> None:
     _atomic_write_json(_users_path(), users)
 
 
-def get_users_with_default_admin() -> Dict[str, dict]:
-    # Ensure there is always an "admin" user present.
-    # This is intentionally file-based and local-only (JSON mode).
-    users = load_users()
-
+def _ensure_default_admin(users: Dict[str, dict], save) -> Dict[str, dict]:
+    # Ensure there is always an "admin" user present (`save` persists the users dict).
+    # Shared by the JSON and SQLite backends.
     if "admin" in users:
         # Optional escape hatch to reset admin password without editing users.json
         if os.getenv("RESET_ADMIN_PASSWORD"):
@@ -334,7 +555,7 @@ def get_users_with_default_admin() -> Dict[str, dict]:
             password = _validate_default_admin_password()
             users["admin"]["password_hash"] = hash_password(password)
             users["admin"]["updated_at"] = now
-            save_users(users)
+            save(users)
             logger.warning("Admin password was reset via RESET_ADMIN_PASSWORD")
         return users
     from escalada.auth.service import hash_password
@@ -350,10 +571,15 @@ def get_users_with_default_admin() -> Dict[str, dict]:
         "created_at": now,
         "updated_at": now,
     }
-    save_users(users)
+    save(users)
     return users
 
 
+def get_users_with_default_admin() -> Dict[str, dict]:
+    # This is intentionally file-based and local-only (JSON mode).
+    return _ensure_default_admin(load_users(), save_users)
+
+
 def build_audit_event(
     *,
     action: str,
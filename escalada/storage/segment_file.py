@@ -0,0 +1,190 @@
+"""
+Raw (uncompressed) byte access to audit log segments, plain or gzip-compressed.
+
+Archived segments are `events.<timestamp>.ndjson.gz`: a sequence of independent gzip members of
+about `GZIP_BLOCK_BYTES` of whole lines each. That is still one valid gzip file (`zcat` and
+`gzip.open` read it as a single stream), but the `<segment>.gzi` sidecar lists each member's
+(raw offset, compressed offset), so a line at a known raw offset (the audit index stores raw
+offsets) is read by decompressing only its member. A `.gz` without (or with a broken) `.gzi`, e.g.
+a segment compressed by hand, is mapped by one streaming pass over its members.
+
+Nothing is ever decompressed to disk; `SegmentFile` decompresses one member at a time in memory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import struct
+import zlib
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+GZ_SUFFIX = ".gz"
+BLOCKS_SUFFIX = ".gzi"
+GZIP_BLOCK_BYTES = 1024 * 1024
+# Sequential reads (scans, unfiltered exports) go through blocks of this many raw bytes.
+READ_CHUNK_BYTES = 1024 * 1024
+
+# (raw offset, compressed offset) of each member, then a final (raw size, compressed size) entry.
+BLOCK = struct.Struct("<QQ")
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def is_compressed(segment: Path) -> bool:
+    return segment.name.endswith(GZ_SUFFIX)
+
+
+def _blocks_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + BLOCKS_SUFFIX)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_block_gzip(
+    source: Path, target: Path, *, level: int = 6, block_bytes: int = GZIP_BLOCK_BYTES
+) -> tuple[int, int]:
+    """Compress `source` into `target` (+ `.gzi`) as line-aligned members; (raw, stored) bytes."""
+    blocks: list[bytes] = []
+    raw_offset = 0
+    tmp = target.with_name(target.name + ".tmp")
+    with source.open("rb") as src, tmp.open("wb") as dst:
+        carry = b""
+        while True:
+            chunk = src.read(block_bytes)
+            data = carry + chunk
+            if not data:
+                break
+            cut = data.rfind(b"\n") + 1 if chunk else len(data)
+            if cut == 0:  # a single line longer than a block: keep reading
+                carry = data
+                continue
+            blocks.append(BLOCK.pack(raw_offset, dst.tell()))
+            dst.write(gzip.compress(data[:cut], compresslevel=level, mtime=0))
+            raw_offset += cut
+            carry = data[cut:]
+        stored = dst.tell()
+        dst.flush()
+        os.fsync(dst.fileno())
+    blocks.append(BLOCK.pack(raw_offset, stored))
+    # The block map goes first: a visible `.gz` always has its `.gzi`.
+    _atomic_write(_blocks_path(target), b"".join(blocks))
+    os.replace(tmp, target)
+    return raw_offset, stored
+
+
+def _scan_members(handle) -> tuple[list[int], list[int]]:
+    # One streaming pass: member boundaries are where a gzip stream ends (`eof`).
+    raw_offsets, gz_offsets = [0], [0]
+    raw = consumed = 0
+    decomp = zlib.decompressobj(_GZIP_WBITS)
+    handle.seek(0)
+    while True:
+        data = handle.read(READ_CHUNK_BYTES)
+        if not data:
+            break
+        while data:
+            raw += len(decomp.decompress(data))
+            if not decomp.eof:
+                consumed += len(data)
+                break
+            unused = decomp.unused_data
+            consumed += len(data) - len(unused)
+            raw_offsets.append(raw)
+            gz_offsets.append(consumed)
+            decomp = zlib.decompressobj(_GZIP_WBITS)
+            data = unused
+            if data and not data.strip(b"\0"):
+                break  # trailing padding
+    return raw_offsets, gz_offsets
+
+
+class SegmentFile:
+    """Read-only view of a segment's raw bytes (plain or compressed); use as a context manager."""
+
+    def __init__(self, segment: Path) -> None:
+        self.path = segment
+        self.compressed = is_compressed(segment)
+        self._handle = segment.open("rb")
+        stat = os.fstat(self._handle.fileno())
+        self.identity = (stat.st_dev, stat.st_ino)
+        self._cached: tuple[int, bytes] | None = None
+        if self.compressed:
+            self._raw_offsets, self._gz_offsets = self._load_blocks(stat.st_size)
+            self.size = self._raw_offsets[-1]
+        else:
+            self.size = stat.st_size
+
+    def _load_blocks(self, stored: int) -> tuple[list[int], list[int]]:
+        try:
+            data = _blocks_path(self.path).read_bytes()
+            entries = [BLOCK.unpack_from(data, i) for i in range(0, len(data), BLOCK.size)]
+            if len(data) % BLOCK.size == 0 and entries and entries[-1][1] == stored:
+                return [raw for raw, _ in entries], [gz for _, gz in entries]
+        except OSError:
+            pass
+        logger.info("Mapping gzip members of %s", self.path.name)
+        return _scan_members(self._handle)
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "SegmentFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _block(self, i: int) -> bytes:
+        if self._cached is None or self._cached[0] != i:
+            self._handle.seek(self._gz_offsets[i])
+            data = self._handle.read(self._gz_offsets[i + 1] - self._gz_offsets[i])
+            self._cached = (i, zlib.decompress(data, _GZIP_WBITS))
+        return self._cached[1]
+
+    def read(self, start: int, end: int) -> bytes:
+        """Raw bytes [start, end)."""
+        if not self.compressed:
+            self._handle.seek(start)
+            return self._handle.read(end - start)
+        parts = []
+        i = bisect_right(self._raw_offsets, start) - 1
+        while start < end and 0 <= i < len(self._raw_offsets) - 1:
+            base = self._raw_offsets[i]
+            piece = self._block(i)[start - base : end - base]
+            if not piece:
+                break
+            parts.append(piece)
+            start += len(piece)
+            i += 1
+        return b"".join(parts)
+
+    def iter_lines(self, start: int = 0) -> Iterator[tuple[int, bytes]]:
+        """(raw offset, line) pairs from `start`; all but a partial last line end in a newline."""
+        pos = start
+        carry = b""
+        while pos < self.size:
+            chunk = self.read(pos, min(pos + READ_CHUNK_BYTES, self.size))
+            if not chunk:
+                break
+            base = pos - len(carry)
+            data = carry + chunk
+            pos += len(chunk)
+            begin = 0
+            while True:
+                newline = data.find(b"\n", begin)
+                if newline < 0:
+                    break
+                yield base + begin, data[begin : newline + 1]
+                begin = newline + 1
+            carry = data[begin:]
+        if carry:
+            yield pos - len(carry), carry
@@ -0,0 +1,496 @@
+"""
+SQLite storage backend (`STORAGE_MODE=sqlite`), standard-library `sqlite3` only.
+
+Same interface as `json_store` (selected in `escalada.storage`), stored in one database file
+(`SQLITE_PATH`, default `STORAGE_DIR/escalada.sqlite3`) in WAL mode:
+- `boxes`: one row per box, the state encoded with `box_codec` (same envelope as the box files)
+- `events`: the audit log; the raw NDJSON line plus indexed columns (box/time, time, action, actor)
+- `users`: one row per user; `settings`: small key/value documents (competition officials)
+
+Concurrency model:
+- every write runs on one dedicated writer thread with its own connection, so writes are
+  serialized without blocking the event loop; `persist_command` commits a command's state row and
+  its audit row in a single transaction (no state-without-audit window on crash)
+- reads use one connection per reader thread; WAL lets them run while the writer commits.
+  Async callers run reads in the threadpool (`run_in_threadpool`), streaming exports iterate the
+  cursor from the response's worker thread
+"""
+
+# -------------------- Standard library imports --------------------
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, TypeVar
+
+# -------------------- Local application imports --------------------
+from escalada.storage.audit_index import parse_created_at
+from escalada.storage.box_codec import (
+    BOX_SCHEMA_VERSION,
+    BoxStateFormatError,
+    decode_box_file,
+    encode_box_state,
+    migrate_box_state,
+)
+from escalada.storage.json_store import (
+    STORAGE_DIR,
+    _ensure_default_admin,
+    _normalize_officials,
+    _officials_payload,
+    build_audit_event,
+)
+
+STORAGE_MODE = "sqlite"
+SQLITE_PATH = os.getenv("SQLITE_PATH") or os.path.join(STORAGE_DIR, "escalada.sqlite3")
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boxes (
+    box_id INTEGER PRIMARY KEY,
+    box_version INTEGER NOT NULL DEFAULT 0,
+    schema_version INTEGER NOT NULL,
+    state BLOB NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT,
+    created_at TEXT,
+    ts REAL,
+    box_id INTEGER,
+    action TEXT,
+    actor TEXT,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_box_ts ON events (box_id, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_OFFICIALS_KEY = "competition_officials"
+
+
+def _event_row(event: dict) -> tuple:
+    created = parse_created_at(event.get("createdAt"))
+    return (
+        event.get("id"),
+        event.get("createdAt"),
+        created.timestamp() if created is not None else None,
+        event.get("boxId"),
+        event.get("action"),
+        event.get("actorUsername"),
+        json.dumps(event, ensure_ascii=False),
+    )
+
+
+def _box_row(box_id: int, state: dict) -> tuple:
+    # Encoded on the caller's thread: the live state keeps changing after the command returns.
+    return (
+        box_id,
+        int(state.get("boxVersion", 0) or 0),
+        BOX_SCHEMA_VERSION,
+        encode_box_state(state),
+        datetime.now(timezone.utc).isoformat(),
+    )
+
+
+_INSERT_EVENT = (
+    "INSERT INTO events (id, created_at, ts, box_id, action, actor, line) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_BOX = (
+    "INSERT OR REPLACE INTO boxes (box_id, box_version, schema_version, state, updated_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+class SqliteStore:
+    """One SQLite database: single writer thread + per-thread reader connections."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    # -------------------- Connections --------------------
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly (`_transaction`).
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across application crashes; a power loss may drop the last commits.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (the writer thread gets its own like any reader).
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn(conn)` in a transaction on the writer thread (blocking)."""
+        return self._writer.submit(self._write_in_thread, fn).result()
+
+    async def _write_async(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, self._write_in_thread, fn)
+
+    def _write_in_thread(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._conn()
+        with self._transaction(conn):
+            return fn(conn)
+
+    def close(self) -> None:
+        """Stop the writer thread (pending writes finish first)."""
+        self._writer.shutdown(wait=True)
+
+    def ensure(self) -> None:
+        self._conn()
+
+    # -------------------- Boxes --------------------
+    async def save_box_state(self, box_id: int, state: dict) -> None:
+        row = _box_row(box_id, state)
+        await self._write_async(lambda conn: conn.execute(_UPSERT_BOX, row))
+
+    async def persist_command(self, box_id: int, state: dict, event: dict) -> None:
+        """Store a command's new box state and its audit event in one transaction."""
+        box_row = _box_row(box_id, state)
+        event_row = _event_row(event)
+
+        def write(conn: sqlite3.Connection) -> None:
+            conn.execute(_UPSERT_BOX, box_row)
+            conn.execute(_INSERT_EVENT, event_row)
+
+        await self._write_async(write)
+
+    def load_box_states(self) -> Dict[int, dict]:
+        states: Dict[int, dict] = {}
+        migrated: list[tuple] = []
+        for box_id, blob in self._conn().execute("SELECT box_id, state FROM boxes"):
+            try:
+                version, _, data = decode_box_file(bytes(blob))
+                if version != BOX_SCHEMA_VERSION:
+                    data = migrate_box_state(data, version)
+                    migrated.append(_box_row(box_id, data))
+            except BoxStateFormatError as exc:
+                logger.error("Skipping box %s stored in the database: %s", box_id, exc)
+                continue
+            if "initiated" in data and not isinstance(data["initiated"], bool):
+                logger.warning("Invalid 'initiated' field for box %s, skipping", box_id)
+                continue
+            if "competitors" in data and not isinstance(data["competitors"], list):
+                logger.warning("Invalid 'competitors' field for box %s, skipping", box_id)
+                continue
+            states[box_id] = data
+        if migrated:
+            self._write(lambda conn: conn.executemany(_UPSERT_BOX, migrated))
+            logger.info("Migrated %s box states to schema %s", len(migrated), BOX_SCHEMA_VERSION)
+        if states:
+            logger.info(f"Successfully loaded {len(states)} valid box states")
+        return states
+
+    def clear_box_states(self) -> int:
+        return self._write(lambda conn: conn.execute("DELETE FROM boxes").rowcount)
+
+    # -------------------- Audit --------------------
+    async def append_audit_event(self, event: dict) -> None:
+        row = _event_row(event)
+        try:
+            await self._write_async(lambda conn: conn.execute(_INSERT_EVENT, row))
+        except sqlite3.Error as exc:
+            logger.warning("Failed to append audit event: %s", exc)
+
+    def read_latest_events(
+        self, *, limit: int = 200, include_payload: bool = False, box_id: int | None = None
+    ) -> list[dict]:
+        if box_id is None:
+            cursor = self._conn().execute(
+                "SELECT line FROM events ORDER BY seq DESC LIMIT ?", (limit,)
+            )
+        else:
+            cursor = self._conn().execute(
+                "SELECT line FROM events WHERE box_id = ? ORDER BY seq DESC LIMIT ?",
+                (box_id, limit),
+            )
+        events = []
+        for (line,) in cursor:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not include_payload:
+                event["payload"] = None
+            events.append(event)
+        return events
+
+    @staticmethod
+    def _audit_where(
+        since: datetime | None,
+        until: datetime | None,
+        box_id: int | None,
+        action: str | None,
+        actor: str | None,
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if since is not None:
+            since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+            clauses.append("ts >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            until = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+            clauses.append("ts < ?")
+            params.append(until.timestamp())
+        for column, value in (("box_id", box_id), ("action", action), ("actor", actor)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def iter_audit_lines(
+        self,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        box_id: int | None = None,
+        action: str | None = None,
+        actor: str | None = None,
+    ) -> Iterator[str]:
+        where, params = self._audit_where(since, until, box_id, action, actor)
+        cursor = self._conn().execute(f"SELECT line FROM events{where} ORDER BY seq", params)
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for (line,) in rows:
+                yield line
+
+    def query_audit_events(
+        self,
+        *,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        box_id: int | None = None,
+        action: str | None = None,
+        actor: str | None = None,
+        limit: int = 500,
+        include_payload: bool = True,
+        newest_first: bool = True,
+    ) -> list[dict]:
+        where, params = self._audit_where(since, until, box_id, action, actor)
+        order = "DESC" if newest_first else "ASC"
+        cursor = self._conn().execute(
+            f"SELECT line FROM events{where} ORDER BY seq {order} LIMIT ?", [*params, limit]
+        )
+        events = []
+        for (line,) in cursor:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not include_payload:
+                event["payload"] = None
+            events.append(event)
+        return events
+
+    def audit_size_bytes(self) -> int:
+        total = 0
+        for suffix in ("", "-wal"):
+            try:
+                total += os.path.getsize(f"{self.path}{suffix}")
+            except OSError:
+                pass
+        return total
+
+    # -------------------- Users / settings --------------------
+    def load_users(self) -> Dict[str, dict]:
+        users: Dict[str, dict] = {}
+        for username, data in self._conn().execute("SELECT username, data FROM users"):
+            try:
+                users[username] = json.loads(data)
+            except ValueError:
+                logger.warning("Skipping unreadable user row %s", username)
+        return users
+
+    def save_users(self, users: Dict[str, dict]) -> None:
+        rows = [(name, json.dumps(user, ensure_ascii=False)) for name, user in users.items()]
+
+        def write(conn: sqlite3.Connection) -> None:
+            # One transaction, touching only changed rows: removed users are deleted, new or
+            # modified ones upserted (saving one password does not rewrite every user).
+            stored = dict(conn.execute("SELECT username, data FROM users"))
+            removed = [(name,) for name in stored.keys() - users.keys()]
+            changed = [(name, data) for name, data in rows if stored.get(name) != data]
+            conn.executemany("DELETE FROM users WHERE username = ?", removed)
+            conn.executemany("INSERT OR REPLACE INTO users (username, data) VALUES (?, ?)", changed)
+
+        self._write(write)
+
+    def load_setting(self, key: str) -> Any:
+        row = self._conn().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_setting(self, key: str, value: Any) -> None:
+        self._write(self._setting_writer(key, value))
+
+    async def save_setting_async(self, key: str, value: Any) -> None:
+        await self._write_async(self._setting_writer(key, value))
+
+    @staticmethod
+    def _setting_writer(key: str, value: Any) -> Callable[[sqlite3.Connection], Any]:
+        payload = json.dumps(value, ensure_ascii=False)
+        return lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, payload)
+        )
+
+
+# -------------------- Module-level interface (same functions as json_store) --------------------
+_store: SqliteStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SqliteStore:
+    """Shared store for `SQLITE_PATH` (created on first use)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SqliteStore(SQLITE_PATH)
+        return _store
+
+
+def is_json_mode() -> bool:
+    return False
+
+
+def ensure_storage_dirs() -> None:
+    get_store().ensure()
+
+
+def clear_box_state_files() -> int:
+    """Delete all persisted box states (kept name: same interface as the JSON backend)."""
+    return get_store().clear_box_states()
+
+
+def load_box_states() -> Dict[int, dict]:
+    return get_store().load_box_states()
+
+
+async def save_box_state(box_id: int, state: dict) -> None:
+    await get_store().save_box_state(box_id, state)
+
+
+async def persist_command(box_id: int, state: dict, event: dict) -> None:
+    await get_store().persist_command(box_id, state, event)
+
+
+async def append_audit_event(event: dict) -> None:
+    await get_store().append_audit_event(event)
+
+
+def read_latest_events(
+    *, limit: int = 200, include_payload: bool = False, box_id: int | None = None
+) -> list[dict]:
+    return get_store().read_latest_events(
+        limit=limit, include_payload=include_payload, box_id=box_id
+    )
+
+
+def audit_segments() -> list[Path]:
+    """No file segments in SQLite mode (the whole log is in the `events` table)."""
+    return []
+
+
+def iter_audit_lines(**filters: Any) -> Iterator[str]:
+    return get_store().iter_audit_lines(**filters)
+
+
+def query_audit_events(**query: Any) -> list[dict]:
+    return get_store().query_audit_events(**query)
+
+
+def audit_size_bytes() -> int:
+    return get_store().audit_size_bytes()
+
+
+def audit_archive_bytes() -> int:
+    """No rotated archives in SQLite mode."""
+    return 0
+
+
+def schedule_audit_maintenance() -> None:
+    """Nothing to archive in SQLite mode (kept for interface parity with the JSON backend)."""
+    return None
+
+
+def load_users() -> Dict[str, dict]:
+    return get_store().load_users()
+
+
+def save_users(users: Dict[str, dict]) -> None:
+    get_store().save_users(users)
+
+
+def get_users_with_default_admin() -> Dict[str, dict]:
+    return _ensure_default_admin(load_users(), save_users)
+
+
+def load_competition_officials() -> dict[str, str]:
+    """Load global competition officials (judge chief + competition director + chief routesetter)."""
+    try:
+        return _normalize_officials(get_store().load_setting(_OFFICIALS_KEY))
+    except (sqlite3.Error, ValueError) as exc:
+        logger.error("Failed to load competition officials: %s", exc)
+        return _normalize_officials(None)
+
+
+def save_competition_officials(
+    judge_chief: str, competition_director: str, chief_routesetter: str
+) -> None:
+    get_store().save_setting(
+        _OFFICIALS_KEY, _officials_payload(judge_chief, competition_director, chief_routesetter)
+    )
+
+
+async def save_competition_officials_async(
+    judge_chief: str, competition_director: str, chief_routesetter: str
+) -> None:
+    """Async `save_competition_officials`: the write queues on the writer thread, not the loop."""
+    await get_store().save_setting_async(
+        _OFFICIALS_KEY, _officials_payload(judge_chief, competition_director, chief_routesetter)
+    )
+
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from escalada.api import save_ranking
+from escalada.api.artifact_cache import ArtifactCache, inputs_hash
+from escalada.api.export_jobs import ExportJobManager
+from escalada.api.official_export import official_export_inputs_hash
+from escalada.api.save_ranking import RankingIn, render_category_files
+
+
+def _render(snapshot):
+    return b"rendered:" + snapshot["categorie"].encode()
+
+
+def test_inputs_hash_is_order_independent():
+    assert inputs_hash({"a": 1, "b": [1, 2]}) == inputs_hash({"b": [1, 2], "a": 1})
+    assert inputs_hash({"a": 1}) != inputs_hash({"a": 2})
+
+
+def test_official_hash_ignores_timer_fields():
+    snap = {"boxId": 1, "categorie": "U13", "scores": {"Ana": [10.0]}, "remaining": 120}
+    ticking = {**snap, "remaining": 95, "timerState": "running", "currentClimber": "Ana"}
+    assert official_export_inputs_hash(snap) == official_export_inputs_hash(ticking)
+    scored = {**snap, "scores": {"Ana": [11.0]}}
+    assert official_export_inputs_hash(snap) != official_export_inputs_hash(scored)
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=25)
+    first = cache.put("aa01", b"x" * 10, ".zip")
+    second = cache.put("bb02", b"y" * 10, ".zip")
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+    assert cache.get("aa01", ".zip") == first  # touch: now most recently used
+
+    cache.put("cc03", b"z" * 10, ".zip")
+    assert cache.get("bb02", ".zip") is None
+    assert first.read_bytes() == b"x" * 10
+    assert cache.size_bytes() == 20
+
+
+def test_cached_artifact_skips_render(tmp_path, monkeypatch):
+    monkeypatch.setenv("RANKING_WORKERS", "0")
+
+    async def scenario():
+        manager = ExportJobManager(cache=ArtifactCache(tmp_path, 1024))
+        snap = {"categorie": "U13"}
+        job, _ = manager.submit(
+            kind="zip",
+            key=("k",),
+            render=_render,
+            render_input=snap,
+            filename="a.zip",
+            cache_key="abcd",
+        )
+        await job.wait()
+        assert job.path.read_bytes() == b"rendered:U13" and not job.cached
+
+        hit, _ = manager.submit(
+            kind="zip",
+            key=("k",),
+            render=_render,
+            render_input=snap,
+            filename="b.zip",
+            cache_key="abcd",
+        )
+        assert hit.status == "done" and hit.cached and hit.path == job.path
+        assert hit.to_dict()["size"] == len(b"rendered:U13")
+
+    asyncio.run(scenario())
+
+
+def test_save_ranking_skips_unchanged_inputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        save_ranking,
+        "resolve_rankings_with_time_tiebreak",
+        lambda **kwargs: {"overall_rows": [], "route_rows": [], "fingerprint": "fp"},
+    )
+    payload = RankingIn(categorie="U13F", route_count=1, scores={"Ana": [10.0], "Bob": [9.0]})
+
+    first = render_category_files(payload)
+    assert first["unchanged"] is False and len(first["saved"]) == 4
+    overall = tmp_path / "escalada/clasamente/U13F/overall.xlsx"
+    mtime = overall.stat().st_mtime_ns
+
+    again = render_category_files(payload)
+    assert again["unchanged"] is True and again["saved"] == first["saved"]
+    assert overall.stat().st_mtime_ns == mtime
+
+    changed = payload.model_copy(update={"scores": {"Ana": [10.0], "Bob": [12.0]}})
+    assert render_category_files(changed)["unchanged"] is False
@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+from escalada.storage import audit_index, json_store
+from escalada.storage.audit_archive import (
+    MANIFEST_NAME,
+    AuditArchiver,
+    archived_segments,
+    audit_archiver,
+)
+from escalada.storage.segment_file import SegmentFile, write_block_gzip
+
+START = datetime(2026, 5, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def _event(idx):
+    return {
+        "id": f"ev{idx}",
+        "createdAt": (START + timedelta(minutes=idx)).isoformat(),
+        "competitionId": 0,
+        "boxId": idx % 2,
+        "action": "SUBMIT_SCORE",
+        "actionId": None,
+        "boxVersion": idx,
+        "sessionId": "s",
+        "actorUsername": "judge",
+        "actorRole": "judge",
+        "actorIp": None,
+        "actorUserAgent": None,
+        "payload": {"score": idx, "note": "ș" * (idx % 5)},
+    }
+
+
+def _append_all(events):
+    async def run():
+        for event in events:
+            await json_store.append_audit_event(event)
+
+    asyncio.run(run())
+
+
+def _write_log(tmp_path, monkeypatch, *, segments=4, per_segment=25):
+    monkeypatch.setattr(json_store, "STORAGE_DIR", str(tmp_path))
+    events = [_event(i) for i in range(segments * per_segment)]
+    for start in range(0, len(events), per_segment):
+        # Rotate before the first event of each new segment.
+        monkeypatch.setattr(json_store, "MAX_AUDIT_FILE_SIZE_MB", 0 if start else 50)
+        _append_all(events[start : start + 1])
+        monkeypatch.setattr(json_store, "MAX_AUDIT_FILE_SIZE_MB", 50)
+        _append_all(events[start + 1 : start + per_segment])
+    audit_archiver.flush()
+    return events
+
+
+def test_rotated_segments_are_compressed_and_read_transparently(tmp_path, monkeypatch):
+    events = _write_log(tmp_path, monkeypatch)
+    archives = archived_segments(tmp_path)
+    assert [p.name.endswith(".ndjson.gz") for p in archives] == [True, True, True]
+    assert not list(tmp_path.glob("events.*.ndjson"))
+
+    # Still one valid gzip stream with the original lines.
+    with gzip.open(archives[0], "rt", encoding="utf-8") as handle:
+        assert [json.loads(line)["id"] for line in handle] == [e["id"] for e in events[:25]]
+
+    ids = [json.loads(line)["id"] for line in json_store.iter_audit_lines()]
+    assert ids == [e["id"] for e in events]
+    filtered = json_store.query_audit_events(box_id=1, since=START + timedelta(minutes=30), limit=3)
+    assert [e["id"] for e in filtered] == ["ev99", "ev97", "ev95"]
+    # The tail continues into the compressed archives.
+    latest = json_store.read_latest_events(limit=30)
+    assert [e["id"] for e in latest] == [f"ev{i}" for i in range(99, 69, -1)]
+    assert latest[0]["payload"] is None
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert [entry["name"] for entry in manifest["segments"]] == [p.name for p in archives]
+    assert [entry["events"] for entry in manifest["segments"]] == [25, 25, 25]
+    assert manifest["segments"][0]["firstEventAt"] == events[0]["createdAt"]
+    assert manifest["segments"][0]["lastEventAt"] == events[24]["createdAt"]
+    assert manifest["totalStoredBytes"] == sum(p.stat().st_size for p in archives)
+    assert manifest["totalStoredBytes"] < manifest["totalRawBytes"]
+    assert json_store.audit_archive_bytes() == manifest["totalStoredBytes"]
+
+
+def test_segment_compressed_between_listing_and_reading(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_archiver, "compress", False)
+    events = _write_log(tmp_path, monkeypatch, segments=3, per_segment=10)
+    listed = json_store.audit_segments()
+    assert [p.name.endswith(".ndjson") for p in listed] == [True, True, True]
+
+    # The archiver compresses and unlinks the plain segments after they were listed.
+    AuditArchiver(compress=True).run(tmp_path)
+    assert not list(tmp_path.glob("events.*.ndjson"))
+    monkeypatch.setattr(json_store, "audit_segments", lambda: list(listed))
+
+    ids = [json.loads(line)["id"] for line in json_store.iter_audit_lines()]
+    assert ids == [e["id"] for e in events]
+    found = json_store.query_audit_events(box_id=0, until=START + timedelta(minutes=10), limit=2)
+    assert [e["id"] for e in found] == ["ev8", "ev6"]
+
+
+def test_retention_by_count_and_age(tmp_path, monkeypatch):
+    _write_log(tmp_path, monkeypatch, segments=5, per_segment=3)
+    archives = archived_segments(tmp_path)
+    assert len(archives) == 4
+
+    manifest = AuditArchiver(keep_segments=2).run(tmp_path)
+    assert archived_segments(tmp_path) == archives[2:]
+    assert [entry["name"] for entry in manifest["segments"]] == [p.name for p in archives[2:]]
+    for removed in archives[:2]:
+        assert not list(tmp_path.glob(removed.name + "*"))
+    assert [json.loads(line)["id"] for line in json_store.iter_audit_lines()][0] == "ev6"
+
+    # Archives rotated more than `keep_days` ago are dropped (rotation time from the name).
+    old = tmp_path / "events.20200101000000.ndjson"
+    old.write_text(json.dumps(_event(0)) + "\n", encoding="utf-8")
+    AuditArchiver(keep_days=30).run(tmp_path)
+    assert not list(tmp_path.glob("events.20200101000000.ndjson*"))
+    assert archived_segments(tmp_path) == archives[2:]
+
+
+def test_hand_compressed_segment_without_block_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_store, "STORAGE_DIR", str(tmp_path))
+    lines = "".join(json.dumps(_event(i)) + "\n" for i in range(40))
+    (tmp_path / "events.20260501000000.ndjson.gz").write_bytes(gzip.compress(lines.encode()))
+
+    with SegmentFile(tmp_path / "events.20260501000000.ndjson.gz") as raw:
+        assert raw.size == len(lines.encode())
+    found = json_store.query_audit_events(box_id=0, limit=2)
+    assert [e["id"] for e in found] == ["ev38", "ev36"]
+    # The index was built from the compressed stream and written next to it.
+    index = audit_index.sidecar(tmp_path / "events.20260501000000.ndjson.gz", ".idx")
+    assert index.stat().st_size == 40 * audit_index.RECORD.size
+
+
+def test_block_gzip_random_access(tmp_path):
+    source = tmp_path / "events.20260501000000.ndjson"
+    data = "".join(json.dumps(_event(i)) + "\n" for i in range(200)).encode()
+    source.write_bytes(data)
+    target = tmp_path / "events.20260501000000.ndjson.gz"
+    raw_bytes, stored = write_block_gzip(source, target, block_bytes=4096)
+    assert (raw_bytes, stored) == (len(data), target.stat().st_size)
+    assert gzip.decompress(target.read_bytes()) == data
+
+    with SegmentFile(target) as raw:
+        assert raw.size == len(data)
+        assert len(raw._raw_offsets) > 10  # one gzip member per ~4 KB of lines
+        for start, end in [(0, 10), (4000, 9000), (len(data) - 50, len(data))]:
+            assert raw.read(start, end) == data[start:end]
+        lines = list(raw.iter_lines(0))
+        assert b"".join(line for _, line in lines) == data
+        assert all(data[offset : offset + len(line)] == line for offset, line in lines)
@@ -0,0 +1,99 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from escalada.api import audit
+from escalada.storage import json_store
+
+
+def _event(idx, box_id, action, actor, created_at):
+    return {
+        "id": f"ev{idx}",
+        "createdAt": created_at,
+        "competitionId": 0,
+        "boxId": box_id,
+        "action": action,
+        "actionId": None,
+        "boxVersion": idx,
+        "sessionId": "s",
+        "actorUsername": actor,
+        "actorRole": "judge",
+        "actorIp": None,
+        "actorUserAgent": None,
+        # Nested keys with envelope names must not be mistaken for the envelope fields.
+        "payload": {"boxId": 99, "action": "NESTED", "note": 'quote " and ș'},
+    }
+
+
+def _write_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_store, "STORAGE_DIR", str(tmp_path))
+    rotated = [
+        _event(1, 1, "INIT_ROUTE", "admin", "2026-05-01T08:00:00+00:00"),
+        _event(2, 1, "SUBMIT_SCORE", "judge1", "2026-05-01T09:00:00.250000+00:00"),
+    ]
+    live = [
+        _event(3, 2, "SUBMIT_SCORE", "judge2", "2026-05-01T10:00:00+00:00"),
+        _event(4, 1, "SUBMIT_SCORE", "judge1", "2026-05-01T11:00:00+00:00"),
+    ]
+    (tmp_path / "events.20260501093000.ndjson").write_text(
+        "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in rotated), encoding="utf-8"
+    )
+    (tmp_path / "events.ndjson").write_text(
+        "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in live) + "\n", encoding="utf-8"
+    )
+
+
+def _export(**params):
+    defaults = dict(
+        fmt="ndjson",
+        since=None,
+        until=None,
+        box_id=None,
+        action=None,
+        actor=None,
+        include_payload=True,
+        claims={"role": "admin"},
+    )
+    response = asyncio.run(audit.export_audit_events(**{**defaults, **params}))
+
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(read()).decode("utf-8")
+
+
+def test_ndjson_export_spans_segments_and_passes_lines_through(tmp_path, monkeypatch):
+    _write_segments(tmp_path, monkeypatch)
+    body = _export()
+    assert [json.loads(line)["id"] for line in body.splitlines()] == ["ev1", "ev2", "ev3", "ev4"]
+    # Stored lines are sent unchanged (no re-serialization).
+    assert body.splitlines()[0] == (tmp_path / "events.20260501093000.ndjson").read_text(
+        encoding="utf-8"
+    ).splitlines()[0]
+
+
+def test_export_filters(tmp_path, monkeypatch):
+    _write_segments(tmp_path, monkeypatch)
+
+    def ids(**params):
+        return [json.loads(line)["id"] for line in _export(**params).splitlines()]
+
+    assert ids(box_id=1) == ["ev1", "ev2", "ev4"]
+    assert ids(action="SUBMIT_SCORE", actor="judge1") == ["ev2", "ev4"]
+    assert ids(action="NESTED") == []
+    assert ids(
+        since=datetime(2026, 5, 1, 9, 0, 0, 250000, tzinfo=timezone.utc),
+        until=datetime(2026, 5, 1, 11, 0),
+    ) == ["ev2", "ev3"]
+    lines = _export(box_id=2, include_payload=False).splitlines()
+    assert json.loads(lines[0])["payload"] is None
+
+
+def test_csv_export(tmp_path, monkeypatch):
+    _write_segments(tmp_path, monkeypatch)
+    rows = list(csv.DictReader(io.StringIO(_export(fmt="csv", actor="judge1"))))
+    assert [row["id"] for row in rows] == ["ev2", "ev4"]
+    assert rows[0]["boxId"] == "1" and rows[0]["actorIp"] == ""
+    assert json.loads(rows[0]["payload"])["note"] == 'quote " and ș'
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from escalada.api import audit
+from escalada.storage import audit_index, json_store
+from escalada.storage.audit_archive import audit_archiver
+
+START = datetime(2026, 5, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def _event(idx):
+    return {
+        "id": f"ev{idx}",
+        "createdAt": (START + timedelta(minutes=idx)).isoformat(),
+        "competitionId": 0,
+        "boxId": idx % 3,
+        "action": "SET_TIME_TIEBREAK_DECISION" if idx % 7 == 0 else "SUBMIT_SCORE",
+        "actionId": None,
+        "boxVersion": idx,
+        "sessionId": "s",
+        "actorUsername": f"judge{idx % 2}",
+        "actorRole": "judge",
+        "actorIp": None,
+        "actorUserAgent": None,
+        "payload": {"boxId": 99, "action": "NESTED", "score": idx},
+    }
+
+
+def _append_all(events):
+    async def run():
+        for event in events:
+            await json_store.append_audit_event(event)
+
+    asyncio.run(run())
+
+
+def _write_rotated_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_store, "STORAGE_DIR", str(tmp_path))
+    events = [_event(i) for i in range(60)]
+    _append_all(events[:30])
+    # Rotate once: the first 30 events move to an archive segment with their index.
+    monkeypatch.setattr(json_store, "MAX_AUDIT_FILE_SIZE_MB", 0)
+    _append_all(events[30:31])
+    monkeypatch.setattr(json_store, "MAX_AUDIT_FILE_SIZE_MB", 50)
+    _append_all(events[31:])
+    # The archive segment is compressed in the background; queries read it transparently.
+    audit_archiver.flush()
+    return events
+
+
+def _expected(events, since=None, until=None, box_id=None, action=None, actor=None):
+    return [
+        e["id"]
+        for e in events
+        if (box_id is None or e["boxId"] == box_id)
+        and (action is None or e["action"] == action)
+        and (actor is None or e["actorUsername"] == actor)
+        and (since is None or datetime.fromisoformat(e["createdAt"]) >= since)
+        and (until is None or datetime.fromisoformat(e["createdAt"]) < until)
+    ]
+
+
+def test_writer_maintains_index_across_rotation(tmp_path, monkeypatch):
+    events = _write_rotated_log(tmp_path, monkeypatch)
+    segments = json_store.audit_segments()
+    assert len(segments) == 2
+    counts = []
+    for segment in segments:
+        index_path = audit_index.sidecar(segment, audit_index.INDEX_SUFFIX)
+        assert index_path.stat().st_size % audit_index.RECORD.size == 0
+        counts.append(index_path.stat().st_size // audit_index.RECORD.size)
+    assert counts == [30, 30]
+
+    filters = [
+        {},
+        {"box_id": 1},
+        {"action": "SET_TIME_TIEBREAK_DECISION"},
+        {"actor": "judge1", "box_id": 2},
+        {
+            "box_id": 1,
+            "since": START + timedelta(minutes=10),
+            "until": START + timedelta(minutes=45),
+        },
+        {"actor": "nobody"},
+    ]
+    for flt in filters:
+        expected = _expected(events, **flt)
+        assert [json.loads(line)["id"] for line in json_store.iter_audit_lines(**flt)] == expected
+        newest = json_store.query_audit_events(**flt, limit=5)
+        assert [e["id"] for e in newest] == expected[::-1][:5]
+        oldest = json_store.query_audit_events(**flt, limit=1000, newest_first=False)
+        assert [e["id"] for e in oldest] == expected
+
+
+def test_missing_and_stale_indexes_are_rebuilt(tmp_path, monkeypatch):
+    events = _write_rotated_log(tmp_path, monkeypatch)
+    archive, live = json_store.audit_segments()
+    audit_index.remove_sidecars(archive)
+    live_index = audit_index.sidecar(live, audit_index.INDEX_SUFFIX)
+    # Crash mid-record: the last record is partial; one more line was written unindexed.
+    with live_index.open("r+b") as handle:
+        handle.truncate(live_index.stat().st_size - 5)
+    extra = _event(60)
+    with live.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(extra) + "\n")
+    audit_index.forget()
+    events.append(extra)
+
+    flt = {"box_id": 0, "since": START + timedelta(minutes=20)}
+    assert [e["id"] for e in json_store.query_audit_events(**flt, limit=100)] == (
+        _expected(events, **flt)[::-1]
+    )
+    # The rotated segment's index was rebuilt on read.
+    rebuilt = audit_index.sidecar(archive, audit_index.INDEX_SUFFIX).stat().st_size
+    assert rebuilt == 30 * audit_index.RECORD.size
+
+    # The next append repairs the live index before adding its own record.
+    events.append(_event(61))
+    _append_all(events[-1:])
+    assert live_index.stat().st_size == 32 * audit_index.RECORD.size
+    assert [json.loads(line)["id"] for line in json_store.iter_audit_lines(box_id=1)] == (
+        _expected(events, box_id=1)
+    )
+
+
+def test_query_endpoint(tmp_path, monkeypatch):
+    _write_rotated_log(tmp_path, monkeypatch)
+    rows = asyncio.run(
+        audit.search_audit_events(
+            since=START + timedelta(minutes=14),
+            until=START + timedelta(minutes=30),
+            box_id=None,
+            action="SET_TIME_TIEBREAK_DECISION",
+            actor=None,
+            limit=500,
+            order="desc",
+            include_payload=True,
+            claims={"role": "admin"},
+        )
+    )
+    assert [row.id for row in rows] == ["ev28", "ev21", "ev14"]
+    assert rows[0].payload == {"boxId": 99, "action": "NESTED", "score": 28}
@@ -28,6 +28,27 @@ class FetchBoxSnapshotTest(unittest.TestCase):
         self.assertEqual(snap["times"], {"Ana": [12.34, 11.0]})
         self.assertTrue(snap["timeCriterionEnabled"])
 
+    def test_ranking_block_is_opt_in_and_cached_per_version(self):
+        from escalada.api.backup import _snapshot_from_state
+
+        state = {
+            "sessionId": "s1",
+            "boxVersion": 4,
+            "routesCount": 1,
+            "scores": {"Ana": [3.0], "Bob": [5.0]},
+            "competitors": [],
+        }
+        self.assertNotIn("ranking", _snapshot_from_state(2, state))
+
+        first = _snapshot_from_state(2, state, include_ranking=True)["ranking"]
+        self.assertEqual([row["Nume"] for row in first], ["Bob", "Ana"])
+        self.assertIs(_snapshot_from_state(2, dict(state), include_ranking=True)["ranking"], first)
+
+        state["scores"]["Cris"] = [9.0]
+        state["boxVersion"] = 5
+        updated = _snapshot_from_state(2, state, include_ranking=True)["ranking"]
+        self.assertEqual(updated[0]["Nume"], "Cris")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,59 @@
+import json
+
+from escalada.scripts.bench_ranking import (
+    TARGETS,
+    compare_reports,
+    generate_competition,
+    main,
+    run_suite,
+)
+
+
+def test_generator_is_deterministic_and_shaped_like_box_state():
+    state = generate_competition(50, 3, tie_density=0.5, seed=3)
+    assert state == generate_competition(50, 3, tie_density=0.5, seed=3)
+    assert len(state["scores"]) == 50
+    assert all(len(row) == 3 for row in state["scores"].values())
+    assert state["routesCount"] == 3 and state["routeIndex"] == 3
+
+    dense = generate_competition(300, 1, tie_density=0.9, seed=1)
+    sparse = generate_competition(300, 1, tie_density=0.0, seed=1)
+    distinct = lambda s: len({row[0] for row in s["scores"].values()})
+    assert distinct(dense) < distinct(sparse)
+
+
+def test_suite_reports_every_case_and_target():
+    report = run_suite((10, 30), (1, 2), (0.3,), repeat=2, max_overall_athletes=10)
+    assert len(report["results"]) == 2 * 2 * len(TARGETS)
+    skipped = [r for r in report["results"] if r.get("skipped")]
+    assert {(r["athletes"], r["target"]) for r in skipped} == {(30, "overall_df")}
+    timed = [r for r in report["results"] if not r.get("skipped")]
+    assert all(r["runs"] == 2 and r["medianMs"] >= 0 for r in timed)
+    json.dumps(report)
+
+
+def test_compare_flags_only_meaningful_slowdowns():
+    base = {"results": [
+        {"case": "a", "target": "resolve", "medianMs": 10.0},
+        {"case": "b", "target": "resolve", "medianMs": 0.1},
+    ]}
+    current = {"results": [
+        {"case": "a", "target": "resolve", "medianMs": 15.0},
+        {"case": "b", "target": "resolve", "medianMs": 0.3},
+        {"case": "c", "target": "resolve", "medianMs": 99.0},
+    ]}
+    regressions = compare_reports(current, base, threshold=0.25)
+    assert [(r["case"], r["ratio"]) for r in regressions] == [("a", 1.5)]
+    assert compare_reports(current, base, threshold=0.6) == []
+
+
+def test_cli_compare_exit_status(tmp_path):
+    out = tmp_path / "bench.json"
+    args = ["--sizes", "10", "--routes", "1", "--tie-densities", "0.2", "--repeat", "2"]
+    assert main(args + ["--output", str(out)]) == 0
+    baseline = json.loads(out.read_text())
+    for item in baseline["results"]:
+        item["medianMs"] = 1e-6
+    slow = tmp_path / "fast_baseline.json"
+    slow.write_text(json.dumps(baseline))
+    assert main(args + ["--compare", str(slow), "--min-delta-ms", "0"]) == 1
@@ -0,0 +1,28 @@
+from escalada.scripts.bench_startup import measure, parse_importtime
+
+
+def test_parse_importtime_lines():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:      2000 |       5000 | escalada.main",
+            "noise",
+        ]
+    )
+    entries = parse_importtime(stderr)
+    assert [(e["module"], e["cumulativeUs"], e["depth"]) for e in entries] == [
+        ("_io", 120, 1),
+        ("escalada.main", 5000, 0),
+    ]
+
+
+def test_export_modules_do_not_load_heavy_dependencies_at_import():
+    for module in (
+        "escalada.api.official_export",
+        "escalada.api.podium",
+        "escalada.routers.upload",
+    ):
+        report = measure(module)
+        assert report["heavyLoaded"] == [], module
+        assert any(entry["module"] == module for entry in report["imports"])
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+from escalada.scripts import bench_box_store, dump_box_state
+from escalada.storage import box_codec, json_store
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_store, "STORAGE_DIR", str(tmp_path))
+    json_store.ensure_storage_dirs()
+    return tmp_path / "boxes"
+
+
+def test_save_writes_compact_versioned_json(storage):
+    state = {"sessionId": "s1", "boxVersion": 3, "categorie": "Cățărare", "scores": {"A": [1.0]}}
+    asyncio.run(json_store.save_box_state(2, state))
+    raw = (storage / "2.json").read_text(encoding="utf-8")
+    assert "\n" not in raw and ": " not in raw
+    assert json.loads(raw) == {"schemaVersion": box_codec.BOX_SCHEMA_VERSION, "state": state}
+    assert json_store.load_box_states() == {2: state}
+
+
+def test_legacy_files_are_migrated_once(storage, monkeypatch):
+    (storage / "1.json").write_text(
+        json.dumps({"initiated": True, "routeIndex": 3, "competitors": []}, indent=2),
+        encoding="utf-8",
+    )
+    (storage / "9.json").write_text(
+        json.dumps({"schemaVersion": box_codec.BOX_SCHEMA_VERSION + 1, "state": {}}),
+        encoding="utf-8",
+    )
+    states = json_store.load_box_states()
+    assert set(states) == {1}
+    assert states[1]["routesCount"] == 3 and states[1]["holdsCounts"] == []
+    assert states[1]["boxVersion"] == 0 and states[1]["sessionId"]
+
+    stored = json.loads((storage / "1.json").read_text(encoding="utf-8"))
+    assert stored["schemaVersion"] == box_codec.BOX_SCHEMA_VERSION
+    # A newer schema than supported is left untouched.
+    assert json.loads((storage / "9.json").read_text(encoding="utf-8"))["state"] == {}
+    (storage / "9.json").unlink()
+
+    def no_migration(state, version):
+        raise AssertionError("current-format files must not be migrated again")
+
+    monkeypatch.setattr(json_store, "migrate_box_state", no_migration)
+    assert json_store.load_box_states()[1]["sessionId"] == states[1]["sessionId"]
+
+
+def test_msgpack_encoding_roundtrip(storage):
+    pytest.importorskip("msgpack")
+    (storage / "4.json").write_text(json.dumps({"boxVersion": 5}), encoding="utf-8")
+    assert json_store.load_box_states(encoding="msgpack")[4]["boxVersion"] == 5
+    assert not (storage / "4.json").exists()
+    assert (storage / "4.msgpack").read_bytes().startswith(box_codec.MSGPACK_MAGIC)
+    assert json_store.load_box_states(encoding="msgpack")[4]["boxVersion"] == 5
+
+
+def test_duplicate_box_files_keep_the_newest_state(storage):
+    pytest.importorskip("msgpack")
+    current = box_codec.encode_box_state({"boxVersion": 7}, "msgpack")
+    (storage / "3.msgpack").write_bytes(current)
+    (storage / "3.json").write_text(json.dumps({"boxVersion": 4}), encoding="utf-8")
+    (storage / "5.msgpack").write_bytes(box_codec.encode_box_state({"boxVersion": 2}, "msgpack"))
+    (storage / "5.json").write_text(json.dumps({"boxVersion": 6}), encoding="utf-8")
+
+    states = json_store.load_box_states(encoding="msgpack")
+    assert states[3]["boxVersion"] == 7 and states[5]["boxVersion"] == 6
+    # The older duplicate is dropped (never re-encoded over the newer file).
+    assert not (storage / "3.json").exists()
+    assert (storage / "3.msgpack").read_bytes() == current
+    assert not (storage / "5.json").exists()
+    assert json_store.load_box_states(encoding="msgpack")[5]["boxVersion"] == 6
+
+
+def test_dump_box_state_prints_readable_json(storage, capsys):
+    asyncio.run(json_store.save_box_state(3, {"boxVersion": 1, "categorie": "U15"}))
+    assert dump_box_state.main(["--storage-dir", str(storage.parent), "--box", "3"]) == 0
+    view = json.loads(capsys.readouterr().out)
+    assert view["encoding"] == "json" and view["state"]["categorie"] == "U15"
+    assert dump_box_state.main(["--storage-dir", str(storage.parent), "--box", "8"]) == 1
+
+
+def test_bench_box_store_smoke():
+    report = bench_box_store.run(boxes=3, athletes=20, routes=2, repeat=1)
+    assert report["compact"]["bytes"] < report["legacy"]["bytes"]
+    assert report["legacy"]["loadMs"] > 0 and report["compact"]["writeMs"] > 0
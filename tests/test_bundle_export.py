@@ -0,0 +1,125 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+from escalada.api import backup, bundle_export, live, official_export
+from escalada.api.artifact_cache import ArtifactCache
+from escalada.api.export_jobs import ExportJobManager, export_jobs
+
+
+def _no_tiebreak(**kwargs):
+    return {"overall_rows": [], "route_rows": []}
+
+
+@pytest.fixture(autouse=True)
+def thread_workers(monkeypatch):
+    monkeypatch.setenv("RANKING_WORKERS", "0")
+    monkeypatch.setattr(official_export, "resolve_rankings_with_time_tiebreak", _no_tiebreak)
+
+
+_SNAP = {"boxId": 1, "categorie": "U13 F", "routesCount": 1, "scores": {"Ana": [10.0]}}
+
+
+def _bundle(snapshots, cache=None, on_box=None):
+    async def read():
+        return b"".join(
+            [c async for c in bundle_export.iter_official_bundle(snapshots, cache, on_box)]
+        )
+
+    return zipfile.ZipFile(io.BytesIO(asyncio.run(read())))
+
+
+def test_bundle_has_one_folder_per_box_and_an_index(tmp_path):
+    cache = ArtifactCache(tmp_path, 1024 * 1024)
+    seen = []
+    zf = _bundle([_SNAP, {**_SNAP, "boxId": 2}, {"boxId": 3}], cache, seen.append)
+    assert zf.testzip() is None
+    assert {name.split("/")[0] for name in zf.namelist()} == {
+        "U13_F_box1",
+        "U13_F_box2",
+        "index.json",
+    }
+    assert "U13_F_box1/overall.xlsx" in zf.namelist()
+
+    index = json.loads(zf.read("index.json"))
+    assert index["boxCount"] == 3 and index["exported"] == 2
+    by_box = {entry["boxId"]: entry for entry in index["boxes"]}
+    assert by_box[3]["status"] == "skipped" and by_box[3]["files"] == []
+    assert "U13_F_box2/metadata.json" in by_box[2]["files"]
+    assert len(seen) == 3
+
+    # Unchanged boxes are served from the per-box artifact cache on the next bundle.
+    index = json.loads(_bundle([_SNAP], cache).read("index.json"))
+    assert index["boxes"][0]["cached"] is True
+
+
+def test_bundle_index_orders_boxes_numerically():
+    snapshots = [{**_SNAP, "boxId": box_id} for box_id in (10, 2, 1)]
+    zf = _bundle(snapshots)
+    index = json.loads(zf.read("index.json"))
+    assert [entry["boxId"] for entry in index["boxes"]] == [1, 2, 10]
+    assert zf.testzip() is None
+    assert all(name in zf.namelist() for entry in index["boxes"] for name in entry["files"])
+
+
+def test_box_members_are_yielded_as_they_are_written():
+    box = bundle_export.BoxExport(
+        box_id=1,
+        categorie="U13 F",
+        folder="U13_F_box1",
+        inputs_hash="x",
+        zip_bytes=official_export.build_official_results_zip(_SNAP),
+    )
+    files = []
+    members = bundle_export._box_members(bundle_export.ZipStreamWriter(), box, files)
+    assert next(members)
+    assert len(files) == 1
+    list(members)
+    assert len(files) > 1
+
+
+def test_bundle_job_reports_progress_per_box():
+    async def scenario():
+        manager = ExportJobManager(concurrency=1, max_pending=2)
+        snapshots = [_SNAP, {**_SNAP, "boxId": 2}]
+
+        async def runner(job):
+            return await bundle_export.run_bundle_job(job, snapshots)
+
+        job, _ = manager.submit(
+            kind="official_bundle", key=("bundle",), runner=runner, filename="bundle.zip"
+        )
+        await job.wait()
+        return job
+
+    job = asyncio.run(scenario())
+    payload = job.to_dict()
+    assert job.status == "done"
+    assert payload["partsDone"] == payload["partsTotal"] == 2
+    assert {part["boxId"] for part in payload["parts"]} == {1, 2}
+    assert zipfile.ZipFile(io.BytesIO(job.result)).testzip() is None
+
+
+def test_bundle_job_endpoint(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_jobs, "cache", ArtifactCache(tmp_path, 1024 * 1024))
+    monkeypatch.setattr(
+        live,
+        "state_map",
+        {1: {"categorie": "U13F", "routesCount": 1, "scores": {"Ana": [10.0]}}},
+    )
+    claims = {"role": "admin"}
+
+    async def scenario():
+        submitted = await backup.submit_official_bundle_job(box_ids=None, claims=claims)
+        job = export_jobs.get(submitted["job"]["jobId"])
+        await job.wait()
+        again = await backup.submit_official_bundle_job(box_ids=None, claims=claims)
+        return job, again
+
+    job, again = asyncio.run(scenario())
+    assert job.status == "done" and job.filename.startswith("official_bundle_")
+    # Same boxes, same inputs: the finished bundle comes straight from the artifact cache.
+    assert again["job"]["status"] == "done" and again["job"]["jobId"] != job.id
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from escalada.api import backup, live
+from escalada.api.artifact_cache import ArtifactCache
+from escalada.api.export_jobs import ExportJobManager, ExportQueueFull, export_jobs
+
+
+def _slow_render(snapshot):
+    time.sleep(0.05)
+    if not snapshot.get("scores"):
+        raise ValueError("missing_scores")
+    return f"zip:{snapshot['boxId']}".encode()
+
+
+def _submit(manager, key, snapshot):
+    return manager.submit(
+        kind="zip", key=key, render=_slow_render, render_input=snapshot, filename=f"{key[0]}.zip"
+    )
+
+
+_SCORED = {"boxId": 1, "scores": {"A": [1]}}
+
+
+@pytest.fixture(autouse=True)
+def thread_workers(monkeypatch):
+    monkeypatch.setenv("RANKING_WORKERS", "0")
+
+
+def test_single_flight_bounded_queue_and_status():
+    async def scenario():
+        manager = ExportJobManager(concurrency=1, max_pending=2)
+        first, dup = _submit(manager, ("a",), _SCORED)
+        again, dedup = _submit(manager, ("a",), _SCORED)
+        assert not dup and dedup and again is first
+        second, _ = _submit(manager, ("b",), {"boxId": 2})
+        with pytest.raises(ExportQueueFull):
+            _submit(manager, ("c",), {})
+
+        await asyncio.sleep(0)
+        assert first.status == "running"
+        assert manager.queue_position(second) == 1
+
+        await first.wait()
+        await second.wait()
+        assert first.to_dict()["progress"] == 1.0 and first.result == b"zip:1"
+        assert second.status == "failed" and second.invalid_input and second.error == "missing_scores"
+
+        # Finished jobs no longer deduplicate; a new render starts.
+        third, dedup = _submit(manager, ("a",), _SCORED)
+        assert not dedup and third is not first
+        await third.wait()
+
+    asyncio.run(scenario())
+
+
+def test_expired_jobs_are_pruned():
+    async def scenario():
+        manager = ExportJobManager(ttl_sec=0)
+        job, _ = _submit(manager, ("a",), _SCORED)
+        assert manager.get(job.id) is job
+        await job.wait()
+        job.finished_at -= 1
+        assert manager.get(job.id) is None
+
+    asyncio.run(scenario())
+
+
+def test_official_export_endpoints_submit_poll_and_download(monkeypatch, tmp_path):
+    monkeypatch.setattr(backup, "build_official_results_zip", _slow_render)
+    monkeypatch.setattr(export_jobs, "cache", ArtifactCache(tmp_path, 1024 * 1024))
+    monkeypatch.setattr(
+        live,
+        "state_map",
+        {
+            4: {"categorie": "U13F", "boxVersion": 2, "routesCount": 1, "scores": {"Ana": [10.0]}},
+            5: {"categorie": "U15M", "boxVersion": 1, "routesCount": 1, "scores": {}},
+        },
+    )
+    claims = {"role": "admin"}
+
+    async def scenario():
+        submitted = await backup.submit_official_export_job(4, claims=claims)
+        again = await backup.submit_official_export_job(4, claims=claims)
+        job_id = submitted["job"]["jobId"]
+        assert again["deduplicated"] and again["job"]["jobId"] == job_id
+
+        with pytest.raises(HTTPException) as exc:
+            await backup.export_job_download(job_id, claims=claims)
+        assert exc.value.status_code == 409
+
+        await export_jobs.get(job_id).wait()
+        status = await backup.export_job_status(job_id, claims=claims)
+        assert status["job"]["status"] == "done" and status["job"]["size"] == len(b"zip:4")
+        response = await backup.export_job_download(job_id, claims=claims)
+        assert open(response.path, "rb").read() == b"zip:4"
+        assert "official_U13F_box4_" in response.headers["content-disposition"]
+
+        # The blocking endpoint serves the cached artifact; invalid input still maps to 400.
+        direct = await backup.export_official_results_zip(4, claims=claims)
+        assert direct.path == response.path
+        with pytest.raises(HTTPException) as exc:
+            await backup.export_official_results_zip(5, claims=claims)
+        assert exc.value.status_code == 400 and exc.value.detail == "missing_scores"
+
+        with pytest.raises(HTTPException) as exc:
+            await backup.export_job_status("nope", claims=claims)
+        assert exc.value.status_code == 404
+
+    asyncio.run(scenario())
+
+
+def test_blocking_official_export_renders_as_a_worker_job(monkeypatch, tmp_path):
+    rendered = []
+
+    def _render(snapshot):
+        rendered.append(snapshot["boxId"])
+        return _slow_render(snapshot)
+
+    monkeypatch.setattr(backup, "build_official_results_zip", _render)
+    monkeypatch.setattr(export_jobs, "cache", ArtifactCache(tmp_path, 1024 * 1024))
+    monkeypatch.setattr(
+        live,
+        "state_map",
+        {6: {"categorie": "U17F", "boxVersion": 1, "routesCount": 1, "scores": {"Ana": [9.0]}}},
+    )
+    claims = {"role": "admin"}
+
+    async def scenario():
+        first, second = await asyncio.gather(
+            backup.export_official_results_zip(6, claims=claims),
+            backup.export_official_results_zip(6, claims=claims),
+        )
+        assert first.path == second.path
+        assert open(first.path, "rb").read() == b"zip:6"
+        # Concurrent requests shared one job; a repeat request is a cache hit.
+        await backup.export_official_results_zip(6, claims=claims)
+        assert rendered == [6]
+
+    asyncio.run(scenario())
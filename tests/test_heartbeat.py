@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from escalada.api.heartbeat import HeartbeatScheduler
+
+
+class _FakeWs:
+    def __init__(self, fail_send: bool = False):
+        self.fail_send = fail_send
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+
+    async def send_text(self, text: str) -> None:
+        if self.fail_send:
+            raise RuntimeError("socket gone")
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def test_tick_pings_live_sockets_and_closes_stale_in_bulk():
+    async def scenario():
+        scheduler = HeartbeatScheduler(interval=3600)
+        fresh, stale, broken = _FakeWs(), _FakeWs(), _FakeWs(fail_send=True)
+        for ws in (fresh, stale, broken):
+            scheduler.register(ws, label="test", timeout=60)
+
+        now = asyncio.get_running_loop().time()
+        scheduler._entries[stale].last_pong = now - 120
+        scheduler.touch(fresh)
+
+        closed = await scheduler.tick(now)
+        remaining = len(scheduler)
+        await scheduler.stop()
+        return fresh, stale, broken, closed, remaining
+
+    fresh, stale, broken, closed, remaining = asyncio.run(scenario())
+
+    assert set(closed) == {stale, broken}
+    assert stale.closed_with == 1000 and broken.closed_with == 1000
+    assert fresh.closed_with is None
+    assert json.loads(fresh.sent[0])["type"] == "PING"
+    assert stale.sent == []
+    assert remaining == 1
+
+
+def test_loop_stops_when_last_socket_unregisters():
+    async def scenario():
+        scheduler = HeartbeatScheduler(interval=3600)
+        ws = _FakeWs()
+        scheduler.register(ws)
+        task = scheduler._task
+        scheduler.unregister(ws)
+        await asyncio.sleep(0)
+        return scheduler._task, task.cancelled() or task.done()
+
+    task_after, stopped = asyncio.run(scenario())
+    assert task_after is None
+    assert stopped is True
+
+
+def test_stalled_send_times_out_without_delaying_other_sockets():
+    class _StalledWs(_FakeWs):
+        async def send_text(self, text: str) -> None:
+            await asyncio.sleep(3600)
+
+        async def close(self, code: int = 1000) -> None:
+            await asyncio.sleep(3600)
+
+    async def scenario():
+        scheduler = HeartbeatScheduler(interval=3600, send_timeout=0.05)
+        fresh, stalled = _FakeWs(), _StalledWs()
+        scheduler.register(fresh, label="fresh")
+        scheduler.register(stalled, label="stalled")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        closed = await scheduler.tick()
+        elapsed = loop.time() - started
+        remaining = len(scheduler)
+        await scheduler.stop()
+        return fresh, stalled, closed, elapsed, remaining
+
+    fresh, stalled, closed, elapsed, remaining = asyncio.run(scenario())
+
+    assert closed == [stalled]
+    assert json.loads(fresh.sent[0])["type"] == "PING"
+    assert fresh.closed_with is None
+    assert elapsed < 1
+    assert remaining == 1
@@ -219,7 +219,7 @@ class VersioningTest(BaseTestCase):
             # Enable validation so boxVersion stale checks are active, but patch persistence to avoid FS writes.
             live_module.VALIDATION_ENABLED = True
             try:
-                with patch.object(live_module, "save_box_state", return_value=None):
+                with patch.object(live_module, "persist_command", return_value=None):
                     with patch.object(live_module, "append_audit_event", return_value=None):
                         await cmd(
                             Cmd(
@@ -0,0 +1,68 @@
+from escalada.api.overall_projection import (
+    OverallProjection,
+    drop_overall_projection,
+    get_overall_projection,
+    mark_overall_dirty,
+)
+from escalada.api.overall_ranking import compute_overall_ranking
+from escalada.api.score_matrix import canonicalize_athlete, drop_box_matrix
+
+
+def _state():
+    return {
+        "boxVersion": 3,
+        "routesCount": 2,
+        "routeIndex": 2,
+        "scores": {"Ana": [10.0, 5.0], "Bob": [12.0, None], "Cris": [10.0, 7.1]},
+        "competitors": [{"nume": "Bob", "club": "CSM"}],
+    }
+
+
+def test_projection_matches_export_engine():
+    state = _state()
+    payload = OverallProjection().get(state)
+    expected = compute_overall_ranking(state["scores"], 2)
+    assert [(r["rank"], r["name"], r["total"]) for r in payload["rows"]] == [
+        (row.rank, row.name, row.total) for row in expected.rows
+    ]
+    assert payload["boxVersion"] == 3 and payload["routesCount"] == 2
+    assert next(r for r in payload["rows"] if r["name"] == "Bob")["club"] == "CSM"
+
+
+def test_cached_per_version_and_only_changed_routes_are_resorted():
+    state = _state()
+    projection = OverallProjection()
+    first = projection.get(state)
+    assert projection.route_recomputes == 2
+    assert projection.get(state) is first
+
+    # Score change on route 2 without a version bump: served from cache until marked dirty.
+    state["scores"]["Bob"][1] = 9.0
+    assert projection.get(state) is first
+    projection.dirty = True
+    updated = projection.get(state)
+    assert projection.route_recomputes == 3
+    assert updated["rows"][0]["name"] == "Bob"
+
+    # Version bump without score changes: rebuilt, no route re-sorted.
+    state["boxVersion"] = 4
+    assert projection.get(state)["rows"] == updated["rows"]
+    assert projection.route_recomputes == 3
+
+
+def test_registry_dirty_flag_and_replaced_state():
+    drop_overall_projection()
+    drop_box_matrix()
+    state = _state()
+    first = get_overall_projection(7, state)
+    # Written through the command path's write-time validation (updates the box matrix).
+    state["scores"]["Dan"] = [1, "x"]
+    canonicalize_athlete(7, state, "Dan")
+    mark_overall_dirty(7)
+    assert len(get_overall_projection(7, state)["rows"]) == 4
+
+    restored = _state()
+    assert len(get_overall_projection(7, restored)["rows"]) == 3
+    assert first["rows"] != get_overall_projection(7, state)["rows"]
+    drop_overall_projection()
+    drop_box_matrix()
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from escalada.api.backup import _snapshot_from_state
+from escalada.api.overall_ranking import compute_overall_ranking, route_rank_points
+from escalada.api.save_ranking import RankingIn, _build_overall_df
+from escalada.scripts.bench_overall_ranking import legacy_overall_df, run
+
+
+def _payload(seed: int, athletes: int, routes: int) -> RankingIn:
+    rng = random.Random(seed)
+    scores = {}
+    times = {}
+    for i in range(athletes):
+        name = f"{rng.choice(['ana', 'Ana', 'bob', 'Zoe'])} {i:03d}"
+        # Ragged rows and missing routes, small value pool for dense ties.
+        length = rng.randint(0, routes)
+        scores[name] = [float(rng.choice([5, 10, 10.1, 20, 25])) for _ in range(length)]
+        times[name] = [rng.choice([None, rng.randint(30, 300)]) for _ in range(length)]
+    return RankingIn(
+        categorie="Test",
+        route_count=routes,
+        scores=scores,
+        times=times,
+        use_time_tiebreak=bool(seed % 2),
+        clubs={name: "Club" for name in list(scores)[::3]},
+    )
+
+
+@pytest.mark.parametrize("seed,athletes,routes", [(1, 40, 1), (2, 60, 2), (3, 80, 3), (4, 25, 4)])
+def test_engine_matches_legacy_builder(seed, athletes, routes):
+    payload = _payload(seed, athletes, routes)
+    expected = legacy_overall_df(payload).reset_index(drop=True)
+    assert _build_overall_df(payload).equals(expected)
+
+    rng = random.Random(seed)
+    names = list(payload.scores)
+    override = {name: rng.randint(1, 5) for name in names[: athletes // 2]}
+    flags = {name: rng.random() < 0.3 for name in names}
+    prev = {name: rng.random() < 0.2 for name in names}
+    expected = legacy_overall_df(
+        payload, rank_override=override, tb_time_flags=flags, tb_prev_flags=prev
+    ).reset_index(drop=True)
+    actual = _build_overall_df(
+        payload, rank_override=override, tb_time_flags=flags, tb_prev_flags=prev
+    )
+    assert actual.equals(expected)
+
+
+def test_route_rank_points_average_tied_positions():
+    scores = {"A": [10.0], "B": [9.0], "C": [9.0], "D": [], "E": [None]}
+    assert route_rank_points(scores, 0) == {"A": 1.0, "B": 2.5, "C": 2.5}
+
+
+def test_row_model_records_are_json_ready():
+    ranking = compute_overall_ranking(
+        {"Ana": [10.0, None], "Bob": [9.0, 8.0]}, 2, times={"Bob": [61, 70]}, use_time=True
+    )
+    records = ranking.records(lambda t: None if t is None else f"t{t}")
+    assert [r["Nume"] for r in records] == ["Bob", "Ana"]
+    assert records[1]["Score R2"] is None
+    assert records[0]["Time R1"] == "t61"
+    assert "TB Time" not in records[0]
+
+
+def test_backup_snapshot_ranking_uses_engine():
+    snap = _snapshot_from_state(
+        3,
+        {
+            "routesCount": 1,
+            "routeIndex": 1,
+            "scores": {"Ana": [10.0], "Bob": [12.0]},
+            "competitors": [{"nume": "Bob", "club": "CSM"}],
+        },
+        include_ranking=True,
+    )
+    assert [(r["Rank"], r["Nume"], r["Club"]) for r in snap["ranking"]] == [
+        (1, "Bob", "CSM"),
+        (2, "Ana", ""),
+    ]
+
+
+def test_benchmark_reports_speedup_and_identical_output():
+    report = run(athletes=120, routes=2, repeat=1)
+    assert report["identical"] is True
+    assert report["engineMs"] < report["legacyMs"]
@@ -0,0 +1,34 @@
+import io
+import re
+
+from escalada.api import pdf_writer
+from escalada.api.pdf_writer import _cell_text, write_pdf
+from escalada.scripts.bench_pdf import run
+
+
+def _pages(data: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b", data))
+
+
+def test_rows_are_split_into_page_chunks():
+    columns = ["Rank", "Name", "Score"]
+    rows = [[i, f"Athlete {i}", float(i)] for i in range(1, 101)]
+    out = io.BytesIO()
+    write_pdf(out, columns, rows, title="U13 – Overall")
+    first, per_page = pdf_writer.FIRST_PAGE_ROWS, pdf_writer.PAGE_ROWS
+    expected = 1 + -(-(len(rows) - first) // per_page)
+    assert _pages(out.getvalue()) == expected
+
+
+def test_missing_values_render_blank_and_empty_sheet(tmp_path):
+    assert _cell_text(None) == "" and _cell_text(float("nan")) == ""
+    assert _cell_text(10.5) == "10.5"
+    path = tmp_path / "route_1.pdf"
+    write_pdf(path, [], [], title="Empty")
+    assert path.read_bytes().startswith(b"%PDF") and _pages(path.read_bytes()) == 1
+
+
+def test_benchmark_reports_linear_cases():
+    report = run(sizes=(10, 60), repeat=1, legacy=False)
+    assert [case["rows"] for case in report["cases"]] == [10, 60]
+    assert report["scaling"] is not None
@@ -177,5 +177,86 @@ class PodiumRankingCalculationTest(unittest.TestCase):
                 self.assertEqual(len(response.json()), 3)
 
 
+class PodiumSourcesTest(unittest.TestCase):
+    """Test live projection lookup and the mtime-cached file fallback"""
+
+    def setUp(self):
+        from escalada.api import podium
+        from escalada.api.podium import router
+        self.podium = podium
+        podium._file_podium_cache.clear()
+        self.app = FastAPI()
+        self.app.include_router(router)
+        self.client = TestClient(self.app)
+
+    def test_podium_from_live_box_without_excel(self):
+        """Test a live box with scores is served without touching the Excel file"""
+        from escalada.api import live
+        from escalada.api.overall_projection import drop_overall_projection
+        state = {
+            "categorie": "Live U13",
+            "routesCount": 1,
+            "scores": {"Ana": [10.0], "Bob": [25.0], "Cris": [5.0], "Dan": [1.0]},
+        }
+        with patch.dict(live.state_map, {901: state}):
+            with patch('pandas.read_excel') as mock_read:
+                response = self.client.get("/podium/Live U13")
+                mock_read.assert_not_called()
+        drop_overall_projection(901)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['name'] for r in response.json()], ['Bob', 'Ana', 'Cris'])
+        self.assertEqual(response.json()[0]['color'], '#ffd700')
+
+    def test_live_podium_follows_tiebreak_decision(self):
+        """Test a podium tie is ordered by the box's tie-break decision, not by name"""
+        from escalada.api import live
+        from escalada.api.overall_projection import drop_overall_projection
+        state = {
+            "categorie": "Live U15",
+            "boxVersion": 1,
+            "routesCount": 1,
+            "routeIndex": 1,
+            "holdsCount": 10,
+            "timeCriterionEnabled": True,
+            "scores": {"Ana": [10.0], "Bob": [10.0], "Cris": [9.0], "Dan": [8.0]},
+            "times": {"Ana": [120], "Bob": [140], "Cris": [150], "Dan": [160]},
+        }
+        with patch.dict(live.state_map, {902: state}):
+            tied = [r['name'] for r in self.client.get("/podium/Live U15").json()]
+            pending = live._resolve_lead_ranking(902, state)[0]
+            fingerprint = pending["eligible_groups"][0]["fingerprint"]
+            state["prevRoundsTiebreakDecisions"] = {fingerprint: "yes"}
+            state["prevRoundsTiebreakRanks"] = {fingerprint: {"Bob": 1, "Ana": 2}}
+            state["boxVersion"] = 2
+            resolved = [r['name'] for r in self.client.get("/podium/Live U15").json()]
+        drop_overall_projection(902)
+        self.podium._rank_override_cache.pop(902, None)
+        self.assertEqual(tied, ['Ana', 'Bob', 'Cris'])
+        self.assertEqual(resolved, ['Bob', 'Ana', 'Cris'])
+
+    def test_file_podium_cached_by_mtime(self):
+        """Test overall.xlsx is parsed once until it changes on disk"""
+        import pandas as pd
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                path = Path("escalada/clasamente/Cache U15/overall.xlsx")
+                path.parent.mkdir(parents=True)
+                path.write_bytes(b"placeholder")
+                frame = pd.DataFrame({'Rank': [1, 2], 'Nume': ['Alice', 'Bob']})
+                with patch('pandas.read_excel', return_value=frame) as mock_read:
+                    first = self.client.get("/podium/Cache U15").json()
+                    second = self.client.get("/podium/Cache U15").json()
+                    self.assertEqual(mock_read.call_count, 1)
+                    self.assertEqual(first, second)
+
+                    path.write_bytes(b"placeholder, rewritten")
+                    self.client.get("/podium/Cache U15")
+                    self.assertEqual(mock_read.call_count, 2)
+            finally:
+                os.chdir(cwd)
+
+
 if __name__ == "__main__":
     unittest.main()
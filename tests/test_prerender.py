@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from escalada.api import live, official_export
+from escalada.api.artifact_cache import ArtifactCache
+from escalada.api.backup import _snapshot_from_state
+from escalada.api.export_jobs import ExportJobManager
+from escalada.api.prerender import Prerenderer, is_box_complete
+
+
+def _no_tiebreak(**kwargs):
+    return {"overall_rows": [], "route_rows": []}
+
+
+def _state(marked=True):
+    return {
+        "categorie": "U13F",
+        "routeIndex": 2,
+        "routesCount": 2,
+        "competitors": [{"nume": "Ana", "marked": True}, {"nume": "Bob", "marked": marked}],
+        "scores": {"Ana": [10.0, 5.0], "Bob": [8.0, 6.0]},
+    }
+
+
+@pytest.fixture(autouse=True)
+def thread_workers(monkeypatch):
+    monkeypatch.setenv("RANKING_WORKERS", "0")
+    monkeypatch.setattr(official_export, "resolve_rankings_with_time_tiebreak", _no_tiebreak)
+
+
+def test_is_box_complete():
+    assert is_box_complete(_state())
+    assert not is_box_complete(_state(marked=False))
+    assert not is_box_complete({**_state(), "routeIndex": 1})
+    assert not is_box_complete({**_state(), "competitors": []})
+
+
+def test_complete_box_is_prerendered_into_the_cache(monkeypatch, tmp_path):
+    state = _state()
+    monkeypatch.setattr(live, "state_map", {4: state})
+    manager = ExportJobManager(cache=ArtifactCache(tmp_path, 1024 * 1024))
+    prerenderer = Prerenderer(manager, quiet_sec=0.05, enabled=True)
+
+    async def scenario():
+        prerenderer.notify(4, _state(marked=False))
+        assert not prerenderer._pending
+        prerenderer.notify(4, state)
+        task = prerenderer._pending[4]
+        # Judge traffic on any box keeps pushing the render back.
+        for _ in range(3):
+            await asyncio.sleep(0.03)
+            prerenderer.notify(7, {})
+            assert prerenderer.submitted == 0
+        await task
+        await asyncio.gather(*manager._tasks)
+
+    asyncio.run(scenario())
+    assert prerenderer.submitted == 1
+    digest = official_export.official_export_inputs_hash(_snapshot_from_state(4, state))
+    assert manager.cache.get(digest, ".zip") is not None
+
+
+def test_unmarking_cancels_pending_prerender(monkeypatch, tmp_path):
+    monkeypatch.setattr(live, "state_map", {4: _state()})
+    prerenderer = Prerenderer(ExportJobManager(), quiet_sec=0.05, enabled=True)
+
+    async def scenario():
+        prerenderer.notify(4, _state())
+        task = prerenderer._pending[4]
+        prerenderer.notify(4, _state(marked=False))
+        await asyncio.sleep(0)
+        return task
+
+    assert asyncio.run(scenario()).cancelled()
+    assert prerenderer.submitted == 0
@@ -0,0 +1,68 @@
+import random
+
+from escalada.api.ranking_index import RouteRankingIndex, drop_route_index, get_route_index
+from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+from escalada.api.score_matrix import ScoreMatrix
+
+
+def _resolve(scores, times, **kwargs):
+    params = {
+        "scores": scores,
+        "times": times,
+        "route_count": 2,
+        "active_route_index": 2,
+        "box_id": 3,
+        "time_criterion_enabled": False,
+        "active_holds_count": 20,
+    }
+    params.update(kwargs)
+    return resolve_rankings_with_time_tiebreak(**params)
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(7)
+    scores = {f"Athlete {i:03d}": [float(rng.randint(0, 20)), None] for i in range(150)}
+    times = {name: [None, None] for name in scores}
+    matrix = ScoreMatrix.from_mappings(scores, times)
+    index = RouteRankingIndex(route_index=2, active_holds_count=20)
+    index.sync(matrix)
+
+    for _ in range(300):
+        name = rng.choice(list(scores))
+        scores[name][1] = rng.choice([None, 20.0, float(rng.randint(0, 19)), rng.randint(0, 19) + 0.1])
+        times[name][1] = rng.choice([None, rng.randint(60, 360)])
+        matrix.set_athlete(name, scores=scores[name], times=times[name])
+        assert index.sync(matrix) == 1
+        assert index.sync(matrix) == 0
+
+    assert index.verify() is True
+    expected = _resolve(scores, times)
+    actual = _resolve(scores, times, ranking_index=index)
+    assert actual == expected
+
+
+def test_sync_handles_added_and_removed_athletes():
+    matrix = ScoreMatrix.from_mappings({"Ana": [5.0], "Bob": [5.0], "Cris": [3.0]}, {})
+    index = RouteRankingIndex(route_index=1, active_holds_count=10)
+    index.sync(matrix)
+    assert [len(g["members"]) for g in index.tie_groups()] == [2]
+
+    matrix.store("Bob", scores=None)
+    matrix.set_athlete("Dan", scores=[3.0])
+    index.sync(matrix)
+    assert index.ordered_ids() == ["Ana", "Cris", "Dan"]
+    assert index.tie_groups()[0]["rank_start"] == 2
+    assert index.verify() is True
+
+
+def test_registry_rebuilds_when_route_changes():
+    drop_route_index()
+    state = {"routeIndex": 1, "holdsCount": 10, "scores": {"Ana": [4.0, 9.0]}, "times": {}}
+    first = get_route_index(1, state)
+    assert get_route_index(1, state) is first
+
+    state["routeIndex"] = 2
+    second = get_route_index(1, state)
+    assert second is not first
+    assert second.results["Ana"].hold == 9
+    drop_route_index()
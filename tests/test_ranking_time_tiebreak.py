@@ -232,3 +232,34 @@ def test_incremental_prev_rounds_memory_keeps_existing_split_when_tie_expands():
     assert pending_prev[0]["known_prev_ranks_by_name"] == {"Ana": 1, "Bob": 2}
     assert pending_prev[0]["missing_prev_rounds_members"] == ["Cris"]
     assert pending_prev[0]["requires_prev_rounds_input"] is True
+
+
+def test_event_fingerprint_cache_is_byte_identical_and_type_aware():
+    from escalada.api import ranking_time_tiebreak as rtt
+
+    def groups(time_value):
+        return [
+            {
+                "rank_start": 1,
+                "rank_end": 2,
+                "affects_podium": True,
+                "members": [
+                    {"name": "Ana", "topped": False, "hold": 9, "plus": True, "time": time_value},
+                    {"name": "Bob", "topped": False, "hold": 9, "plus": True, "time": None},
+                ],
+            }
+        ]
+
+    rtt._fingerprint_cache.clear()
+    first = rtt._event_global_fingerprint(box_id=2, route_index=1, tie_groups=groups(90))
+    assert len(rtt._fingerprint_cache) == 1
+    cached = rtt._event_global_fingerprint(box_id=2, route_index=1, tie_groups=groups(90))
+    as_float = rtt._event_global_fingerprint(box_id=2, route_index=1, tie_groups=groups(90.0))
+
+    rtt._fingerprint_cache.clear()
+    uncached_float = rtt._event_global_fingerprint(box_id=2, route_index=1, tie_groups=groups(90.0))
+
+    assert cached == first
+    assert first.startswith("tb3:")
+    assert as_float != first
+    assert as_float == uncached_float
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from escalada.api import ranking_time_tiebreak
+from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+
+
+def _category(size: int, seed: int):
+    rng = random.Random(seed)
+    scores = {}
+    times = {}
+    for i in range(size):
+        name = f"{rng.choice(['ana', 'Ana', 'bob', 'Zoe'])} {i:04d}"
+        value = rng.choice([None, 30, 30.0, rng.randint(0, 29), rng.randint(0, 29) + 0.1, -2.0])
+        scores[name] = [rng.randint(0, 30), value]
+        times[name] = [None, rng.choice([None, rng.randint(40, 400), "03:15"])]
+    return scores, times
+
+
+@pytest.mark.parametrize("holds_count", [30, None])
+@pytest.mark.parametrize("criterion", [False, True])
+def test_vectorized_baseline_matches_python_path(monkeypatch, holds_count, criterion):
+    scores, times = _category(600, seed=11)
+    if criterion:
+        # Unique result keys: no ties, so the core resolver is not involved.
+        scores = {name: [None, float(idx)] for idx, name in enumerate(list(scores)[:25])}
+        times = {name: times[name] for name in scores}
+    params = {
+        "scores": scores,
+        "times": times,
+        "route_count": 2,
+        "active_route_index": 2,
+        "box_id": 4,
+        "time_criterion_enabled": criterion,
+        "active_holds_count": holds_count,
+    }
+
+    monkeypatch.setattr(ranking_time_tiebreak, "VECTORIZED_MIN_ATHLETES", 10**9)
+    expected = resolve_rankings_with_time_tiebreak(**params)
+    monkeypatch.setattr(ranking_time_tiebreak, "VECTORIZED_MIN_ATHLETES", 1)
+    actual = resolve_rankings_with_time_tiebreak(**params)
+
+    assert actual == expected
+    assert actual["fingerprint"] == expected["fingerprint"]
+
+
+def test_vectorized_baseline_handles_tiny_inputs(monkeypatch):
+    monkeypatch.setattr(ranking_time_tiebreak, "VECTORIZED_MIN_ATHLETES", 0)
+    empty = resolve_rankings_with_time_tiebreak(
+        scores={},
+        times={},
+        route_count=1,
+        active_route_index=1,
+        box_id=None,
+        time_criterion_enabled=False,
+    )
+    assert empty["overall_rows"] == []
+
+    single = resolve_rankings_with_time_tiebreak(
+        scores={"Ana": [5.1]},
+        times={},
+        route_count=1,
+        active_route_index=1,
+        box_id=None,
+        time_criterion_enabled=False,
+    )
+    assert single["overall_rows"][0]["rank"] == 1
+    assert single["overall_rows"][0]["score"] == 5.1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from escalada.api import live, worker_pool
+from escalada.api.rankings_batch import (
+    BatchRankingRequest,
+    batch_rankings,
+    compute_category_ranking,
+)
+from escalada.api.save_ranking import RankingIn
+
+
+def _payload(categorie: str, box_id: int) -> RankingIn:
+    return RankingIn(
+        categorie=categorie,
+        route_count=2,
+        scores={"Ana": [9.0, 12.1], "Bob": [7.0, 15.0], "Cris": [8.1, 4.0]},
+        times={"Ana": [60.0, 75.0]},
+        route_index=2,
+        active_holds_count=20,
+        box_id=box_id,
+    )
+
+
+@pytest.fixture
+def live_boxes(monkeypatch):
+    monkeypatch.setattr(
+        live,
+        "state_map",
+        {
+            1: {
+                "categorie": "U13F",
+                "routesCount": 1,
+                "routeIndex": 1,
+                "holdsCount": 20,
+                "scores": {"Ana": [12.0], "Bob": [10.1]},
+                "times": {"Ana": ["01:05"], "Bob": [80]},
+                "competitors": [{"nume": "Ana", "club": "CSM"}],
+            },
+            2: {"categorie": "U15M", "routesCount": 1, "scores": {}},
+        },
+    )
+
+
+@pytest.mark.parametrize("workers", ["0", "2"])
+def test_batch_ranks_boxes_and_payloads(monkeypatch, live_boxes, workers):
+    monkeypatch.setenv("RANKING_WORKERS", workers)
+    request = BatchRankingRequest(
+        box_ids=[1, 2, 99, 1],
+        payloads=[_payload("Seniori", 5), _payload("Juniori", 6)],
+    )
+    try:
+        body = asyncio.run(batch_rankings(request, claims={"role": "admin"}))
+    finally:
+        worker_pool.shutdown_worker_pool()
+
+    by_cat = {item["categorie"]: item for item in body["results"]}
+    assert sorted(by_cat) == ["Juniori", "Seniori", "U13F"]
+    assert [row["Nume"] for row in by_cat["U13F"]["overall"]] == ["Ana", "Bob"]
+    assert by_cat["U13F"]["overall"][0]["Club"] == "CSM"
+    assert by_cat["Seniori"]["payloadIndex"] == 0
+    assert by_cat["Seniori"]["overall"] == compute_category_ranking(_payload("Seniori", 5))["overall"]
+    assert all(item["elapsedMs"] >= 0 and item["wallMs"] >= 0 for item in body["results"])
+
+    assert sorted((e["boxId"], e["error"]) for e in body["errors"]) == [
+        (2, "missing_scores"),
+        (99, "box_not_found"),
+    ]
+    assert body["timing"]["workers"] == int(workers)
+
+
+def test_batch_rejects_empty_request():
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(batch_rankings(BatchRankingRequest(), claims={"role": "admin"}))
+    assert exc.value.detail == "empty_batch"
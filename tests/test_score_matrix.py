@@ -0,0 +1,100 @@
+import json
+import math
+
+from escalada.api.ranking_time_tiebreak import resolve_rankings_with_time_tiebreak
+from escalada.api.score_matrix import (
+    ScoreMatrix,
+    box_matrix,
+    canonicalize_athlete,
+    canonicalize_state,
+    drop_box_matrix,
+)
+
+
+def test_values_are_validated_on_write():
+    matrix = ScoreMatrix.from_mappings(
+        {"Ana": [10, True, float("inf"), "7"], "": [1.0], "Bob": "bad"},
+        {"Ana": ["01:30", "95", None], "Cris": [float("nan")]},
+    )
+    assert matrix.scores["Ana"] == [10.0, None, None, None]
+    assert matrix.times["Ana"] == [90.0, 95.0, None]
+    assert matrix.times["Cris"] == [None]
+    assert "Bob" not in matrix.scores
+    assert matrix.score("Ana", 0) == 10.0
+    assert matrix.time("Ana", 5) is None
+
+
+def test_serializes_to_current_json_shape():
+    scores = {"Ana": [10.0, None], "Bob": [7.5]}
+    times = {"Bob": [61.0, 70.0, None]}
+    matrix = ScoreMatrix.from_mappings(scores, times)
+    out_scores, out_times = matrix.to_json()
+    assert out_scores == scores
+    assert out_times == times
+    json.dumps(out_scores)
+
+
+def test_columns_are_zero_copy_float64():
+    matrix = ScoreMatrix.from_mappings({"Ana": [4.0, 8.0], "Bob": [5.0]}, {})
+    column = matrix.score_column(1)
+    assert column.format == "d"
+    assert column[0] == 8.0 and math.isnan(column[1])
+    matrix.set_athlete("Bob", scores=[5.0, 9.0])
+    assert column[1] == 9.0
+
+
+def test_canonicalize_helpers_rewrite_state_in_place():
+    drop_box_matrix()
+    state = {"scores": {"Ana": [3.0]}, "times": {}}
+    matrix = box_matrix(4, state)
+    version = matrix.version
+
+    state["scores"]["Ana"] = [3, True]
+    state["times"]["Ana"] = ["00:45"]
+    canonicalize_athlete(4, state, "Ana")
+    assert state["scores"]["Ana"] == [3.0, None]
+    assert state["times"]["Ana"] == [45.0]
+    # The box matrix was updated in place (same object, new version), not rebuilt.
+    assert box_matrix(4, state) is matrix
+    assert matrix.version > version
+    assert matrix.scores["Ana"] == [3.0, None] and matrix.time("Ana", 0) == 45.0
+    # Later in-place edits of the state lists do not leak into the matrix.
+    state["scores"]["Ana"].append(9.0)
+    assert matrix.scores["Ana"] == [3.0, None]
+    drop_box_matrix()
+
+    restored = canonicalize_state({"scores": {"Bob": ["x"]}, "times": {}})
+    assert restored["scores"] == {"Bob": [None]}
+
+
+def test_ranking_reads_matrix_like_dicts():
+    scores = {"Ana": [9.0], "Bob": [7.0], "Cris": [8.1]}
+    times = {"Ana": ["01:00"], "Bob": [70], "Cris": [None]}
+    matrix = ScoreMatrix.from_mappings(scores, times)
+    params = {
+        "route_count": 1,
+        "active_route_index": 1,
+        "box_id": 1,
+        "time_criterion_enabled": False,
+        "active_holds_count": 20,
+    }
+    from_dicts = resolve_rankings_with_time_tiebreak(scores=scores, times=times, **params)
+    from_matrix = resolve_rankings_with_time_tiebreak(
+        scores=None, times=None, matrix=matrix, **params
+    )
+    assert from_matrix == from_dicts
+    json.dumps(from_matrix["overall_rows"])
+
+
+def test_whole_seconds_keeps_export_truncation():
+    matrix = ScoreMatrix.from_mappings(
+        {"Ana": [9.0], "Bob": [9.0]}, {"Ana": [61.9], "Bob": ["01:01"]}
+    )
+    whole = matrix.whole_seconds()
+    assert whole.times == {"Ana": [61.0], "Bob": [61.0]}
+    assert whole.time_column(0).tolist() == [61.0, 61.0]
+    assert matrix.times["Ana"] == [61.9]
+    assert matrix.whole_seconds() is whole
+
+    matrix.set_athlete("Ana", times=[59.5])
+    assert matrix.whole_seconds().times["Ana"] == [59.0]
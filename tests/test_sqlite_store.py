@@ -0,0 +1,116 @@
+import asyncio
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from escalada.storage import json_store, sqlite_store
+from escalada.storage.sqlite_store import SqliteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteStore(tmp_path / "escalada.sqlite3")
+    yield store
+    store.close()
+
+
+def _event(box_id, action, actor="judge1", created_at="2026-05-01T10:00:00+00:00"):
+    event = json_store.build_audit_event(
+        action=action,
+        payload={"boxId": box_id, "type": action},
+        box_id=box_id,
+        state={"boxVersion": 1, "sessionId": "s"},
+        actor={"username": actor, "role": "judge"},
+    )
+    event["createdAt"] = created_at
+    return event
+
+
+def test_wal_mode_and_command_commit(store):
+    state = {"boxVersion": 2, "sessionId": "s", "categorie": "U13", "scores": {"Ana": [5.0]}}
+    asyncio.run(store.persist_command(1, state, _event(1, "SUBMIT_SCORE")))
+
+    conn = sqlite3.connect(store.path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT count(*) FROM events").fetchone()[0] == 1
+    conn.close()
+    assert store.load_box_states() == {1: state}
+    assert store.clear_box_states() == 1 and store.load_box_states() == {}
+
+
+def test_failed_audit_insert_rolls_back_the_state(store, monkeypatch):
+    bad_insert = "INSERT INTO missing VALUES (?, ?, ?, ?, ?, ?, ?)"
+    monkeypatch.setattr(sqlite_store, "_INSERT_EVENT", bad_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(store.persist_command(1, {"boxVersion": 1}, _event(1, "SUBMIT_SCORE")))
+    assert store.load_box_states() == {}
+
+
+def test_audit_reads_and_filters(store):
+    async def write():
+        await store.append_audit_event(_event(1, "INIT_ROUTE", "admin", "2026-05-01T08:00:00+00:00"))
+        await store.append_audit_event(_event(2, "SUBMIT_SCORE", "judge2"))
+        await store.append_audit_event(_event(1, "SUBMIT_SCORE", "judge1", "2026-05-01T11:00:00Z"))
+
+    asyncio.run(write())
+    latest = store.read_latest_events(limit=2)
+    assert [e["boxId"] for e in latest] == [1, 2] and latest[0]["payload"] is None
+    assert [e["action"] for e in store.read_latest_events(box_id=1, include_payload=True)] == [
+        "SUBMIT_SCORE",
+        "INIT_ROUTE",
+    ]
+
+    def actions(**filters):
+        return [json.loads(line)["actorUsername"] for line in store.iter_audit_lines(**filters)]
+
+    assert actions(box_id=1) == ["admin", "judge1"]
+    assert actions(action="SUBMIT_SCORE", actor="judge2") == ["judge2"]
+    assert actions(since=datetime(2026, 5, 1, 10, tzinfo=timezone.utc)) == ["judge2", "judge1"]
+    assert actions(until=datetime(2026, 5, 1, 10)) == ["admin"]
+
+
+def test_save_users_writes_only_changed_rows(store):
+    users = {name: {"username": name, "role": "judge"} for name in ("a", "b", "c")}
+    store.save_users(users)
+
+    def rowids():
+        with sqlite3.connect(store.path) as conn:
+            return dict(conn.execute("SELECT username, rowid FROM users"))
+
+    before = rowids()
+    users["b"] = {"username": "b", "role": "judge", "is_active": False}
+    del users["c"]
+    users["d"] = {"username": "d", "role": "judge"}
+    store.save_users(users)
+    after = rowids()
+    # Unchanged rows are left in place; only b (replaced), c (deleted) and d (new) are written.
+    assert set(after) == {"a", "b", "d"}
+    assert after["a"] == before["a"] and after["b"] != before["b"]
+    assert store.load_users()["b"]["is_active"] is False
+
+
+def test_users_and_officials(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "_store", SqliteStore(tmp_path / "db.sqlite3"))
+    users = sqlite_store.get_users_with_default_admin()
+    assert users["admin"]["role"] == "admin"
+    users["judge"] = {"username": "judge", "role": "judge"}
+    sqlite_store.save_users(users)
+    del users["judge"]
+    sqlite_store.save_users(users)
+    assert set(sqlite_store.load_users()) == {"admin"}
+
+    sqlite_store.save_competition_officials(" Ana ", "Bob", "")
+    assert sqlite_store.load_competition_officials() == {
+        "judgeChief": "Ana",
+        "competitionDirector": "Bob",
+        "chiefRoutesetter": "",
+    }
+    asyncio.run(sqlite_store.save_competition_officials_async("Ana", "", " Cid "))
+    assert sqlite_store.load_competition_officials() == {
+        "judgeChief": "Ana",
+        "competitionDirector": "",
+        "chiefRoutesetter": "Cid",
+    }
+    sqlite_store.get_store().close()
@@ -63,13 +63,13 @@ class WebSocketFifteenBoxesAdminTest(unittest.TestCase):
         # In this sandboxed environment, tests are not allowed to write to the repo filesystem
         # (e.g. `data/boxes/*.json`), so we stub persistence/audit to keep the test "real"
         # (auth + WS + /api/cmd) while remaining in-memory.
-        self._orig_save_box_state = getattr(live_module, "save_box_state", None)
+        self._orig_persist_command = getattr(live_module, "persist_command", None)
         self._orig_append_audit_event = getattr(live_module, "append_audit_event", None)
 
         async def _noop_async(*_args, **_kwargs):
             return None
 
-        live_module.save_box_state = _noop_async
+        live_module.persist_command = _noop_async
         live_module.append_audit_event = _noop_async
         rl = get_rate_limiter()
         rl.reset_all()
@@ -79,8 +79,8 @@ class WebSocketFifteenBoxesAdminTest(unittest.TestCase):
 
     def tearDown(self):
         # Restore patched persistence hooks.
-        if getattr(self, "_orig_save_box_state", None) is not None:
-            live_module.save_box_state = self._orig_save_box_state
+        if getattr(self, "_orig_persist_command", None) is not None:
+            live_module.persist_command = self._orig_persist_command
         if getattr(self, "_orig_append_audit_event", None) is not None:
             live_module.append_audit_event = self._orig_append_audit_event
 
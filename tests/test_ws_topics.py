@@ -0,0 +1,97 @@
+import json
+
+from escalada.api import live
+from escalada.api.live import (
+    _build_topic_payload,
+    _command_topics,
+    _parse_topics,
+    _topic_messages,
+)
+
+
+class _DummyWs:
+    pass
+
+
+def test_parse_topics_accepts_query_string_and_list():
+    assert _parse_topics("flow, Ranking") == frozenset({"flow", "ranking"})
+    assert _parse_topics(["roster", "officials"]) == frozenset({"roster", "officials"})
+
+
+def test_parse_topics_returns_none_for_legacy_clients():
+    assert _parse_topics(None) is None
+    assert _parse_topics("") is None
+    assert _parse_topics("bogus") is None
+    assert _parse_topics(42) is None
+
+
+def test_command_topics_mapping():
+    assert _command_topics("START_TIMER") == frozenset({"flow"})
+    assert _command_topics("PROGRESS_UPDATE") == frozenset({"flow"})
+    assert _command_topics("REGISTER_TIME") == frozenset({"flow", "ranking"})
+    assert _command_topics("SET_TIME_CRITERION") == frozenset({"ranking"})
+    assert _command_topics("SUBMIT_SCORE") == frozenset({"flow", "ranking", "roster"})
+
+
+def test_flow_payload_is_small():
+    state = {
+        "boxVersion": 7,
+        "timerState": "running",
+        "remaining": 231.5,
+        "currentClimber": "Ana",
+        "holdCount": 12.0,
+        "competitors": [{"nume": f"Athlete {i}", "club": "Club"} for i in range(200)],
+    }
+    payload = _build_topic_payload(1, state, "flow")
+    assert payload["topic"] == "flow"
+    assert "competitors" not in payload
+    assert len(json.dumps(payload)) < 200
+
+
+def test_topic_messages_only_build_subscribed_projections(monkeypatch):
+    def _fail_resolve(*_args, **_kwargs):
+        raise AssertionError("ranking must not be resolved without subscribers")
+
+    monkeypatch.setattr(live, "_resolve_lead_ranking", _fail_resolve)
+    timer_ws = _DummyWs()
+    roster_ws = _DummyWs()
+
+    messages = _topic_messages(
+        1,
+        {"timerState": "idle", "competitors": []},
+        [(timer_ws, frozenset({"flow"})), (roster_ws, frozenset({"roster"}))],
+        frozenset({"flow", "ranking", "roster"}),
+    )
+
+    topics = {(ws, json.loads(text)["topic"]) for ws, text in messages}
+    assert topics == {(timer_ws, "flow"), (roster_ws, "roster")}
+
+
+def test_register_time_reaches_ranking_only_subscribers(monkeypatch):
+    monkeypatch.setattr(
+        live,
+        "_resolve_lead_ranking",
+        lambda *_args, **_kwargs: ({}, [{"nume": "Ana", "time": 42}]),
+    )
+    monkeypatch.setattr(live, "get_overall_projection", lambda *_args, **_kwargs: [])
+    ranking_ws = _DummyWs()
+
+    messages = _topic_messages(
+        1,
+        {"boxVersion": 3, "scores": {"Ana": [10.0]}, "times": {"Ana": [42]}},
+        [(ranking_ws, frozenset({"ranking"}))],
+        _command_topics("REGISTER_TIME"),
+    )
+
+    assert len(messages) == 1
+    ws, text = messages[0]
+    payload = json.loads(text)
+    assert ws is ranking_ws
+    assert payload["topic"] == "ranking"
+    assert payload["leadRankingRows"] == [{"nume": "Ana", "time": 42}]
+
+
+def test_topic_messages_skip_unchanged_topics():
+    ws = _DummyWs()
+    messages = _topic_messages(1, {}, [(ws, frozenset({"roster"}))], frozenset({"flow"}))
+    assert messages == []
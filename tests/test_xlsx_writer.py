@@ -0,0 +1,49 @@
+import io
+
+import openpyxl
+import pandas as pd
+
+from escalada.api.official_export import _build_route_table
+from escalada.api.xlsx_writer import write_xlsx
+
+
+def _cells(data: bytes):
+    ws = openpyxl.load_workbook(io.BytesIO(data)).active
+    return ws.title, [[cell.value for cell in row] for row in ws.iter_rows()], ws["A1"]
+
+
+def test_matches_pandas_layout():
+    columns, rows = _build_route_table(
+        scores={"Ana": [10.0], "Bob": [9.5], "Cris": [9.5], "Dan": []},
+        times={"Ana": [75]},
+        clubs={"Ana": "CSM"},
+        route_index=0,
+        use_time_tiebreak=True,
+        tb_time_flags={"Bob": True},
+    )
+    assert columns == ["Rank", "Name", "Club", "Score", "Points", "Time", "TB Time"]
+
+    ours = io.BytesIO()
+    write_xlsx(ours, columns, rows)
+    legacy = io.BytesIO()
+    pd.DataFrame(rows, columns=columns).to_excel(legacy, index=False)
+
+    title, values, header = _cells(ours.getvalue())
+    assert (title, values) == _cells(legacy.getvalue())[:2]
+    assert values[-1] == [4, "Dan", None, None, 4, None, None]
+    assert header.font.b and header.border.left.style == "thin"
+    assert header.alignment.horizontal == "center"
+
+
+def test_empty_sheet_and_path_target(tmp_path):
+    path = tmp_path / "route_1.xlsx"
+    write_xlsx(path, [], [])
+    assert _cells(path.read_bytes())[1] in ([], [[None]])
+
+
+def test_large_sheet_streams_rows():
+    rows = ([i, f"Athlete {i}", "", float(i % 50), None] for i in range(20000))
+    out = io.BytesIO()
+    write_xlsx(out, ["Rank", "Name", "Club", "Score", "Points"], rows)
+    ws = openpyxl.load_workbook(io.BytesIO(out.getvalue()), read_only=True).active
+    assert sum(1 for _ in ws.iter_rows()) == 20001
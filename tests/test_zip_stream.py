@@ -0,0 +1,71 @@
+import asyncio
+import io
+import zipfile
+
+from escalada.api import backup, live, official_export
+from escalada.api.artifact_cache import ArtifactCache
+from escalada.api.export_jobs import export_jobs
+from escalada.api.zip_stream import iter_zip, spooled_buffer
+
+
+def _no_tiebreak(**kwargs):
+    return {"overall_rows": [], "route_rows": []}
+
+
+def _collect(response):
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(read())
+
+
+def test_iter_zip_streams_members_as_chunks():
+    big = spooled_buffer()
+    big.write(bytes(range(256)) * 2048)
+    chunks = list(iter_zip([("a.txt", b"hello"), ("big.bin", big), ("z.txt", b"bye")]))
+    assert len(chunks) > 3
+    zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert zf.testzip() is None
+    assert zf.read("a.txt") == b"hello" and len(zf.read("big.bin")) == 256 * 2048
+    assert big.closed
+
+
+def test_official_zip_members(monkeypatch):
+    monkeypatch.setattr(official_export, "resolve_rankings_with_time_tiebreak", _no_tiebreak)
+    snap = {"boxId": 1, "categorie": "U13 F", "routesCount": 2, "scores": {"Ana": [10.0, 5.0]}}
+    names = zipfile.ZipFile(io.BytesIO(official_export.build_official_results_zip(snap))).namelist()
+    assert names == [
+        "U13_F/overall.xlsx",
+        "U13_F/overall.pdf",
+        "U13_F/route_1.xlsx",
+        "U13_F/route_1.pdf",
+        "U13_F/route_2.xlsx",
+        "U13_F/route_2.pdf",
+        "U13_F/metadata.json",
+    ]
+
+
+
+def test_export_endpoints_stream_and_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(official_export, "resolve_rankings_with_time_tiebreak", _no_tiebreak)
+    monkeypatch.setattr(export_jobs, "cache", ArtifactCache(tmp_path, 1024 * 1024))
+    monkeypatch.setenv("RANKING_WORKERS", "0")
+    monkeypatch.setattr(
+        live,
+        "state_map",
+        {
+            1: {"categorie": "U13F", "routesCount": 1, "scores": {"Ana": [10.0], "Bob": [8.0]}},
+            2: {"categorie": "U15M", "routesCount": 1, "scores": {"Cris": [3.0]}},
+        },
+    )
+    claims = {"role": "admin"}
+
+    rendered = asyncio.run(backup.export_official_results_zip(1, claims=claims))
+    body = open(rendered.path, "rb").read()
+    assert zipfile.ZipFile(io.BytesIO(body)).testzip() is None
+    cached = asyncio.run(backup.export_official_results_zip(1, claims=claims))
+    assert cached.path == rendered.path
+
+    bundle = asyncio.run(backup.export_official_bundle_zip(box_ids=None, claims=claims))
+    folders = {n.split("/")[0] for n in zipfile.ZipFile(io.BytesIO(_collect(bundle))).namelist()}
+    assert folders == {"U13F_box1", "U15M_box2", "index.json"}